@@ -4,15 +4,28 @@
 
 from collections import namedtuple
 
+from reversi.zobrist import ZOBRIST_BLACK, ZOBRIST_WHITE, ZOBRIST_TURN
+from reversi.BitBoardMethods.StableDiscs cimport get_stable_discs_bits_size8_64bit
+
 MIN_BOARD_SIZE = 4
 MAX_BOARD_SIZE = 26
 
 
+cdef:
+    unsigned long long[64] zobrist_b
+    unsigned long long[64] zobrist_w
+    unsigned long long zobrist_turn = ZOBRIST_TURN
+
+for i in range(64):
+    zobrist_b[i] = ZOBRIST_BLACK[i]
+    zobrist_w[i] = ZOBRIST_WHITE[i]
+
+
 cdef class CythonBitBoard():
     """Cython BitBoard
     """
     cdef readonly size
-    cdef public _black_score, _white_score, prev, _green_bitboard, _black_bitboard, _white_bitboard, _hole_bitboard, _ini_green, _ini_black, _ini_white, _mask, _flippable_discs_num
+    cdef public _black_score, _white_score, prev, _green_bitboard, _black_bitboard, _white_bitboard, _hole_bitboard, _ini_green, _ini_black, _ini_white, _mask, _flippable_discs_num, _hash
 
     def __init__(self, hole=0x0, ini_black=None, ini_white=None):
         self.size = 8
@@ -62,6 +75,7 @@ cdef class CythonBitBoard():
         self._black_bitboard &= ~self._hole_bitboard
         self._white_bitboard &= ~self._hole_bitboard
         self.update_score()
+        self.update_hash()
 
     def _is_invalid_size(self, size):
         return not(MIN_BOARD_SIZE <= size <= MAX_BOARD_SIZE and size % 2 == 0)
@@ -94,6 +108,12 @@ cdef class CythonBitBoard():
     def get_legal_moves_bits(self, str color):
         return _get_legal_moves_bits_size8_64bit(color, self._black_bitboard, self._white_bitboard, self._hole_bitboard)
 
+    def get_stable_discs(self, str color):
+        return _get_stable_discs_size8_64bit(color, self._black_bitboard, self._white_bitboard, self._hole_bitboard)
+
+    def get_stable_discs_bits(self, str color):
+        return get_stable_discs_bits_size8_64bit(self._black_bitboard if color == 'black' else self._white_bitboard, self._black_bitboard, self._white_bitboard, self._hole_bitboard)
+
     def get_flippable_discs(self, str color, x, y):
         return _get_flippable_discs_size8_64bit(color == 'black', self._black_bitboard, self._white_bitboard, x, y)
 
@@ -111,6 +131,17 @@ cdef class CythonBitBoard():
                     self._white_score += 1
                 mask >>= 1
 
+    def update_hash(self):
+        cdef:
+            unsigned long long hash_value = _get_discs_hash_size8_64bit(self._black_bitboard, self._white_bitboard)
+        if self.prev and self._black_score > self.prev[len(self.prev)-1][2]:
+            hash_value ^= zobrist_turn
+        self._hash = hash_value
+
+    @property
+    def hash(self):
+        return self._hash
+
     def get_board_info(self):
         return _get_board_info_size8_64bit(self._black_bitboard, self._white_bitboard)
 
@@ -144,7 +175,7 @@ cdef class CythonBitBoard():
         return self._black_bitboard, self._white_bitboard, self._hole_bitboard
 
     def undo(self):
-        (self._black_bitboard, self._white_bitboard, self._black_score, self._white_score) = self.prev.pop()
+        _undo_size8_64bit(self)
 
 
 cdef inline _get_legal_moves_size8_64bit(str color, unsigned long long b, unsigned long long w, unsigned long long h):
@@ -222,6 +253,26 @@ cdef inline unsigned long long _get_legal_moves_bits_size8_64bit(str color, unsi
     return blank & ((tmp_h << 1) | (tmp_h >> 1) | (tmp_v << 8) | (tmp_v >> 8) | (tmp_d1 << 9) | (tmp_d1 >> 9) | (tmp_d2 << 7) | (tmp_d2 >> 7))
 
 
+cdef inline _get_stable_discs_size8_64bit(str color, unsigned long long b, unsigned long long w, unsigned long long h):
+    """_get_stable_discs_size8_64bit
+    """
+    cdef:
+        unsigned long long stable_discs
+    stable_discs = get_stable_discs_bits_size8_64bit(b if color == 'black' else w, b, w, h)
+
+    ret = []
+    cdef:
+        unsigned int x, y
+        unsigned long long mask = 0x8000000000000000
+    for y in range(8):
+        for x in range(8):
+            if stable_discs & mask:
+                ret += [(x, y)]
+            mask >>= 1
+
+    return ret
+
+
 cdef inline _get_flippable_discs_size8_64bit(unsigned int color, unsigned long long black_bitboard, unsigned long long white_bitboard, unsigned int x, unsigned int y):
     """_get_flippable_discs_size8_64bit
     """
@@ -243,7 +294,7 @@ cdef inline unsigned long long _put_disc_size8_64bit(board, unsigned int color,
     """_put_disc_size8_64bit
     """
     cdef:
-        unsigned long long put, black_bitboard, white_bitboard, flippable_discs_num, flippable_discs_count
+        unsigned long long put, black_bitboard, white_bitboard, flippable_discs_num, flippable_discs_count, hash_value
         unsigned int black_score, white_score
         signed int shift_size
 
@@ -259,10 +310,14 @@ cdef inline unsigned long long _put_disc_size8_64bit(board, unsigned int color,
     white_bitboard = board._white_bitboard
     black_score = board._black_score
     white_score = board._white_score
+    hash_value = board._hash
     flippable_discs_num = _get_flippable_discs_num_size8_64bit(color, black_bitboard, white_bitboard, put)
     flippable_discs_count = _popcount_size8_64bit(flippable_discs_num)
 
     # 打つ前の状態を格納
+    prev = board.prev
+    if prev and black_score > prev[len(prev)-1][2]:
+        hash_value ^= zobrist_turn
     board.prev += [(black_bitboard, white_bitboard, black_score, white_score)]
 
     # 自分の石を置いて相手の石をひっくり返す
@@ -271,21 +326,40 @@ cdef inline unsigned long long _put_disc_size8_64bit(board, unsigned int color,
         white_bitboard ^= flippable_discs_num
         black_score += <unsigned int>1 + <unsigned int>flippable_discs_count
         white_score -= <unsigned int>flippable_discs_count
+        hash_value ^= _get_discs_hash_size8_64bit(put | flippable_discs_num, flippable_discs_num) ^ zobrist_turn
     else:
         white_bitboard ^= put | flippable_discs_num
         black_bitboard ^= flippable_discs_num
         black_score -= <unsigned int>flippable_discs_count
         white_score += <unsigned int>1 + <unsigned int>flippable_discs_count
+        hash_value ^= _get_discs_hash_size8_64bit(flippable_discs_num, put | flippable_discs_num)
 
     board._black_bitboard = black_bitboard
     board._white_bitboard = white_bitboard
     board._black_score = black_score
     board._white_score = white_score
     board._flippable_discs_num = flippable_discs_num
+    board._hash = hash_value
 
     return flippable_discs_num
 
 
+cdef inline void _undo_size8_64bit(board):
+    """_undo_size8_64bit
+    """
+    cdef:
+        unsigned long long black_bitboard = board._black_bitboard, white_bitboard = board._white_bitboard, hash_value = board._hash
+        unsigned int black_score = board._black_score
+    prev = board.prev
+    (board._black_bitboard, board._white_bitboard, board._black_score, board._white_score) = prev.pop()
+    # ハッシュ値を更新
+    if black_score > board._black_score:
+        hash_value ^= zobrist_turn
+    if prev and board._black_score > prev[len(prev)-1][2]:
+        hash_value ^= zobrist_turn
+    board._hash = hash_value ^ _get_discs_hash_size8_64bit(black_bitboard ^ board._black_bitboard, white_bitboard ^ board._white_bitboard)
+
+
 cdef inline unsigned long long _get_flippable_discs_num_size8_64bit(unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long move):
     """_get_flippable_discs_num_size8_64bit
     """
@@ -359,6 +433,22 @@ cdef inline unsigned long long _popcount_size8_64bit(unsigned long long bits):
     return (bits + (bits >> <unsigned int>32)) & <unsigned long long>0x000000000000007F
 
 
+cdef inline unsigned long long _get_discs_hash_size8_64bit(unsigned long long black_bits, unsigned long long white_bits):
+    """_get_discs_hash_size8_64bit
+    """
+    cdef:
+        unsigned long long lsb, hash_value = 0
+    while black_bits:
+        lsb = black_bits & (~black_bits + 1)
+        hash_value ^= zobrist_b[_popcount_size8_64bit(lsb - 1)]
+        black_bits ^= lsb
+    while white_bits:
+        lsb = white_bits & (~white_bits + 1)
+        hash_value ^= zobrist_w[_popcount_size8_64bit(lsb - 1)]
+        white_bits ^= lsb
+    return hash_value
+
+
 cdef inline _get_board_info_size8_64bit(unsigned long long b, unsigned long long w):
     """_get_board_info_size8_64bit
     """
@@ -0,0 +1,61 @@
+"""GetStableDiscs.py
+"""
+
+
+def get_stable_discs(color, size, b, w, h):
+    """
+    確定石(以降ひっくり返されることのない石)の場所をすべて返す
+    """
+    stable_discs_bits = get_stable_discs_bits(color, size, b, w, h)
+
+    # 確定石の場所を格納
+    ret = []
+    check = 1 << (size * size - 1)
+    for y in range(size):
+        for x in range(size):
+            if stable_discs_bits & check:
+                ret += [(x, y)]
+            check >>= 1
+
+    return ret
+
+
+def get_stable_discs_bits(color, size, b, w, h):
+    """
+    確定石(以降ひっくり返されることのない石)の場所をすべて返す
+    """
+    # 前準備
+    player = b if color == 'black' else w
+    board = (1 << size * size) - 1                                   # 盤面の範囲
+    blank = board & ~(b | w | h)                                     # 空きマス位置
+    left = int(('1' + '0' * (size - 1)) * size, 2)                   # 左端の列
+    right = left >> (size - 1)                                       # 右端の列
+    top = ((1 << size) - 1) << (size * (size - 1))                   # 上端の行
+    bottom = (1 << size) - 1                                         # 下端の行
+    axes = [
+        (1, board & ~right, board & ~left),                          # 水平方向
+        (size, board & ~bottom, board & ~top),                       # 垂直方向
+        (size + 1, board & ~(right | bottom), board & ~(left | top)),  # 左上-右下方向
+        (size - 1, board & ~(left | bottom), board & ~(right | top)),  # 右上-左下方向
+    ]
+
+    # 方向ごとに、空きマスを含まない列(穴で区切る)に属するマスを求める
+    full_lines = []
+    for shift_size, lmask, rmask in axes:
+        open_lines = blank
+        for _ in range(size - 1):
+            open_lines |= (((open_lines << shift_size) & lmask) | ((open_lines >> shift_size) & rmask)) & ~h
+        full_lines.append(board & ~open_lines)
+
+    # すべての方向で、列が埋まっているか両隣のどちらかが盤面の端/穴/確定石の石を確定石とする(増えなくなるまで繰り返す)
+    stable = 0
+    while True:
+        fixed = stable | h
+        new_stable = player
+        for (shift_size, lmask, rmask), full_line in zip(axes, full_lines):
+            new_stable &= full_line | ((fixed >> shift_size) & rmask) | (board & ~rmask) | ((fixed << shift_size) & lmask) | (board & ~lmask)
+        if new_stable == stable:
+            break
+        stable = new_stable
+
+    return stable
@@ -0,0 +1,39 @@
+#cython: language_level=3
+"""GetStableDiscsFast
+"""
+
+import sys
+
+from reversi.BitBoardMethods.StableDiscs cimport get_stable_discs_bits_size8_64bit
+from reversi.BitBoardMethods.GetStableDiscs import get_stable_discs_bits as _get_stable_discs_bits
+
+
+MAXSIZE64 = 2**63 - 1
+
+
+def get_stable_discs(color, size, b, w, h):
+    """get_stable_discs
+           return all stable discs
+    """
+    stable_discs_bits = get_stable_discs_bits(color, size, b, w, h)
+
+    ret = []
+    check = 1 << (size * size - 1)
+    for y in range(size):
+        for x in range(size):
+            if stable_discs_bits & check:
+                ret += [(x, y)]
+            check >>= 1
+
+    return ret
+
+
+def get_stable_discs_bits(color, size, b, w, h):
+    """get_stable_discs_bits
+           return all stable discs bits
+    """
+    if size == 8:
+        if sys.maxsize == MAXSIZE64:
+            return get_stable_discs_bits_size8_64bit(b if color == 'black' else w, b, w, h)
+
+    return _get_stable_discs_bits(color, size, b, w, h)
@@ -1,6 +1,8 @@
 """PutDisc.py
 """
 
+from reversi.zobrist import get_discs_hash, get_turn_hash
+
 
 def put_disc(board, color, x, y):
     """put_disc
@@ -18,6 +20,7 @@ def put_disc(board, color, x, y):
         flippable_discs_num |= 1 << ((size*size-1)-(tmp_y*size+tmp_x))
 
     # 打つ前の状態を格納
+    turn_hash = get_turn_hash(board.prev, board._black_score)
     board.prev += [(board._black_bitboard, board._white_bitboard, board._black_score, board._white_score)]
 
     # 自分の石を置いて相手の石をひっくり返す
@@ -33,6 +36,12 @@ def put_disc(board, color, x, y):
         board._black_score -= len(flippable_discs)
         board._white_score += 1 + len(flippable_discs)
 
+    # ハッシュ値を更新
+    black_bits, white_bits = flippable_discs_num, put | flippable_discs_num
+    if color == 'black':
+        black_bits, white_bits = white_bits, black_bits
+    board._hash ^= get_discs_hash(black_bits, white_bits) ^ turn_hash ^ get_turn_hash(board.prev, board._black_score)
+
     board._flippable_discs_num = flippable_discs_num
 
     return flippable_discs_num
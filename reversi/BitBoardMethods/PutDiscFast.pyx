@@ -4,10 +4,22 @@
 
 import sys
 
+from reversi.zobrist import ZOBRIST_BLACK, ZOBRIST_WHITE, ZOBRIST_TURN, get_discs_hash, get_turn_hash
+
 
 MAXSIZE64 = 2**63 - 1
 
 
+cdef:
+    unsigned long long[64] zobrist_b
+    unsigned long long[64] zobrist_w
+    unsigned long long zobrist_turn = ZOBRIST_TURN
+
+for i in range(64):
+    zobrist_b[i] = ZOBRIST_BLACK[i]
+    zobrist_w[i] = ZOBRIST_WHITE[i]
+
+
 def put_disc(board, color, x, y):
     """put_disc
     """
@@ -23,7 +35,7 @@ cdef inline unsigned long long _put_disc_size8_64bit(board, unsigned int color,
     """_put_disc_size8_64bit
     """
     cdef:
-        unsigned long long put, black_bitboard, white_bitboard, flippable_discs_num, flippable_discs_count
+        unsigned long long put, black_bitboard, white_bitboard, flippable_discs_num, flippable_discs_count, hash_value
         unsigned int black_score, white_score
         signed int shift_size
 
@@ -39,10 +51,14 @@ cdef inline unsigned long long _put_disc_size8_64bit(board, unsigned int color,
     white_bitboard = board._white_bitboard
     black_score = board._black_score
     white_score = board._white_score
+    hash_value = board._hash
     flippable_discs_num = _get_flippable_discs_num_size8_64bit(color, black_bitboard, white_bitboard, shift_size)
     flippable_discs_count = _get_flippable_discs_count_size8_64bit(flippable_discs_num)
 
     # 打つ前の状態を格納
+    prev = board.prev
+    if prev and black_score > prev[-1][2]:
+        hash_value ^= zobrist_turn
     board.prev += [(black_bitboard, white_bitboard, black_score, white_score)]
 
     # 自分の石を置いて相手の石をひっくり返す
@@ -51,17 +67,20 @@ cdef inline unsigned long long _put_disc_size8_64bit(board, unsigned int color,
         white_bitboard ^= flippable_discs_num
         black_score += <unsigned int>1 + <unsigned int>flippable_discs_count
         white_score -= <unsigned int>flippable_discs_count
+        hash_value ^= _get_discs_hash_size8_64bit(put | flippable_discs_num, flippable_discs_num) ^ zobrist_turn
     else:
         white_bitboard ^= put | flippable_discs_num
         black_bitboard ^= flippable_discs_num
         black_score -= <unsigned int>flippable_discs_count
         white_score += <unsigned int>1 + <unsigned int>flippable_discs_count
+        hash_value ^= _get_discs_hash_size8_64bit(flippable_discs_num, put | flippable_discs_num)
 
     board._black_bitboard = black_bitboard
     board._white_bitboard = white_bitboard
     board._black_score = black_score
     board._white_score = white_score
     board._flippable_discs_num = flippable_discs_num
+    board._hash = hash_value
 
     return flippable_discs_num
 
@@ -143,6 +162,22 @@ cdef inline unsigned long long _get_flippable_discs_count_size8_64bit(unsigned l
     return (discs & <unsigned long long>0x00000000FFFFFFFF) + (discs >> <unsigned int>32 & <unsigned long long>0x00000000FFFFFFFF)
 
 
+cdef inline unsigned long long _get_discs_hash_size8_64bit(unsigned long long black_bits, unsigned long long white_bits):
+    """_get_discs_hash_size8_64bit
+    """
+    cdef:
+        unsigned long long lsb, hash_value = 0
+    while black_bits:
+        lsb = black_bits & (~black_bits + 1)
+        hash_value ^= zobrist_b[_get_flippable_discs_count_size8_64bit(lsb - 1)]
+        black_bits ^= lsb
+    while white_bits:
+        lsb = white_bits & (~white_bits + 1)
+        hash_value ^= zobrist_w[_get_flippable_discs_count_size8_64bit(lsb - 1)]
+        white_bits ^= lsb
+    return hash_value
+
+
 cdef inline _put_disc(size, board, color, unsigned int x, unsigned int y):
     """_put_disc
     """
@@ -162,6 +197,7 @@ cdef inline _put_disc(size, board, color, unsigned int x, unsigned int y):
         flippable_discs_num |= 1 << ((size*size-1)-(tmp_y*size+tmp_x))
 
     # 打つ前の状態を格納
+    turn_hash = get_turn_hash(board.prev, board._black_score)
     board.prev += [(board._black_bitboard, board._white_bitboard, board._black_score, board._white_score)]
 
     # 自分の石を置いて相手の石をひっくり返す
@@ -170,11 +206,13 @@ cdef inline _put_disc(size, board, color, unsigned int x, unsigned int y):
         board._white_bitboard ^= flippable_discs_num
         board._black_score += 1 + len(flippable_discs)
         board._white_score -= len(flippable_discs)
+        board._hash ^= get_discs_hash(put | flippable_discs_num, flippable_discs_num) ^ turn_hash ^ ZOBRIST_TURN
     else:
         board._white_bitboard ^= put | flippable_discs_num
         board._black_bitboard ^= flippable_discs_num
         board._black_score -= len(flippable_discs)
         board._white_score += 1 + len(flippable_discs)
+        board._hash ^= get_discs_hash(flippable_discs_num, put | flippable_discs_num) ^ turn_hash
 
     board._flippable_discs_num = flippable_discs_num
 
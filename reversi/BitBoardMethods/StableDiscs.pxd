@@ -0,0 +1,52 @@
+# StableDiscs
+#
+#        盤面サイズ8の確定石(以降ひっくり返されることのない石)の算出
+#        方向ごとに空きマスを含まない列を求め、盤面の端/穴/確定石に接する石を広げていく
+
+
+cdef inline unsigned long long get_stable_discs_bits_size8_64bit(unsigned long long player, unsigned long long b, unsigned long long w, unsigned long long h) noexcept nogil:
+    """get_stable_discs_bits_size8_64bit
+    """
+    cdef:
+        unsigned int i
+        unsigned long long blank = ~(b | w | h)
+        unsigned long long full_h, full_v, full_d1, full_d2, open_lines
+        unsigned long long stable = 0, new_stable, fixed
+
+    # 水平方向
+    open_lines = blank
+    for i in range(7):
+        open_lines |= (((open_lines << 1) & <unsigned long long>0xFEFEFEFEFEFEFEFE) | ((open_lines >> 1) & <unsigned long long>0x7F7F7F7F7F7F7F7F)) & ~h
+    full_h = ~open_lines
+
+    # 垂直方向
+    open_lines = blank
+    for i in range(7):
+        open_lines |= ((open_lines << 8) | (open_lines >> 8)) & ~h
+    full_v = ~open_lines
+
+    # 左上-右下方向
+    open_lines = blank
+    for i in range(7):
+        open_lines |= (((open_lines << 9) & <unsigned long long>0xFEFEFEFEFEFEFEFE) | ((open_lines >> 9) & <unsigned long long>0x7F7F7F7F7F7F7F7F)) & ~h
+    full_d1 = ~open_lines
+
+    # 右上-左下方向
+    open_lines = blank
+    for i in range(7):
+        open_lines |= (((open_lines << 7) & <unsigned long long>0x7F7F7F7F7F7F7F7F) | ((open_lines >> 7) & <unsigned long long>0xFEFEFEFEFEFEFEFE)) & ~h
+    full_d2 = ~open_lines
+
+    # すべての方向で、列が埋まっているか両隣のどちらかが盤面の端/穴/確定石の石を確定石とする(増えなくなるまで繰り返す)
+    while True:
+        fixed = stable | h
+        new_stable = player
+        new_stable &= full_h | ((fixed >> 1) & <unsigned long long>0x7F7F7F7F7F7F7F7F) | <unsigned long long>0x8080808080808080 | ((fixed << 1) & <unsigned long long>0xFEFEFEFEFEFEFEFE) | <unsigned long long>0x0101010101010101  # noqa: E501
+        new_stable &= full_v | (fixed >> 8) | <unsigned long long>0xFF00000000000000 | (fixed << 8) | <unsigned long long>0x00000000000000FF
+        new_stable &= full_d1 | ((fixed >> 9) & <unsigned long long>0x007F7F7F7F7F7F7F) | <unsigned long long>0xFF80808080808080 | ((fixed << 9) & <unsigned long long>0xFEFEFEFEFEFEFE00) | <unsigned long long>0x01010101010101FF  # noqa: E501
+        new_stable &= full_d2 | ((fixed >> 7) & <unsigned long long>0x00FEFEFEFEFEFEFE) | <unsigned long long>0xFF01010101010101 | ((fixed << 7) & <unsigned long long>0x7F7F7F7F7F7F7F00) | <unsigned long long>0x80808080808080FF  # noqa: E501
+        if new_stable == stable:
+            break
+        stable = new_stable
+
+    return stable
@@ -1,8 +1,15 @@
 """Undo
 """
 
+from reversi.zobrist import get_discs_hash, get_turn_hash
+
 
 def undo(board):
     """undo
     """
+    black_bitboard, white_bitboard = board._black_bitboard, board._white_bitboard
+    turn_hash = get_turn_hash(board.prev, board._black_score)
     (board._black_bitboard, board._white_bitboard, board._black_score, board._white_score) = board.prev.pop()
+    # ハッシュ値を更新
+    discs_hash = get_discs_hash(black_bitboard ^ board._black_bitboard, white_bitboard ^ board._white_bitboard)
+    board._hash ^= discs_hash ^ turn_hash ^ get_turn_hash(board.prev, board._black_score)
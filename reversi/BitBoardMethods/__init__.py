@@ -8,6 +8,7 @@ SLOW_MODE2 = True
 SLOW_MODE3 = True
 SLOW_MODE4 = True
 SLOW_MODE5 = True
+SLOW_MODE6 = True
 CYBOARD_ERROR = True
 
 
@@ -61,6 +62,16 @@ try:
 except ImportError:
     from reversi.BitBoardMethods.PutDisc import put_disc
 
+try:
+    if 'FORCE_BITBOARDMETHODS_IMPORT_ERROR' in os.environ:
+        if os.environ['FORCE_BITBOARDMETHODS_IMPORT_ERROR'] == 'RAISE':
+            raise ImportError
+
+    from reversi.BitBoardMethods.GetStableDiscsFast import get_stable_discs, get_stable_discs_bits
+    SLOW_MODE6 = False
+except ImportError:
+    from reversi.BitBoardMethods.GetStableDiscs import get_stable_discs, get_stable_discs_bits
+
 try:
     if 'FORCE_CYBOARD_IMPORT_ERROR' in os.environ:
         if os.environ['FORCE_CYBOARD_IMPORT_ERROR'] == 'RAISE':
@@ -79,5 +90,7 @@ __all__ = [
     'get_board_info',
     'undo',
     'put_disc',
+    'get_stable_discs',
+    'get_stable_discs_bits',
     'CythonBitBoard',
 ]
@@ -47,6 +47,15 @@ setup(
     ext_modules=ext_modules
 )
 
+# GetStableDiscsFast
+ext_modules = [Extension("GetStableDiscsFast", ["GetStableDiscsFast.pyx"])]
+
+setup(
+    name='GetStableDiscsFast',
+    cmdclass={'build_ext': build_ext},
+    ext_modules=ext_modules
+)
+
 # CyBoard8_64bit
 ext_modules = [Extension("CyBoard8_64bit", ["CyBoard8_64bit.pyx"])]
 
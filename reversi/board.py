@@ -7,6 +7,7 @@ from collections import namedtuple
 
 from reversi.color import C as c
 from reversi.disc import D as d
+from reversi.zobrist import ZOBRIST_TURN, get_hash, get_discs_hash, get_turn_hash
 import reversi.BitBoardMethods as BitBoardMethods
 
 
@@ -102,6 +103,7 @@ class Board(AbstractBoard):
                     self._board[y][x] = d.white
                 mask >>= 1
         self.update_score()
+        self.update_hash()
 
     def _set_hole(self):
         size = self.size
@@ -112,6 +114,7 @@ class Board(AbstractBoard):
                     self._board[y][x] = d.hole
                 mask >>= 1
         self.update_score()
+        self.update_hash()
 
     def _is_invalid_size(self, size):
         """_is_invalid_size
@@ -184,6 +187,22 @@ class Board(AbstractBoard):
 
         return ret
 
+    def get_stable_discs(self, color):
+        """get_stable_discs
+
+               確定石(以降ひっくり返されることのない石)の場所をすべて返す
+        """
+        black_bitboard, white_bitboard, hole_bitboard = self.get_bitboard_info()
+        return BitBoardMethods.get_stable_discs(color, self.size, black_bitboard, white_bitboard, hole_bitboard)
+
+    def get_stable_discs_bits(self, color):
+        """get_stable_discs_bits
+
+               確定石(以降ひっくり返されることのない石)の場所をビットで返す
+        """
+        black_bitboard, white_bitboard, hole_bitboard = self.get_bitboard_info()
+        return BitBoardMethods.get_stable_discs_bits(color, self.size, black_bitboard, white_bitboard, hole_bitboard)
+
     def _get_flippable_discs_in_direction(self, color, x, y, direction):
         """_get_flippable_discs_in_direction
 
@@ -270,10 +289,14 @@ class Board(AbstractBoard):
         for tmp_x, tmp_y, in flippable_discs:
             self._board[tmp_y][tmp_x] = d[color]
 
+        flippable_discs_num = self._get_bit_pos(flippable_discs)
+        turn_hash = self._get_turn_hash()
+
         self.update_score()                                                                  # スコア更新
         self.prev += [{'color': color, 'x': x, 'y': y, 'flippable_discs': flippable_discs}]  # 打った手の記録
+        self._hash ^= self._get_discs_hash(color, x, y, flippable_discs_num) ^ turn_hash ^ self._get_turn_hash()  # ハッシュ値更新
 
-        return self._get_bit_pos(flippable_discs)
+        return flippable_discs_num
 
     def update_score(self):
         """update_score
@@ -281,6 +304,39 @@ class Board(AbstractBoard):
         self._black_score = sum([row.count(d.black) for row in self._board])
         self._white_score = sum([row.count(d.white) for row in self._board])
 
+    def update_hash(self):
+        """update_hash
+        """
+        black_bitboard, white_bitboard, _ = self.get_bitboard_info()
+        self._hash = get_hash(black_bitboard, white_bitboard, c.next_color(self.prev[-1]['color']) if self.prev else c.black)
+
+    @property
+    def hash(self):
+        """hash
+
+               盤面(手番含む)のハッシュ値
+        """
+        return self._hash
+
+    def _get_turn_hash(self):
+        """_get_turn_hash
+
+               直前の手から手番のハッシュ値を求める(パスは考慮しない)
+        """
+        if self.prev and self.prev[-1]['color'] == c.black:
+            return ZOBRIST_TURN
+        return 0
+
+    def _get_discs_hash(self, color, x, y, flippable_discs_num):
+        """_get_discs_hash
+
+               着手前後の石のハッシュ値の差分
+        """
+        put = 1 << ((self.size*self.size-1)-(y*self.size+x))
+        if color == c.black:
+            return get_discs_hash(put | flippable_discs_num, flippable_discs_num)
+        return get_discs_hash(flippable_discs_num, put | flippable_discs_num)
+
     def _get_bit_pos(self, discs):
         """_get_bit_pos
 
@@ -370,11 +426,14 @@ class Board(AbstractBoard):
     def undo(self):
         """undo
         """
+        turn_hash = self._get_turn_hash()
         prev = self.prev.pop()
         self._board[prev['y']][prev['x']] = d.blank     # 置いた石を取り除く
         for prev_x, prev_y in prev['flippable_discs']:  # ひっくり返された石を反転させる
             self._board[prev_y][prev_x] = d[c.next_color(prev['color'])]
         self.update_score()
+        discs_hash = self._get_discs_hash(prev['color'], prev['x'], prev['y'], self._get_bit_pos(prev['flippable_discs']))
+        self._hash ^= discs_hash ^ turn_hash ^ self._get_turn_hash()  # ハッシュ値更新
 
 
 def BitBoard(size=8, hole=0x0, ini_black=None, ini_white=None):
@@ -438,12 +497,14 @@ class PyBitBoard(AbstractBoard):
         self._black_bitboard |= self._ini_black
         self._white_bitboard |= self._ini_white
         self.update_score()
+        self.update_hash()
 
     def _set_hole(self):
         self._green_bitboard &= ~self._hole_bitboard
         self._black_bitboard &= ~self._hole_bitboard
         self._white_bitboard &= ~self._hole_bitboard
         self.update_score()
+        self.update_hash()
 
     def _is_invalid_size(self, size):
         """_is_invalid_size
@@ -497,6 +558,20 @@ class PyBitBoard(AbstractBoard):
         """
         return BitBoardMethods.get_legal_moves_bits(color, self.size, self._black_bitboard, self._white_bitboard, self._hole_bitboard, self._mask)
 
+    def get_stable_discs(self, color):
+        """get_stable_discs
+
+               確定石(以降ひっくり返されることのない石)の場所をすべて返す
+        """
+        return BitBoardMethods.get_stable_discs(color, self.size, self._black_bitboard, self._white_bitboard, self._hole_bitboard)
+
+    def get_stable_discs_bits(self, color):
+        """get_stable_discs_bits
+
+               確定石(以降ひっくり返されることのない石)の場所をビットで返す
+        """
+        return BitBoardMethods.get_stable_discs_bits(color, self.size, self._black_bitboard, self._white_bitboard, self._hole_bitboard)
+
     def get_flippable_discs(self, color, x, y):
         """get_flippable_discs
 
@@ -525,6 +600,19 @@ class PyBitBoard(AbstractBoard):
                     self._white_score += 1
                 mask >>= 1
 
+    def update_hash(self):
+        """update_hash
+        """
+        self._hash = get_discs_hash(self._black_bitboard, self._white_bitboard) ^ get_turn_hash(self.prev, self._black_score)
+
+    @property
+    def hash(self):
+        """hash
+
+               盤面(手番含む)のハッシュ値
+        """
+        return self._hash
+
     def get_board_info(self):
         """get_board_info
         """
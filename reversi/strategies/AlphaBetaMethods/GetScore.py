@@ -1,8 +1,6 @@
 """Get Score of AlphaBeta strategy
 """
 
-import time
-
 from reversi.strategies.common import Timer, Measure
 
 
@@ -111,8 +109,7 @@ def timer(pid):
     """timer
     """
     if pid:
-        if time.time() > Timer.deadline[pid]:
-            Timer.timeout_flag[pid] = True  # タイムアウト発生
-            return Timer.timeout_value[pid]
+        if Timer.is_expired(pid):
+            return Timer.get_timeout_value(pid)  # タイムアウト発生
 
     return None
@@ -3,14 +3,24 @@
 """
 
 import sys
-import time
 
 from reversi.strategies.common import Timer, Measure
+from reversi.zobrist import ZOBRIST_BLACK, ZOBRIST_WHITE, ZOBRIST_TURN
 
 
 MAXSIZE64 = 2**63 - 1
 
 
+cdef:
+    unsigned long long[64] zobrist_b
+    unsigned long long[64] zobrist_w
+    unsigned long long zobrist_turn = ZOBRIST_TURN
+
+for i in range(64):
+    zobrist_b[i] = ZOBRIST_BLACK[i]
+    zobrist_w[i] = ZOBRIST_WHITE[i]
+
+
 def get_score(alphabeta, color, board, alpha, beta, depth, pid):
     """get_score
     """
@@ -166,9 +176,8 @@ cdef inline signed int timer(pid):
     """timer
     """
     if pid:
-        if time.time() > Timer.deadline[pid]:
-            Timer.timeout_flag[pid] = True  # タイムアウト発生
-            return Timer.timeout_value[pid]
+        if Timer.is_expired(pid):
+            return Timer.get_timeout_value(pid)  # タイムアウト発生
 
     return <signed int>0
 
@@ -301,7 +310,7 @@ cdef inline unsigned long long _put_disc_size8_64bit(board, unsigned int color,
     """_put_disc_size8_64bit
     """
     cdef:
-        unsigned long long put, black_bitboard, white_bitboard, flippable_discs_num, flippable_discs_count
+        unsigned long long put, black_bitboard, white_bitboard, flippable_discs_num, flippable_discs_count, hash_value
         unsigned int black_score, white_score
         signed int shift_size
 
@@ -314,10 +323,14 @@ cdef inline unsigned long long _put_disc_size8_64bit(board, unsigned int color,
     white_bitboard = board._white_bitboard
     black_score = board._black_score
     white_score = board._white_score
+    hash_value = board._hash
     flippable_discs_num = _get_flippable_discs_num_size8_64bit(color, black_bitboard, white_bitboard, shift_size)
     flippable_discs_count = _get_bit_count_size8_64bit(flippable_discs_num)
 
     # 打つ前の状態を格納
+    prev = board.prev
+    if prev and black_score > prev[-1][2]:
+        hash_value ^= zobrist_turn
     board.prev += [(black_bitboard, white_bitboard, black_score, white_score)]
 
     # 自分の石を置いて相手の石をひっくり返す
@@ -326,17 +339,20 @@ cdef inline unsigned long long _put_disc_size8_64bit(board, unsigned int color,
         white_bitboard ^= flippable_discs_num
         black_score += <unsigned int>1 + <unsigned int>flippable_discs_count
         white_score -= <unsigned int>flippable_discs_count
+        hash_value ^= _get_discs_hash_size8_64bit(put | flippable_discs_num, flippable_discs_num) ^ zobrist_turn
     else:
         white_bitboard ^= put | flippable_discs_num
         black_bitboard ^= flippable_discs_num
         black_score -= <unsigned int>flippable_discs_count
         white_score += <unsigned int>1 + <unsigned int>flippable_discs_count
+        hash_value ^= _get_discs_hash_size8_64bit(flippable_discs_num, put | flippable_discs_num)
 
     board._black_bitboard = black_bitboard
     board._white_bitboard = white_bitboard
     board._black_score = black_score
     board._white_score = white_score
     board._flippable_discs_num = flippable_discs_num
+    board._hash = hash_value
 
     return flippable_discs_num
 
@@ -406,7 +422,33 @@ cdef inline unsigned long long _get_next_put_size8_64bit(unsigned long long put,
     return next_put
 
 
+cdef inline unsigned long long _get_discs_hash_size8_64bit(unsigned long long black_bits, unsigned long long white_bits):
+    """_get_discs_hash_size8_64bit
+    """
+    cdef:
+        unsigned long long lsb, hash_value = 0
+    while black_bits:
+        lsb = black_bits & (~black_bits + 1)
+        hash_value ^= zobrist_b[_get_bit_count_size8_64bit(lsb - 1)]
+        black_bits ^= lsb
+    while white_bits:
+        lsb = white_bits & (~white_bits + 1)
+        hash_value ^= zobrist_w[_get_bit_count_size8_64bit(lsb - 1)]
+        white_bits ^= lsb
+    return hash_value
+
+
 cdef inline _undo(board):
     """_undo
     """
-    (board._black_bitboard, board._white_bitboard, board._black_score, board._white_score) = board.prev.pop()
+    cdef:
+        unsigned long long black_bitboard = board._black_bitboard, white_bitboard = board._white_bitboard, hash_value = board._hash
+        unsigned int black_score = board._black_score
+    prev = board.prev
+    (board._black_bitboard, board._white_bitboard, board._black_score, board._white_score) = prev.pop()
+    # ハッシュ値を更新
+    if black_score > board._black_score:
+        hash_value ^= zobrist_turn
+    if prev and board._black_score > prev[-1][2]:
+        hash_value ^= zobrist_turn
+    board._hash = hash_value ^ _get_discs_hash_size8_64bit(black_bitboard ^ board._black_bitboard, white_bitboard ^ board._white_bitboard)
@@ -21,7 +21,7 @@ try:
         if os.environ['FORCE_ALPHABETAMETHODS_IMPORT_ERROR'] == 'RAISE':
             raise ImportError
 
-    from ...strategies.AlphaBetaMethods.NextMoveSize8_64bit import next_move, get_best_move
+    from ...strategies.AlphaBetaMethods.NextMoveSize8_64bit import next_move, get_best_move, SearchContext
     ALPHABETA_SIZE8_64BIT_ERROR = False
 except ImportError:
     pass
@@ -34,4 +34,5 @@ __all__ = [
     'get_score_measure_timer',
     'next_move',
     'get_best_move',
+    'SearchContext',
 ]
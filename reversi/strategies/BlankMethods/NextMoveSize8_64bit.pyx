@@ -5,6 +5,14 @@
 import time
 
 from reversi.strategies.common import Timer, Measure
+from reversi.zobrist import ZOBRIST_BLACK, ZOBRIST_WHITE, ZOBRIST_TURN
+from reversi.strategies.common.TimeoutCheck cimport TimeoutCheck, init_timeout_check, is_timeout
+from reversi.strategies.common.StatsCounter cimport StatsCounter, init_stats_counter, count_node, count_cutoff
+from reversi.strategies.common.PrincipalVariation cimport PVTable, pv_clear, pv_update, pv_to_list
+from reversi.strategies.coordinator.EvaluatorMethods.CyEvaluator8_64bit import CyEvaluator_Compiled
+from reversi.strategies.coordinator.EvaluatorMethods.CyEvaluator8_64bit cimport CyEvaluator
+from reversi.strategies.common.TableScore cimport get_table_score, get_table_delta
+from reversi.strategies.common.ShallowSearch cimport sort_moves_by_shallow_search
 
 
 DEF POSITIVE_INFINITY = 10000000
@@ -14,310 +22,10 @@ DEF POSSIBILITY_RANGE = MAX_POSSIBILITY * 2 + 1
 DEF BUCKET_SIZE = MAX_POSSIBILITY
 DEF TRANSPOSITION_TABLE_DEPTH = 3  # 置換表を有効にする残りの探索深さ
 cdef:
-    unsigned long long measure_count
-    unsigned long long bb
-    unsigned long long wb
-    unsigned long long hb
-    unsigned long long fd
-    unsigned long long[64] pbb
-    unsigned long long[64] pwb
-    unsigned int bs
-    unsigned int ws
-    unsigned int[64] pbs
-    unsigned int[64] pws
-    unsigned int tail
-    double timer_deadline
-    unsigned int timer_timeout
-    signed int timer_timeout_value
-    signed int corner, c, a1, a2, b1, b2, b3, wx, o1, o2, wp, ww, we, wb1, wb2, wb3
-    # {{{ -- signed int[8][8] t_table= [ --
-    signed int[8][8] t_table= [
-        [0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-    ]
-    # -- signed int[8][8] t_table= [ -- }}}
-    # {{{ --- signed int[8][256] table_values= [ ---
-    signed int[8][256] table_values= [
-        [
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-        ],
-        [
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-        ],
-        [
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-        ],
-        [
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-        ],
-        [
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-        ],
-        [
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-        ],
-        [
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-        ],
-        [
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-        ],
-    ]
-    # --- signed int[8][256] table_values= [ --- }}}
+    unsigned long long[64] zobrist_b
+    unsigned long long[64] zobrist_w
+    unsigned long long[64] zobrist_f
+    unsigned long long zobrist_turn = ZOBRIST_TURN
     # {{{ -- signed int[256] edge_table8 = [ --
     signed int[256] edge_table8 = [
         0, 0, 0, 1, 0, 0, 0, 2,
@@ -354,27 +62,95 @@ cdef:
         4, 4, 4, 5, 5, 5, 6, 13
     ]
     # -- signed int[256] edge_table8 = [ -- }}}
-    dict tp_table = {}  # Trans Position Table
 
 
-def next_move(color, board, params, depth, pid, timer, measure):
+for i in range(64):
+    zobrist_b[i] = ZOBRIST_BLACK[i]
+    zobrist_w[i] = ZOBRIST_WHITE[i]
+    zobrist_f[i] = ZOBRIST_BLACK[i] ^ ZOBRIST_WHITE[i]
+
+
+cdef class SearchContext:
+    """SearchContext
+
+           探索ごとの状態(盤面、タイマー、計測値など)
+    """
+    cdef:
+        unsigned long long measure_count
+        StatsCounter stats
+        PVTable pv
+        unsigned long long bb
+        unsigned long long wb
+        unsigned long long hb
+        unsigned long long fd
+        unsigned long long[64] pbb
+        unsigned long long[64] pwb
+        unsigned int bs
+        unsigned int ws
+        unsigned int[64] pbs
+        unsigned int[64] pws
+        unsigned int tail
+        unsigned long long zh
+        unsigned long long[64] pzh
+        signed int ts
+        signed int[64] pts
+        TimeoutCheck timer_check
+        unsigned int timer_timeout
+        signed int timer_timeout_value
+        signed int corner, c, a1, a2, b1, b2, b3, wx, o1, o2, wp, ww, we, wb1, wb2, wb3
+        signed int[8][8] t_table
+        signed int[64] square_values
+        dict tp_table
+        CyEvaluator order_evaluator
+
+    def __cinit__(self):
+        self.tp_table = {}
+
+    cdef public unsigned int timer_interval         # タイムアウトを確認するノード数の間隔(0の場合は探索速度に合わせて調整)
+    cdef public unsigned int ordering_depth         # 浅い探索で手を並び替える残り深さの下限(0の場合は並び替えない)
+    cdef public unsigned int ordering_search_depth  # 手の並び替えに用いる浅い探索の深さ
+
+    def __init__(self, timer_interval=0, ordering_depth=0, ordering_search_depth=2):
+        self.timer_interval = timer_interval
+        self.ordering_depth = ordering_depth
+        self.ordering_search_depth = ordering_search_depth
+
+    def __reduce__(self):
+        return (SearchContext, (self.timer_interval, self.ordering_depth, self.ordering_search_depth))  # 複製時は初期状態とする
+
+    def get_pv(self):
+        """get_pv
+
+               直前の探索の最善応手手順((x, y)のリスト、パスはNone)
+        """
+        return pv_to_list(&self.pv)
+
+
+def next_move(color, board, params, depth, pid, timer, measure, context=None, stats=None):
     """next_move
     """
     if pid is None:
         timer, measure = False, False
-    return _next_move(color, board, params, depth, pid, timer, measure)
+    cdef SearchContext ctx = SearchContext() if context is None else context  # 探索ごとの状態
+    ret = _next_move(ctx, color, board, params, depth, pid, timer, measure)
+    if stats is not None:
+        stats.add(ctx.stats)  # 探索の統計情報を加算
+    return ret
 
 
-def get_best_move(color, board, params, moves, alpha, beta, depth, pid, timer, measure):
+def get_best_move(color, board, params, moves, alpha, beta, depth, pid, timer, measure, context=None, stats=None):
     """get_best_move
     """
     if pid is None:
         timer, measure = False, False
-    return _get_best_move_wrap(color, board, params, moves, alpha, beta, depth, pid, timer, measure)
+    cdef SearchContext ctx = SearchContext() if context is None else context  # 探索ごとの状態
+    ret = _get_best_move_wrap(ctx, color, board, params, moves, alpha, beta, depth, pid, timer, measure)
+    if stats is not None:
+        stats.add(ctx.stats)  # 探索の統計情報を加算
+    return ret
 
 
-cdef inline tuple _next_move(str color, board, params, int depth, str pid, int timer, int measure):
-    global timer_deadline, timer_timeout, timer_timeout_value, measure_count, bb, wb, hb, bs, ws, corner, c, a1, a2, b1, b2, b3, wx, o1, o2, wp, ww, we, wb1, wb2, wb3
+cdef inline tuple _next_move(SearchContext ctx, str color, board, params, int depth, pid, int timer, int measure):
     cdef:
         signed int alpha = NEGATIVE_INFINITY, beta = POSITIVE_INFINITY
         unsigned int int_color = 0
@@ -384,45 +160,49 @@ cdef inline tuple _next_move(str color, board, params, int depth, str pid, int t
         unsigned int[64] legal_moves_x
         unsigned int[64] legal_moves_y
     # タイマーとメジャー準備
-    measure_count = 0
-    timer_timeout = <unsigned int>0
+    ctx.measure_count = 0
+    init_stats_counter(&ctx.stats)
+    ctx.timer_timeout = <unsigned int>0
     if timer and pid:
-        timer_deadline = Timer.deadline[pid]
-        timer_timeout_value = Timer.timeout_value[pid]
+        init_timeout_check(&ctx.timer_check, Timer.get_deadline(pid) - time.monotonic(), ctx.timer_interval)  # 期限を単調増加時計の時刻に変換
+        ctx.timer_timeout_value = Timer.get_timeout_value(pid)
     if measure and pid:
         if pid not in Measure.count:
             Measure.count[pid] = <unsigned int>0
-        measure_count = Measure.count[pid]
+        ctx.measure_count = Measure.count[pid]
     # 評価パラメータ取得
-    corner = params[0]
-    c = params[1]
-    a1 = params[2]
-    a2 = params[3]
-    b1 = params[4]
-    b2 = params[5]
-    b3 = params[6]
-    wx = params[7]
-    o1 = params[8]
-    o2 = params[9]
-    wp = params[10]
-    ww = params[11]
-    we = params[12]
-    wb1 = params[13]
-    wb2 = params[14]
-    wb3 = params[15]
-    _set_t_table()
+    ctx.corner = params[0]
+    ctx.c = params[1]
+    ctx.a1 = params[2]
+    ctx.a2 = params[3]
+    ctx.b1 = params[4]
+    ctx.b2 = params[5]
+    ctx.b3 = params[6]
+    ctx.wx = params[7]
+    ctx.o1 = params[8]
+    ctx.o2 = params[9]
+    ctx.wp = params[10]
+    ctx.ww = params[11]
+    ctx.we = params[12]
+    ctx.wb1 = params[13]
+    ctx.wb2 = params[14]
+    ctx.wb3 = params[15]
+    _set_t_table(ctx)
+    _set_order_evaluator(ctx)
     # 次の手番
     if color == 'black':
         int_color = <unsigned int>1
     # ボード情報取得
-    bb, wb, hb = board.get_bitboard_info()
-    bs = board._black_score
-    ws = board._white_score
+    ctx.bb, ctx.wb, ctx.hb = board.get_bitboard_info()
+    ctx.bs = board._black_score
+    ctx.ws = board._white_score
+    ctx.zh = _get_hash(int_color, ctx.bb, ctx.wb)
+    ctx.ts = get_table_score(ctx.square_values, ctx.bb, ctx.wb)  # テーブルによる評価値(以降は着手ごとに差分更新)
     # 最大深さ調整
-    if depth > <int>(64 - (bs + ws)):
-        depth =  <int>64 - (bs + ws)
+    if depth > <int>(64 - (ctx.bs + ctx.ws)):
+        depth =  <int>64 - (ctx.bs + ctx.ws)
     # 最善手を取得
-    legal_moves = _get_legal_moves_bits(int_color, bb, wb, hb)
+    legal_moves = _get_legal_moves_bits(int_color, ctx.bb, ctx.wb, ctx.hb)
     for y in range(8):
         for x in range(8):
             if legal_moves & mask:
@@ -431,17 +211,16 @@ cdef inline tuple _next_move(str color, board, params, int depth, str pid, int t
                 legal_moves_y[index] = y
                 index += 1
             mask >>= 1
-    best_move, scores = _get_best_move(int_color, index, legal_moves_bit_list, legal_moves_x, legal_moves_y, alpha, beta, depth, timer)
+    best_move, scores = _get_best_move(ctx, int_color, index, legal_moves_bit_list, legal_moves_x, legal_moves_y, alpha, beta, depth, timer)
     # タイマーとメジャー格納
     if measure and pid:
-        Measure.count[pid] = measure_count
-    if timer and pid and timer_timeout:
-        Timer.timeout_flag[pid] = True  # タイムアウト発生
+        Measure.count[pid] = ctx.measure_count
+    if timer and pid and ctx.timer_timeout:
+        Timer.set_timeout(pid)  # タイムアウト発生
     return best_move
 
 
-cdef inline _get_best_move_wrap(str color, board, params, moves, signed int alpha, signed int beta, int depth, str pid, int timer, int measure):
-    global timer_deadline, timer_timeout, timer_timeout_value, measure_count, bb, wb, hb, bs, ws, corner, c, a1, a2, b1, b2, b3, wx, o1, o2, wp, ww, we, wb1, wb2, wb3
+cdef inline _get_best_move_wrap(SearchContext ctx, str color, board, params, moves, signed int alpha, signed int beta, int depth, pid, int timer, int measure):
     cdef:
         unsigned long long[64] moves_bit_list
         unsigned int[64] moves_x
@@ -450,43 +229,47 @@ cdef inline _get_best_move_wrap(str color, board, params, moves, signed int alph
         unsigned long long put
         signed int lshift
     # タイマーとメジャー準備
-    measure_count = 0
-    timer_timeout = <unsigned int>0
+    ctx.measure_count = 0
+    init_stats_counter(&ctx.stats)
+    ctx.timer_timeout = <unsigned int>0
     if timer and pid:
-        timer_deadline = Timer.deadline[pid]
-        timer_timeout_value = Timer.timeout_value[pid]
+        init_timeout_check(&ctx.timer_check, Timer.get_deadline(pid) - time.monotonic(), ctx.timer_interval)  # 期限を単調増加時計の時刻に変換
+        ctx.timer_timeout_value = Timer.get_timeout_value(pid)
     if measure and pid:
         if pid not in Measure.count:
             Measure.count[pid] = <unsigned int>0
-        measure_count = Measure.count[pid]
+        ctx.measure_count = Measure.count[pid]
     # 評価パラメータ取得
-    corner = params[0]
-    c = params[1]
-    a1 = params[2]
-    a2 = params[3]
-    b1 = params[4]
-    b2 = params[5]
-    b3 = params[6]
-    wx = params[7]
-    o1 = params[8]
-    o2 = params[9]
-    wp = params[10]
-    ww = params[11]
-    we = params[12]
-    wb1 = params[13]
-    wb2 = params[14]
-    wb3 = params[15]
-    _set_t_table()
+    ctx.corner = params[0]
+    ctx.c = params[1]
+    ctx.a1 = params[2]
+    ctx.a2 = params[3]
+    ctx.b1 = params[4]
+    ctx.b2 = params[5]
+    ctx.b3 = params[6]
+    ctx.wx = params[7]
+    ctx.o1 = params[8]
+    ctx.o2 = params[9]
+    ctx.wp = params[10]
+    ctx.ww = params[11]
+    ctx.we = params[12]
+    ctx.wb1 = params[13]
+    ctx.wb2 = params[14]
+    ctx.wb3 = params[15]
+    _set_t_table(ctx)
+    _set_order_evaluator(ctx)
     # 次の手番
     if color == 'black':
         int_color = <unsigned int>1
     # ボード情報取得
-    bb, wb, hb = board.get_bitboard_info()
-    bs = board._black_score
-    ws = board._white_score
+    ctx.bb, ctx.wb, ctx.hb = board.get_bitboard_info()
+    ctx.bs = board._black_score
+    ctx.ws = board._white_score
+    ctx.zh = _get_hash(int_color, ctx.bb, ctx.wb)
+    ctx.ts = get_table_score(ctx.square_values, ctx.bb, ctx.wb)  # テーブルによる評価値(以降は着手ごとに差分更新)
     # 最大深さ調整
-    if depth > <int>(64 - (bs + ws)):
-        depth =  <int>64 - (bs + ws)
+    if depth > <int>(64 - (ctx.bs + ctx.ws)):
+        depth =  <int>64 - (ctx.bs + ctx.ws)
     # 最善手を取得
     for x, y in moves:
         lshift = (63-(y*8+x))
@@ -495,52 +278,54 @@ cdef inline _get_best_move_wrap(str color, board, params, moves, signed int alph
         moves_x[index] = x
         moves_y[index] = y
         index += 1
-    best_move, scores = _get_best_move(int_color, index, moves_bit_list, moves_x, moves_y, alpha, beta, depth, timer)
+    best_move, scores = _get_best_move(ctx, int_color, index, moves_bit_list, moves_x, moves_y, alpha, beta, depth, timer)
     # タイマーとメジャー格納
     if measure and pid:
-        Measure.count[pid] = measure_count
-    if timer and pid and timer_timeout:
-        Timer.timeout_flag[pid] = True  # タイムアウト発生
+        Measure.count[pid] = ctx.measure_count
+    if timer and pid and ctx.timer_timeout:
+        Timer.set_timeout(pid)  # タイムアウト発生
     return (best_move, scores)
 
 
-cdef inline _get_best_move(unsigned int int_color, unsigned int index, unsigned long long[64] moves_bit_list, unsigned int[64] moves_x, unsigned int[64] moves_y, signed int alpha, signed int beta, int depth, int timer):
-    global timer_timeout, tp_table
+cdef inline _get_best_move(SearchContext ctx, unsigned int int_color, unsigned int index, unsigned long long[64] moves_bit_list, unsigned int[64] moves_x, unsigned int[64] moves_y, signed int alpha, signed int beta, int depth, int timer):
     cdef:
         signed int score = alpha
         unsigned int int_color_next = 1, i, best = 0
-    scores, tp_table = {}, {}
+    scores, ctx.tp_table = {}, {}
     # 手番
     if int_color:
         int_color_next = <unsigned int>0
     # 各手のスコア取得
+    ctx.pv.passes = 0
+    pv_clear(&ctx.pv, 0)
     for i in range(index):
-        _put_disc(int_color, moves_bit_list[i])
-        score = -_get_score(int_color_next, -beta, -alpha, depth-1, timer, <unsigned int>0)
-        _undo()
+        _put_disc(ctx, int_color, moves_bit_list[i])
+        score = -_get_score(ctx, int_color_next, -beta, -alpha, depth-1, timer, <unsigned int>0)
+        _undo(ctx)
         scores[(moves_x[i], moves_y[i])] = score
-        if timer_timeout:
+        if ctx.timer_timeout:
             break
         if score > alpha:  # 最善手を更新
             alpha = score
             best = i
+            pv_update(&ctx.pv, 0, moves_bit_list[i])
+    if not ctx.pv.length[0] and index:
+        ctx.pv.moves[0][0], ctx.pv.length[0] = moves_bit_list[best], 1  # 最善手のみ
     return (moves_x[best], moves_y[best]), scores
 
 
-cdef inline signed int check_timeout():
+cdef inline signed int check_timeout(SearchContext ctx) noexcept nogil:
     """check_timeout
     """
-    global timer_deadline, timer_timeout, timer_timeout_value
-    if time.time() > timer_deadline:
-        timer_timeout = <unsigned int>1
-        return timer_timeout_value
+    if is_timeout(&ctx.timer_check):
+        ctx.timer_timeout = <unsigned int>1
+        return ctx.timer_timeout_value
     return <signed int>0
 
 
-cdef inline signed int _get_score(unsigned int int_color, signed int alpha, signed int beta, unsigned int depth, int t, unsigned int pas):
+cdef inline signed int _get_score(SearchContext ctx, unsigned int int_color, signed int alpha, signed int beta, unsigned int depth, int t, unsigned int pas):
     """_get_score
     """
-    global timer_timeout, measure_count, bb, wb, hb, bs, ws, pbb, pwb, pbs, pws, fd, tail, tp_table
     cdef:
         signed int null_window
         unsigned long long legal_moves_b_bits, legal_moves_w_bits, legal_moves_bits, move
@@ -557,21 +342,27 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
         signed int score
         unsigned long long bits_count
         signed int upper, lower, score_max = NEGATIVE_INFINITY, alpha_ini = alpha
+        unsigned int ply = ctx.tail + ctx.pv.passes
+
+    pv_clear(&ctx.pv, ply)
 
     # タイムアウト判定
     if t:
-        timeout = check_timeout()
+        timeout = check_timeout(ctx)
         if timeout:
             return timeout
 
     # 探索ノード数カウント
-    measure_count += 1
+    ctx.measure_count += 1
+    count_node(&ctx.stats, ctx.tail)
 
     # 置換表に結果が存在する場合、その値を返す
-    key = (bb, wb, int_color)
+    key = (ctx.bb, ctx.wb, int_color)
     if depth >= TRANSPOSITION_TABLE_DEPTH:
-        if key in tp_table:
-            lower, upper = tp_table[key]
+        ctx.stats.tt_probes += 1
+        if key in ctx.tp_table:
+            ctx.stats.tt_hits += 1
+            lower, upper = ctx.tp_table[key]
             if upper <= alpha:
                 return upper
             if lower >= beta:
@@ -585,10 +376,10 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
 
     # 合法手を取得
     # {{{ -- _get_legal_moves_bits(int_color, bb, wb, hb) --
-    player, opponent = wb, bb
+    player, opponent = ctx.wb, ctx.bb
     if int_color:
-        player, opponent = bb, wb
-    blank = ~(player | opponent | hb)
+        player, opponent = ctx.bb, ctx.wb
+    blank = ~(player | opponent | ctx.hb)
     horizontal = opponent & <unsigned long long>0x7E7E7E7E7E7E7E7E  # horizontal mask value
     vertical = opponent & <unsigned long long>0x00FFFFFFFFFFFF00    # vertical mask value
     diagonal = opponent & <unsigned long long>0x007E7E7E7E7E7E00    # diagonal mask value
@@ -632,23 +423,30 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
     if not legal_moves_bits:
         # 前回もパスの場合ゲーム終了
         if pas:
+            ctx.stats.leaves += 1
             # {{{ --- return _evaluate(int_color, <signed int>0, <signed int>0) * sign ---
-            score = bs - ws
+            score = ctx.bs - ctx.ws
             if score > 0:    # 黒が勝った
-                score += ww
+                score += ctx.ww
             elif score < 0:  # 白が勝った
-                score -= ww
+                score -= ctx.ww
             return score * sign
             # --- return _evaluate(int_color, <signed int>0, <signed int>0) * sign --- }}}
 
-        return -_get_score(int_color_next, -beta, -alpha, depth, t, <unsigned int>1)
+        ctx.zh ^= zobrist_turn
+        ctx.pv.passes += 1
+        score = -_get_score(ctx, int_color_next, -beta, -alpha, depth, t, <unsigned int>1)
+        ctx.pv.passes -= 1
+        ctx.zh ^= zobrist_turn
+        pv_update(&ctx.pv, ply, 0)  # パス
+        return score
 
     # 最大深さに到達
     if not depth:
         # 相手の着手可能数を取得
         # {{{ -- _get_legal_moves_bits(<unsigned int>0 if int_color else <unsigned int>1, bb, wb, hb) --
         player, opponent = opponent, player  # reversed for opponent
-        blank = ~(player | opponent | hb)
+        blank = ~(player | opponent | ctx.hb)
         horizontal = opponent & <unsigned long long>0x7E7E7E7E7E7E7E7E  # horizontal mask value
         vertical = opponent & <unsigned long long>0x00FFFFFFFFFFFF00    # vertical mask value
         diagonal = opponent & <unsigned long long>0x007E7E7E7E7E7E00    # diagonal mask value
@@ -713,17 +511,18 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
             # -- _popcount -- }}}
 
         # 評価値を返す
+        ctx.stats.leaves += 1
         # {{{ --- return _evaluate(int_color, <signed int>legal_moves_b_bits, <signed int>legal_moves_w_bits) * sign ---
         # 勝敗が決まっている場合
         if not legal_moves_b_bits and not legal_moves_w_bits:
-            score = bs - ws
+            score = ctx.bs - ctx.ws
             if score > 0:    # 黒が勝った
-                score += ww
+                score += ctx.ww
             elif score < 0:  # 白が勝った
-                score -= ww
+                score -= ctx.ww
             return score * sign
         # 勝敗が決まっていない場合
-        score = _get_t() + _get_p(<signed int>legal_moves_b_bits, <signed int>legal_moves_w_bits) + _get_e() + _get_b()
+        score = _get_t(ctx) + _get_p(ctx, <signed int>legal_moves_b_bits, <signed int>legal_moves_w_bits) + _get_e(ctx) + _get_b(ctx)
         return score * sign
         # --- return _evaluate(int_color, <signed int>legal_moves_b_bits, <signed int>legal_moves_w_bits) * sign --- }}}
 
@@ -731,7 +530,7 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
     while (legal_moves_bits):
         move = legal_moves_bits & (~legal_moves_bits+1)  # 一番右のONしているビットのみ取り出す
         next_moves_list[count] = move
-        b, w = bb, wb
+        b, w = ctx.bb, ctx.wb
 
         # ひっくり返せる石を取得
         # {{{ -- _get_flippable_discs_num --
@@ -800,7 +599,7 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
         player, opponent = w, b
         if int_color:
             player, opponent = b, w
-        blank = ~(player | opponent | hb)
+        blank = ~(player | opponent | ctx.hb)
         horizontal = opponent & <unsigned long long>0x7E7E7E7E7E7E7E7E  # horizontal mask value
         vertical = opponent & <unsigned long long>0x00FFFFFFFFFFFF00    # vertical mask value
         diagonal = opponent & <unsigned long long>0x007E7E7E7E7E7E00    # diagonal mask value
@@ -849,6 +648,10 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
     # 着手可能数に応じて並び替え
     _sort_moves_by_possibility(count, next_moves_list, possibilities)
 
+    # 残り深さが深い場合は浅い探索の結果で並び替え(評価値が同じ手は着手可能数の順のまま)
+    if ctx.ordering_depth and depth >= ctx.ordering_depth:
+        sort_moves_by_shallow_search(ctx.order_evaluator, int_color, ctx.bb, ctx.wb, ctx.hb, ctx.bs, ctx.ws, count, next_moves_list, ctx.ordering_search_depth, &ctx.stats, ctx.tail)
+
     # 次の手の探索
     for i in range(count):
         # 一手打つ
@@ -858,9 +661,9 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
         flippable_discs_num = 0
         bf_t_, bf_rt, bf_r_, bf_rb, bf_b_, bf_lb, bf_l_, bf_lt = 0, 0, 0, 0, 0, 0, 0, 0
         move = next_moves_list[i]
-        player, opponent = wb, bb
+        player, opponent = ctx.wb, ctx.bb
         if int_color:
-            player, opponent = bb, wb
+            player, opponent = ctx.bb, ctx.wb
         t_ = <unsigned long long>0xFFFFFFFFFFFFFF00 & (move << <unsigned int>8)  # top
         rt = <unsigned long long>0x7F7F7F7F7F7F7F00 & (move << <unsigned int>7)  # right-top
         r_ = <unsigned long long>0x7F7F7F7F7F7F7F7F & (move >> <unsigned int>1)  # right
@@ -910,10 +713,10 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
             flippable_discs_num |= bf_l_
         if lt & player:
             flippable_discs_num |= bf_lt
-        fd = flippable_discs_num
+        ctx.fd = flippable_discs_num
         # -- _get_flippable_discs_num -- }}}
         # {{{ -- _popcount --
-        bits = fd
+        bits = ctx.fd
         bits = bits - ((bits >> <unsigned int>1) & <unsigned long long>0x5555555555555555)
         bits = (bits & <unsigned long long>0x3333333333333333) + ((bits >> <unsigned int>2) & <unsigned long long>0x3333333333333333)
         bits = (bits + (bits >> <unsigned int>4)) & <unsigned long long>0x0F0F0F0F0F0F0F0F
@@ -922,37 +725,44 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
         bits_count = (bits + (bits >> <unsigned int>32)) & <unsigned long long>0x000000000000007F
         # -- _popcount -- }}}
         # 打つ前の状態を格納
-        pbb[tail] = bb
-        pwb[tail] = wb
-        pbs[tail] = bs
-        pws[tail] = ws
-        tail += 1
+        ctx.pbb[ctx.tail] = ctx.bb
+        ctx.pwb[ctx.tail] = ctx.wb
+        ctx.pbs[ctx.tail] = ctx.bs
+        ctx.pws[ctx.tail] = ctx.ws
+        ctx.pzh[ctx.tail] = ctx.zh
+        ctx.pts[ctx.tail] = ctx.ts
+        ctx.tail += 1
         # 自分の石を置いて相手の石をひっくり返す
         if int_color:
-            bb ^= move | fd
-            wb ^= fd
-            bs += <unsigned int>1 + <unsigned int>bits_count
-            ws -= <unsigned int>bits_count
+            ctx.bb ^= move | ctx.fd
+            ctx.wb ^= ctx.fd
+            ctx.bs += <unsigned int>1 + <unsigned int>bits_count
+            ctx.ws -= <unsigned int>bits_count
         else:
-            wb ^= move | fd
-            bb ^= fd
-            bs -= <unsigned int>bits_count
-            ws += <unsigned int>1 + <unsigned int>bits_count
+            ctx.wb ^= move | ctx.fd
+            ctx.bb ^= ctx.fd
+            ctx.bs -= <unsigned int>bits_count
+            ctx.ws += <unsigned int>1 + <unsigned int>bits_count
+        # ハッシュ値を更新
+        ctx.zh ^= _get_put_hash(int_color, move, ctx.fd)
+        # テーブルによる評価値を更新(着手位置と返した石の分のみ)
+        ctx.ts += get_table_delta(ctx.square_values, int_color, move, ctx.fd)
         # --- _put_disc(int_color, next_moves_list[i]) --- }}}
 
         # Null Window Search
         null_window = beta if not i else alpha + 1
-        score = -_get_score(int_color_next, -null_window, -alpha, depth-1, t, <unsigned int>0)
+        score = -_get_score(ctx, int_color_next, -null_window, -alpha, depth-1, t, <unsigned int>0)
         if alpha < score:
             if i and score <= null_window:
-                score = -_get_score(int_color_next, -beta, -score, depth-1, t, <unsigned int>0)
+                score = -_get_score(ctx, int_color_next, -beta, -score, depth-1, t, <unsigned int>0)
             alpha = score
+            pv_update(&ctx.pv, ply, move)
 
         # 手を戻す
-        _undo()
+        _undo(ctx)
 
         # タイムアウト判定
-        if timer_timeout:
+        if ctx.timer_timeout:
             return alpha
 
         # 最大値の更新
@@ -961,16 +771,17 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
 
         # beta cut
         if score_max >= beta:
+            count_cutoff(&ctx.stats, i)
             if depth >= TRANSPOSITION_TABLE_DEPTH:
-                tp_table[key] = (score_max, POSITIVE_INFINITY)
+                ctx.tp_table[key] = (score_max, POSITIVE_INFINITY)
             return score_max
 
     if depth >= TRANSPOSITION_TABLE_DEPTH:
         # 置換表に結果を格納
         if score_max > alpha_ini:
-            tp_table[key] = (score_max, score_max)
+            ctx.tp_table[key] = (score_max, score_max)
         else:
-            tp_table[key] = (NEGATIVE_INFINITY, score_max)
+            ctx.tp_table[key] = (NEGATIVE_INFINITY, score_max)
 
     return score_max
 
@@ -1093,10 +904,9 @@ cdef inline unsigned long long _get_legal_moves_bits(unsigned int int_color, uns
     return blank & ((tmp_h << 1) | (tmp_h >> 1) | (tmp_v << 8) | (tmp_v >> 8) | (tmp_d1 << 9) | (tmp_d1 >> 9) | (tmp_d2 << 7) | (tmp_d2 >> 7))
 
 
-cdef inline void _put_disc(unsigned int int_color, unsigned long long move):
+cdef inline void _put_disc(SearchContext ctx, unsigned int int_color, unsigned long long move):
     """_put_disc
     """
-    global bb, wb, bs, ws, pbb, pwb, pbs, pws, fd, tail
     cdef:
         unsigned long long count, bits
         unsigned long long t_, rt, r_, rb, b_, lb, l_, lt
@@ -1104,11 +914,11 @@ cdef inline void _put_disc(unsigned int int_color, unsigned long long move):
         unsigned long long player, opponent, flippable_discs_num = 0
     # ひっくり返せる石を取得
     # {{{ -- _get_flippable_discs_num --
-    player = wb
-    opponent = bb
+    player = ctx.wb
+    opponent = ctx.bb
     if int_color:
-        player = bb
-        opponent = wb
+        player = ctx.bb
+        opponent = ctx.wb
     t_ = <unsigned long long>0xFFFFFFFFFFFFFF00 & (move << <unsigned int>8)  # top
     rt = <unsigned long long>0x7F7F7F7F7F7F7F00 & (move << <unsigned int>7)  # right-top
     r_ = <unsigned long long>0x7F7F7F7F7F7F7F7F & (move >> <unsigned int>1)  # right
@@ -1158,10 +968,10 @@ cdef inline void _put_disc(unsigned int int_color, unsigned long long move):
         flippable_discs_num |= bf_l_
     if lt & player:
         flippable_discs_num |= bf_lt
-    fd = flippable_discs_num
+    ctx.fd = flippable_discs_num
     # -- _get_flippable_discs_num -- }}}
     # {{{ -- _popcount --
-    bits = fd
+    bits = ctx.fd
     bits = bits - ((bits >> <unsigned int>1) & <unsigned long long>0x5555555555555555)
     bits = (bits & <unsigned long long>0x3333333333333333) + ((bits >> <unsigned int>2) & <unsigned long long>0x3333333333333333)
     bits = (bits + (bits >> <unsigned int>4)) & <unsigned long long>0x0F0F0F0F0F0F0F0F
@@ -1170,148 +980,194 @@ cdef inline void _put_disc(unsigned int int_color, unsigned long long move):
     count = (bits + (bits >> <unsigned int>32)) & <unsigned long long>0x000000000000007F
     # -- _popcount -- }}}
     # 打つ前の状態を格納
-    pbb[tail] = bb
-    pwb[tail] = wb
-    pbs[tail] = bs
-    pws[tail] = ws
-    tail += 1
+    ctx.pbb[ctx.tail] = ctx.bb
+    ctx.pwb[ctx.tail] = ctx.wb
+    ctx.pbs[ctx.tail] = ctx.bs
+    ctx.pws[ctx.tail] = ctx.ws
+    ctx.pzh[ctx.tail] = ctx.zh
+    ctx.pts[ctx.tail] = ctx.ts
+    ctx.tail += 1
     # 自分の石を置いて相手の石をひっくり返す
     if int_color:
-        bb ^= move | fd
-        wb ^= fd
-        bs += <unsigned int>1 + <unsigned int>count
-        ws -= <unsigned int>count
+        ctx.bb ^= move | ctx.fd
+        ctx.wb ^= ctx.fd
+        ctx.bs += <unsigned int>1 + <unsigned int>count
+        ctx.ws -= <unsigned int>count
     else:
-        wb ^= move | fd
-        bb ^= fd
-        bs -= <unsigned int>count
-        ws += <unsigned int>1 + <unsigned int>count
+        ctx.wb ^= move | ctx.fd
+        ctx.bb ^= ctx.fd
+        ctx.bs -= <unsigned int>count
+        ctx.ws += <unsigned int>1 + <unsigned int>count
+    # ハッシュ値を更新
+    ctx.zh ^= _get_put_hash(int_color, move, ctx.fd)
+    # テーブルによる評価値を更新(着手位置と返した石の分のみ)
+    ctx.ts += get_table_delta(ctx.square_values, int_color, move, ctx.fd)
 
 
-cdef inline void _undo():
+cdef inline void _undo(SearchContext ctx):
     """_undo
     """
-    global bb, wb, bs, ws, pbb, pwb, pbs, pws, tail
-    tail -= 1
-    bb = pbb[tail]
-    wb = pwb[tail]
-    bs = pbs[tail]
-    ws = pws[tail]
+    ctx.tail -= 1
+    ctx.zh = ctx.pzh[ctx.tail]
+    ctx.bb = ctx.pbb[ctx.tail]
+    ctx.wb = ctx.pwb[ctx.tail]
+    ctx.bs = ctx.pbs[ctx.tail]
+    ctx.ws = ctx.pws[ctx.tail]
+    ctx.ts = ctx.pts[ctx.tail]
 
 
-cdef inline signed int _set_t_table():
-    global t_table, corner, c, a1, a2, b1, b2, b3, wx, o1, o2
+cdef inline unsigned long long _get_hash(unsigned int int_color, unsigned long long b, unsigned long long w):
+    """_get_hash
+    """
     cdef:
-        unsigned int row, col, bit8, mask
-        signed int value
-    t_table[0][0] = corner
-    t_table[0][1] = c
-    t_table[0][2] = a2
-    t_table[0][3] = b3
-    t_table[0][4] = b3
-    t_table[0][5] = a2
-    t_table[0][6] = c
-    t_table[0][7] = corner
-    t_table[1][0] = c
-    t_table[1][1] = wx
-    t_table[1][2] = o1
-    t_table[1][3] = o2
-    t_table[1][4] = o2
-    t_table[1][5] = o1
-    t_table[1][6] = wx
-    t_table[1][7] = c
-    t_table[2][0] = a2
-    t_table[2][1] = o1
-    t_table[2][2] = a1
-    t_table[2][3] = b2
-    t_table[2][4] = b2
-    t_table[2][5] = a1
-    t_table[2][6] = o1
-    t_table[2][7] = a2
-    t_table[3][0] = b3
-    t_table[3][1] = o2
-    t_table[3][2] = b2
-    t_table[3][3] = b1
-    t_table[3][4] = b1
-    t_table[3][5] = b2
-    t_table[3][6] = o2
-    t_table[3][7] = b3
-    t_table[4][0] = b3
-    t_table[4][1] = o2
-    t_table[4][2] = b2
-    t_table[4][3] = b1
-    t_table[4][4] = b1
-    t_table[4][5] = b2
-    t_table[4][6] = o2
-    t_table[4][7] = b3
-    t_table[5][0] = a2
-    t_table[5][1] = o1
-    t_table[5][2] = a1
-    t_table[5][3] = b2
-    t_table[5][4] = b2
-    t_table[5][5] = a1
-    t_table[5][6] = o1
-    t_table[5][7] = a2
-    t_table[6][0] = c
-    t_table[6][1] = wx
-    t_table[6][2] = o1
-    t_table[6][3] = o2
-    t_table[6][4] = o2
-    t_table[6][5] = o1
-    t_table[6][6] = wx
-    t_table[6][7] = c
-    t_table[7][0] = corner
-    t_table[7][1] = c
-    t_table[7][2] = a2
-    t_table[7][3] = b3
-    t_table[7][4] = b3
-    t_table[7][5] = a2
-    t_table[7][6] = c
-    t_table[7][7] = corner
-
-    # 事前計算
-    for row in range(8):
-        for bit8 in range(256):
-            value = <signed int>0
-            mask = <unsigned int>1 << 7
-            for col in range(8):
-                if mask & bit8:
-                    value += t_table[row][col]
-                mask >>= 1
-            table_values[row][bit8] = value
-
-
-cdef inline signed int _get_t():
-    """テーブルによる評価値
+        unsigned long long lsb, hash_value = 0
+    if not int_color:
+        hash_value = zobrist_turn
+    while b:
+        lsb = b & (~b + 1)
+        hash_value ^= zobrist_b[_bit_index(lsb)]
+        b ^= lsb
+    while w:
+        lsb = w & (~w + 1)
+        hash_value ^= zobrist_w[_bit_index(lsb)]
+        w ^= lsb
+    return hash_value
+
+
+cdef inline unsigned long long _get_put_hash(unsigned int int_color, unsigned long long move, unsigned long long flippable_discs_num):
+    """_get_put_hash
     """
-    global bb, wb, table_values
     cdef:
-        unsigned long long mask = 0x00000000000000FF, tb, tw
-        unsigned int row, shift
-        signed int score = 0
-    for row in range(8):
-        shift = (7 - row) * 8
-        tb = (bb >> shift) & mask
-        tw = (wb >> shift) & mask
-        score += table_values[row][tb] - table_values[row][tw]
-    return score
+        unsigned long long lsb, hash_value = zobrist_turn
+    if int_color:
+        hash_value ^= zobrist_b[_bit_index(move)]
+    else:
+        hash_value ^= zobrist_w[_bit_index(move)]
+    while flippable_discs_num:
+        lsb = flippable_discs_num & (~flippable_discs_num + 1)
+        hash_value ^= zobrist_f[_bit_index(lsb)]
+        flippable_discs_num ^= lsb
+    return hash_value
+
+
+cdef inline unsigned int _bit_index(unsigned long long bit):
+    """_bit_index
+    """
+    bit -= 1
+    bit = bit - ((bit >> <unsigned int>1) & <unsigned long long>0x5555555555555555)
+    bit = (bit & <unsigned long long>0x3333333333333333) + ((bit >> <unsigned int>2) & <unsigned long long>0x3333333333333333)
+    bit = (bit + (bit >> <unsigned int>4)) & <unsigned long long>0x0F0F0F0F0F0F0F0F
+    bit = bit + (bit >> <unsigned int>8)
+    bit = bit + (bit >> <unsigned int>16)
+    return <unsigned int>((bit + (bit >> <unsigned int>32)) & <unsigned long long>0x000000000000007F)
+
+
+cdef inline void _set_order_evaluator(SearchContext ctx):
+    """_set_order_evaluator
+
+           手の並び替えに用いる評価関数(評価パラメータを変換)
+    """
+    ctx.order_evaluator = None
+    if ctx.ordering_depth:
+        ctx.order_evaluator = CyEvaluator_Compiled(
+            table=[[ctx.t_table[y][x] for x in range(8)] for y in range(8)],
+            ww=ctx.ww, wp=ctx.wp, we=ctx.we, wb1=ctx.wb1, wb2=ctx.wb2, wb3=ctx.wb3,
+        )
+
+
+cdef inline signed int _set_t_table(SearchContext ctx):
+    cdef:
+        unsigned int x, y
+    ctx.t_table[0][0] = ctx.corner
+    ctx.t_table[0][1] = ctx.c
+    ctx.t_table[0][2] = ctx.a2
+    ctx.t_table[0][3] = ctx.b3
+    ctx.t_table[0][4] = ctx.b3
+    ctx.t_table[0][5] = ctx.a2
+    ctx.t_table[0][6] = ctx.c
+    ctx.t_table[0][7] = ctx.corner
+    ctx.t_table[1][0] = ctx.c
+    ctx.t_table[1][1] = ctx.wx
+    ctx.t_table[1][2] = ctx.o1
+    ctx.t_table[1][3] = ctx.o2
+    ctx.t_table[1][4] = ctx.o2
+    ctx.t_table[1][5] = ctx.o1
+    ctx.t_table[1][6] = ctx.wx
+    ctx.t_table[1][7] = ctx.c
+    ctx.t_table[2][0] = ctx.a2
+    ctx.t_table[2][1] = ctx.o1
+    ctx.t_table[2][2] = ctx.a1
+    ctx.t_table[2][3] = ctx.b2
+    ctx.t_table[2][4] = ctx.b2
+    ctx.t_table[2][5] = ctx.a1
+    ctx.t_table[2][6] = ctx.o1
+    ctx.t_table[2][7] = ctx.a2
+    ctx.t_table[3][0] = ctx.b3
+    ctx.t_table[3][1] = ctx.o2
+    ctx.t_table[3][2] = ctx.b2
+    ctx.t_table[3][3] = ctx.b1
+    ctx.t_table[3][4] = ctx.b1
+    ctx.t_table[3][5] = ctx.b2
+    ctx.t_table[3][6] = ctx.o2
+    ctx.t_table[3][7] = ctx.b3
+    ctx.t_table[4][0] = ctx.b3
+    ctx.t_table[4][1] = ctx.o2
+    ctx.t_table[4][2] = ctx.b2
+    ctx.t_table[4][3] = ctx.b1
+    ctx.t_table[4][4] = ctx.b1
+    ctx.t_table[4][5] = ctx.b2
+    ctx.t_table[4][6] = ctx.o2
+    ctx.t_table[4][7] = ctx.b3
+    ctx.t_table[5][0] = ctx.a2
+    ctx.t_table[5][1] = ctx.o1
+    ctx.t_table[5][2] = ctx.a1
+    ctx.t_table[5][3] = ctx.b2
+    ctx.t_table[5][4] = ctx.b2
+    ctx.t_table[5][5] = ctx.a1
+    ctx.t_table[5][6] = ctx.o1
+    ctx.t_table[5][7] = ctx.a2
+    ctx.t_table[6][0] = ctx.c
+    ctx.t_table[6][1] = ctx.wx
+    ctx.t_table[6][2] = ctx.o1
+    ctx.t_table[6][3] = ctx.o2
+    ctx.t_table[6][4] = ctx.o2
+    ctx.t_table[6][5] = ctx.o1
+    ctx.t_table[6][6] = ctx.wx
+    ctx.t_table[6][7] = ctx.c
+    ctx.t_table[7][0] = ctx.corner
+    ctx.t_table[7][1] = ctx.c
+    ctx.t_table[7][2] = ctx.a2
+    ctx.t_table[7][3] = ctx.b3
+    ctx.t_table[7][4] = ctx.b3
+    ctx.t_table[7][5] = ctx.a2
+    ctx.t_table[7][6] = ctx.c
+    ctx.t_table[7][7] = ctx.corner
+
+    # ビット位置ごとのテーブル値
+    for y in range(8):
+        for x in range(8):
+            ctx.square_values[63 - (y * 8 + x)] = ctx.t_table[y][x]
+
+
+cdef inline signed int _get_t(SearchContext ctx):
+    """テーブルによる評価値(着手と取り消しに合わせて差分更新した値)
+    """
+    return ctx.ts
 
 
-cdef inline signed int _get_p(signed int pos_b, signed int pos_w):
+cdef inline signed int _get_p(SearchContext ctx, signed int pos_b, signed int pos_w):
     """着手可能数による評価値
     """
-    global wp
-    return (pos_b - pos_w) * wp
+    return (pos_b - pos_w) * ctx.wp
 
 
-cdef inline signed int _get_e():
+cdef inline signed int _get_e(SearchContext ctx):
     """辺の確定石による評価値
     """
-    global bb, wb, we
     cdef:
         signed int score = 0
         unsigned long long all_bitboard, bit_pos, lt, rt, lb, rb, b_t, w_t, b_b, w_b, b_l, w_l, b_r, w_r
-    all_bitboard = bb | wb
+    all_bitboard = ctx.bb | ctx.wb
     bit_pos = <unsigned long long>0x8000000000000000
     lt = <unsigned long long>0x8000000000000000
     rt = <unsigned long long>0x0100000000000000
@@ -1322,91 +1178,90 @@ cdef inline signed int _get_e():
         # 上辺
         b_t, w_t = 0, 0
         if (lt | rt) & all_bitboard:
-            b_t = (<unsigned long long>0xFF00000000000000 & bb) >> 56
-            w_t = (<unsigned long long>0xFF00000000000000 & wb) >> 56
+            b_t = (<unsigned long long>0xFF00000000000000 & ctx.bb) >> 56
+            w_t = (<unsigned long long>0xFF00000000000000 & ctx.wb) >> 56
         # 下辺
-        b_b = <unsigned long long>0x00000000000000FF & bb
-        w_b = <unsigned long long>0x00000000000000FF & wb
+        b_b = <unsigned long long>0x00000000000000FF & ctx.bb
+        w_b = <unsigned long long>0x00000000000000FF & ctx.wb
         # 左辺
         b_l, w_l = 0, 0
-        if (lt | lb) & bb:
-            if bb & <unsigned long long>0x8000000000000000:
+        if (lt | lb) & ctx.bb:
+            if ctx.bb & <unsigned long long>0x8000000000000000:
                 b_l += <unsigned long long>0x0000000000000080
-            if bb & <unsigned long long>0x0080000000000000:
+            if ctx.bb & <unsigned long long>0x0080000000000000:
                 b_l += <unsigned long long>0x0000000000000040
-            if bb & <unsigned long long>0x0000800000000000:
+            if ctx.bb & <unsigned long long>0x0000800000000000:
                 b_l += <unsigned long long>0x0000000000000020
-            if bb & <unsigned long long>0x0000008000000000:
+            if ctx.bb & <unsigned long long>0x0000008000000000:
                 b_l += <unsigned long long>0x0000000000000010
-            if bb & <unsigned long long>0x0000000080000000:
+            if ctx.bb & <unsigned long long>0x0000000080000000:
                 b_l += <unsigned long long>0x0000000000000008
-            if bb & <unsigned long long>0x0000000000800000:
+            if ctx.bb & <unsigned long long>0x0000000000800000:
                 b_l += <unsigned long long>0x0000000000000004
-            if bb & <unsigned long long>0x0000000000008000:
+            if ctx.bb & <unsigned long long>0x0000000000008000:
                 b_l += <unsigned long long>0x0000000000000002
-            if bb & <unsigned long long>0x0000000000000080:
+            if ctx.bb & <unsigned long long>0x0000000000000080:
                 b_l += <unsigned long long>0x0000000000000001
-        if (lt | lb) & wb:
-            if wb & <unsigned long long>0x8000000000000000:
+        if (lt | lb) & ctx.wb:
+            if ctx.wb & <unsigned long long>0x8000000000000000:
                 w_l += <unsigned long long>0x0000000000000080
-            if wb & <unsigned long long>0x0080000000000000:
+            if ctx.wb & <unsigned long long>0x0080000000000000:
                 w_l += <unsigned long long>0x0000000000000040
-            if wb & <unsigned long long>0x0000800000000000:
+            if ctx.wb & <unsigned long long>0x0000800000000000:
                 w_l += <unsigned long long>0x0000000000000020
-            if wb & <unsigned long long>0x0000008000000000:
+            if ctx.wb & <unsigned long long>0x0000008000000000:
                 w_l += <unsigned long long>0x0000000000000010
-            if wb & <unsigned long long>0x0000000080000000:
+            if ctx.wb & <unsigned long long>0x0000000080000000:
                 w_l += <unsigned long long>0x0000000000000008
-            if wb & <unsigned long long>0x0000000000800000:
+            if ctx.wb & <unsigned long long>0x0000000000800000:
                 w_l += <unsigned long long>0x0000000000000004
-            if wb & <unsigned long long>0x0000000000008000:
+            if ctx.wb & <unsigned long long>0x0000000000008000:
                 w_l += <unsigned long long>0x0000000000000002
-            if wb & <unsigned long long>0x0000000000000080:
+            if ctx.wb & <unsigned long long>0x0000000000000080:
                 w_l += <unsigned long long>0x0000000000000001
         # 右辺
         b_r, w_r = 0, 0
-        if (rt | rb) & bb:
-            if bb & <unsigned long long>0x0100000000000000:
+        if (rt | rb) & ctx.bb:
+            if ctx.bb & <unsigned long long>0x0100000000000000:
                 b_r += <unsigned long long>0x0000000000000080
-            if bb & <unsigned long long>0x0001000000000000:
+            if ctx.bb & <unsigned long long>0x0001000000000000:
                 b_r += <unsigned long long>0x0000000000000040
-            if bb & <unsigned long long>0x0000010000000000:
+            if ctx.bb & <unsigned long long>0x0000010000000000:
                 b_r += <unsigned long long>0x0000000000000020
-            if bb & <unsigned long long>0x0000000100000000:
+            if ctx.bb & <unsigned long long>0x0000000100000000:
                 b_r += <unsigned long long>0x0000000000000010
-            if bb & <unsigned long long>0x0000000001000000:
+            if ctx.bb & <unsigned long long>0x0000000001000000:
                 b_r += <unsigned long long>0x0000000000000008
-            if bb & <unsigned long long>0x0000000000010000:
+            if ctx.bb & <unsigned long long>0x0000000000010000:
                 b_r += <unsigned long long>0x0000000000000004
-            if bb & <unsigned long long>0x0000000000000100:
+            if ctx.bb & <unsigned long long>0x0000000000000100:
                 b_r += <unsigned long long>0x0000000000000002
-            if bb & <unsigned long long>0x0000000000000001:
+            if ctx.bb & <unsigned long long>0x0000000000000001:
                 b_r += <unsigned long long>0x0000000000000001
-        if (rt | rb) & wb:
-            if wb & <unsigned long long>0x0100000000000000:
+        if (rt | rb) & ctx.wb:
+            if ctx.wb & <unsigned long long>0x0100000000000000:
                 w_r += <unsigned long long>0x0000000000000080
-            if wb & <unsigned long long>0x0001000000000000:
+            if ctx.wb & <unsigned long long>0x0001000000000000:
                 w_r += <unsigned long long>0x0000000000000040
-            if wb & <unsigned long long>0x0000010000000000:
+            if ctx.wb & <unsigned long long>0x0000010000000000:
                 w_r += <unsigned long long>0x0000000000000020
-            if wb & <unsigned long long>0x0000000100000000:
+            if ctx.wb & <unsigned long long>0x0000000100000000:
                 w_r += <unsigned long long>0x0000000000000010
-            if wb & <unsigned long long>0x0000000001000000:
+            if ctx.wb & <unsigned long long>0x0000000001000000:
                 w_r += <unsigned long long>0x0000000000000008
-            if wb & <unsigned long long>0x0000000000010000:
+            if ctx.wb & <unsigned long long>0x0000000000010000:
                 w_r += <unsigned long long>0x0000000000000004
-            if wb & <unsigned long long>0x0000000000000100:
+            if ctx.wb & <unsigned long long>0x0000000000000100:
                 w_r += <unsigned long long>0x0000000000000002
-            if wb & <unsigned long long>0x0000000000000001:
+            if ctx.wb & <unsigned long long>0x0000000000000001:
                 w_r += <unsigned long long>0x0000000000000001
-        score = ((edge_table8[b_t] - edge_table8[w_t]) + (edge_table8[b_b] - edge_table8[w_b]) + (edge_table8[b_l] - edge_table8[w_l]) + (edge_table8[b_r] - edge_table8[w_r])) * we
+        score = ((edge_table8[b_t] - edge_table8[w_t]) + (edge_table8[b_b] - edge_table8[w_b]) + (edge_table8[b_l] - edge_table8[w_l]) + (edge_table8[b_r] - edge_table8[w_r])) * ctx.we
     return score
 
 
-cdef inline signed int _get_b():
+cdef inline signed int _get_b(SearchContext ctx):
     """空きマスのパターンによる評価値
     """
-    global bb, wb, wb1, wb2, wb3
     cdef:
         signed int score = 0
         unsigned long long blackwhite, blank
@@ -1418,8 +1273,8 @@ cdef inline signed int _get_b():
         unsigned int i;
         unsigned long long[8] blanks;
         unsigned long long bits;
-    black = bb
-    white = wb
+    black = ctx.bb
+    white = ctx.wb
     blackwhite = black | white
     horizontal = blackwhite & <unsigned long long>0x7E7E7E7E7E7E7E7E  # 左右チェック用マスク
     vertical = blackwhite & <unsigned long long>0x00FFFFFFFFFFFF00    # 上下チェック用マスク
@@ -1473,32 +1328,32 @@ cdef inline signed int _get_b():
             bits = bits + (bits >> <unsigned int>16)
             score -= <signed int>(bits + (bits >> <unsigned int>32)) & <unsigned long long>0x000000000000007F
             # -- _popcount -- }}}
-    score *= wb1
+    score *= ctx.wb1
     # wb2の計算
     lt_x = lt_blank & <unsigned long long>0x0040000000000000  # 左上のX打ち
     if lt_x:
         if lt_x & black:
-            score += wb2
+            score += ctx.wb2
         else:
-            score -= wb2
+            score -= ctx.wb2
     rt_x = rt_blank & <unsigned long long>0x0002000000000000  # 右上のX打ち
     if rt_x:
         if rt_x & black:
-            score += wb2
+            score += ctx.wb2
         else:
-            score -= wb2
+            score -= ctx.wb2
     lb_x = lb_blank & <unsigned long long>0x0000000000004000  # 左下のX打ち
     if lb_x:
         if lb_x & black:
-            score += wb2
+            score += ctx.wb2
         else:
-            score -= wb2
+            score -= ctx.wb2
     rb_x = rb_blank & <unsigned long long>0x0000000000000200  # 右下のX打ち
     if rb_x:
         if rb_x & black:
-            score += wb2
+            score += ctx.wb2
         else:
-            score -= wb2
+            score -= ctx.wb2
     # wb3の計算
     lt_r = l_blank & <unsigned long long>0x4000000000000000
     lt_b = t_blank & <unsigned long long>0x0080000000000000
@@ -1527,28 +1382,28 @@ cdef inline signed int _get_b():
     for i in range(1, 5):
         lt_r >>= 1
         if lt_r & blank:
-            score += wb3 * lt_r_sign
+            score += ctx.wb3 * lt_r_sign
         lt_b >>= 8
         if lt_b & blank:
-            score += wb3 * lt_b_sign
+            score += ctx.wb3 * lt_b_sign
         rt_l <<= 1
         if rt_l & blank:
-            score += wb3 * rt_l_sign
+            score += ctx.wb3 * rt_l_sign
         rt_b >>= 8
         if rt_b & blank:
-            score += wb3 * rt_b_sign
+            score += ctx.wb3 * rt_b_sign
         lb_t <<= 8
         if lb_t & blank:
-            score += wb3 * lb_t_sign
+            score += ctx.wb3 * lb_t_sign
         lb_r >>= 1
         if lb_r & blank:
-            score += wb3 * lb_r_sign
+            score += ctx.wb3 * lb_r_sign
         rb_t <<= 8
         if rb_t & blank:
-            score += wb3 * rb_t_sign
+            score += ctx.wb3 * rb_t_sign
         rb_l <<= 1
         if rb_l & blank:
-            score += wb3 * rb_l_sign
+            score += ctx.wb3 * rb_l_sign
     return score
 
 
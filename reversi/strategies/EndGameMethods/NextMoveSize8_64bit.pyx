@@ -5,6 +5,9 @@
 import time
 
 from reversi.strategies.common import Timer, Measure
+from reversi.zobrist import ZOBRIST_BLACK, ZOBRIST_WHITE, ZOBRIST_TURN
+from reversi.strategies.common.TimeoutCheck cimport TimeoutCheck, init_timeout_check, is_timeout
+from reversi.strategies.common.StatsCounter cimport StatsCounter, init_stats_counter, count_node, count_cutoff
 from reversi.recorder import Recorder
 
 
@@ -18,55 +21,91 @@ DEF SHORTEST_REWARD = 10000
 
 
 cdef:
-    unsigned long long measure_count
-    unsigned long long bb
-    unsigned long long wb
-    unsigned long long rec_bb
-    unsigned long long rec_wb
-    unsigned long long hb
-    unsigned long long fd
-    unsigned long long[64] pbb
-    unsigned long long[64] pwb
-    unsigned long long[64] rec_pbb
-    unsigned long long[64] rec_pwb
-    unsigned int rol
-    unsigned int rec
-    unsigned int rec_depth
-    unsigned int bs
-    unsigned int ws
-    unsigned int max_depth
-    unsigned int start_depth
-    unsigned int[64] pbs
-    unsigned int[64] pws
-    unsigned int[64] rec_pbs
-    unsigned int[64] rec_pws
-    unsigned int tail
-    unsigned int is_timer_enabled
-    double timer_deadline
-    double rec_score
-    unsigned int timer_timeout
-    signed int timer_timeout_value
-    signed int taker_sign
-
-
-def next_move(color, board, depth, pid, timer, measure, role):
+    unsigned long long[64] zobrist_b
+    unsigned long long[64] zobrist_w
+    unsigned long long[64] zobrist_f
+    unsigned long long zobrist_turn = ZOBRIST_TURN
+
+
+for i in range(64):
+    zobrist_b[i] = ZOBRIST_BLACK[i]
+    zobrist_w[i] = ZOBRIST_WHITE[i]
+    zobrist_f[i] = ZOBRIST_BLACK[i] ^ ZOBRIST_WHITE[i]
+
+
+cdef class SearchContext:
+    """SearchContext
+
+           探索ごとの状態(盤面、タイマー、計測値など)
+    """
+    cdef:
+        unsigned long long measure_count
+        StatsCounter stats
+        unsigned long long bb
+        unsigned long long wb
+        unsigned long long rec_bb
+        unsigned long long rec_wb
+        unsigned long long hb
+        unsigned long long fd
+        unsigned long long[64] pbb
+        unsigned long long[64] pwb
+        unsigned long long[64] rec_pbb
+        unsigned long long[64] rec_pwb
+        unsigned int rol
+        unsigned int rec
+        unsigned int rec_depth
+        unsigned int bs
+        unsigned int ws
+        unsigned int max_depth
+        unsigned int start_depth
+        unsigned int[64] pbs
+        unsigned int[64] pws
+        unsigned int[64] rec_pbs
+        unsigned int[64] rec_pws
+        unsigned int tail
+        unsigned long long zh
+        unsigned long long[64] pzh
+        unsigned int is_timer_enabled
+        TimeoutCheck timer_check
+        double rec_score
+        unsigned int timer_timeout
+        signed int timer_timeout_value
+        signed int taker_sign
+
+    cdef public unsigned int timer_interval  # タイムアウトを確認するノード数の間隔(0の場合は探索速度に合わせて調整)
+
+    def __init__(self, timer_interval=0):
+        self.timer_interval = timer_interval
+
+    def __reduce__(self):
+        return (SearchContext, (self.timer_interval,))  # 複製時は初期状態とする
+
+
+def next_move(color, board, depth, pid, timer, measure, role, context=None, stats=None):
     """next_move
     """
     if pid is None:
         timer, measure = False, False
-    return _next_move(color, board, depth, pid, timer, measure, role)
+    cdef SearchContext ctx = SearchContext() if context is None else context  # 探索ごとの状態
+    ret = _next_move(ctx, color, board, depth, pid, timer, measure, role)
+    if stats is not None:
+        stats.add(ctx.stats)  # 探索の統計情報を加算
+    return ret
 
 
-def get_best_move(color, board, moves, alpha, beta, depth, pid, timer, measure, role, recorder):
+def get_best_move(color, board, moves, alpha, beta, depth, pid, timer, measure, role, recorder, context=None, stats=None):
     """get_best_move
     """
     if pid is None:
         timer, measure = False, False
-    return _get_best_move_wrap(color, board, moves, alpha, beta, depth, pid, timer, measure, role, recorder)
+    cdef SearchContext ctx = SearchContext() if context is None else context  # 探索ごとの状態
+    ret = _get_best_move_wrap(ctx, color, board, moves, alpha, beta, depth, pid, timer, measure, role, recorder)
+    if stats is not None:
+        stats.add(ctx.stats)  # 探索の統計情報を加算
+    return ret
 
 
-cdef inline tuple _next_move(str color, board, int depth, str pid, int timer, int measure, str role):
-    global is_timer_enabled, timer_deadline, timer_timeout, timer_timeout_value, measure_count, bb, wb, hb, bs, ws, max_depth
+cdef inline tuple _next_move(SearchContext ctx, str color, board, int depth, pid, int timer, int measure, str role):
     cdef:
         double alpha = -10000000, beta = 10000000
         unsigned int int_color = 0
@@ -76,32 +115,34 @@ cdef inline tuple _next_move(str color, board, int depth, str pid, int timer, in
         unsigned int[64] legal_moves_x
         unsigned int[64] legal_moves_y
     # タイマーとメジャー準備
-    measure_count = 0
-    timer_timeout = <unsigned int>0
-    is_timer_enabled = timer
-    if is_timer_enabled and pid:
-        timer_deadline = Timer.deadline[pid]
-        timer_timeout_value = Timer.timeout_value[pid]
+    ctx.measure_count = 0
+    init_stats_counter(&ctx.stats)
+    ctx.timer_timeout = <unsigned int>0
+    ctx.is_timer_enabled = timer
+    if ctx.is_timer_enabled and pid:
+        init_timeout_check(&ctx.timer_check, Timer.get_deadline(pid) - time.monotonic(), ctx.timer_interval)  # 期限を単調増加時計の時刻に変換
+        ctx.timer_timeout_value = Timer.get_timeout_value(pid)
     if measure and pid:
         if pid not in Measure.count:
             Measure.count[pid] = <unsigned int>0
-        measure_count = Measure.count[pid]
+        ctx.measure_count = Measure.count[pid]
     # 次の手番
     if color == 'black':
         int_color = <unsigned int>1
     # ボード情報取得
-    bb, wb, hb = board.get_bitboard_info()
-    bs = board._black_score
-    ws = board._white_score
+    ctx.bb, ctx.wb, ctx.hb = board.get_bitboard_info()
+    ctx.bs = board._black_score
+    ctx.ws = board._white_score
+    ctx.zh = _get_hash(int_color, ctx.bb, ctx.wb)
     # 役割
-    beta = _set_role(role, beta)
+    beta = _set_role(ctx, role, beta)
     # 最大深さ調整
-    if depth > <int>(max_depth - (bs + ws)):
-        depth =  <int>max_depth - (bs + ws)
+    if depth > <int>(ctx.max_depth - (ctx.bs + ctx.ws)):
+        depth =  <int>ctx.max_depth - (ctx.bs + ctx.ws)
     # 棋譜初期化(無効)
-    _init_recorder(<unsigned int>0, depth)
+    _init_recorder(ctx, <unsigned int>0, depth)
     # 最善手を取得
-    legal_moves = _get_legal_moves_bits(int_color, bb, wb, hb)
+    legal_moves = _get_legal_moves_bits(int_color, ctx.bb, ctx.wb, ctx.hb)
     for y in range(8):
         for x in range(8):
             if legal_moves & mask:
@@ -110,17 +151,16 @@ cdef inline tuple _next_move(str color, board, int depth, str pid, int timer, in
                 legal_moves_y[index] = y
                 index += 1
             mask >>= 1
-    best_move, scores = _get_best_move(int_color, index, legal_moves_bit_list, legal_moves_x, legal_moves_y, alpha, beta, depth)
+    best_move, scores = _get_best_move(ctx, int_color, index, legal_moves_bit_list, legal_moves_x, legal_moves_y, alpha, beta, depth)
     # タイマーとメジャー格納
     if measure and pid:
-        Measure.count[pid] = measure_count
-    if is_timer_enabled and pid and timer_timeout:
-        Timer.timeout_flag[pid] = True  # タイムアウト発生
+        Measure.count[pid] = ctx.measure_count
+    if ctx.is_timer_enabled and pid and ctx.timer_timeout:
+        Timer.set_timeout(pid)  # タイムアウト発生
     return best_move
 
 
-cdef inline _get_best_move_wrap(str color, board, moves, double alpha, double beta, int depth, str pid, int timer, int measure, str role, int recorder):
-    global is_timer_enabled, timer_deadline, timer_timeout, timer_timeout_value, measure_count, bb, wb, hb, bs, ws, max_depth, rec, rec_depth, rec_bb, rec_wb, rec_pbb, rec_pbs, rec_pwb, rec_pws
+cdef inline _get_best_move_wrap(SearchContext ctx, str color, board, moves, double alpha, double beta, int depth, pid, int timer, int measure, str role, int recorder):
     cdef:
         unsigned long long[64] moves_bit_list
         unsigned int[64] moves_x
@@ -130,30 +170,32 @@ cdef inline _get_best_move_wrap(str color, board, moves, double alpha, double be
         signed int lshift
         list prev
     # タイマーとメジャー準備
-    measure_count = 0
-    timer_timeout = <unsigned int>0
-    is_timer_enabled = timer
-    if is_timer_enabled and pid:
-        timer_deadline = Timer.deadline[pid]
-        timer_timeout_value = Timer.timeout_value[pid]
+    ctx.measure_count = 0
+    init_stats_counter(&ctx.stats)
+    ctx.timer_timeout = <unsigned int>0
+    ctx.is_timer_enabled = timer
+    if ctx.is_timer_enabled and pid:
+        init_timeout_check(&ctx.timer_check, Timer.get_deadline(pid) - time.monotonic(), ctx.timer_interval)  # 期限を単調増加時計の時刻に変換
+        ctx.timer_timeout_value = Timer.get_timeout_value(pid)
     if measure and pid:
         if pid not in Measure.count:
             Measure.count[pid] = <unsigned int>0
-        measure_count = Measure.count[pid]
+        ctx.measure_count = Measure.count[pid]
     # 次の手番
     if color == 'black':
         int_color = <unsigned int>1
     # ボード情報取得
-    bb, wb, hb = board.get_bitboard_info()
-    bs = board._black_score
-    ws = board._white_score
+    ctx.bb, ctx.wb, ctx.hb = board.get_bitboard_info()
+    ctx.bs = board._black_score
+    ctx.ws = board._white_score
+    ctx.zh = _get_hash(int_color, ctx.bb, ctx.wb)
     # 役割
-    beta = _set_role(role, beta)
+    beta = _set_role(ctx, role, beta)
     # 最大深さ調整
-    if depth > <int>(max_depth - (bs + ws)):
-        depth =  <int>max_depth - (bs + ws)
+    if depth > <int>(ctx.max_depth - (ctx.bs + ctx.ws)):
+        depth =  <int>ctx.max_depth - (ctx.bs + ctx.ws)
     # 棋譜初期化
-    _init_recorder(recorder, depth)
+    _init_recorder(ctx, recorder, depth)
     # 最善手を取得
     for x, y in moves:
         lshift = (63-(y*8+x))
@@ -162,64 +204,61 @@ cdef inline _get_best_move_wrap(str color, board, moves, double alpha, double be
         moves_x[index] = x
         moves_y[index] = y
         index += 1
-    best_move, scores = _get_best_move(int_color, index, moves_bit_list, moves_x, moves_y, alpha, beta, depth)
+    best_move, scores = _get_best_move(ctx, int_color, index, moves_bit_list, moves_x, moves_y, alpha, beta, depth)
     # タイマーとメジャー格納
     if measure and pid:
-        Measure.count[pid] = measure_count
-    if is_timer_enabled and pid and timer_timeout:
-        Timer.timeout_flag[pid] = True  # タイムアウト発生
-    if rec:
+        Measure.count[pid] = ctx.measure_count
+    if ctx.is_timer_enabled and pid and ctx.timer_timeout:
+        Timer.set_timeout(pid)  # タイムアウト発生
+    if ctx.rec:
         prev = []
-        for i in range(rec_depth):
-            prev += [(rec_pbb[i], rec_pwb[i], rec_pbs[i], rec_pws[i])]
-        return (best_move, scores, str(Recorder().get_record_by_custom(8, rec_bb, rec_wb, prev)))
+        for i in range(ctx.rec_depth):
+            prev += [(ctx.rec_pbb[i], ctx.rec_pwb[i], ctx.rec_pbs[i], ctx.rec_pws[i])]
+        return (best_move, scores, str(Recorder().get_record_by_custom(8, ctx.rec_bb, ctx.rec_wb, prev)))
     return (best_move, scores)
 
 
-cdef inline void _init_recorder(unsigned int recorder, unsigned int  depth):
-    global rec, rec_score, rec_depth, start_depth, rec_bb, rec_wb, rec_pbb, rec_pwb, rec_pbs, rec_pws
+cdef inline void _init_recorder(SearchContext ctx, unsigned int recorder, unsigned int  depth):
     cdef:
         unsigned int i
-    rec = recorder
-    rec_score = <double>0
-    rec_depth = <unsigned int>0
-    rec_bb = <unsigned long long>0
-    rec_wb = <unsigned long long>0
+    ctx.rec = recorder
+    ctx.rec_score = <double>0
+    ctx.rec_depth = <unsigned int>0
+    ctx.rec_bb = <unsigned long long>0
+    ctx.rec_wb = <unsigned long long>0
     for i in range(64):
-        rec_pbb[i] = <unsigned long long>0
-        rec_pwb[i] = <unsigned long long>0
-        rec_pbs[i] = <unsigned int>0
-        rec_pws[i] = <unsigned int>0
-    start_depth = depth
+        ctx.rec_pbb[i] = <unsigned long long>0
+        ctx.rec_pwb[i] = <unsigned long long>0
+        ctx.rec_pbs[i] = <unsigned int>0
+        ctx.rec_pws[i] = <unsigned int>0
+    ctx.start_depth = depth
 
 
-cdef inline double _set_role(str role, double beta):
-    global rol, hb, max_depth, taker_sign
-    rol = BEST_MATCH
-    max_depth = <unsigned int>64 - <unsigned int>_popcount(hb)
+cdef inline double _set_role(SearchContext ctx, str role, double beta):
+    ctx.rol = BEST_MATCH
+    ctx.max_depth = <unsigned int>64 - <unsigned int>_popcount(ctx.hb)
     if role != 'best_match':
         # TODO : MUCH_TAKER:確定石の場所を記憶し、相手が確定石に置く手を後回しにする
         if role == 'black_max':
-            beta = <double>max_depth
-            rol = BLACK_MAX
-            taker_sign = <signed int>1
+            beta = <double>ctx.max_depth
+            ctx.rol = BLACK_MAX
+            ctx.taker_sign = <signed int>1
         elif role == 'white_max':
-            beta = <double>max_depth
-            rol = WHITE_MAX
-            taker_sign = <signed int>-1
+            beta = <double>ctx.max_depth
+            ctx.rol = WHITE_MAX
+            ctx.taker_sign = <signed int>-1
         elif role == 'black_shortest':
             beta = <double>SHORTEST_REWARD * 64
-            rol = BLACK_SHORTEST
-            taker_sign = <signed int>1
+            ctx.rol = BLACK_SHORTEST
+            ctx.taker_sign = <signed int>1
         elif role == 'white_shortest':
             beta = <double>SHORTEST_REWARD * 64
-            rol = WHITE_SHORTEST
-            taker_sign = <signed int>-1
+            ctx.rol = WHITE_SHORTEST
+            ctx.taker_sign = <signed int>-1
     return beta
 
 
-cdef inline _get_best_move(unsigned int int_color, unsigned int index, unsigned long long[64] moves_bit_list, unsigned int[64] moves_x, unsigned int[64] moves_y, double alpha, double beta, int depth):
-    global timer_timeout, rol
+cdef inline _get_best_move(SearchContext ctx, unsigned int int_color, unsigned int index, unsigned long long[64] moves_bit_list, unsigned int[64] moves_x, unsigned int[64] moves_y, double alpha, double beta, int depth):
     cdef:
         double score = alpha
         unsigned int int_color_next = 1, i, best = 64
@@ -229,15 +268,15 @@ cdef inline _get_best_move(unsigned int int_color, unsigned int index, unsigned
         int_color_next = <unsigned int>0
     # 各手のスコア取得
     for i in range(index):
-        _put_disc(int_color, moves_bit_list[i])
-        if rol == BEST_MATCH:
-            score = -_get_score(int_color_next, -beta, -alpha, depth-1, <unsigned int>0)
+        _put_disc(ctx, int_color, moves_bit_list[i])
+        if ctx.rol == BEST_MATCH:
+            score = -_get_score(ctx, int_color_next, -beta, -alpha, depth-1, <unsigned int>0)
         else:
-            score = _get_score_taker(int_color_next, alpha, beta, depth-1, <unsigned int>0)
-        _undo()
+            score = _get_score_taker(ctx, int_color_next, alpha, beta, depth-1, <unsigned int>0)
+        _undo(ctx)
         scores[(moves_x[i], moves_y[i])] = score
         #print(moves_x[i], moves_y[i], score)
-        if timer_timeout:
+        if ctx.timer_timeout:
             if best == 64:
                 best = i
             break
@@ -247,20 +286,18 @@ cdef inline _get_best_move(unsigned int int_color, unsigned int index, unsigned
     return (moves_x[best], moves_y[best]), scores
 
 
-cdef inline signed int check_timeout():
+cdef inline signed int check_timeout(SearchContext ctx) noexcept nogil:
     """check_timeout
     """
-    global timer_deadline, timer_timeout, timer_timeout_value
-    if time.time() > timer_deadline:
-        timer_timeout = <unsigned int>1
-        return timer_timeout_value
+    if is_timeout(&ctx.timer_check):
+        ctx.timer_timeout = <unsigned int>1
+        return ctx.timer_timeout_value
     return <signed int>0
 
 
-cdef inline double _get_score(unsigned int int_color, double alpha, double beta, unsigned int depth, unsigned int pas):
+cdef inline double _get_score(SearchContext ctx, unsigned int int_color, double alpha, double beta, unsigned int depth, unsigned int pas):
     """_get_score
     """
-    global timer_timeout, measure_count, bb, wb, bs, ws, pbb, pwb, pbs, pws, fd, tail, is_timer_enabled, max_depth
     cdef:
         signed int timeout
         double score
@@ -268,57 +305,66 @@ cdef inline double _get_score(unsigned int int_color, double alpha, double beta,
         unsigned int i, is_game_end = 0, int_color_next = 1, x, y
         signed int sign = -1
     # タイムアウト判定
-    if is_timer_enabled:
-        timeout = check_timeout()
+    if ctx.is_timer_enabled:
+        timeout = check_timeout(ctx)
         if timeout:
             return timeout
     # 探索ノード数カウント
-    measure_count += 1
+    ctx.measure_count += 1
+    count_node(&ctx.stats, ctx.tail)
     # 合法手を取得
-    legal_moves_bits = _get_legal_moves_bits(int_color, bb, wb, hb)
+    legal_moves_bits = _get_legal_moves_bits(int_color, ctx.bb, ctx.wb, ctx.hb)
     # 前回パス and 打てる場所なし の場合ゲーム終了
     if pas and not legal_moves_bits:
         is_game_end = <unsigned int>1
     # 最大深さに到達 or ゲーム終了
     if not depth or is_game_end:
+        ctx.stats.leaves += 1
         if int_color:
             sign = <signed int>1
-        return <double>((<double>bs - <double>ws) * <double>sign)
+        return <double>((<double>ctx.bs - <double>ctx.ws) * <double>sign)
     # 次の手番
     if int_color:
         int_color_next = <unsigned int>0
     # パスの場合
     if not legal_moves_bits:
-        return -_get_score(int_color_next, -beta, -alpha, depth, <unsigned int>1)
+        ctx.zh ^= zobrist_turn
+        score = -_get_score(ctx, int_color_next, -beta, -alpha, depth, <unsigned int>1)
+        ctx.zh ^= zobrist_turn
+        return score
     # 最終1手
-    if bs + ws == <unsigned int>(max_depth - 1):
-        measure_count += 1
-        count = _popcount(_get_flippable_discs_num(int_color, bb, wb, legal_moves_bits))
-        if rol == BEST_MATCH:
+    if ctx.bs + ctx.ws == <unsigned int>(ctx.max_depth - 1):
+        ctx.measure_count += 1
+        count_node(&ctx.stats, ctx.tail + 1)
+        count = _popcount(_get_flippable_discs_num(int_color, ctx.bb, ctx.wb, legal_moves_bits))
+        if ctx.rol == BEST_MATCH:
+            ctx.stats.leaves += 1
             if int_color:
-                return <double>(<double>bs - <double>ws + <double>(1 + count*2))
+                return <double>(<double>ctx.bs - <double>ctx.ws + <double>(1 + count*2))
             else:
-                return <double>-(<double>bs - <double>ws - <double>(1 + count*2))
+                return <double>-(<double>ctx.bs - <double>ctx.ws - <double>(1 + count*2))
     # 評価値を算出
+    i = 0
     while (legal_moves_bits):
         move = legal_moves_bits & (~legal_moves_bits+1)  # 一番右のONしているビットのみ取り出す
-        _put_disc(int_color, move)
-        score = -_get_score(int_color_next, -beta, -alpha, depth-1, <unsigned int>0)
-        _undo()
+        _put_disc(ctx, int_color, move)
+        score = -_get_score(ctx, int_color_next, -beta, -alpha, depth-1, <unsigned int>0)
+        _undo(ctx)
         legal_moves_bits ^= move  # 一番右のONしているビットをOFFする
         if score > alpha:
             alpha = score
-        if timer_timeout:
+        if ctx.timer_timeout:
             return alpha
         if alpha >= beta:  # 枝刈り
+            count_cutoff(&ctx.stats, i)
             return alpha
+        i += 1
     return alpha
 
 
-cdef inline double _get_score_taker(unsigned int int_color, double alpha, double beta, unsigned int depth, unsigned int pas):
+cdef inline double _get_score_taker(SearchContext ctx, unsigned int int_color, double alpha, double beta, unsigned int depth, unsigned int pas):
     """_get_score_taker
     """
-    global timer_timeout, measure_count, bb, wb, bs, ws, pbb, pwb, pbs, pws, fd, tail, is_timer_enabled, rol, taker_sign, max_depth
     cdef:
         signed int timeout
         double score
@@ -326,70 +372,79 @@ cdef inline double _get_score_taker(unsigned int int_color, double alpha, double
         unsigned int i, is_game_end = 0, int_color_next = 1, x, y, reward
         signed int sign = -1
     # タイムアウト判定
-    if is_timer_enabled:
-        timeout = check_timeout()
+    if ctx.is_timer_enabled:
+        timeout = check_timeout(ctx)
         if timeout:
             return timeout
     # 探索ノード数カウント
-    measure_count += 1
+    ctx.measure_count += 1
+    count_node(&ctx.stats, ctx.tail)
     # 合法手を取得
-    legal_moves_bits = _get_legal_moves_bits(int_color, bb, wb, hb)
+    legal_moves_bits = _get_legal_moves_bits(int_color, ctx.bb, ctx.wb, ctx.hb)
     # 前回パス and 打てる場所なし の場合ゲーム終了
     if pas and not legal_moves_bits:
         is_game_end = <unsigned int>1
     # 最大深さに到達 or ゲーム終了
     if not depth or is_game_end:
-        if rol == BLACK_SHORTEST or rol == WHITE_SHORTEST:
-            if is_game_end and <signed int>(bs * taker_sign) > <signed int>(ws * taker_sign):
-                reward = (max_depth - (bs + ws)) * SHORTEST_REWARD
+        ctx.stats.leaves += 1
+        if ctx.rol == BLACK_SHORTEST or ctx.rol == WHITE_SHORTEST:
+            if is_game_end and <signed int>(ctx.bs * ctx.taker_sign) > <signed int>(ctx.ws * ctx.taker_sign):
+                reward = (ctx.max_depth - (ctx.bs + ctx.ws)) * SHORTEST_REWARD
                 if reward > SHORTEST_REWARD:
-                    score = <double>((<double>bs - <double>ws) * taker_sign + <double>reward)
+                    score = <double>((<double>ctx.bs - <double>ctx.ws) * ctx.taker_sign + <double>reward)
                     #print(depth, score, hex(bs), hex(ws))
-                    _save_record(score, depth)
+                    _save_record(ctx, score, depth)
                     return score
-        return <double>(<double>bs - <double>ws) * taker_sign
+        return <double>(<double>ctx.bs - <double>ctx.ws) * ctx.taker_sign
     # 次の手番
     if int_color:
         int_color_next = <unsigned int>0
     # パスの場合
     if not legal_moves_bits:
-        return _get_score_taker(int_color_next, alpha, beta, depth, <unsigned int>1)
+        ctx.zh ^= zobrist_turn
+        score = _get_score_taker(ctx, int_color_next, alpha, beta, depth, <unsigned int>1)
+        ctx.zh ^= zobrist_turn
+        return score
     # 最終1手
-    if bs + ws == <unsigned int>(max_depth - 1):
-        measure_count += 1
-        count = _popcount(_get_flippable_discs_num(int_color, bb, wb, legal_moves_bits))
+    if ctx.bs + ctx.ws == <unsigned int>(ctx.max_depth - 1):
+        ctx.measure_count += 1
+        count_node(&ctx.stats, ctx.tail + 1)
+        ctx.stats.leaves += 1
+        count = _popcount(_get_flippable_discs_num(int_color, ctx.bb, ctx.wb, legal_moves_bits))
         if int_color:
-            return <double>(<double>bs - <double>ws + <double>(1 + count*2)) * taker_sign
+            return <double>(<double>ctx.bs - <double>ctx.ws + <double>(1 + count*2)) * ctx.taker_sign
         else:
-            return <double>(<double>bs - <double>ws - <double>(1 + count*2)) * taker_sign
+            return <double>(<double>ctx.bs - <double>ctx.ws - <double>(1 + count*2)) * ctx.taker_sign
     # 評価値を算出
+    i = 0
     while (legal_moves_bits):
         move = legal_moves_bits & (~legal_moves_bits+1)  # 一番右のONしているビットのみ取り出す
-        _put_disc(int_color, move)
-        score = _get_score_taker(int_color_next, alpha, beta, depth-1, <unsigned int>0)
-        _undo()
+        _put_disc(ctx, int_color, move)
+        score = _get_score_taker(ctx, int_color_next, alpha, beta, depth-1, <unsigned int>0)
+        _undo(ctx)
         legal_moves_bits ^= move  # 一番右のONしているビットをOFFする
         if score > alpha:
             alpha = score
-        if timer_timeout:
+        if ctx.timer_timeout:
             return alpha
         if alpha >= beta:  # 枝刈り
+            count_cutoff(&ctx.stats, i)
             return alpha
+        i += 1
     return alpha
 
 
-cdef inline void _save_record(double score, unsigned int depth):
-    global rec, rec_score, rec_depth, start_depth, rec_bb, rec_wb, rec_pbb, rec_pwb, rec_pbs, rec_pws, bb, wb, pbb, pwb, pbs, pws
-    if rec and (score > rec_score):
-        rec_depth = start_depth - depth
-        rec_score = score
-        rec_bb = bb
-        rec_wb = wb
-        for i in range(rec_depth):
-            rec_pbb[i] = pbb[i]
-            rec_pwb[i] = pwb[i]
-            rec_pbs[i] = pbs[i]
-            rec_pws[i] = pws[i]
+cdef inline void _save_record(SearchContext ctx, double score, unsigned int depth):
+    if ctx.rec and (score > ctx.rec_score):
+        ctx.rec_depth = ctx.start_depth - depth
+        ctx.rec_score = score
+        ctx.rec_bb = ctx.bb
+        ctx.rec_wb = ctx.wb
+        for i in range(ctx.rec_depth):
+            ctx.rec_pbb[i] = ctx.pbb[i]
+            ctx.rec_pwb[i] = ctx.pwb[i]
+            ctx.rec_pbs[i] = ctx.pbs[i]
+            ctx.rec_pws[i] = ctx.pws[i]
 
 
 cdef inline unsigned long long _get_legal_moves_bits(unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long h):
@@ -448,33 +503,35 @@ cdef inline unsigned long long _popcount(unsigned long long bits):
     return (bits + (bits >> <unsigned int>32)) & <unsigned long long>0x000000000000007F
 
 
-cdef inline void _put_disc(unsigned int int_color, unsigned long long move):
+cdef inline void _put_disc(SearchContext ctx, unsigned int int_color, unsigned long long move):
     """_put_disc
     """
-    global bb, wb, bs, ws, pbb, pwb, pbs, pws, fd, tail
     cdef:
         unsigned long long count
         signed int lshift
     # ひっくり返せる石を取得
-    fd = _get_flippable_discs_num(int_color, bb, wb, move)
-    count = _popcount(fd)
+    ctx.fd = _get_flippable_discs_num(int_color, ctx.bb, ctx.wb, move)
+    count = _popcount(ctx.fd)
     # 打つ前の状態を格納
-    pbb[tail] = bb
-    pwb[tail] = wb
-    pbs[tail] = bs
-    pws[tail] = ws
-    tail += 1
+    ctx.pbb[ctx.tail] = ctx.bb
+    ctx.pwb[ctx.tail] = ctx.wb
+    ctx.pbs[ctx.tail] = ctx.bs
+    ctx.pws[ctx.tail] = ctx.ws
+    ctx.pzh[ctx.tail] = ctx.zh
+    ctx.tail += 1
     # 自分の石を置いて相手の石をひっくり返す
     if int_color:
-        bb ^= move | fd
-        wb ^= fd
-        bs += <unsigned int>1 + <unsigned int>count
-        ws -= <unsigned int>count
+        ctx.bb ^= move | ctx.fd
+        ctx.wb ^= ctx.fd
+        ctx.bs += <unsigned int>1 + <unsigned int>count
+        ctx.ws -= <unsigned int>count
     else:
-        wb ^= move | fd
-        bb ^= fd
-        bs -= <unsigned int>count
-        ws += <unsigned int>1 + <unsigned int>count
+        ctx.wb ^= move | ctx.fd
+        ctx.bb ^= ctx.fd
+        ctx.bs -= <unsigned int>count
+        ctx.ws += <unsigned int>1 + <unsigned int>count
+    # ハッシュ値を更新
+    ctx.zh ^= _get_put_hash(int_color, move, ctx.fd)
 
 
 cdef inline unsigned long long _get_flippable_discs_num(unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long move):
@@ -539,12 +596,58 @@ cdef inline unsigned long long _get_flippable_discs_num(unsigned int int_color,
     return flippable_discs_num
 
 
-cdef inline void _undo():
+cdef inline void _undo(SearchContext ctx):
     """_undo
     """
-    global bb, wb, bs, ws, pbb, pwb, pbs, pws, tail
-    tail -= 1
-    bb = pbb[tail]
-    wb = pwb[tail]
-    bs = pbs[tail]
-    ws = pws[tail]
+    ctx.tail -= 1
+    ctx.zh = ctx.pzh[ctx.tail]
+    ctx.bb = ctx.pbb[ctx.tail]
+    ctx.wb = ctx.pwb[ctx.tail]
+    ctx.bs = ctx.pbs[ctx.tail]
+    ctx.ws = ctx.pws[ctx.tail]
+
+
+cdef inline unsigned long long _get_hash(unsigned int int_color, unsigned long long b, unsigned long long w):
+    """_get_hash
+    """
+    cdef:
+        unsigned long long lsb, hash_value = 0
+    if not int_color:
+        hash_value = zobrist_turn
+    while b:
+        lsb = b & (~b + 1)
+        hash_value ^= zobrist_b[_bit_index(lsb)]
+        b ^= lsb
+    while w:
+        lsb = w & (~w + 1)
+        hash_value ^= zobrist_w[_bit_index(lsb)]
+        w ^= lsb
+    return hash_value
+
+
+cdef inline unsigned long long _get_put_hash(unsigned int int_color, unsigned long long move, unsigned long long flippable_discs_num):
+    """_get_put_hash
+    """
+    cdef:
+        unsigned long long lsb, hash_value = zobrist_turn
+    if int_color:
+        hash_value ^= zobrist_b[_bit_index(move)]
+    else:
+        hash_value ^= zobrist_w[_bit_index(move)]
+    while flippable_discs_num:
+        lsb = flippable_discs_num & (~flippable_discs_num + 1)
+        hash_value ^= zobrist_f[_bit_index(lsb)]
+        flippable_discs_num ^= lsb
+    return hash_value
+
+
+cdef inline unsigned int _bit_index(unsigned long long bit):
+    """_bit_index
+    """
+    bit -= 1
+    bit = bit - ((bit >> <unsigned int>1) & <unsigned long long>0x5555555555555555)
+    bit = (bit & <unsigned long long>0x3333333333333333) + ((bit >> <unsigned int>2) & <unsigned long long>0x3333333333333333)
+    bit = (bit + (bit >> <unsigned int>4)) & <unsigned long long>0x0F0F0F0F0F0F0F0F
+    bit = bit + (bit >> <unsigned int>8)
+    bit = bit + (bit >> <unsigned int>16)
+    return <unsigned int>((bit + (bit >> <unsigned int>32)) & <unsigned long long>0x000000000000007F)
@@ -0,0 +1,671 @@
+#cython: language_level=3, profile=False, boundscheck=False, wraparound=False, initializedcheck=False, cdivision=True
+"""Next Move(Size8,64bit) of MTD(f) strategy
+
+       置換表を用いたfail-softのnull-window探索を繰り返して評価値を求める
+"""
+
+import time
+
+from reversi.strategies.common import Timer, Measure
+from reversi.zobrist import ZOBRIST_BLACK, ZOBRIST_WHITE, ZOBRIST_TURN
+from reversi.strategies.coordinator.EvaluatorMethods.CyEvaluator8_64bit cimport CyEvaluator
+from reversi.strategies.common.TimeoutCheck cimport TimeoutCheck, init_timeout_check, is_timeout
+from reversi.strategies.common.StatsCounter cimport StatsCounter, init_stats_counter, count_node, count_cutoff
+from reversi.strategies.common.TableScore cimport get_table_score, get_table_delta
+from reversi.strategies.TranspositionTableMethods.TranspositionTable8_64bit cimport TranspositionTable, TTEntry, TT_EXACT, TT_LOWER, TT_UPPER
+
+
+DEF TT_MIN_DEPTH = 2  # 置換表を参照する残り深さの下限
+DEF MAX_PLY = 64        # キラー手を保持する深さの上限
+DEF HISTORY_MAX = 0xFFFF
+DEF KEY_TT = HISTORY_MAX + 3
+DEF KEY_KILLER1 = HISTORY_MAX + 2
+DEF KEY_KILLER2 = HISTORY_MAX + 1
+DEF NEGATIVE_INFINITY = -100000000
+
+
+cdef:
+    unsigned long long[64] zobrist_b
+    unsigned long long[64] zobrist_w
+    unsigned long long[64] zobrist_f
+    unsigned long long zobrist_turn = ZOBRIST_TURN
+
+
+for i in range(64):
+    zobrist_b[i] = ZOBRIST_BLACK[i]
+    zobrist_w[i] = ZOBRIST_WHITE[i]
+    zobrist_f[i] = ZOBRIST_BLACK[i] ^ ZOBRIST_WHITE[i]
+
+
+cdef class SearchContext:
+    """SearchContext
+
+           探索ごとの状態(盤面、タイマー、計測値など)
+    """
+    cdef:
+        unsigned long long measure_count
+        StatsCounter stats
+        unsigned long long[64] legal_moves_bit_list
+        unsigned int[64] legal_moves_x
+        unsigned int[64] legal_moves_y
+        unsigned long long bb
+        unsigned long long wb
+        unsigned long long hb
+        unsigned long long fd
+        unsigned long long[64] pbb
+        unsigned long long[64] pwb
+        unsigned int bs
+        unsigned int ws
+        unsigned int[64] pbs
+        unsigned int[64] pws
+        unsigned int tail
+        unsigned long long zh
+        unsigned long long[64] pzh
+        unsigned int is_table
+        signed int ts
+        signed int[64] pts
+        TimeoutCheck timer_check
+        unsigned int timer_timeout
+        signed int timer_timeout_value
+        object board, evaluator
+        CyEvaluator cy_evaluator
+        unsigned int is_cy_evaluator
+        TranspositionTable tt
+        unsigned int is_tt
+        unsigned int is_killer_history
+        unsigned long long[MAX_PLY][2] killer_moves
+        unsigned int[2][64] history_table
+
+    cdef public unsigned int timer_interval  # タイムアウトを確認するノード数の間隔(0の場合は探索速度に合わせて調整)
+
+    def __init__(self, timer_interval=0):
+        self.timer_interval = timer_interval
+
+    def __reduce__(self):
+        return (SearchContext, (self.timer_interval,))  # 複製時は初期状態とする
+
+
+def next_move(color, board, param_min, param_max, first_guess, depth, evaluator, pid, timer, measure, tt=None, killer_history=False, context=None, stats=None):
+    """next_move
+    """
+    if pid is None:
+        timer, measure = False, False
+    cdef SearchContext ctx = SearchContext() if context is None else context  # 探索ごとの状態
+    _set_tt(ctx, tt)
+    _set_killer_history(ctx, killer_history)
+    ret = _next_move(ctx, color, board, param_min, param_max, first_guess, depth, evaluator, pid, timer, measure)
+    if stats is not None:
+        stats.add(ctx.stats)  # 探索の統計情報を加算
+    return ret
+
+
+def get_best_move(color, board, moves, alpha, beta, first_guess, depth, evaluator, pid, timer, measure, tt=None, killer_history=False, context=None, stats=None):
+    """get_best_move
+    """
+    if pid is None:
+        timer, measure = False, False
+    cdef SearchContext ctx = SearchContext() if context is None else context  # 探索ごとの状態
+    _set_tt(ctx, tt)
+    _set_killer_history(ctx, killer_history)
+    ret = _get_best_move_wrap(ctx, color, board, moves, alpha, beta, first_guess, depth, evaluator, pid, timer, measure)
+    if stats is not None:
+        stats.add(ctx.stats)  # 探索の統計情報を加算
+    return ret
+
+
+cdef inline tuple _next_move(SearchContext ctx, str color, board, signed int param_min, signed int param_max, double first_guess, int depth, evaluator, pid, int timer, int measure):
+    cdef:
+        double alpha = param_min, beta = param_max
+        unsigned long long b, w, h
+        unsigned int int_color = 0
+        unsigned int x, y, index = 0
+        unsigned long long legal_moves, mask = 0x8000000000000000
+    ctx.measure_count = 0
+    init_stats_counter(&ctx.stats)
+    ctx.timer_timeout = <unsigned int>0
+    _set_cy_evaluator(ctx, evaluator)
+    if timer and pid:
+        init_timeout_check(&ctx.timer_check, Timer.get_deadline(pid) - time.monotonic(), ctx.timer_interval)  # 期限を単調増加時計の時刻に変換
+        ctx.timer_timeout_value = Timer.get_timeout_value(pid)
+    if measure and pid:
+        if pid not in Measure.count:
+            Measure.count[pid] = 0
+        ctx.measure_count = Measure.count[pid]
+    if color == 'black':
+        int_color = <unsigned int>1
+    b, w, h = board.get_bitboard_info()
+    legal_moves = _get_legal_moves_bits(int_color, b, w, h)
+    for y in range(8):
+        for x in range(8):
+            if legal_moves & mask:
+                ctx.legal_moves_bit_list[index] = mask
+                ctx.legal_moves_x[index] = x
+                ctx.legal_moves_y[index] = y
+                index += 1
+            mask >>= 1
+    best_move, scores = _get_best_move(ctx, int_color, board, index, ctx.legal_moves_bit_list, ctx.legal_moves_x, ctx.legal_moves_y, alpha, beta, first_guess, depth, evaluator, timer)
+    if measure and pid:
+        Measure.count[pid] = ctx.measure_count
+    if timer and pid and ctx.timer_timeout:
+        Timer.set_timeout(pid)  # タイムアウト発生
+    return (best_move, scores)
+
+
+cdef inline _get_best_move_wrap(SearchContext ctx, str color, board, moves, double alpha, double beta, double first_guess, int depth, evaluator, pid, int timer, int measure):
+    cdef:
+        unsigned long long[64] moves_bit_list
+        unsigned int[64] moves_x
+        unsigned int[64] moves_y
+        unsigned int x, y, index = 0, int_color = 0
+        unsigned long long put
+        signed int lshift
+    ctx.measure_count = 0
+    init_stats_counter(&ctx.stats)
+    ctx.timer_timeout = <unsigned int>0
+    _set_cy_evaluator(ctx, evaluator)
+    if timer and pid:
+        init_timeout_check(&ctx.timer_check, Timer.get_deadline(pid) - time.monotonic(), ctx.timer_interval)  # 期限を単調増加時計の時刻に変換
+        ctx.timer_timeout_value = Timer.get_timeout_value(pid)
+    if measure and pid:
+        if pid not in Measure.count:
+            Measure.count[pid] = 0
+        ctx.measure_count = Measure.count[pid]
+    for x, y in moves:
+        lshift = (63-(y*8+x))
+        put = <unsigned long long>1 << lshift
+        moves_bit_list[index] = put
+        moves_x[index] = x
+        moves_y[index] = y
+        index += 1
+    if color == 'black':
+        int_color = <unsigned int>1
+    best_move, scores = _get_best_move(ctx, int_color, board, index, moves_bit_list, moves_x, moves_y, alpha, beta, first_guess, depth, evaluator, timer)
+    if measure and pid:
+        Measure.count[pid] = ctx.measure_count
+    if timer and pid and ctx.timer_timeout:
+        Timer.set_timeout(pid)  # タイムアウト発生
+    return (best_move, scores)
+
+
+cdef inline _get_best_move(SearchContext ctx, unsigned int int_color, board, unsigned int index, unsigned long long[64] moves_bit_list, unsigned int[64] moves_x, unsigned int[64] moves_y, double alpha, double beta, double g, int depth, evaluator, int timer):
+    cdef:
+        double score, best_score, lower = alpha, upper = beta, bound
+        unsigned int int_color_next = 1, i, best = 0, pass_best
+    scores = {}
+    # 手番
+    if int_color:
+        int_color_next = <unsigned int>0
+    # ボード情報取得
+    ctx.board, ctx.evaluator = board, evaluator
+    ctx.bb, ctx.wb, ctx.hb = board.get_bitboard_info()
+    ctx.bs = board._black_score
+    ctx.ws = board._white_score
+    ctx.zh = _get_hash(int_color, ctx.bb, ctx.wb)
+    ctx.ts = get_table_score(ctx.cy_evaluator.square_values, ctx.bb, ctx.wb) if ctx.is_table else 0  # テーブルによる評価値(以降は着手ごとに差分更新)
+    # ボード情報退避(評価時にボードへ書き戻す場合のみ)
+    if not ctx.is_cy_evaluator:
+        board_bb = ctx.bb
+        board_wb = ctx.wb
+        board_bs = ctx.bs
+        board_ws = ctx.ws
+        board_prev = [(item[0], item[1], item[2], item[3]) for item in board.prev]
+        board_hash = board._hash
+    # 初期値を窓の範囲内に収める
+    if g < lower:
+        g = lower
+    if g > upper:
+        g = upper
+    # 上限と下限が一致するまでnull-window探索を繰り返す
+    while lower < upper:
+        bound = g + 1 if g == lower else g  # (bound-1, bound)の窓で探索
+        best_score, pass_best = NEGATIVE_INFINITY, 0
+        for i in range(index):
+            with nogil:  # 探索中はGILを解放する
+                _put_disc(ctx, int_color, moves_bit_list[i])
+                score = -_get_score(ctx, int_color_next, -bound, -(bound-1), depth-1, timer, <unsigned int>0)
+                _undo(ctx)
+            scores[(moves_x[i], moves_y[i])] = score
+            if ctx.timer_timeout:  # タイムアウト判定
+                break
+            if score > best_score:
+                best_score, pass_best = score, i
+                if best_score >= bound:  # 枝刈り
+                    break
+        if ctx.timer_timeout:
+            break
+        g = best_score
+        if g < bound:
+            upper = g  # fail-low
+        else:
+            lower = g  # fail-high
+            best = pass_best
+    if not ctx.timer_timeout and index:
+        scores[(moves_x[best], moves_y[best])] = g
+    # ボードを元に戻す
+    if not ctx.is_cy_evaluator:
+        board._black_bitboard = board_bb
+        board._white_bitboard = board_wb
+        board._black_score = board_bs
+        board._white_score = board_ws
+        board.prev = [(item[0], item[1], item[2], item[3]) for item in board_prev]
+        board._hash = board_hash
+    ctx.board, ctx.evaluator = None, None
+    return (moves_x[best], moves_y[best]), scores
+
+
+cdef inline void _set_cy_evaluator(SearchContext ctx, evaluator):
+    """_set_cy_evaluator
+    """
+    ctx.cy_evaluator, ctx.is_cy_evaluator, ctx.is_table = None, <unsigned int>0, <unsigned int>0
+    candidate = getattr(evaluator, 'cy_evaluator', None)
+    if isinstance(candidate, CyEvaluator):
+        ctx.cy_evaluator, ctx.is_cy_evaluator = candidate, <unsigned int>1
+        ctx.is_table = ctx.cy_evaluator.has_table
+
+
+cdef inline void _set_tt(SearchContext ctx, table):
+    """_set_tt
+    """
+    ctx.tt, ctx.is_tt = None, <unsigned int>0
+    if isinstance(table, TranspositionTable):
+        ctx.tt, ctx.is_tt = table, <unsigned int>1
+
+
+cdef inline void _set_killer_history(SearchContext ctx, killer_history):
+    """_set_killer_history
+    """
+    cdef:
+        unsigned int i, j
+    ctx.is_killer_history = <unsigned int>1 if killer_history else <unsigned int>0
+    if ctx.is_killer_history:
+        for i in range(MAX_PLY):
+            ctx.killer_moves[i][0] = 0
+            ctx.killer_moves[i][1] = 0
+        for i in range(2):
+            for j in range(64):
+                ctx.history_table[i][j] >>= 1  # 前回までの値は減衰させて引き継ぐ
+
+
+cdef inline unsigned int _get_move_key(SearchContext ctx, unsigned int int_color, unsigned int depth, unsigned long long move, unsigned long long tt_move) noexcept nogil:
+    """_get_move_key
+    """
+    if move == tt_move:
+        return KEY_TT
+    if ctx.is_killer_history:
+        if depth < MAX_PLY:
+            if move == ctx.killer_moves[depth][0]:
+                return KEY_KILLER1
+            if move == ctx.killer_moves[depth][1]:
+                return KEY_KILLER2
+        return ctx.history_table[int_color][_bit_index(move)]
+    return 0
+
+
+cdef inline void _update_killer_history(SearchContext ctx, unsigned int int_color, unsigned int depth, unsigned long long move) noexcept nogil:
+    """_update_killer_history
+    """
+    cdef:
+        unsigned int i, index = _bit_index(move)
+    if depth < MAX_PLY and ctx.killer_moves[depth][0] != move:
+        ctx.killer_moves[depth][1] = ctx.killer_moves[depth][0]
+        ctx.killer_moves[depth][0] = move
+    ctx.history_table[int_color][index] += depth * depth
+    if ctx.history_table[int_color][index] > HISTORY_MAX:
+        for i in range(64):
+            ctx.history_table[int_color][i] >>= 1
+
+
+cdef inline void _pick_move(unsigned int index, unsigned int count, unsigned long long[64] moves, unsigned int[64] keys) noexcept nogil:
+    """_pick_move
+
+           残りの手の中で優先度の最も高い手を、他の手の順序を保ったままindexの位置に移動
+    """
+    cdef:
+        unsigned int i, best = index, key
+        unsigned long long move
+    for i in range(index+1, count):
+        if keys[i] > keys[best]:
+            best = i
+    if best != index:
+        move, key = moves[best], keys[best]
+        i = best
+        while i > index:
+            moves[i], keys[i] = moves[i-1], keys[i-1]
+            i -= 1
+        moves[index], keys[index] = move, key
+
+
+cdef inline signed int check_timeout(SearchContext ctx) noexcept nogil:
+    """check_timeout
+    """
+    if is_timeout(&ctx.timer_check):
+        ctx.timer_timeout = <unsigned int>1
+        return ctx.timer_timeout_value
+    return <signed int>0
+
+
+cdef inline double _get_score(SearchContext ctx, unsigned int int_color, double alpha, double beta, unsigned int depth, int t, unsigned int pas) nogil:
+    """_get_score
+    """
+    cdef:
+        signed int timeout
+        double score, best_score = NEGATIVE_INFINITY
+        unsigned long long legal_moves_b_bits, legal_moves_w_bits, legal_moves_bits, move, best_move = 0, tt_move = 0
+        unsigned int i, is_game_end = 0, int_color_next = 1, x, y, count = 0
+        signed int sign = -1
+        TTEntry* entry
+        unsigned long long[64] next_moves_list
+        unsigned int[64] move_keys
+    # タイムアウト判定
+    if t:
+        timeout = check_timeout(ctx)
+        if timeout:
+            return timeout
+    # 探索ノード数カウント
+    ctx.measure_count += 1
+    count_node(&ctx.stats, ctx.tail)
+    # 合法手を取得
+    legal_moves_bits = _get_legal_moves_bits(int_color, ctx.bb, ctx.wb, ctx.hb)
+    # 前回パス and 打てる場所なし の場合ゲーム終了
+    if pas and not legal_moves_bits:
+        is_game_end = <unsigned int>1
+    # 最大深さに到達 or ゲーム終了
+    if not depth or is_game_end:
+        if int_color:
+            legal_moves_b_bits = legal_moves_bits
+            legal_moves_w_bits = _get_legal_moves_bits(<unsigned int>0, ctx.bb, ctx.wb, ctx.hb)
+            sign = <signed int>1
+        else:
+            legal_moves_b_bits = _get_legal_moves_bits(<unsigned int>1, ctx.bb, ctx.wb, ctx.hb)
+            legal_moves_w_bits = legal_moves_bits
+        ctx.stats.leaves += 1
+        # Cython実装の評価関数の場合はボードを介さずに評価
+        if ctx.is_cy_evaluator:
+            return ctx.cy_evaluator._evaluate(int_color, ctx.bb, ctx.wb, ctx.bs, ctx.ws, <unsigned int>_popcount(legal_moves_b_bits), <unsigned int>_popcount(legal_moves_w_bits), ctx.fd, ctx.ts) * sign
+        return _evaluate_board(ctx, int_color, legal_moves_b_bits, legal_moves_w_bits) * sign
+    # 次の手番
+    if int_color:
+        int_color_next = <unsigned int>0
+    # パスの場合
+    if not legal_moves_bits:
+        ctx.zh ^= zobrist_turn
+        score = -_get_score(ctx, int_color_next, -beta, -alpha, depth, t, <unsigned int>1)
+        ctx.zh ^= zobrist_turn
+        return score
+    # 置換表を参照(範囲外の値もそのまま返す)
+    if ctx.is_tt and depth >= TT_MIN_DEPTH:
+        entry = ctx.tt.probe(ctx.zh)
+        ctx.stats.tt_probes += 1
+        if entry is not NULL:
+            ctx.stats.tt_hits += 1
+            if ctx.tt.cutoff and entry.depth >= <signed int>depth:
+                if entry.flag == TT_EXACT:
+                    return entry.score
+                if entry.flag == TT_LOWER and entry.score >= beta:
+                    return entry.score
+                if entry.flag == TT_UPPER and entry.score <= alpha:
+                    return entry.score
+            tt_move = entry.move & legal_moves_bits  # 前回の最善手を最初に探索
+    # 手の優先度を取得(置換表の手 > キラー手 > ヒストリー値、それ以外は右のビットから順に探索)
+    while (legal_moves_bits):
+        move = legal_moves_bits & (~legal_moves_bits+1)  # 一番右のONしているビットのみ取り出す
+        next_moves_list[count] = move
+        move_keys[count] = _get_move_key(ctx, int_color, depth, move, tt_move)
+        count += 1
+        legal_moves_bits ^= move  # 一番右のONしているビットをOFFする
+    # 評価値を算出(fail-soft)
+    for i in range(count):
+        if tt_move or ctx.is_killer_history:
+            _pick_move(i, count, next_moves_list, move_keys)
+        move = next_moves_list[i]
+        _put_disc(ctx, int_color, move)
+        score = -_get_score(ctx, int_color_next, -beta, -(alpha if alpha > best_score else best_score), depth-1, t, <unsigned int>0)
+        _undo(ctx)
+        if ctx.timer_timeout:
+            return score
+        if score > best_score:
+            best_score = score
+            best_move = move
+            if best_score >= beta:  # 枝刈り
+                count_cutoff(&ctx.stats, i)
+                if ctx.is_killer_history:
+                    _update_killer_history(ctx, int_color, depth, move)
+                break
+    # 置換表に登録
+    if ctx.is_tt and depth >= TT_MIN_DEPTH:
+        if best_score <= alpha:
+            ctx.tt.store(ctx.zh, depth, TT_UPPER, best_score, best_move)
+        elif best_score >= beta:
+            ctx.tt.store(ctx.zh, depth, TT_LOWER, best_score, best_move)
+        else:
+            ctx.tt.store(ctx.zh, depth, TT_EXACT, best_score, best_move)
+    return best_score
+
+cdef double _evaluate_board(SearchContext ctx, unsigned int int_color, unsigned long long legal_moves_b_bits, unsigned long long legal_moves_w_bits) with gil:
+    """_evaluate_board
+    """
+    cdef:
+        unsigned int i
+    board = ctx.board
+    board._black_bitboard = ctx.bb
+    board._white_bitboard = ctx.wb
+    board._black_score = ctx.bs
+    board._white_score = ctx.ws
+    board._flippable_discs_num = ctx.fd
+    board._hash = ctx.zh
+    board.prev = []
+    for i in range(ctx.tail):
+        board.prev += [(ctx.pbb[i], ctx.pwb[i], ctx.pbs[i], ctx.pws[i])]
+    str_color = 'black' if int_color else 'white'
+    return ctx.evaluator.evaluate(str_color, board, _popcount(legal_moves_b_bits), _popcount(legal_moves_w_bits))
+
+
+cdef inline unsigned long long _get_legal_moves_bits(unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long h) noexcept nogil:
+    """_get_legal_moves_bits
+    """
+    cdef:
+        unsigned long long player = w, opponent = b
+    if int_color:
+        player = b
+        opponent = w
+    cdef:
+        unsigned long long blank = ~(player | opponent | h)
+        unsigned long long horizontal = opponent & <unsigned long long>0x7E7E7E7E7E7E7E7E  # horizontal mask value
+        unsigned long long vertical = opponent & <unsigned long long>0x00FFFFFFFFFFFF00    # vertical mask value
+        unsigned long long diagonal = opponent & <unsigned long long>0x007E7E7E7E7E7E00    # diagonal mask value
+        unsigned long long tmp_h, tmp_v, tmp_d1, tmp_d2
+    # left/right
+    tmp_h = horizontal & ((player << 1) | (player >> 1))
+    tmp_h |= horizontal & ((tmp_h << 1) | (tmp_h >> 1))
+    tmp_h |= horizontal & ((tmp_h << 1) | (tmp_h >> 1))
+    tmp_h |= horizontal & ((tmp_h << 1) | (tmp_h >> 1))
+    tmp_h |= horizontal & ((tmp_h << 1) | (tmp_h >> 1))
+    tmp_h |= horizontal & ((tmp_h << 1) | (tmp_h >> 1))
+    # top/bottom
+    tmp_v = vertical & ((player << 8) | (player >> 8))
+    tmp_v |= vertical & ((tmp_v << 8) | (tmp_v >> 8))
+    tmp_v |= vertical & ((tmp_v << 8) | (tmp_v >> 8))
+    tmp_v |= vertical & ((tmp_v << 8) | (tmp_v >> 8))
+    tmp_v |= vertical & ((tmp_v << 8) | (tmp_v >> 8))
+    tmp_v |= vertical & ((tmp_v << 8) | (tmp_v >> 8))
+    # left-top/right-bottom
+    tmp_d1 = diagonal & ((player << 9) | (player >> 9))
+    tmp_d1 |= diagonal & ((tmp_d1 << 9) | (tmp_d1 >> 9))
+    tmp_d1 |= diagonal & ((tmp_d1 << 9) | (tmp_d1 >> 9))
+    tmp_d1 |= diagonal & ((tmp_d1 << 9) | (tmp_d1 >> 9))
+    tmp_d1 |= diagonal & ((tmp_d1 << 9) | (tmp_d1 >> 9))
+    tmp_d1 |= diagonal & ((tmp_d1 << 9) | (tmp_d1 >> 9))
+    # right-top/left-bottom
+    tmp_d2 = diagonal & ((player << 7) | (player >> 7))
+    tmp_d2 |= diagonal & ((tmp_d2 << 7) | (tmp_d2 >> 7))
+    tmp_d2 |= diagonal & ((tmp_d2 << 7) | (tmp_d2 >> 7))
+    tmp_d2 |= diagonal & ((tmp_d2 << 7) | (tmp_d2 >> 7))
+    tmp_d2 |= diagonal & ((tmp_d2 << 7) | (tmp_d2 >> 7))
+    tmp_d2 |= diagonal & ((tmp_d2 << 7) | (tmp_d2 >> 7))
+    return blank & ((tmp_h << 1) | (tmp_h >> 1) | (tmp_v << 8) | (tmp_v >> 8) | (tmp_d1 << 9) | (tmp_d1 >> 9) | (tmp_d2 << 7) | (tmp_d2 >> 7))
+
+
+cdef inline unsigned long long _popcount(unsigned long long bits) noexcept nogil:
+    """_popcount
+    """
+    bits = bits - ((bits >> <unsigned int>1) & <unsigned long long>0x5555555555555555)
+    bits = (bits & <unsigned long long>0x3333333333333333) + ((bits >> <unsigned int>2) & <unsigned long long>0x3333333333333333)
+    bits = (bits + (bits >> <unsigned int>4)) & <unsigned long long>0x0F0F0F0F0F0F0F0F
+    bits = bits + (bits >> <unsigned int>8)
+    bits = bits + (bits >> <unsigned int>16)
+    return (bits + (bits >> <unsigned int>32)) & <unsigned long long>0x000000000000007F
+
+
+cdef inline void _put_disc(SearchContext ctx, unsigned int int_color, unsigned long long move) noexcept nogil:
+    """_put_disc
+    """
+    cdef:
+        unsigned long long count
+        signed int lshift
+    # ひっくり返せる石を取得
+    ctx.fd = _get_flippable_discs_num(int_color, ctx.bb, ctx.wb, move)
+    count = _popcount(ctx.fd)
+    # 打つ前の状態を格納
+    ctx.pbb[ctx.tail] = ctx.bb
+    ctx.pwb[ctx.tail] = ctx.wb
+    ctx.pbs[ctx.tail] = ctx.bs
+    ctx.pws[ctx.tail] = ctx.ws
+    ctx.pzh[ctx.tail] = ctx.zh
+    ctx.pts[ctx.tail] = ctx.ts
+    ctx.tail += 1
+    # 自分の石を置いて相手の石をひっくり返す
+    if int_color:
+        ctx.bb ^= move | ctx.fd
+        ctx.wb ^= ctx.fd
+        ctx.bs += <unsigned int>1 + <unsigned int>count
+        ctx.ws -= <unsigned int>count
+    else:
+        ctx.wb ^= move | ctx.fd
+        ctx.bb ^= ctx.fd
+        ctx.bs -= <unsigned int>count
+        ctx.ws += <unsigned int>1 + <unsigned int>count
+    # ハッシュ値を更新
+    ctx.zh ^= _get_put_hash(int_color, move, ctx.fd)
+    # テーブルによる評価値を更新(着手位置と返した石の分のみ)
+    if ctx.is_table:
+        ctx.ts += get_table_delta(ctx.cy_evaluator.square_values, int_color, move, ctx.fd)
+
+
+cdef inline unsigned long long _get_flippable_discs_num(unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long move) noexcept nogil:
+    """_get_flippable_discs_size8_64bit
+    """
+    cdef:
+        unsigned long long t_, rt, r_, rb, b_, lb, l_, lt
+        unsigned long long bf_t_ = 0, bf_rt = 0, bf_r_ = 0, bf_rb = 0, bf_b_ = 0, bf_lb = 0, bf_l_ = 0, bf_lt = 0
+        unsigned long long player = w, opponent = b, flippable_discs_num = 0
+    if int_color:
+        player = b
+        opponent = w
+    t_ = <unsigned long long>0xFFFFFFFFFFFFFF00 & (move << <unsigned int>8)  # top
+    rt = <unsigned long long>0x7F7F7F7F7F7F7F00 & (move << <unsigned int>7)  # right-top
+    r_ = <unsigned long long>0x7F7F7F7F7F7F7F7F & (move >> <unsigned int>1)  # right
+    rb = <unsigned long long>0x007F7F7F7F7F7F7F & (move >> <unsigned int>9)  # right-bottom
+    b_ = <unsigned long long>0x00FFFFFFFFFFFFFF & (move >> <unsigned int>8)  # bottom
+    lb = <unsigned long long>0x00FEFEFEFEFEFEFE & (move >> <unsigned int>7)  # left-bottom
+    l_ = <unsigned long long>0xFEFEFEFEFEFEFEFE & (move << <unsigned int>1)  # left
+    lt = <unsigned long long>0xFEFEFEFEFEFEFE00 & (move << <unsigned int>9)  # left-top
+    for i in range(6):
+        if t_ & opponent:
+            bf_t_ |= t_
+            t_ = <unsigned long long>0xFFFFFFFFFFFFFF00 & (t_ << <unsigned int>8)
+        if rt & opponent:
+            bf_rt |= rt
+            rt = <unsigned long long>0x7F7F7F7F7F7F7F00 & (rt << <unsigned int>7)
+        if r_ & opponent:
+            bf_r_ |= r_
+            r_ = <unsigned long long>0x7F7F7F7F7F7F7F7F & (r_ >> <unsigned int>1)
+        if rb & opponent:
+            bf_rb |= rb
+            rb = <unsigned long long>0x007F7F7F7F7F7F7F & (rb >> <unsigned int>9)
+        if b_ & opponent:
+            bf_b_ |= b_
+            b_ = <unsigned long long>0x00FFFFFFFFFFFFFF & (b_ >> <unsigned int>8)
+        if lb & opponent:
+            bf_lb |= lb
+            lb = <unsigned long long>0x00FEFEFEFEFEFEFE & (lb >> <unsigned int>7)
+        if l_ & opponent:
+            bf_l_ |= l_
+            l_ = <unsigned long long>0xFEFEFEFEFEFEFEFE & (l_ << <unsigned int>1)
+        if lt & opponent:
+            bf_lt |= lt
+            lt = <unsigned long long>0xFEFEFEFEFEFEFE00 & (lt << <unsigned int>9)
+    if t_ & player:
+        flippable_discs_num |= bf_t_
+    if rt & player:
+        flippable_discs_num |= bf_rt
+    if r_ & player:
+        flippable_discs_num |= bf_r_
+    if rb & player:
+        flippable_discs_num |= bf_rb
+    if b_ & player:
+        flippable_discs_num |= bf_b_
+    if lb & player:
+        flippable_discs_num |= bf_lb
+    if l_ & player:
+        flippable_discs_num |= bf_l_
+    if lt & player:
+        flippable_discs_num |= bf_lt
+    return flippable_discs_num
+
+
+cdef inline void _undo(SearchContext ctx) noexcept nogil:
+    """_undo
+    """
+    ctx.tail -= 1
+    ctx.zh = ctx.pzh[ctx.tail]
+    ctx.bb = ctx.pbb[ctx.tail]
+    ctx.wb = ctx.pwb[ctx.tail]
+    ctx.bs = ctx.pbs[ctx.tail]
+    ctx.ws = ctx.pws[ctx.tail]
+    ctx.ts = ctx.pts[ctx.tail]
+
+
+cdef inline unsigned long long _get_hash(unsigned int int_color, unsigned long long b, unsigned long long w) noexcept nogil:
+    """_get_hash
+    """
+    cdef:
+        unsigned long long lsb, hash_value = 0
+    if not int_color:
+        hash_value = zobrist_turn
+    while b:
+        lsb = b & (~b + 1)
+        hash_value ^= zobrist_b[_bit_index(lsb)]
+        b ^= lsb
+    while w:
+        lsb = w & (~w + 1)
+        hash_value ^= zobrist_w[_bit_index(lsb)]
+        w ^= lsb
+    return hash_value
+
+
+cdef inline unsigned long long _get_put_hash(unsigned int int_color, unsigned long long move, unsigned long long flippable_discs_num) noexcept nogil:
+    """_get_put_hash
+    """
+    cdef:
+        unsigned long long lsb, hash_value = zobrist_turn
+    if int_color:
+        hash_value ^= zobrist_b[_bit_index(move)]
+    else:
+        hash_value ^= zobrist_w[_bit_index(move)]
+    while flippable_discs_num:
+        lsb = flippable_discs_num & (~flippable_discs_num + 1)
+        hash_value ^= zobrist_f[_bit_index(lsb)]
+        flippable_discs_num ^= lsb
+    return hash_value
+
+
+cdef inline unsigned int _bit_index(unsigned long long bit) noexcept nogil:
+    """_bit_index
+    """
+    bit -= 1
+    bit = bit - ((bit >> <unsigned int>1) & <unsigned long long>0x5555555555555555)
+    bit = (bit & <unsigned long long>0x3333333333333333) + ((bit >> <unsigned int>2) & <unsigned long long>0x3333333333333333)
+    bit = (bit + (bit >> <unsigned int>4)) & <unsigned long long>0x0F0F0F0F0F0F0F0F
+    bit = bit + (bit >> <unsigned int>8)
+    bit = bit + (bit >> <unsigned int>16)
+    return <unsigned int>((bit + (bit >> <unsigned int>32)) & <unsigned long long>0x000000000000007F)
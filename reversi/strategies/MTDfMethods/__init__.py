@@ -0,0 +1,23 @@
+import os
+import pyximport
+pyximport.install()
+
+
+MTDF_SIZE8_64BIT_ERROR = True
+
+try:
+    if 'FORCE_MTDFMETHODS_IMPORT_ERROR' in os.environ:
+        if os.environ['FORCE_MTDFMETHODS_IMPORT_ERROR'] == 'RAISE':
+            raise ImportError
+
+    from ...strategies.MTDfMethods.NextMoveSize8_64bit import next_move, get_best_move, SearchContext
+    MTDF_SIZE8_64BIT_ERROR = False
+except ImportError:
+    pass
+
+
+__all__ = [
+    'next_move',
+    'get_best_move',
+    'SearchContext',
+]
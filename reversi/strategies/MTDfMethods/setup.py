@@ -0,0 +1,14 @@
+from distutils.core import setup
+from distutils.extension import Extension
+from Cython.Distutils import build_ext
+
+
+# NextMoveSize8_64bit(SearchContextを複製できるよう、パッケージを含めたモジュール名にする)
+ext_modules = [Extension("reversi.strategies.MTDfMethods.NextMoveSize8_64bit", ["NextMoveSize8_64bit.pyx"], include_dirs=["../../.."])]
+
+setup(
+    name='NextMoveSize8_64bit',
+    cmdclass={'build_ext': build_ext},
+    ext_modules=ext_modules,
+    package_dir={'': '../../..'},  # パッケージのルート(このディレクトリに出力する)
+)
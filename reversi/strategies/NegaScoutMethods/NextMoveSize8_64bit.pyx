@@ -3,164 +3,357 @@
 """
 
 import time
+import copy
 
 from reversi.strategies.common import Timer, Measure
+from reversi.strategies.table import Table
+from reversi.zobrist import ZOBRIST_BLACK, ZOBRIST_WHITE, ZOBRIST_TURN
+from reversi.strategies.coordinator.EvaluatorMethods.CyEvaluator8_64bit import CyEvaluator_Compiled
+from reversi.strategies.coordinator.EvaluatorMethods.CyEvaluator8_64bit cimport CyEvaluator
+from reversi.strategies.common.TimeoutCheck cimport TimeoutCheck, init_timeout_check, is_timeout
+from reversi.strategies.common.StatsCounter cimport StatsCounter, init_stats_counter, count_node, count_cutoff
+from reversi.strategies.common.PrincipalVariation cimport PVTable, pv_clear, pv_update, pv_to_list
+from reversi.strategies.common.TableScore cimport get_table_score, get_table_delta
+from reversi.strategies.common.ShallowSearch cimport sort_moves_by_shallow_search
+from reversi.strategies.TranspositionTableMethods.TranspositionTable8_64bit cimport TranspositionTable, TTEntry, TT_EXACT, TT_LOWER, TT_UPPER
+
+
+DEF TT_MIN_DEPTH = 2  # 置換表を参照する残り深さの下限
+DEF MAX_PLY = 64        # キラー手を保持する深さの上限
+DEF HISTORY_MAX = 0xFFFF
+DEF KEY_TT = HISTORY_MAX + 3
+DEF KEY_KILLER1 = HISTORY_MAX + 2
+DEF KEY_KILLER2 = HISTORY_MAX + 1
+DEF KEY_KILLER_BASE = 0x40000000
 
 
 cdef:
-    unsigned long long measure_count
-    double timer_deadline
-    unsigned int timer_timeout
-    signed int timer_timeout_value
-    unsigned long long bb
-    unsigned long long wb
-    unsigned long long hb
-    unsigned long long fd
-    unsigned long long[64] pbb
-    unsigned long long[64] pwb
-    unsigned int bs
-    unsigned int ws
-    unsigned int[64] pbs
-    unsigned int[64] pws
-    unsigned int tail
-
-
-def next_move(color, board, param_min, param_max, depth, evaluator, pid, timer, measure):
+    unsigned long long[64] zobrist_b
+    unsigned long long[64] zobrist_w
+    unsigned long long[64] zobrist_f
+    unsigned long long zobrist_turn = ZOBRIST_TURN
+
+
+for i in range(64):
+    zobrist_b[i] = ZOBRIST_BLACK[i]
+    zobrist_w[i] = ZOBRIST_WHITE[i]
+    zobrist_f[i] = ZOBRIST_BLACK[i] ^ ZOBRIST_WHITE[i]
+
+
+cdef class SearchContext:
+    """SearchContext
+
+           探索ごとの状態(盤面、タイマー、計測値など)
+    """
+    cdef:
+        unsigned long long measure_count
+        StatsCounter stats
+        PVTable pv
+        TimeoutCheck timer_check
+        unsigned int timer_timeout
+        signed int timer_timeout_value
+        object board, evaluator
+        CyEvaluator cy_evaluator
+        unsigned int is_cy_evaluator
+        CyEvaluator order_evaluator
+        TranspositionTable tt
+        unsigned int is_tt
+        unsigned int is_killer_history
+        unsigned long long[MAX_PLY][2] killer_moves
+        unsigned int[2][64] history_table
+        unsigned long long bb
+        unsigned long long wb
+        unsigned long long hb
+        unsigned long long fd
+        unsigned long long[64] pbb
+        unsigned long long[64] pwb
+        unsigned int bs
+        unsigned int ws
+        unsigned int[64] pbs
+        unsigned int[64] pws
+        unsigned int tail
+        unsigned long long zh
+        unsigned long long[64] pzh
+        unsigned int is_table
+        signed int ts
+        signed int[64] pts
+
+    cdef public unsigned int timer_interval         # タイムアウトを確認するノード数の間隔(0の場合は探索速度に合わせて調整)
+    cdef public unsigned int ordering_depth         # 浅い探索で手を並び替える残り深さの下限(0の場合は並び替えない)
+    cdef public unsigned int ordering_search_depth  # 手の並び替えに用いる浅い探索の深さ
+
+    def __init__(self, timer_interval=0, ordering_depth=0, ordering_search_depth=2):
+        self.timer_interval = timer_interval
+        self.ordering_depth = ordering_depth
+        self.ordering_search_depth = ordering_search_depth
+
+    def __reduce__(self):
+        return (SearchContext, (self.timer_interval, self.ordering_depth, self.ordering_search_depth))  # 複製時は初期状態とする
+
+    def get_pv(self):
+        """get_pv
+
+               直前の探索の最善応手手順((x, y)のリスト、パスはNone)
+        """
+        return pv_to_list(&self.pv)
+
+
+def next_move(color, board, param_min, param_max, depth, evaluator, pid, timer, measure, tt=None, killer_history=False, context=None, stats=None):
     """next_move
     """
     if pid is None:
         timer, measure = False, False
-    return _next_move(color, board, param_min, param_max, depth, evaluator, pid, timer, measure)
+    cdef SearchContext ctx = SearchContext() if context is None else context  # 探索ごとの状態
+    _set_tt(ctx, tt)
+    _set_killer_history(ctx, killer_history)
+    ret = _next_move(ctx, color, board, param_min, param_max, depth, evaluator, pid, timer, measure)
+    if stats is not None:
+        stats.add(ctx.stats)  # 探索の統計情報を加算
+    return ret
 
 
-def get_best_move(color, board, moves, alpha, beta, depth, evaluator, pid, timer, measure):
+def get_best_move(color, board, moves, alpha, beta, depth, evaluator, pid, timer, measure, tt=None, killer_history=False, context=None, stats=None):
     """get_best_move
     """
     if pid is None:
         timer, measure = False, False
-    return _get_best_move_wrap(color, board, moves, alpha, beta, depth, evaluator, pid, timer, measure)
+    cdef SearchContext ctx = SearchContext() if context is None else context  # 探索ごとの状態
+    _set_tt(ctx, tt)
+    _set_killer_history(ctx, killer_history)
+    ret = _get_best_move_wrap(ctx, color, board, moves, alpha, beta, depth, evaluator, pid, timer, measure)
+    if stats is not None:
+        stats.add(ctx.stats)  # 探索の統計情報を加算
+    return ret
 
 
-cdef inline tuple _next_move(str color, board, signed int param_min, signed int param_max, int depth, evaluator, str pid, int timer, int measure):
-    global timer_deadline, timer_timeout, timer_timeout_value, measure_count
+cdef inline tuple _next_move(SearchContext ctx, str color, board, signed int param_min, signed int param_max, int depth, evaluator, pid, int timer, int measure):
     cdef:
         double alpha = param_min, beta = param_max
         unsigned int int_color = 0
-    measure_count = 0
-    timer_timeout = <unsigned int>0
+    ctx.measure_count = 0
+    init_stats_counter(&ctx.stats)
+    ctx.timer_timeout = <unsigned int>0
+    _set_cy_evaluator(ctx, evaluator)
+    _set_order_evaluator(ctx, evaluator)
     if timer and pid:
-        timer_deadline = Timer.deadline[pid]
-        timer_timeout_value = Timer.timeout_value[pid]
+        init_timeout_check(&ctx.timer_check, Timer.get_deadline(pid) - time.monotonic(), ctx.timer_interval)  # 期限を単調増加時計の時刻に変換
+        ctx.timer_timeout_value = Timer.get_timeout_value(pid)
     if measure and pid:
         if pid not in Measure.count:
             Measure.count[pid] = 0
-        measure_count = Measure.count[pid]
+        ctx.measure_count = Measure.count[pid]
     if color == 'black':
         int_color = <unsigned int>1
     moves = board.get_legal_moves(color)  # 手の候補
-    best_move, _ = _get_best_move(int_color, board, moves, alpha, beta, depth, evaluator, timer)
+    best_move, _ = _get_best_move(ctx, int_color, board, moves, alpha, beta, depth, evaluator, timer)
     if measure and pid:
-        Measure.count[pid] = measure_count
-    if timer and pid and timer_timeout:
-        Timer.timeout_flag[pid] = True  # タイムアウト発生
+        Measure.count[pid] = ctx.measure_count
+    if timer and pid and ctx.timer_timeout:
+        Timer.set_timeout(pid)  # タイムアウト発生
     return best_move
 
 
-cdef inline _get_best_move_wrap(str color, board, moves, double alpha, double beta, int depth, evaluator, str pid, int timer, int measure):
-    global timer_deadline, timer_timeout, timer_timeout_value, measure_count
+cdef inline _get_best_move_wrap(SearchContext ctx, str color, board, moves, double alpha, double beta, int depth, evaluator, pid, int timer, int measure):
     cdef:
         unsigned int int_color = 0
-    measure_count = 0
-    timer_timeout = <unsigned int>0
+    ctx.measure_count = 0
+    init_stats_counter(&ctx.stats)
+    ctx.timer_timeout = <unsigned int>0
+    _set_cy_evaluator(ctx, evaluator)
+    _set_order_evaluator(ctx, evaluator)
     if timer and pid:
-        timer_deadline = Timer.deadline[pid]
-        timer_timeout_value = Timer.timeout_value[pid]
+        init_timeout_check(&ctx.timer_check, Timer.get_deadline(pid) - time.monotonic(), ctx.timer_interval)  # 期限を単調増加時計の時刻に変換
+        ctx.timer_timeout_value = Timer.get_timeout_value(pid)
     if measure and pid:
         if pid not in Measure.count:
             Measure.count[pid] = 0
-        measure_count = Measure.count[pid]
+        ctx.measure_count = Measure.count[pid]
     if color == 'black':
         int_color = <unsigned int>1
-    best_move, scores = _get_best_move(int_color, board, moves, alpha, beta, depth, evaluator, timer)
+    best_move, scores = _get_best_move(ctx, int_color, board, moves, alpha, beta, depth, evaluator, timer)
     if measure and pid:
-        Measure.count[pid] = measure_count
-    if timer and pid and timer_timeout:
-        Timer.timeout_flag[pid] = True  # タイムアウト発生
+        Measure.count[pid] = ctx.measure_count
+    if timer and pid and ctx.timer_timeout:
+        Timer.set_timeout(pid)  # タイムアウト発生
     return (best_move, scores)
 
 
-cdef inline _get_best_move(unsigned int int_color, board, moves, double alpha, double beta, int depth, evaluator, int timer):
-    global timer_timeout, bb, wb, hb, bs, ws
+cdef inline _get_best_move(SearchContext ctx, unsigned int int_color, board, moves, double alpha, double beta, int depth, evaluator, int timer):
     cdef:
         double score = alpha
         unsigned int int_color_next = 1, board_bs, board_ws
-        unsigned long long board_bb, board_wb
+        unsigned long long board_bb, board_wb, move_bit
     scores = {}
     # 手番
     if int_color:
         int_color_next = <unsigned int>0
     # ボード情報取得
-    bb, wb, hb = board.get_bitboard_info()
-    bs = board._black_score
-    ws = board._white_score
-    # ボード情報退避
-    board_bb = bb
-    board_wb = wb
-    board_bs = bs
-    board_ws = ws
-    board_prev = [(item[0], item[1], item[2], item[3]) for item in board.prev]
+    ctx.board, ctx.evaluator = board, evaluator
+    ctx.bb, ctx.wb, ctx.hb = board.get_bitboard_info()
+    ctx.bs = board._black_score
+    ctx.ws = board._white_score
+    ctx.zh = _get_hash(int_color, ctx.bb, ctx.wb)
+    ctx.ts = get_table_score(ctx.cy_evaluator.square_values, ctx.bb, ctx.wb) if ctx.is_table else 0  # テーブルによる評価値(以降は着手ごとに差分更新)
+    # ボード情報退避(評価時にボードへ書き戻す場合のみ)
+    if not ctx.is_cy_evaluator:
+        board_bb = ctx.bb
+        board_wb = ctx.wb
+        board_bs = ctx.bs
+        board_ws = ctx.ws
+        board_prev = [(item[0], item[1], item[2], item[3]) for item in board.prev]
+        board_hash = board._hash
     # 各手のスコア取得
     best_move = None
+    ctx.pv.passes = 0
+    pv_clear(&ctx.pv, 0)
     for move in moves:
-        _put_disc(int_color, <unsigned long long>1 << (63-(move[1]*8+move[0])))
-        score = -_get_score(int_color_next, board, -beta, -alpha, depth-1, evaluator, timer, <unsigned int>0)
-        _undo()
+        move_bit = <unsigned long long>1 << (63-(move[1]*8+move[0]))
+        with nogil:  # 探索中はGILを解放する
+            _put_disc(ctx, int_color, move_bit)
+            score = -_get_score(ctx, int_color_next, -beta, -alpha, depth-1, timer, <unsigned int>0)
+            _undo(ctx)
         scores[move] = score
-        if timer_timeout:  # タイムアウト判定
+        if ctx.timer_timeout:  # タイムアウト判定
             best_move = move if best_move is None else best_move
             break
         if score > alpha:  # 最善手を更新
             alpha = score
             best_move = move
+            pv_update(&ctx.pv, 0, move_bit)
+    if best_move is None and moves:
+        best_move = moves[0]  # 窓の下限を超える手がない場合
+    if not ctx.pv.length[0] and best_move is not None:
+        ctx.pv.moves[0][0], ctx.pv.length[0] = <unsigned long long>1 << (63-(best_move[1]*8+best_move[0])), 1  # 最善手のみ
     # ボードを元に戻す
-    board._black_bitboard = board_bb
-    board._white_bitboard = board_wb
-    board._black_score = board_bs
-    board._white_score = board_ws
-    board.prev = [(item[0], item[1], item[2], item[3]) for item in board_prev]
+    if not ctx.is_cy_evaluator:
+        board._black_bitboard = board_bb
+        board._white_bitboard = board_wb
+        board._black_score = board_bs
+        board._white_score = board_ws
+        board.prev = [(item[0], item[1], item[2], item[3]) for item in board_prev]
+        board._hash = board_hash
+    ctx.board, ctx.evaluator = None, None
     return best_move, scores
 
 
-cdef inline signed int check_timeout():
+cdef inline void _set_cy_evaluator(SearchContext ctx, evaluator):
+    """_set_cy_evaluator
+    """
+    ctx.cy_evaluator, ctx.is_cy_evaluator, ctx.is_table = None, <unsigned int>0, <unsigned int>0
+    candidate = getattr(evaluator, 'cy_evaluator', None)
+    if isinstance(candidate, CyEvaluator):
+        ctx.cy_evaluator, ctx.is_cy_evaluator = candidate, <unsigned int>1
+        ctx.is_table = ctx.cy_evaluator.has_table
+
+
+cdef inline void _set_order_evaluator(SearchContext ctx, evaluator):
+    """_set_order_evaluator
+
+           手の並び替えに用いる評価関数(Cython実装の評価関数がない場合は評価関数のテーブルで代用)
+    """
+    ctx.order_evaluator = ctx.cy_evaluator
+    if ctx.ordering_depth and not ctx.is_cy_evaluator:
+        ctx.order_evaluator = CyEvaluator_Compiled(table=_get_order_table(evaluator))
+
+
+cdef inline list _get_order_table(evaluator):
+    """_get_order_table
+
+           評価関数が持つテーブル(ない場合は既定のテーブル)
+    """
+    table = Table(8)
+    for value in getattr(evaluator, '__dict__', {}).values():
+        if isinstance(getattr(value, 'table', None), Table):
+            table = copy.copy(value.table)  # 元のテーブルサイズは変えない
+            table.set_table(8)
+            break
+    return [[table.table[y][x] for x in range(8)] for y in range(8)]
+
+
+cdef inline void _set_tt(SearchContext ctx, table):
+    """_set_tt
+    """
+    ctx.tt, ctx.is_tt = None, <unsigned int>0
+    if isinstance(table, TranspositionTable):
+        ctx.tt, ctx.is_tt = table, <unsigned int>1
+
+
+cdef inline void _set_killer_history(SearchContext ctx, killer_history):
+    """_set_killer_history
+    """
+    cdef:
+        unsigned int i, j
+    ctx.is_killer_history = <unsigned int>1 if killer_history else <unsigned int>0
+    if ctx.is_killer_history:
+        for i in range(MAX_PLY):
+            ctx.killer_moves[i][0] = 0
+            ctx.killer_moves[i][1] = 0
+        for i in range(2):
+            for j in range(64):
+                ctx.history_table[i][j] >>= 1  # 前回までの値は減衰させて引き継ぐ
+
+
+cdef inline unsigned int _get_move_key(SearchContext ctx, unsigned int int_color, unsigned int depth, unsigned long long move, unsigned long long tt_move) noexcept nogil:
+    """_get_move_key
+    """
+    if move == tt_move:
+        return KEY_TT
+    if ctx.is_killer_history:
+        if depth < MAX_PLY:
+            if move == ctx.killer_moves[depth][0]:
+                return KEY_KILLER1
+            if move == ctx.killer_moves[depth][1]:
+                return KEY_KILLER2
+        return ctx.history_table[int_color][_bit_index(move)]
+    return 0
+
+
+cdef inline void _update_killer_history(SearchContext ctx, unsigned int int_color, unsigned int depth, unsigned long long move) noexcept nogil:
+    """_update_killer_history
+    """
+    cdef:
+        unsigned int i, index = _bit_index(move)
+    if depth < MAX_PLY and ctx.killer_moves[depth][0] != move:
+        ctx.killer_moves[depth][1] = ctx.killer_moves[depth][0]
+        ctx.killer_moves[depth][0] = move
+    ctx.history_table[int_color][index] += depth * depth
+    if ctx.history_table[int_color][index] > HISTORY_MAX:
+        for i in range(64):
+            ctx.history_table[int_color][i] >>= 1
+
+
+cdef inline signed int check_timeout(SearchContext ctx) noexcept nogil:
     """check_timeout
     """
-    global timer_deadline, timer_timeout, timer_timeout_value
-    if time.time() > timer_deadline:
-        timer_timeout = <unsigned int>1
-        return timer_timeout_value
+    if is_timeout(&ctx.timer_check):
+        ctx.timer_timeout = <unsigned int>1
+        return ctx.timer_timeout_value
     return <signed int>0
 
 
-cdef inline double _get_score(unsigned int int_color, board, double alpha, double beta, unsigned int depth, evaluator, int t, unsigned int pas):
+cdef inline double _get_score(SearchContext ctx, unsigned int int_color, double alpha, double beta, unsigned int depth, int t, unsigned int pas) nogil:
     """_get_score
     """
-    global timer_timeout, measure_count, bb, wb, hb, bs, ws, pbb, pwb, pbs, pws, fd, tail
     cdef:
-        double score, tmp, null_window
-        unsigned long long legal_moves_b_bits, legal_moves_w_bits, legal_moves_bits, move
-        unsigned int i, is_game_end = 0, int_color_next = 1, count = 0, index = 0
+        double score, tmp, null_window, alpha_orig = alpha
+        unsigned long long legal_moves_b_bits, legal_moves_w_bits, legal_moves_bits, move, best_move = 0, tt_move = 0
+        unsigned int i, j, is_game_end = 0, int_color_next = 1, count = 0, index = 0, key
         signed int timeout, sign = -1
         unsigned long long[64] next_moves_list
         signed int[64] possibilities
+        TTEntry* entry
+        unsigned int ply = ctx.tail + ctx.pv.passes
+    pv_clear(&ctx.pv, ply)
     # タイムアウト判定
     if t:
-        timeout = check_timeout()
+        timeout = check_timeout(ctx)
         if timeout:
             return timeout
     # 探索ノード数カウント
-    measure_count += 1
+    ctx.measure_count += 1
+    count_node(&ctx.stats, ctx.tail)
     # 合法手を取得
-    legal_moves_bits = _get_legal_moves_bits(int_color, bb, wb, hb)
+    legal_moves_bits = _get_legal_moves_bits(int_color, ctx.bb, ctx.wb, ctx.hb)
     # 前回パス and 打てる場所なし の場合ゲーム終了
     if pas and not legal_moves_bits:
         is_game_end = <unsigned int>1
@@ -168,64 +361,127 @@ cdef inline double _get_score(unsigned int int_color, board, double alpha, doubl
     if not depth or is_game_end:
         if int_color:
             legal_moves_b_bits = legal_moves_bits
-            legal_moves_w_bits = _get_legal_moves_bits(<unsigned int>0, bb, wb, hb)
+            legal_moves_w_bits = _get_legal_moves_bits(<unsigned int>0, ctx.bb, ctx.wb, ctx.hb)
             sign = <signed int>1
-            str_color = 'black'
         else:
-            legal_moves_b_bits = _get_legal_moves_bits(<unsigned int>1, bb, wb, hb)
+            legal_moves_b_bits = _get_legal_moves_bits(<unsigned int>1, ctx.bb, ctx.wb, ctx.hb)
             legal_moves_w_bits = legal_moves_bits
-            str_color = 'white'
-        board._black_bitboard = bb
-        board._white_bitboard = wb
-        board._black_score = bs
-        board._white_score = ws
-        board._flippable_discs_num = fd
-        board.prev = []
-        for i in range(tail):
-            board.prev += [(pbb[i], pwb[i], pbs[i], pws[i])]
-        return evaluator.evaluate(str_color, board, _popcount(legal_moves_b_bits), _popcount(legal_moves_w_bits)) * sign
+        ctx.stats.leaves += 1
+        # Cython実装の評価関数の場合はボードを介さずに評価
+        if ctx.is_cy_evaluator:
+            return ctx.cy_evaluator._evaluate(int_color, ctx.bb, ctx.wb, ctx.bs, ctx.ws, <unsigned int>_popcount(legal_moves_b_bits), <unsigned int>_popcount(legal_moves_w_bits), ctx.fd, ctx.ts) * sign
+        return _evaluate_board(ctx, int_color, legal_moves_b_bits, legal_moves_w_bits) * sign
     # 次の手番
     if int_color:
         sign = <signed int>1
         int_color_next = <unsigned int>0
     # パスの場合
     if not legal_moves_bits:
-        return -_get_score(int_color_next, board, -beta, -alpha, depth, evaluator, t, <unsigned int>1)
+        ctx.zh ^= zobrist_turn
+        ctx.pv.passes += 1
+        score = -_get_score(ctx, int_color_next, -beta, -alpha, depth, t, <unsigned int>1)
+        ctx.pv.passes -= 1
+        ctx.zh ^= zobrist_turn
+        pv_update(&ctx.pv, ply, 0)  # パス
+        return score
+    # 置換表を参照
+    if ctx.is_tt and depth >= TT_MIN_DEPTH:
+        entry = ctx.tt.probe(ctx.zh)
+        ctx.stats.tt_probes += 1
+        if entry is not NULL:
+            ctx.stats.tt_hits += 1
+            if ctx.tt.cutoff and entry.depth >= <signed int>depth:
+                if entry.flag == TT_EXACT:
+                    return entry.score
+                if entry.flag == TT_LOWER and entry.score >= beta:
+                    return beta
+                if entry.flag == TT_UPPER and entry.score <= alpha:
+                    return alpha
+            tt_move = entry.move & legal_moves_bits
     # 着手可能数に応じて手を並び替え
     while (legal_moves_bits):
         move = legal_moves_bits & (~legal_moves_bits+1)  # 一番右のONしているビットのみ取り出す
         next_moves_list[count] = move
-        possibilities[count] = _get_possibility(int_color, bb, wb, move, sign)
+        possibilities[count] = _get_possibility(ctx, int_color, ctx.bb, ctx.wb, move, sign)
+        if ctx.is_killer_history:  # キラー手を優先、着手可能数が同じ場合はヒストリー値の順
+            key = _get_move_key(ctx, int_color, depth, move, 0)
+            if key > HISTORY_MAX:
+                possibilities[count] = KEY_KILLER_BASE + <signed int>key
+            else:
+                possibilities[count] = possibilities[count] * (HISTORY_MAX + 1) + <signed int>key
         count += 1
         legal_moves_bits ^= move  # 一番右のONしているビットをOFFする
     _sort_moves_by_possibility(count, next_moves_list, possibilities)
+    # 残り深さが深い場合は浅い探索の結果で並び替え(評価値が同じ手は着手可能数の順のまま)
+    if ctx.ordering_depth and depth >= ctx.ordering_depth:
+        sort_moves_by_shallow_search(ctx.order_evaluator, int_color, ctx.bb, ctx.wb, ctx.hb, ctx.bs, ctx.ws, count, next_moves_list, ctx.ordering_search_depth, &ctx.stats, ctx.tail)
+    # 置換表の最善手を先頭に移動
+    if tt_move:
+        for i in range(count):
+            if next_moves_list[i] == tt_move:
+                for j in range(i, 0, -1):
+                    next_moves_list[j] = next_moves_list[j-1]
+                next_moves_list[0] = tt_move
+                break
     # 次の手の探索
     null_window = beta
     for i in range(count):
         if alpha < beta:
-            _put_disc(int_color, next_moves_list[i])
-            tmp = -_get_score(int_color_next, board, -null_window, -alpha, depth-1, evaluator, t, <unsigned int>0)
-            _undo()
+            _put_disc(ctx, int_color, next_moves_list[i])
+            tmp = -_get_score(ctx, int_color_next, -null_window, -alpha, depth-1, t, <unsigned int>0)
+            _undo(ctx)
             if alpha < tmp:
                 if tmp <= null_window and index:
-                    _put_disc(int_color, next_moves_list[i])
-                    alpha = -_get_score(int_color_next, board, -beta, -tmp, depth-1, evaluator, t, <unsigned int>0)
-                    _undo()
-                    if timer_timeout:
+                    _put_disc(ctx, int_color, next_moves_list[i])
+                    alpha = -_get_score(ctx, int_color_next, -beta, -tmp, depth-1, t, <unsigned int>0)
+                    _undo(ctx)
+                    if ctx.timer_timeout:
                         return alpha
                 else:
                     alpha = tmp
+                best_move = next_moves_list[i]
+                pv_update(&ctx.pv, ply, best_move)
+                if alpha >= beta:
+                    count_cutoff(&ctx.stats, i)
             null_window = alpha + 1
         else:
-            return alpha
+            break
         index += <unsigned int>1
+    # キラー手とヒストリー値を更新
+    if ctx.is_killer_history and alpha >= beta and best_move and not ctx.timer_timeout:
+        _update_killer_history(ctx, int_color, depth, best_move)
+    # 置換表に登録
+    if ctx.is_tt and depth >= TT_MIN_DEPTH and not ctx.timer_timeout:
+        if alpha <= alpha_orig:
+            ctx.tt.store(ctx.zh, depth, TT_UPPER, alpha, best_move)
+        elif alpha >= beta:
+            ctx.tt.store(ctx.zh, depth, TT_LOWER, alpha, best_move)
+        else:
+            ctx.tt.store(ctx.zh, depth, TT_EXACT, alpha, best_move)
     return alpha
 
-
-cdef inline signed int _get_possibility(unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long move, signed int sign):
+cdef double _evaluate_board(SearchContext ctx, unsigned int int_color, unsigned long long legal_moves_b_bits, unsigned long long legal_moves_w_bits) with gil:
+    """_evaluate_board
+    """
+    cdef:
+        unsigned int i
+    board = ctx.board
+    board._black_bitboard = ctx.bb
+    board._white_bitboard = ctx.wb
+    board._black_score = ctx.bs
+    board._white_score = ctx.ws
+    board._flippable_discs_num = ctx.fd
+    board._hash = ctx.zh
+    board.prev = []
+    for i in range(ctx.tail):
+        board.prev += [(ctx.pbb[i], ctx.pwb[i], ctx.pbs[i], ctx.pws[i])]
+    str_color = 'black' if int_color else 'white'
+    return ctx.evaluator.evaluate(str_color, board, _popcount(legal_moves_b_bits), _popcount(legal_moves_w_bits))
+
+
+cdef inline signed int _get_possibility(SearchContext ctx, unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long move, signed int sign) noexcept nogil:
     """_get_possibility
     """
-    global hb
     cdef:
         unsigned long long flippable_discs_num
         signed int pb, pw
@@ -238,12 +494,12 @@ cdef inline signed int _get_possibility(unsigned int int_color, unsigned long lo
     else:
         w ^= move | flippable_discs_num
         b ^= flippable_discs_num
-    pb = <signed int>_popcount(_get_legal_moves_bits(<unsigned int>1, b, w, hb))
-    pw = <signed int>_popcount(_get_legal_moves_bits(<unsigned int>0, b, w, hb))
+    pb = <signed int>_popcount(_get_legal_moves_bits(<unsigned int>1, b, w, ctx.hb))
+    pw = <signed int>_popcount(_get_legal_moves_bits(<unsigned int>0, b, w, ctx.hb))
     return (pb - pw) * sign
 
 
-cdef inline void _sort_moves_by_possibility(unsigned int count, unsigned long long[64] next_moves_list, signed int[64] possibilities):
+cdef inline void _sort_moves_by_possibility(unsigned int count, unsigned long long[64] next_moves_list, signed int[64] possibilities) noexcept nogil:
     """_sort_moves_by_possibility
     """
     cdef:
@@ -266,7 +522,7 @@ cdef inline void _sort_moves_by_possibility(unsigned int count, unsigned long lo
         _merge(len1, len2, array_move1, array_p1, array_move2, array_p2, next_moves_list, possibilities)
 
 
-cdef inline void _merge(unsigned int len1, unsigned int len2, unsigned long long[64] array_move1, signed int[64] array_p1, unsigned long long[64] array_move2, signed int[64] array_p2, unsigned long long[64] next_moves_list, signed int[64] possibilities):
+cdef inline void _merge(unsigned int len1, unsigned int len2, unsigned long long[64] array_move1, signed int[64] array_p1, unsigned long long[64] array_move2, signed int[64] array_p2, unsigned long long[64] next_moves_list, signed int[64] possibilities) noexcept nogil:
     """_merge
     """
     cdef:
@@ -282,7 +538,7 @@ cdef inline void _merge(unsigned int len1, unsigned int len2, unsigned long long
             j += 1
 
 
-cdef inline unsigned long long _get_legal_moves_bits(unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long h):
+cdef inline unsigned long long _get_legal_moves_bits(unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long h) noexcept nogil:
     """_get_legal_moves_bits
     """
     cdef:
@@ -327,7 +583,7 @@ cdef inline unsigned long long _get_legal_moves_bits(unsigned int int_color, uns
     return blank & ((tmp_h << 1) | (tmp_h >> 1) | (tmp_v << 8) | (tmp_v >> 8) | (tmp_d1 << 9) | (tmp_d1 >> 9) | (tmp_d2 << 7) | (tmp_d2 >> 7))
 
 
-cdef inline unsigned long long _popcount(unsigned long long bits):
+cdef inline unsigned long long _popcount(unsigned long long bits) noexcept nogil:
     """_popcount
     """
     bits = bits - ((bits >> <unsigned int>1) & <unsigned long long>0x5555555555555555)
@@ -338,35 +594,41 @@ cdef inline unsigned long long _popcount(unsigned long long bits):
     return (bits + (bits >> <unsigned int>32)) & <unsigned long long>0x000000000000007F
 
 
-cdef inline void _put_disc(unsigned int int_color, unsigned long long move):
+cdef inline void _put_disc(SearchContext ctx, unsigned int int_color, unsigned long long move) noexcept nogil:
     """_put_disc
     """
-    global bb, wb, bs, ws, pbb, pwb, pbs, pws, fd, tail
     cdef:
         unsigned long long count
     # ひっくり返せる石を取得
-    fd = _get_flippable_discs_num(int_color, bb, wb, move)
-    count = _popcount(fd)
+    ctx.fd = _get_flippable_discs_num(int_color, ctx.bb, ctx.wb, move)
+    count = _popcount(ctx.fd)
     # 打つ前の状態を格納
-    pbb[tail] = bb
-    pwb[tail] = wb
-    pbs[tail] = bs
-    pws[tail] = ws
-    tail += 1
+    ctx.pbb[ctx.tail] = ctx.bb
+    ctx.pwb[ctx.tail] = ctx.wb
+    ctx.pbs[ctx.tail] = ctx.bs
+    ctx.pws[ctx.tail] = ctx.ws
+    ctx.pzh[ctx.tail] = ctx.zh
+    ctx.pts[ctx.tail] = ctx.ts
+    ctx.tail += 1
     # 自分の石を置いて相手の石をひっくり返す
     if int_color:
-        bb ^= move | fd
-        wb ^= fd
-        bs += <unsigned int>1 + <unsigned int>count
-        ws -= <unsigned int>count
+        ctx.bb ^= move | ctx.fd
+        ctx.wb ^= ctx.fd
+        ctx.bs += <unsigned int>1 + <unsigned int>count
+        ctx.ws -= <unsigned int>count
     else:
-        wb ^= move | fd
-        bb ^= fd
-        bs -= <unsigned int>count
-        ws += <unsigned int>1 + <unsigned int>count
-
-
-cdef inline unsigned long long _get_flippable_discs_num(unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long move):
+        ctx.wb ^= move | ctx.fd
+        ctx.bb ^= ctx.fd
+        ctx.bs -= <unsigned int>count
+        ctx.ws += <unsigned int>1 + <unsigned int>count
+    # ハッシュ値を更新
+    ctx.zh ^= _get_put_hash(int_color, move, ctx.fd)
+    # テーブルによる評価値を更新(着手位置と返した石の分のみ)
+    if ctx.is_table:
+        ctx.ts += get_table_delta(ctx.cy_evaluator.square_values, int_color, move, ctx.fd)
+
+
+cdef inline unsigned long long _get_flippable_discs_num(unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long move) noexcept nogil:
     """_get_flippable_discs_num
     """
     cdef:
@@ -384,7 +646,7 @@ cdef inline unsigned long long _get_flippable_discs_num(unsigned int int_color,
     lb = <unsigned long long>0x00FEFEFEFEFEFEFE & (move >> <unsigned int>7)  # left-bottom
     l_ = <unsigned long long>0xFEFEFEFEFEFEFEFE & (move << <unsigned int>1)  # left
     lt = <unsigned long long>0xFEFEFEFEFEFEFE00 & (move << <unsigned int>9)  # left-top
-    for _ in range(6):
+    for i in range(6):
         if t_ & opponent:
             bf_t_ |= t_
             t_ = <unsigned long long>0xFFFFFFFFFFFFFF00 & (t_ << <unsigned int>8)
@@ -428,12 +690,59 @@ cdef inline unsigned long long _get_flippable_discs_num(unsigned int int_color,
     return flippable_discs_num
 
 
-cdef inline void _undo():
+cdef inline void _undo(SearchContext ctx) noexcept nogil:
     """_undo
     """
-    global bb, wb, bs, ws, pbb, pwb, pbs, pws, tail
-    tail -= 1
-    bb = pbb[tail]
-    wb = pwb[tail]
-    bs = pbs[tail]
-    ws = pws[tail]
+    ctx.tail -= 1
+    ctx.zh = ctx.pzh[ctx.tail]
+    ctx.bb = ctx.pbb[ctx.tail]
+    ctx.wb = ctx.pwb[ctx.tail]
+    ctx.bs = ctx.pbs[ctx.tail]
+    ctx.ws = ctx.pws[ctx.tail]
+    ctx.ts = ctx.pts[ctx.tail]
+
+
+cdef inline unsigned long long _get_hash(unsigned int int_color, unsigned long long b, unsigned long long w) noexcept nogil:
+    """_get_hash
+    """
+    cdef:
+        unsigned long long lsb, hash_value = 0
+    if not int_color:
+        hash_value = zobrist_turn
+    while b:
+        lsb = b & (~b + 1)
+        hash_value ^= zobrist_b[_bit_index(lsb)]
+        b ^= lsb
+    while w:
+        lsb = w & (~w + 1)
+        hash_value ^= zobrist_w[_bit_index(lsb)]
+        w ^= lsb
+    return hash_value
+
+
+cdef inline unsigned long long _get_put_hash(unsigned int int_color, unsigned long long move, unsigned long long flippable_discs_num) noexcept nogil:
+    """_get_put_hash
+    """
+    cdef:
+        unsigned long long lsb, hash_value = zobrist_turn
+    if int_color:
+        hash_value ^= zobrist_b[_bit_index(move)]
+    else:
+        hash_value ^= zobrist_w[_bit_index(move)]
+    while flippable_discs_num:
+        lsb = flippable_discs_num & (~flippable_discs_num + 1)
+        hash_value ^= zobrist_f[_bit_index(lsb)]
+        flippable_discs_num ^= lsb
+    return hash_value
+
+
+cdef inline unsigned int _bit_index(unsigned long long bit) noexcept nogil:
+    """_bit_index
+    """
+    bit -= 1
+    bit = bit - ((bit >> <unsigned int>1) & <unsigned long long>0x5555555555555555)
+    bit = (bit & <unsigned long long>0x3333333333333333) + ((bit >> <unsigned int>2) & <unsigned long long>0x3333333333333333)
+    bit = (bit + (bit >> <unsigned int>4)) & <unsigned long long>0x0F0F0F0F0F0F0F0F
+    bit = bit + (bit >> <unsigned int>8)
+    bit = bit + (bit >> <unsigned int>16)
+    return <unsigned int>((bit + (bit >> <unsigned int>32)) & <unsigned long long>0x000000000000007F)
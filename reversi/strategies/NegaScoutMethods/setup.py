@@ -12,11 +12,12 @@ setup(
     ext_modules=ext_modules
 )
 
-# NextMoveSize8_64bit
-ext_modules = [Extension("NextMoveSize8_64bit", ["NextMoveSize8_64bit.pyx"])]
+# NextMoveSize8_64bit(SearchContextを複製できるよう、パッケージを含めたモジュール名にする)
+ext_modules = [Extension("reversi.strategies.NegaScoutMethods.NextMoveSize8_64bit", ["NextMoveSize8_64bit.pyx"], include_dirs=["../../.."])]
 
 setup(
     name='NextMoveSize8_64bit',
     cmdclass={'build_ext': build_ext},
-    ext_modules=ext_modules
+    ext_modules=ext_modules,
+    package_dir={'': '../../..'},  # パッケージのルート(このディレクトリに出力する)
 )
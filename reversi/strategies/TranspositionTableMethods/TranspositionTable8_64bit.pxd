@@ -0,0 +1,39 @@
+cdef enum:
+    TT_EXACT = 1
+    TT_LOWER = 2
+    TT_UPPER = 3
+
+
+ctypedef struct TTEntry:
+    unsigned long long key
+    unsigned long long move
+    double score
+    signed int depth
+    unsigned char flag
+    unsigned char generation
+
+
+cdef class TranspositionTable:
+    cdef:
+        TTEntry* entries
+        unsigned long long mask
+        unsigned char generation
+        readonly double size
+        readonly bint cutoff
+        readonly unsigned long long buckets
+        public unsigned long long probes
+        public unsigned long long hits
+
+    cpdef clear(self)
+    cpdef new_search(self)
+    cdef TTEntry* probe(self, unsigned long long key) noexcept nogil
+    cdef void store(self, unsigned long long key, signed int depth, unsigned char flag, double score, unsigned long long move) noexcept nogil
+
+
+cdef class SharedTranspositionTable(TranspositionTable):
+    cdef:
+        object shm
+        TTEntry entry
+        readonly str name
+        readonly bint owner
+        readonly long owner_pid
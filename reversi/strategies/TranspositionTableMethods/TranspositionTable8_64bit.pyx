@@ -0,0 +1,242 @@
+#cython: language_level=3, profile=False, boundscheck=False, wraparound=False, initializedcheck=False, cdivision=True
+"""TranspositionTable8_64bit
+
+       探索カーネル用の置換表(Size8,64bit)
+       (1バケット2エントリ : 深さ優先 + 常時置換)
+"""
+
+import os
+
+cimport cython
+from cpython.mem cimport PyMem_Malloc, PyMem_Free
+from libc.string cimport memset, memcpy
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+
+EXACT = TT_EXACT
+LOWER = TT_LOWER
+UPPER = TT_UPPER
+
+DEF ENTRIES_PER_BUCKET = 2
+
+
+cdef class TranspositionTable:
+    """置換表
+
+           確保済みのC配列にハッシュ値をキーとして探索結果を保持する
+           size   : テーブルサイズ(MB)
+           cutoff : Falseの場合は枝刈りに使わず、手の並び替えにのみ使用する
+    """
+    def __cinit__(self, size=16, cutoff=True, *args, **kwargs):
+        cdef unsigned long long buckets = 1, max_buckets
+
+        max_buckets = <unsigned long long>(size * 1024 * 1024) // (sizeof(TTEntry) * ENTRIES_PER_BUCKET)
+        if max_buckets < 1:
+            raise ValueError('size must be large enough for one bucket')
+
+        while buckets * 2 <= max_buckets:  # 2のべき乗に切り下げ
+            buckets *= 2
+
+        self.entries = <TTEntry*>PyMem_Malloc(buckets * ENTRIES_PER_BUCKET * sizeof(TTEntry))
+        if not self.entries:
+            raise MemoryError()
+
+        self.size = size
+        self.cutoff = cutoff
+        self.buckets = buckets
+        self.mask = buckets - 1
+        self.clear()
+
+    def __dealloc__(self):
+        PyMem_Free(self.entries)
+
+    def __reduce__(self):
+        return (TranspositionTable, (self.size, self.cutoff))  # 複製時は空のテーブルとする
+
+    def __len__(self):
+        return self.buckets * ENTRIES_PER_BUCKET
+
+    cpdef clear(self):
+        """clear
+
+               全エントリを消去
+        """
+        memset(self.entries, 0, self.buckets * ENTRIES_PER_BUCKET * sizeof(TTEntry))
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+
+    cpdef new_search(self):
+        """new_search
+
+               新しい探索の開始(世代を進めて古いエントリを置換対象にする)
+        """
+        self.generation = (self.generation + 1) & 0xFF
+        self.probes = 0
+        self.hits = 0
+
+    def get(self, key):
+        """get
+
+               エントリを取得(depth, flag, score, move)
+        """
+        cdef TTEntry* entry = self.probe(key)
+        if entry is NULL:
+            return None
+        return (entry.depth, entry.flag, entry.score, entry.move)
+
+    def put(self, key, depth, flag, score, move):
+        """put
+
+               エントリを登録
+        """
+        self.store(key, depth, flag, score, move)
+
+    cdef TTEntry* probe(self, unsigned long long key) noexcept nogil:
+        cdef TTEntry* bucket = self.entries + (key & self.mask) * ENTRIES_PER_BUCKET
+
+        self.probes += 1
+        if bucket[0].flag and bucket[0].key == key:
+            self.hits += 1
+            return &bucket[0]
+        if bucket[1].flag and bucket[1].key == key:
+            self.hits += 1
+            return &bucket[1]
+        return NULL
+
+    cdef void store(self, unsigned long long key, signed int depth, unsigned char flag, double score, unsigned long long move) noexcept nogil:
+        cdef TTEntry* bucket = self.entries + (key & self.mask) * ENTRIES_PER_BUCKET
+        cdef TTEntry* entry
+
+        # 深さ優先スロット : 同一局面、より深い探索結果、または前回探索以前のエントリなら置換
+        if bucket[0].key == key or depth >= bucket[0].depth or bucket[0].generation != self.generation or not bucket[0].flag:
+            entry = &bucket[0]
+            if bucket[0].flag and bucket[0].key != key:
+                bucket[1] = bucket[0]  # 追い出したエントリは常時置換スロットへ
+            elif bucket[0].key == key and move == 0:
+                move = bucket[0].move  # 最善手が不明な場合は以前の手を残す
+        # 常時置換スロット
+        else:
+            entry = &bucket[1]
+            if bucket[1].key == key and move == 0:
+                move = bucket[1].move
+
+        entry.key = key
+        entry.move = move
+        entry.score = score
+        entry.depth = depth
+        entry.flag = flag
+        entry.generation = self.generation
+
+
+cdef inline unsigned long long _get_check(TTEntry* entry) noexcept nogil:
+    """_get_check
+
+           エントリのキー以外の値から検査値を算出
+    """
+    cdef unsigned long long score_bits, info = (<unsigned long long>(<unsigned int>entry.depth) << 16) | (<unsigned long long>entry.flag << 8) | entry.generation
+    memcpy(&score_bits, &entry.score, sizeof(score_bits))
+    return entry.move ^ score_bits ^ info
+
+
+@cython.no_gc_clear
+cdef class SharedTranspositionTable(TranspositionTable):
+    """共有置換表
+
+           共有メモリ上に確保した置換表(複数プロセスからロックなしで参照・登録する)
+           キーにはエントリの値との排他的論理和を格納し、書き込みが競合して壊れたエントリは参照時に読み捨てる
+           name : 既存の共有メモリの名前(省略時は新規に確保する)
+    """
+    def __cinit__(self, size=16, cutoff=True, name=None):
+        cdef unsigned long long nbytes = self.buckets * ENTRIES_PER_BUCKET * sizeof(TTEntry)
+        cdef unsigned char[::1] buf
+
+        if shared_memory is None:
+            raise NotImplementedError('multiprocessing.shared_memory is not available')
+
+        PyMem_Free(self.entries)
+        self.entries = NULL
+
+        self.owner = name is None
+        self.owner_pid = os.getpid()
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=nbytes)
+        buf = self.shm.buf
+        self.entries = <TTEntry*>&buf[0]  # 共有メモリを閉じるまで有効
+        self.name = self.shm.name
+
+        if self.owner:
+            self.clear()
+
+    def __dealloc__(self):
+        self.entries = NULL  # 共有メモリの破棄は確保したプロセスのみ行う
+        if self.owner and self.shm is not None:
+            self.unlink()
+
+    def __reduce__(self):
+        return (SharedTranspositionTable, (self.size, self.cutoff, self.name))  # 複製時は同じ共有メモリを参照する
+
+    def unlink(self):
+        """unlink
+
+               共有メモリの参照を解除(確保したプロセスの場合は共有メモリを破棄)
+        """
+        if self.shm is None:
+            return
+        self.entries = NULL
+        self.shm.close()
+        if self.owner and self.owner_pid == os.getpid():
+            self.shm.unlink()
+        self.shm = None
+
+    cdef TTEntry* probe(self, unsigned long long key) noexcept nogil:
+        cdef TTEntry* bucket = self.entries + (key & self.mask) * ENTRIES_PER_BUCKET
+        cdef unsigned int i
+
+        if self.entries is NULL:  # 共有メモリの参照を解除済み
+            return NULL
+
+        self.probes += 1
+        for i in range(ENTRIES_PER_BUCKET):
+            self.entry = bucket[i]  # 他のプロセスに書き換えられる前に退避して検査する
+            if self.entry.flag and self.entry.key ^ _get_check(&self.entry) == key:
+                self.entry.key = key
+                self.hits += 1
+                return &self.entry
+        return NULL
+
+    cdef void store(self, unsigned long long key, signed int depth, unsigned char flag, double score, unsigned long long move) noexcept nogil:
+        cdef TTEntry* bucket = self.entries + (key & self.mask) * ENTRIES_PER_BUCKET
+        cdef TTEntry first, second, entry
+        cdef TTEntry* slot
+
+        if self.entries is NULL:
+            return
+
+        first, second = bucket[0], bucket[1]
+        first.key ^= _get_check(&first)
+        second.key ^= _get_check(&second)
+
+        # 深さ優先スロット : 同一局面、より深い探索結果、または前回探索以前のエントリなら置換
+        if first.key == key or depth >= first.depth or first.generation != self.generation or not first.flag:
+            slot = &bucket[0]
+            if first.flag and first.key != key:
+                bucket[1] = bucket[0]  # 追い出したエントリは常時置換スロットへ
+            elif first.key == key and move == 0:
+                move = first.move  # 最善手が不明な場合は以前の手を残す
+        # 常時置換スロット
+        else:
+            slot = &bucket[1]
+            if second.key == key and move == 0:
+                move = second.move
+
+        entry.move = move
+        entry.score = score
+        entry.depth = depth
+        entry.flag = flag
+        entry.generation = self.generation
+        entry.key = key ^ _get_check(&entry)
+        slot[0] = entry
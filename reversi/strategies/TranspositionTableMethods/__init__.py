@@ -0,0 +1,29 @@
+import os
+import pyximport
+pyximport.install()
+
+
+TRANSPOSITIONTABLE_ERROR = True
+SHARED_TRANSPOSITIONTABLE_ERROR = True
+
+try:
+    if 'FORCE_TRANSPOSITIONTABLEMETHODS_IMPORT_ERROR' in os.environ:
+        if os.environ['FORCE_TRANSPOSITIONTABLEMETHODS_IMPORT_ERROR'] == 'RAISE':
+            raise ImportError
+
+    from ...strategies.TranspositionTableMethods.TranspositionTable8_64bit import TranspositionTable, SharedTranspositionTable, EXACT, LOWER, UPPER
+    TRANSPOSITIONTABLE_ERROR = False
+
+    from multiprocessing import shared_memory  # noqa: F401 共有置換表はPython3.8以降のみ
+    SHARED_TRANSPOSITIONTABLE_ERROR = False
+except ImportError:
+    pass
+
+
+__all__ = [
+    'TranspositionTable',
+    'SharedTranspositionTable',
+    'EXACT',
+    'LOWER',
+    'UPPER',
+]
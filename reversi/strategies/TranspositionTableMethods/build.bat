@@ -0,0 +1 @@
+py -3.7 setup.py build_ext --inplace
@@ -0,0 +1,13 @@
+from distutils.core import setup
+from distutils.extension import Extension
+from Cython.Distutils import build_ext
+
+
+# TranspositionTable8_64bit
+ext_modules = [Extension("TranspositionTable8_64bit", ["TranspositionTable8_64bit.pyx"], include_dirs=[".", "../../.."])]
+
+setup(
+    name='TranspositionTable8_64bit',
+    cmdclass={'build_ext': build_ext},
+    ext_modules=ext_modules
+)
@@ -1,4 +1,5 @@
-from ..strategies.common import CPU_TIME, Timer, Measure, AbstractStrategy, AbstractScorer, AbstractEvaluator, AbstractOrderer, AbstractSelector
+from ..strategies.common import CPU_TIME, Timer, Measure, TimeManager, SearchStats
+from ..strategies.common import AbstractStrategy, AbstractScorer, AbstractEvaluator, AbstractOrderer, AbstractSelector
 from ..strategies.user import ConsoleUserInput, WindowUserInput
 from ..strategies.easy import Random, Greedy, Unselfish, SlowStarter
 from ..strategies.table import Table
@@ -9,10 +10,13 @@ from ..strategies.alphabeta import _AlphaBeta_, _AlphaBeta, AlphaBeta_, AlphaBet
 from ..strategies.blank import _Blank_, _Blank, Blank_, Blank
 from ..strategies.endgame import _EndGame_, _EndGame, EndGame_, EndGame
 from ..strategies.negascout import _NegaScout_, _NegaScout, NegaScout_, NegaScout
+from ..strategies.mtdf import _MTDf_, _MTDf, MTDf_, MTDf
 from ..strategies.switch import _Switch_, Switch
 from ..strategies.joseki import _Joseki_, _Usagi_, Usagi, _Tora_, Tora, _Ushi_, Ushi, _Nezumi_, Nezumi, _Neko_, Neko, _Hitsuji_, Hitsuji
 from ..strategies.fullreading import _FullReading_, _FullReading, FullReading_, FullReading
 from ..strategies.iterative import IterativeDeepning_, IterativeDeepning
+from ..strategies.parallel import _ParallelSearch_, _ParallelSearch, ParallelSearch_, ParallelSearch, _ThreadedSearch_, _ThreadedSearch, ThreadedSearch_, ThreadedSearch  # noqa: E501
+from ..strategies.parallel import _LazySMP_, LazySMP
 from ..strategies.randomopening import _RandomOpening_, RandomOpening
 from ..strategies.external import External
 from ..strategies.proto import MinMax2, NegaMax3, AlphaBeta4, AB_T4, AB_TI
@@ -23,6 +27,8 @@ __all__ = [
     'CPU_TIME',
     'Timer',
     'Measure',
+    'TimeManager',
+    'SearchStats',
     'AbstractStrategy',
     'AbstractScorer',
     'AbstractEvaluator',
@@ -113,6 +119,10 @@ __all__ = [
     '_NegaScout',
     'NegaScout_',
     'NegaScout',
+    '_MTDf_',
+    '_MTDf',
+    'MTDf_',
+    'MTDf',
     'NegaScout_TPW',
     'NegaScout_TPWE',
     'NegaScout_TPWEB',
@@ -130,6 +140,16 @@ __all__ = [
     'NegaScout4_TPWE',
     'IterativeDeepning_',
     'IterativeDeepning',
+    '_ParallelSearch_',
+    '_ParallelSearch',
+    'ParallelSearch_',
+    'ParallelSearch',
+    '_ThreadedSearch_',
+    '_ThreadedSearch',
+    'ThreadedSearch_',
+    'ThreadedSearch',
+    '_LazySMP_',
+    'LazySMP',
     'AbI_B_TPW',
     'AbI_B_TPWE',
     'AbI_PCB_TPWE',
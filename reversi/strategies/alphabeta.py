@@ -3,9 +3,11 @@
 
 import sys
 
-from reversi.strategies.common import Timer, Measure, AbstractStrategy
+from reversi.strategies.common import Timer, Measure, SearchStats, AbstractStrategy
+from reversi.strategies.common.analyze import analyze
 from reversi.strategies.coordinator import Evaluator_N
 import reversi.strategies.AlphaBetaMethods as AlphaBetaMethods
+import reversi.strategies.TranspositionTableMethods as TranspositionTableMethods
 
 
 MAXSIZE64 = 2**63 - 1
@@ -15,7 +17,7 @@ class _AlphaBeta_(AbstractStrategy):
     """
     AlphaBeta法で次の手を決める
     """
-    def __init__(self, depth=3, evaluator=None):
+    def __init__(self, depth=3, evaluator=None, tt_size=None, killer_history=False, ordering_depth=0, ordering_search_depth=2):
         self._MIN = -10000000
         self._MAX = 10000000
 
@@ -23,29 +25,52 @@ class _AlphaBeta_(AbstractStrategy):
         self.evaluator = evaluator
         self.timer = False
         self.measure = False
-
-    def next_move(self, color, board):
+        self.transposition_table = None
+        self.killer_history = killer_history  # キラー手とヒストリーによる途中局面の並び替え(盤面サイズ8の探索でのみ使用)
+        self.context = AlphaBetaMethods.SearchContext() if not AlphaBetaMethods.ALPHABETA_SIZE8_64BIT_ERROR else None  # 探索ごとの状態(盤面サイズ8の探索でのみ使用)
+        if self.context is not None:
+            self.context.ordering_depth, self.context.ordering_search_depth = ordering_depth, ordering_search_depth  # 浅い探索による途中局面の手の並び替え
+        self.stats = SearchStats()  # 直近の探索の統計情報
+        self.pv = []                # 直近の探索の最善応手手順(盤面サイズ8以外の場合は最善手のみ)
+
+        # 置換表(tt_size:MB, 盤面サイズ8の探索でのみ使用)
+        if tt_size and not TranspositionTableMethods.TRANSPOSITIONTABLE_ERROR:
+            self.transposition_table = TranspositionTableMethods.TranspositionTable(tt_size)
+
+    def next_move(self, color, board, budget=None):
         """
         次の一手
         """
-        pid = Timer.get_pid(self)  # タイムアウト監視用のプロセスID
+        pid = Timer.get_budget(self, budget)  # タイムアウト監視用の時間予算
+        self.stats = SearchStats()
+        self.stats.start()
+
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
 
         if board.size == 8 and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not AlphaBetaMethods.ALPHABETA_SIZE8_64BIT_ERROR:
-            return AlphaBetaMethods.next_move(color, board, self._MIN, self._MAX, self.depth, self.evaluator, pid, self.timer, self.measure)
+            best_move = AlphaBetaMethods.next_move(color, board, self._MIN, self._MAX, self.depth, self.evaluator, pid, self.timer, self.measure, self.transposition_table, self.killer_history, context=self.context, stats=self.stats)  # noqa: E501
+            self.pv = self.context.get_pv()
+        else:
+            moves = board.get_legal_moves(color)  # 手の候補
+            best_move, _ = self.get_best_move(color, board, moves, self.depth, pid)
 
-        moves = board.get_legal_moves(color)  # 手の候補
-        best_move, _ = self.get_best_move(color, board, moves, self.depth, pid)
+        self.stats.end(self.depth, Timer.is_timeout(pid))
 
         return best_move
 
-    def get_best_move(self, color, board, moves, depth, pid=None):
+    def get_best_move(self, color, board, moves, depth, pid=None, alpha=None, beta=None):
         """
-        最善手を選ぶ
+        最善手を選ぶ(alpha, betaを省略した場合は全幅で探索)
         """
-        best_move, alpha, beta, scores = None, self._MIN, self._MAX, {}
+        alpha = self._MIN if alpha is None else alpha
+        beta = self._MAX if beta is None else beta
+        best_move, scores = None, {}
 
         if board.size == 8 and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not AlphaBetaMethods.ALPHABETA_SIZE8_64BIT_ERROR:
-            return AlphaBetaMethods.get_best_move(color, board, moves, alpha, beta, depth, self.evaluator, pid, self.timer, self.measure)
+            best_move, scores = AlphaBetaMethods.get_best_move(color, board, moves, alpha, beta, depth, self.evaluator, pid, self.timer, self.measure, self.transposition_table, self.killer_history, context=self.context, stats=self.stats)  # noqa: E501
+            self.pv = self.context.get_pv()
+            return best_move, scores
 
         # 打てる手の中から評価値の最も高い手を選ぶ
         for move in moves:
@@ -59,8 +84,18 @@ class _AlphaBeta_(AbstractStrategy):
                     alpha = score
                     best_move = move
 
+        if best_move is None and moves:
+            best_move = moves[0]  # 窓の下限を超える手がない場合
+        self.pv = [best_move] if best_move is not None else []
+
         return best_move, scores
 
+    def analyze(self, color, board, k=1, depth=None, time_limit=None):
+        """
+        上位k個の手の評価値と最善応手手順を求める(depthの省略時は探索の深さ、time_limitの指定時は時間内で深さを増やす)
+        """
+        return analyze(self, color, board, k, depth, time_limit)
+
     def get_score(self, move, color, board, alpha, beta, depth, pid=None):
         """
         手を打った時の評価値を取得
@@ -82,16 +117,16 @@ class _AlphaBeta_(AbstractStrategy):
 class _AlphaBeta(_AlphaBeta_):
     """AlphaBeta + Measure
     """
-    def __init__(self, depth=3, evaluator=None):
-        super().__init__(depth, evaluator)
+    def __init__(self, depth=3, evaluator=None, tt_size=None, killer_history=False, ordering_depth=0, ordering_search_depth=2):
+        super().__init__(depth, evaluator, tt_size, killer_history, ordering_depth, ordering_search_depth)
         self.timer = False
         self.measure = True
 
     @Measure.time
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """next_move
         """
-        return super().next_move(color, board)
+        return super().next_move(color, board, budget)
 
     def _get_score(self, color, board, alpha, beta, depth, pid=None):
         """_get_score
@@ -102,16 +137,16 @@ class _AlphaBeta(_AlphaBeta_):
 class AlphaBeta_(_AlphaBeta_):
     """AlphaBeta + Timer
     """
-    def __init__(self, depth=3, evaluator=None):
-        super().__init__(depth, evaluator)
+    def __init__(self, depth=3, evaluator=None, tt_size=None, killer_history=False, ordering_depth=0, ordering_search_depth=2):
+        super().__init__(depth, evaluator, tt_size, killer_history, ordering_depth, ordering_search_depth)
         self.timer = True
         self.measure = False
 
     @Timer.start(-10000000)
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """next_move
         """
-        return super().next_move(color, board)
+        return super().next_move(color, board, budget)
 
     def _get_score(self, color, board, alpha, beta, depth, pid=None):
         """_get_score
@@ -122,17 +157,17 @@ class AlphaBeta_(_AlphaBeta_):
 class AlphaBeta(_AlphaBeta_):
     """AlphaBeta + Measure + Timer
     """
-    def __init__(self, depth=3, evaluator=None):
-        super().__init__(depth, evaluator)
+    def __init__(self, depth=3, evaluator=None, tt_size=None, killer_history=False, ordering_depth=0, ordering_search_depth=2):
+        super().__init__(depth, evaluator, tt_size, killer_history, ordering_depth, ordering_search_depth)
         self.timer = True
         self.measure = True
 
     @Timer.start(-10000000)
     @Measure.time
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """next_move
         """
-        return super().next_move(color, board)
+        return super().next_move(color, board, budget)
 
     def _get_score(self, color, board, alpha, beta, depth, pid=None):
         """_get_score
@@ -144,29 +179,29 @@ class _AlphaBetaN_(_AlphaBeta_):
     """
     AlphaBeta法でEvaluator_Nにより次の手を決める
     """
-    def __init__(self, depth, evaluator=Evaluator_N()):
-        super().__init__(depth=depth, evaluator=evaluator)
+    def __init__(self, depth, evaluator=Evaluator_N(), tt_size=None, killer_history=False, ordering_depth=0, ordering_search_depth=2):
+        super().__init__(depth=depth, evaluator=evaluator, tt_size=tt_size, killer_history=killer_history, ordering_depth=ordering_depth, ordering_search_depth=ordering_search_depth)  # noqa: E501
 
 
 class _AlphaBetaN(_AlphaBeta):
     """
     AlphaBeta法でEvaluator_Nにより次の手を決める
     """
-    def __init__(self, depth, evaluator=Evaluator_N()):
-        super().__init__(depth=depth, evaluator=evaluator)
+    def __init__(self, depth, evaluator=Evaluator_N(), tt_size=None, killer_history=False, ordering_depth=0, ordering_search_depth=2):
+        super().__init__(depth=depth, evaluator=evaluator, tt_size=tt_size, killer_history=killer_history, ordering_depth=ordering_depth, ordering_search_depth=ordering_search_depth)  # noqa: E501
 
 
 class AlphaBetaN_(AlphaBeta_):
     """
     AlphaBeta法でEvaluator_Nにより次の手を決める
     """
-    def __init__(self, depth, evaluator=Evaluator_N()):
-        super().__init__(depth=depth, evaluator=evaluator)
+    def __init__(self, depth, evaluator=Evaluator_N(), tt_size=None, killer_history=False, ordering_depth=0, ordering_search_depth=2):
+        super().__init__(depth=depth, evaluator=evaluator, tt_size=tt_size, killer_history=killer_history, ordering_depth=ordering_depth, ordering_search_depth=ordering_search_depth)  # noqa: E501
 
 
 class AlphaBetaN(AlphaBeta):
     """
     AlphaBeta法でEvaluator_Nにより次の手を決める
     """
-    def __init__(self, depth, evaluator=Evaluator_N()):
-        super().__init__(depth=depth, evaluator=evaluator)
+    def __init__(self, depth, evaluator=Evaluator_N(), tt_size=None, killer_history=False, ordering_depth=0, ordering_search_depth=2):
+        super().__init__(depth=depth, evaluator=evaluator, tt_size=tt_size, killer_history=killer_history, ordering_depth=ordering_depth, ordering_search_depth=ordering_search_depth)  # noqa: E501
@@ -3,7 +3,8 @@
 
 import sys
 
-from reversi.strategies.common import Timer, Measure, AbstractStrategy
+from reversi.strategies.common import Timer, Measure, SearchStats, AbstractStrategy
+from reversi.strategies.common.analyze import analyze
 from reversi.strategies.coordinator import Evaluator_TPWEB
 from reversi.strategies.negascout import _NegaScout_, _NegaScout, NegaScout_, NegaScout
 import reversi.strategies.BlankMethods as BlankMethods
@@ -16,7 +17,7 @@ class _Blank_(AbstractStrategy):
     """
     空きマスの状態を形勢判断に加えて次の手を決める
     """
-    def __init__(self, depth=4, corner=50, c=-20, a1=0, a2=-1, b1=-1, b2=-1, b3=-1, x=-25, o1=-5, o2=-5, wp=5, ww=10000, we=100, wb1=-5, wb2=-20, wb3=-10):
+    def __init__(self, depth=4, corner=50, c=-20, a1=0, a2=-1, b1=-1, b2=-1, b3=-1, x=-25, o1=-5, o2=-5, wp=5, ww=10000, we=100, wb1=-5, wb2=-20, wb3=-10, ordering_depth=0, ordering_search_depth=2):  # noqa: E501
         self._MIN = -10000000
         self._MAX = 10000000
         self.params = [corner, c, a1, a2, b1, b2, b3, x, o1, o2, wp, ww, we, wb1, wb2, wb3]
@@ -25,70 +26,93 @@ class _Blank_(AbstractStrategy):
         self.negascout_tpweb = _NegaScout_(depth=depth, evaluator=self.evaluator)
         self.timer = False
         self.measure = False
+        self.context = BlankMethods.SearchContext() if not BlankMethods.BLANK_SIZE8_64BIT_ERROR else None  # 探索ごとの状態(盤面サイズ8の探索でのみ使用)
+        if self.context is not None:
+            self.context.ordering_depth, self.context.ordering_search_depth = ordering_depth, ordering_search_depth  # 浅い探索による途中局面の手の並び替え
+        self.stats = SearchStats()  # 直近の探索の統計情報
+        self.pv = []                # 直近の探索の最善応手手順
 
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """
         次の一手
         """
-        pid = Timer.get_pid(self)  # タイムアウト監視用のプロセスID
+        pid = Timer.get_budget(self, budget)  # タイムアウト監視用の時間予算
+        self.stats = SearchStats()
+        self.stats.start()
         if board.size == 8 and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not BlankMethods.BLANK_SIZE8_64BIT_ERROR:
-            return BlankMethods.next_move(color, board, self.params, self.depth, pid, self.timer, self.measure)
-        return self.negascout_tpweb.next_move(color, board)
-
-    def get_best_move(self, color, board, moves, depth=4, pid=None):
+            best_move = BlankMethods.next_move(color, board, self.params, self.depth, pid, self.timer, self.measure, context=self.context, stats=self.stats)
+            self.pv = self.context.get_pv()
+        else:
+            best_move = self.negascout_tpweb.next_move(color, board)
+            self.pv = self.negascout_tpweb.pv
+        self.stats.end(self.depth, Timer.is_timeout(pid))
+        return best_move
+
+    def get_best_move(self, color, board, moves, depth=4, pid=None, alpha=None, beta=None):
         """
-        最善手を選ぶ
+        最善手を選ぶ(alpha, betaを省略した場合は全幅で探索)
         """
-        alpha, beta = self._MIN, self._MAX
+        alpha = self._MIN if alpha is None else alpha
+        beta = self._MAX if beta is None else beta
         if board.size == 8 and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not BlankMethods.BLANK_SIZE8_64BIT_ERROR:
-            return BlankMethods.get_best_move(color, board, self.params, moves, alpha, beta, depth, pid, self.timer, self.measure)
-        return self.negascout_tpweb.get_best_move(color, board, moves, depth, pid)
+            best_move, scores = BlankMethods.get_best_move(color, board, self.params, moves, alpha, beta, depth, pid, self.timer, self.measure, context=self.context, stats=self.stats)  # noqa: E501
+            self.pv = self.context.get_pv()
+            return best_move, scores
+        best_move, scores = self.negascout_tpweb.get_best_move(color, board, moves, depth, pid, alpha, beta)
+        self.pv = self.negascout_tpweb.pv
+        return best_move, scores
+
+    def analyze(self, color, board, k=1, depth=None, time_limit=None):
+        """
+        上位k個の手の評価値と最善応手手順を求める(depthの省略時は探索の深さ、time_limitの指定時は時間内で深さを増やす)
+        """
+        return analyze(self, color, board, k, depth, time_limit)
 
 
 class _Blank(_Blank_):
     """Blank + Measure
     """
-    def __init__(self, depth=4, corner=50, c=-20, a1=0, a2=-1, b1=-1, b2=-1, b3=-1, x=-25, o1=-5, o2=-5, wp=5, ww=10000, we=100, wb1=-5, wb2=-20, wb3=-10):
-        super().__init__(depth, corner, c, a1, a2, b1, b2, b3, x, o1, o2, wp, ww, we, wb1, wb2, wb3)
+    def __init__(self, depth=4, corner=50, c=-20, a1=0, a2=-1, b1=-1, b2=-1, b3=-1, x=-25, o1=-5, o2=-5, wp=5, ww=10000, we=100, wb1=-5, wb2=-20, wb3=-10, ordering_depth=0, ordering_search_depth=2):  # noqa: E501
+        super().__init__(depth, corner, c, a1, a2, b1, b2, b3, x, o1, o2, wp, ww, we, wb1, wb2, wb3, ordering_depth, ordering_search_depth)
         self.negascout_tpweb = _NegaScout(depth=depth, evaluator=self.evaluator)
         self.timer = False
         self.measure = True
 
     @Measure.time
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """next_move
         """
-        return super().next_move(color, board)
+        return super().next_move(color, board, budget)
 
 
 class Blank_(_Blank_):
     """Blank + Timer
     """
-    def __init__(self, depth=4, corner=50, c=-20, a1=0, a2=-1, b1=-1, b2=-1, b3=-1, x=-25, o1=-5, o2=-5, wp=5, ww=10000, we=100, wb1=-5, wb2=-20, wb3=-10):
-        super().__init__(depth, corner, c, a1, a2, b1, b2, b3, x, o1, o2, wp, ww, we, wb1, wb2, wb3)
+    def __init__(self, depth=4, corner=50, c=-20, a1=0, a2=-1, b1=-1, b2=-1, b3=-1, x=-25, o1=-5, o2=-5, wp=5, ww=10000, we=100, wb1=-5, wb2=-20, wb3=-10, ordering_depth=0, ordering_search_depth=2):  # noqa: E501
+        super().__init__(depth, corner, c, a1, a2, b1, b2, b3, x, o1, o2, wp, ww, we, wb1, wb2, wb3, ordering_depth, ordering_search_depth)
         self.negascout_tpweb = NegaScout_(depth=depth, evaluator=self.evaluator)
         self.timer = True
         self.measure = False
 
     @Timer.start(-10000000)
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """next_move
         """
-        return super().next_move(color, board)
+        return super().next_move(color, board, budget)
 
 
 class Blank(_Blank_):
     """Blank + Measure + Timer
     """
-    def __init__(self, depth=4, corner=50, c=-20, a1=0, a2=-1, b1=-1, b2=-1, b3=-1, x=-25, o1=-5, o2=-5, wp=5, ww=10000, we=100, wb1=-5, wb2=-20, wb3=-10):
-        super().__init__(depth, corner, c, a1, a2, b1, b2, b3, x, o1, o2, wp, ww, we, wb1, wb2, wb3)
+    def __init__(self, depth=4, corner=50, c=-20, a1=0, a2=-1, b1=-1, b2=-1, b3=-1, x=-25, o1=-5, o2=-5, wp=5, ww=10000, we=100, wb1=-5, wb2=-20, wb3=-10, ordering_depth=0, ordering_search_depth=2):  # noqa: E501
+        super().__init__(depth, corner, c, a1, a2, b1, b2, b3, x, o1, o2, wp, ww, we, wb1, wb2, wb3, ordering_depth, ordering_search_depth)
         self.negascout_tpweb = NegaScout(depth=depth, evaluator=self.evaluator)
         self.timer = True
         self.measure = True
 
     @Timer.start(-10000000)
     @Measure.time
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """next_move
         """
-        return super().next_move(color, board)
+        return super().next_move(color, board, budget)
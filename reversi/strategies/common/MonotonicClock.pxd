@@ -0,0 +1,24 @@
+# MonotonicClock
+#
+#        探索カーネルからGILを解放したまま参照できる単調増加時計(秒)
+
+cdef extern from *:
+    """
+    #ifdef _WIN32
+    #include <windows.h>
+    static double reversi_monotonic_time(void) {
+        LARGE_INTEGER frequency, counter;
+        QueryPerformanceFrequency(&frequency);
+        QueryPerformanceCounter(&counter);
+        return (double)counter.QuadPart / (double)frequency.QuadPart;
+    }
+    #else
+    #include <time.h>
+    static double reversi_monotonic_time(void) {
+        struct timespec ts;
+        clock_gettime(CLOCK_MONOTONIC, &ts);
+        return (double)ts.tv_sec + (double)ts.tv_nsec * 1e-9;
+    }
+    #endif
+    """
+    double monotonic_time "reversi_monotonic_time"() nogil
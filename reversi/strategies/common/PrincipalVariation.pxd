@@ -0,0 +1,59 @@
+# PrincipalVariation
+#
+#        探索カーネルの最善応手手順(三角形のPVテーブル)
+
+cdef enum:
+    PV_MAX_PLY = 64  # 手順を記録する深さ(ルートからの手数、パスを含む)の上限
+
+
+cdef struct PVTable:
+    unsigned long long[PV_MAX_PLY][PV_MAX_PLY] moves  # 深さごとの最善応手手順(0はパス)
+    unsigned int[PV_MAX_PLY] length                   # 深さごとの手順の終端
+    unsigned int passes                               # 現在の局面までのパスの回数
+
+
+cdef inline void pv_clear(PVTable* pv, unsigned int ply) noexcept nogil:
+    """pv_clear
+    """
+    if ply < PV_MAX_PLY:
+        pv.length[ply] = ply
+
+
+cdef inline void pv_update(PVTable* pv, unsigned int ply, unsigned long long move) noexcept nogil:
+    """pv_update
+
+           手を先頭に、一つ深い局面の手順を続ける
+    """
+    cdef:
+        unsigned int i
+    if ply >= PV_MAX_PLY:
+        return
+    pv.moves[ply][ply] = move
+    pv.length[ply] = ply + 1
+    if ply + 1 < PV_MAX_PLY:
+        for i in range(ply + 1, pv.length[ply + 1]):
+            pv.moves[ply][i] = pv.moves[ply + 1][i]
+        if pv.length[ply + 1] > ply + 1:
+            pv.length[ply] = pv.length[ply + 1]
+
+
+cdef inline list pv_to_list(PVTable* pv):
+    """pv_to_list
+
+           ルートからの手順を(x, y)のリストに変換(パスはNone)
+    """
+    cdef:
+        unsigned int i, index
+        unsigned long long move
+    ret = []
+    for i in range(pv.length[0]):
+        move = pv.moves[0][i]
+        if not move:
+            ret.append(None)
+            continue
+        index = 63
+        while move > 1:
+            move >>= 1
+            index -= 1
+        ret.append((index % 8, index // 8))
+    return ret
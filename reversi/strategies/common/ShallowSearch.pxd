@@ -0,0 +1,187 @@
+# ShallowSearch
+#
+#        浅い探索による途中局面の手の並び替え(AlphaBeta/NegaScout/Blankの探索カーネルで共通)
+#        Cython実装の評価関数を使い、置換表などを使わない固定深さのアルファベータ法で各手を評価する
+#        (浅い探索のノード数も探索カーネルの統計情報に数える)
+
+from reversi.strategies.coordinator.EvaluatorMethods.CyEvaluator8_64bit cimport CyEvaluator
+from reversi.strategies.common.TableScore cimport get_table_score, get_table_delta
+from reversi.strategies.common.StatsCounter cimport StatsCounter, count_node
+
+
+cdef inline void sort_moves_by_shallow_search(CyEvaluator evaluator, unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long h, unsigned int bs, unsigned int ws, unsigned int count, unsigned long long* moves, unsigned int depth, StatsCounter* stats, unsigned int ply) noexcept nogil:  # noqa: E501
+    """sort_moves_by_shallow_search
+
+           手を浅い探索の評価値の高い順に並び替える(同じ評価値の手は元の順序を保つ、plyは並び替える局面のルートからの手数)
+    """
+    cdef:
+        unsigned int i, j
+        double score
+        double[64] scores
+        unsigned long long move, fd
+        signed int ts = 0
+    if evaluator.has_table:
+        ts = get_table_score(evaluator.square_values, b, w)
+    # 各手を打った局面を相手番から探索(順序付けのため全幅の窓で評価する)
+    for i in range(count):
+        fd = _shallow_flippable_discs(int_color, b, w, moves[i])
+        scores[i] = -_shallow_put_and_search(evaluator, int_color, b, w, h, bs, ws, ts, moves[i], fd, depth - 1 if depth else 0, -1e18, 1e18, stats, ply + 1)
+    # 挿入ソート(手の数が少ないため)
+    for i in range(1, count):
+        move, score = moves[i], scores[i]
+        j = i
+        while j > 0 and scores[j-1] < score:
+            moves[j], scores[j] = moves[j-1], scores[j-1]
+            j -= 1
+        moves[j], scores[j] = move, score
+
+
+cdef inline double _shallow_put_and_search(CyEvaluator evaluator, unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long h, unsigned int bs, unsigned int ws, signed int ts, unsigned long long move, unsigned long long fd, unsigned int depth, double alpha, double beta, StatsCounter* stats, unsigned int ply) noexcept nogil:  # noqa: E501
+    """_shallow_put_and_search
+
+           着手後の局面の相手番から見た評価値
+    """
+    cdef:
+        unsigned int count = <unsigned int>_shallow_popcount(fd)
+    if evaluator.has_table:
+        ts += get_table_delta(evaluator.square_values, int_color, move, fd)
+    if int_color:
+        return _shallow_search(evaluator, <unsigned int>0, b ^ (move | fd), w ^ fd, h, bs + count + 1, ws - count, fd, ts, depth, alpha, beta, <unsigned int>0, stats, ply)
+    return _shallow_search(evaluator, <unsigned int>1, b ^ fd, w ^ (move | fd), h, bs - count, ws + count + 1, fd, ts, depth, alpha, beta, <unsigned int>0, stats, ply)
+
+
+cdef inline double _shallow_search(CyEvaluator evaluator, unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long h, unsigned int bs, unsigned int ws, unsigned long long fd, signed int ts, unsigned int depth, double alpha, double beta, unsigned int pas, StatsCounter* stats, unsigned int ply) noexcept nogil:  # noqa: E501
+    """_shallow_search
+
+           手番から見た評価値(パスは深さに数えない)
+    """
+    cdef:
+        double score
+        unsigned long long legal_moves_bits, legal_moves_b_bits, legal_moves_w_bits, move, next_fd
+    count_node(stats, ply)
+    legal_moves_bits = _shallow_legal_moves(int_color, b, w, h)
+    # 最大深さに到達 or ゲーム終了
+    if not depth or (pas and not legal_moves_bits):
+        if int_color:
+            legal_moves_b_bits = legal_moves_bits
+            legal_moves_w_bits = _shallow_legal_moves(<unsigned int>0, b, w, h)
+        else:
+            legal_moves_b_bits = _shallow_legal_moves(<unsigned int>1, b, w, h)
+            legal_moves_w_bits = legal_moves_bits
+        stats.leaves += 1
+        score = evaluator._evaluate(int_color, b, w, bs, ws, <unsigned int>_shallow_popcount(legal_moves_b_bits), <unsigned int>_shallow_popcount(legal_moves_w_bits), fd, ts)
+        return score if int_color else -score
+    # パスの場合
+    if not legal_moves_bits:
+        return -_shallow_search(evaluator, <unsigned int>(not int_color), b, w, h, bs, ws, fd, ts, depth, -beta, -alpha, <unsigned int>1, stats, ply)
+    while legal_moves_bits:
+        move = legal_moves_bits & (~legal_moves_bits + 1)
+        next_fd = _shallow_flippable_discs(int_color, b, w, move)
+        score = -_shallow_put_and_search(evaluator, int_color, b, w, h, bs, ws, ts, move, next_fd, depth - 1, -beta, -alpha, stats, ply + 1)
+        if score > alpha:
+            alpha = score
+            if alpha >= beta:  # 枝刈り
+                break
+        legal_moves_bits ^= move
+    return alpha
+
+
+cdef inline unsigned long long _shallow_legal_moves(unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long h) noexcept nogil:
+    """_shallow_legal_moves
+    """
+    cdef:
+        unsigned int i
+        unsigned long long player = w, opponent = b
+    if int_color:
+        player = b
+        opponent = w
+    cdef:
+        unsigned long long blank = ~(player | opponent | h)
+        unsigned long long horizontal = opponent & <unsigned long long>0x7E7E7E7E7E7E7E7E
+        unsigned long long vertical = opponent & <unsigned long long>0x00FFFFFFFFFFFF00
+        unsigned long long diagonal = opponent & <unsigned long long>0x007E7E7E7E7E7E00
+        unsigned long long tmp_h, tmp_v, tmp_d1, tmp_d2
+    tmp_h = horizontal & ((player << 1) | (player >> 1))
+    tmp_v = vertical & ((player << 8) | (player >> 8))
+    tmp_d1 = diagonal & ((player << 9) | (player >> 9))
+    tmp_d2 = diagonal & ((player << 7) | (player >> 7))
+    for i in range(5):
+        tmp_h |= horizontal & ((tmp_h << 1) | (tmp_h >> 1))
+        tmp_v |= vertical & ((tmp_v << 8) | (tmp_v >> 8))
+        tmp_d1 |= diagonal & ((tmp_d1 << 9) | (tmp_d1 >> 9))
+        tmp_d2 |= diagonal & ((tmp_d2 << 7) | (tmp_d2 >> 7))
+    return blank & ((tmp_h << 1) | (tmp_h >> 1) | (tmp_v << 8) | (tmp_v >> 8) | (tmp_d1 << 9) | (tmp_d1 >> 9) | (tmp_d2 << 7) | (tmp_d2 >> 7))
+
+
+cdef inline unsigned long long _shallow_flippable_discs(unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long move) noexcept nogil:
+    """_shallow_flippable_discs
+    """
+    cdef:
+        unsigned int i
+        unsigned long long t_, rt, r_, rb, b_, lb, l_, lt
+        unsigned long long bf_t_ = 0, bf_rt = 0, bf_r_ = 0, bf_rb = 0, bf_b_ = 0, bf_lb = 0, bf_l_ = 0, bf_lt = 0
+        unsigned long long player = w, opponent = b, flippable_discs = 0
+    if int_color:
+        player = b
+        opponent = w
+    t_ = <unsigned long long>0xFFFFFFFFFFFFFF00 & (move << 8)  # top
+    rt = <unsigned long long>0x7F7F7F7F7F7F7F00 & (move << 7)  # right-top
+    r_ = <unsigned long long>0x7F7F7F7F7F7F7F7F & (move >> 1)  # right
+    rb = <unsigned long long>0x007F7F7F7F7F7F7F & (move >> 9)  # right-bottom
+    b_ = <unsigned long long>0x00FFFFFFFFFFFFFF & (move >> 8)  # bottom
+    lb = <unsigned long long>0x00FEFEFEFEFEFEFE & (move >> 7)  # left-bottom
+    l_ = <unsigned long long>0xFEFEFEFEFEFEFEFE & (move << 1)  # left
+    lt = <unsigned long long>0xFEFEFEFEFEFEFE00 & (move << 9)  # left-top
+    for i in range(6):
+        if t_ & opponent:
+            bf_t_ |= t_
+            t_ = <unsigned long long>0xFFFFFFFFFFFFFF00 & (t_ << 8)
+        if rt & opponent:
+            bf_rt |= rt
+            rt = <unsigned long long>0x7F7F7F7F7F7F7F00 & (rt << 7)
+        if r_ & opponent:
+            bf_r_ |= r_
+            r_ = <unsigned long long>0x7F7F7F7F7F7F7F7F & (r_ >> 1)
+        if rb & opponent:
+            bf_rb |= rb
+            rb = <unsigned long long>0x007F7F7F7F7F7F7F & (rb >> 9)
+        if b_ & opponent:
+            bf_b_ |= b_
+            b_ = <unsigned long long>0x00FFFFFFFFFFFFFF & (b_ >> 8)
+        if lb & opponent:
+            bf_lb |= lb
+            lb = <unsigned long long>0x00FEFEFEFEFEFEFE & (lb >> 7)
+        if l_ & opponent:
+            bf_l_ |= l_
+            l_ = <unsigned long long>0xFEFEFEFEFEFEFEFE & (l_ << 1)
+        if lt & opponent:
+            bf_lt |= lt
+            lt = <unsigned long long>0xFEFEFEFEFEFEFE00 & (lt << 9)
+    if t_ & player:
+        flippable_discs |= bf_t_
+    if rt & player:
+        flippable_discs |= bf_rt
+    if r_ & player:
+        flippable_discs |= bf_r_
+    if rb & player:
+        flippable_discs |= bf_rb
+    if b_ & player:
+        flippable_discs |= bf_b_
+    if lb & player:
+        flippable_discs |= bf_lb
+    if l_ & player:
+        flippable_discs |= bf_l_
+    if lt & player:
+        flippable_discs |= bf_lt
+    return flippable_discs
+
+
+cdef inline unsigned long long _shallow_popcount(unsigned long long bits) noexcept nogil:
+    """_shallow_popcount
+    """
+    bits = bits - ((bits >> 1) & <unsigned long long>0x5555555555555555)
+    bits = (bits & <unsigned long long>0x3333333333333333) + ((bits >> 2) & <unsigned long long>0x3333333333333333)
+    bits = (bits + (bits >> 4)) & <unsigned long long>0x0F0F0F0F0F0F0F0F
+    bits = bits + (bits >> 8)
+    bits = bits + (bits >> 16)
+    return (bits + (bits >> 32)) & <unsigned long long>0x000000000000007F
@@ -0,0 +1,40 @@
+# StatsCounter
+#
+#        探索カーネルの統計情報の計数(探索後にSearchStatsへ加算する)
+
+from libc.string cimport memset
+
+
+cdef enum:
+    STATS_MAX_PLY = 64  # ノード数を数える深さ(ルートからの手数)の上限
+
+
+cdef struct StatsCounter:
+    unsigned long long[STATS_MAX_PLY] nodes  # 深さごとの探索ノード数
+    unsigned long long leaves                # 末端で評価した局面数
+    unsigned long long cutoffs               # 枝刈りしたノード数
+    unsigned long long first_cutoffs         # 最初の手で枝刈りしたノード数
+    unsigned long long tt_probes             # 置換表の参照回数
+    unsigned long long tt_hits               # 置換表にエントリがあった回数
+
+
+cdef inline void init_stats_counter(StatsCounter* counter) noexcept nogil:
+    """init_stats_counter
+    """
+    memset(counter, 0, sizeof(StatsCounter))
+
+
+cdef inline void count_node(StatsCounter* counter, unsigned int ply) noexcept nogil:
+    """count_node
+    """
+    if ply >= STATS_MAX_PLY:
+        ply = STATS_MAX_PLY - 1
+    counter.nodes[ply] += 1
+
+
+cdef inline void count_cutoff(StatsCounter* counter, unsigned int index) noexcept nogil:
+    """count_cutoff
+    """
+    counter.cutoffs += 1
+    if not index:
+        counter.first_cutoffs += 1
@@ -0,0 +1,61 @@
+# TableScore
+#
+#        テーブルによる評価値の差分計算(着手位置と返した石のみ参照する)
+#        square_valuesはビット位置(最下位ビットが0)ごとのテーブル値
+
+
+cdef inline void set_square_values(signed int* square_values, table):
+    """set_square_values
+
+           8x8のテーブルをビット位置ごとの値に変換
+    """
+    cdef:
+        unsigned int x, y
+    for y in range(8):
+        for x in range(8):
+            square_values[63 - (y * 8 + x)] = <signed int>table[y][x]
+
+
+cdef inline unsigned int _square_index(unsigned long long bit) noexcept nogil:
+    """_square_index
+    """
+    bit -= 1
+    bit = bit - ((bit >> <unsigned int>1) & <unsigned long long>0x5555555555555555)
+    bit = (bit & <unsigned long long>0x3333333333333333) + ((bit >> <unsigned int>2) & <unsigned long long>0x3333333333333333)
+    bit = (bit + (bit >> <unsigned int>4)) & <unsigned long long>0x0F0F0F0F0F0F0F0F
+    bit = bit + (bit >> <unsigned int>8)
+    bit = bit + (bit >> <unsigned int>16)
+    return <unsigned int>((bit + (bit >> <unsigned int>32)) & <unsigned long long>0x000000000000007F)
+
+
+cdef inline signed int _get_bits_value(signed int* square_values, unsigned long long bits) noexcept nogil:
+    """_get_bits_value
+    """
+    cdef:
+        unsigned long long lsb
+        signed int value = 0
+    while bits:
+        lsb = bits & (~bits + 1)
+        value += square_values[_square_index(lsb)]
+        bits ^= lsb
+    return value
+
+
+cdef inline signed int get_table_score(signed int* square_values, unsigned long long b, unsigned long long w) noexcept nogil:
+    """get_table_score
+
+           盤面全体のテーブルによる評価値(+側黒優勢)
+    """
+    return _get_bits_value(square_values, b) - _get_bits_value(square_values, w)
+
+
+cdef inline signed int get_table_delta(signed int* square_values, unsigned int int_color, unsigned long long move, unsigned long long fd) noexcept nogil:
+    """get_table_delta
+
+           着手によるテーブルの評価値の変化量(返した石は相手の分を引いて自分の分を足す)
+    """
+    cdef:
+        signed int delta = square_values[_square_index(move)] + 2 * _get_bits_value(square_values, fd)
+    if int_color:
+        return delta
+    return -delta
@@ -0,0 +1,54 @@
+# TimeoutCheck
+#
+#        探索カーネルのタイムアウト判定(指定ノード数ごとに単調増加時計を参照する)
+
+from reversi.strategies.common.MonotonicClock cimport monotonic_time
+
+
+cdef enum:
+    TIMEOUT_CHECK_PERIOD_US = 1000    # 時計を参照する目標の周期(マイクロ秒)
+    TIMEOUT_CHECK_MAX_NODES = 65536   # 時計を参照するノード数の間隔の上限
+
+
+cdef struct TimeoutCheck:
+    double deadline        # 期限(単調増加時計の時刻)
+    double checked         # 前回時計を参照した時刻
+    unsigned int interval  # 時計を参照するノード数の間隔(0の場合は探索速度に合わせて調整)
+    unsigned int nodes     # 現在の間隔
+    unsigned int count     # 次に時計を参照するまでのノード数
+
+
+cdef inline void init_timeout_check(TimeoutCheck* check, double remaining, unsigned int interval) noexcept nogil:
+    """init_timeout_check
+    """
+    check.checked = monotonic_time()
+    check.deadline = check.checked + remaining
+    check.interval = interval
+    check.nodes = interval if interval else 1
+    check.count = 0  # 最初のノードでは必ず時計を参照する
+
+
+cdef inline bint is_timeout(TimeoutCheck* check) noexcept nogil:
+    """is_timeout
+    """
+    cdef double now, elapsed
+
+    if check.count:
+        check.count -= 1
+        return False
+
+    now = monotonic_time()
+    if now > check.deadline:
+        return True  # タイムアウト発生(以降のノードでも時計を参照する)
+
+    if not check.interval:
+        # 前回からの経過時間が目標の周期に近づくように間隔を調整する
+        elapsed = (now - check.checked) * 1000000
+        if elapsed < TIMEOUT_CHECK_PERIOD_US / 2 and check.nodes < TIMEOUT_CHECK_MAX_NODES:
+            check.nodes <<= 1
+        elif elapsed > TIMEOUT_CHECK_PERIOD_US * 2 and check.nodes > 1:
+            check.nodes >>= 1
+
+    check.checked = now
+    check.count = check.nodes - 1
+    return False
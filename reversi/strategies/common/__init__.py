@@ -1,13 +1,18 @@
 from ...strategies.common.cputime import CPU_TIME
-from ...strategies.common.timer import Timer
+from ...strategies.common.timer import Timer, TimeBudget
 from ...strategies.common.measure import Measure
+from ...strategies.common.timemanager import TimeManager
+from ...strategies.common.stats import SearchStats
 from ...strategies.common.abstract import AbstractStrategy, AbstractScorer, AbstractEvaluator, AbstractOrderer, AbstractSelector
 
 
 __all__ = [
     'CPU_TIME',
     'Timer',
+    'TimeBudget',
     'Measure',
+    'TimeManager',
+    'SearchStats',
     'AbstractStrategy',
     'AbstractScorer',
     'AbstractEvaluator',
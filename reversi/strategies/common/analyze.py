@@ -0,0 +1,59 @@
+"""Analyze
+"""
+
+from reversi.strategies.common import Timer
+
+
+def analyze(strategy, color, board, k=1, depth=None, time_limit=None):
+    """
+    上位k個の手と評価値と最善応手手順を求める
+    (最善手を除いた手で再探索を繰り返し、各手の評価値を全幅の窓で求める)
+
+    time_limitを指定した場合は制限時間内で深さを増やして読み、最後に読み切った深さの結果を返す
+    (深さ1は制限時間によらず読み切る)
+    """
+    moves = board.get_legal_moves(color)
+    k = min(k, len(moves))
+
+    if getattr(strategy, 'transposition_table', None) is not None:
+        strategy.transposition_table.new_search()  # 置換表は各再探索で共有する
+
+    if time_limit is None:
+        return _analyze(strategy, color, board, moves, k, strategy.depth if depth is None else depth, None)
+
+    pid = Timer.create_budget(Timer.get_pid(strategy), strategy._MIN, time_limit)  # 解析の時間予算を設定
+    empties = board.size**2 - board._black_score - board._white_score
+    result = _analyze(strategy, color, board, moves, k, 1, None)  # タイムアウト時の値を返さないよう、深さ1は時間によらず読み切る
+    depth = 2 if depth is None else max(depth, 2)
+
+    while depth <= empties and pid.remaining() > 0:  # 最後まで読んだ場合、または時間切れの場合は打ち切る
+        ret = _analyze(strategy, color, board, moves, k, depth, pid)
+
+        if Timer.is_timeout(pid):  # タイムアウト発生時、読み切っていない結果は使わない
+            break
+
+        result = ret
+        depth += 1
+
+    return result
+
+
+def _analyze(strategy, color, board, moves, k, depth, pid):
+    """
+    最善手を除いて再探索し、評価値の高い順に(手, 評価値, 最善応手手順)を返す
+    """
+    result, moves = [], list(moves)
+
+    for _ in range(k):
+        best_move, scores = strategy.get_best_move(color, board, moves, depth, pid)
+        if best_move is None or best_move not in scores:
+            break
+
+        result.append((best_move, scores[best_move], list(getattr(strategy, 'pv', [best_move]))))
+
+        if Timer.is_timeout(pid):
+            break
+
+        moves.remove(best_move)
+
+    return result
@@ -4,15 +4,17 @@
 """
 
 import time
-import os
+
+from reversi.strategies.common.timer import Timer, PidDict
 
 
 class Measure:
     """
     計測
+    (インスタンスごとの計測値はインスタンスの破棄とともに削除する)
     """
-    elp_time = {}
-    count = {}
+    elp_time = PidDict()
+    count = PidDict()
 
     @classmethod
     def time(cls, func):
@@ -20,7 +22,7 @@ class Measure:
         時間計測
         """
         def wrapper(*args, **kwargs):
-            key = args[0].__class__.__name__ + str(os.getpid())
+            key = Timer.get_pid(args[0])  # インスタンスごとに計測
 
             if key not in Measure.elp_time:
                 Measure.elp_time[key] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
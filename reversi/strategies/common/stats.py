@@ -0,0 +1,101 @@
+"""SearchStats
+"""
+
+import time
+
+
+class SearchStats:
+    """
+    探索の統計情報
+    (ノード数や枝刈りの回数は盤面サイズ8の探索でのみ計測する)
+    """
+    def __init__(self):
+        self.nodes_by_depth = {}     # 深さ(ルートからの手数)ごとの探索ノード数
+        self.leaf_evaluations = 0    # 末端で評価した局面数
+        self.cutoffs = 0             # 枝刈りしたノード数
+        self.first_move_cutoffs = 0  # 最初の手で枝刈りしたノード数
+        self.tt_probes = 0           # 置換表の参照回数
+        self.tt_hits = 0             # 置換表にエントリがあった回数
+        self.timeouts = 0            # タイムアウトした探索の回数
+        self.depth = None            # 読んだ深さ
+        self.elapsed = 0             # 経過時間(s)
+        self.start_time = None       # 計測開始時刻
+
+    @property
+    def nodes(self):
+        """
+        探索ノード数
+        """
+        return sum(self.nodes_by_depth.values())
+
+    @property
+    def nps(self):
+        """
+        1秒あたりの探索ノード数
+        """
+        return self.nodes / self.elapsed if self.elapsed else 0
+
+    @property
+    def first_move_cutoff_rate(self):
+        """
+        枝刈りのうち最初の手で枝刈りした割合(手の並び替えの精度)
+        """
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0
+
+    @property
+    def tt_hit_rate(self):
+        """
+        置換表のヒット率
+        """
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0
+
+    def start(self):
+        """
+        計測開始
+        """
+        self.start_time = time.perf_counter()
+
+    def end(self, depth, timeout=False):
+        """
+        計測終了
+        """
+        if self.start_time is not None:
+            self.elapsed += time.perf_counter() - self.start_time
+            self.start_time = None
+        self.depth = depth
+        if timeout:
+            self.timeouts += 1
+
+    def add(self, counter):
+        """
+        探索カーネルの計数値を加算
+        """
+        for ply, nodes in enumerate(counter['nodes']):
+            if nodes:
+                self.nodes_by_depth[ply] = self.nodes_by_depth.get(ply, 0) + nodes
+        self.leaf_evaluations += counter['leaves']
+        self.cutoffs += counter['cutoffs']
+        self.first_move_cutoffs += counter['first_cutoffs']
+        self.tt_probes += counter['tt_probes']
+        self.tt_hits += counter['tt_hits']
+
+    def to_dict(self):
+        """
+        辞書形式で取得
+        """
+        return {
+            'nodes': self.nodes,
+            'nodes_by_depth': dict(self.nodes_by_depth),
+            'leaf_evaluations': self.leaf_evaluations,
+            'cutoffs': self.cutoffs,
+            'first_move_cutoff_rate': self.first_move_cutoff_rate,
+            'tt_probes': self.tt_probes,
+            'tt_hits': self.tt_hits,
+            'timeouts': self.timeouts,
+            'depth': self.depth,
+            'elapsed': self.elapsed,
+            'nps': self.nps,
+        }
+
+    def __repr__(self):
+        return 'SearchStats(' + ', '.join([key + '=' + str(value) for key, value in self.to_dict().items() if key != 'nodes_by_depth']) + ')'
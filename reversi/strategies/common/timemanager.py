@@ -0,0 +1,86 @@
+"""TimeManager
+"""
+
+import time
+
+
+class TimeManager:
+    """
+    持ち時間の管理
+    (対局全体の持ち時間と一手ごとの加算時間から、一手の思考時間を配分する)
+    """
+    def __init__(self, total=60, increment=0, margin=0.05, max_ratio=3, stable_depth=3, stable_ratio=0.3, instability=0.5, swing=10, next_ratio=0.5, min_time=0.01):  # noqa: E501
+        self.total = total                # 対局全体の持ち時間(s)
+        self.increment = increment        # 一手ごとの加算時間(s)
+        self.margin = margin              # 時間切れを防ぐために残しておく持ち時間の割合
+        self.max_ratio = max_ratio        # 基本の配分時間に対する上限の倍率
+        self.stable_depth = stable_depth  # 最善手が変わらなければ打ち切る反復の回数
+        self.stable_ratio = stable_ratio  # 最善手が安定した場合に打ち切る配分時間の割合
+        self.instability = instability    # 最善手や評価値が変動した場合に配分時間を延ばす割合
+        self.swing = swing                # 評価値の変動が大きいとみなす幅
+        self.next_ratio = next_ratio      # 次の反復を始めない配分時間の割合(次の反復は時間がかかるため)
+        self.min_time = min_time          # 一手の最小の思考時間(s)
+        self.reset()
+
+    def reset(self):
+        """
+        対局開始時の状態にする
+        """
+        self.remaining = self.total  # 残りの持ち時間
+        self.empties = None          # 直前の手番の空きマス数
+        self.start_time = None       # 思考開始時刻
+        self.target = None           # 目標の思考時間
+        self.limit = None            # 上限の思考時間
+        self.best_move = None        # 直前の反復の最善手
+        self.score = None            # 直前の反復の評価値
+        self.stable = 0              # 最善手が変わらなかった反復の回数
+
+    def start(self, board, moves):
+        """
+        思考開始(上限の思考時間を返す)
+        """
+        empties = board.size**2 - board._black_score - board._white_score
+        if self.empties is not None and empties > self.empties:
+            self.reset()  # 空きマスが増えた場合は新しい対局とみなす
+        self.empties = empties
+        self.start_time = time.time()
+        self.best_move, self.score, self.stable = None, None, 0
+
+        usable = self.remaining * (1 - self.margin)
+        if len(moves) <= 1:
+            self.target = self.limit = min(self.min_time, max(usable, 0))  # 手の選択肢がない場合は読まない
+            return self.limit
+
+        # 残りの自分の手数で均等に配分し、変動に応じて上限まで延長する
+        base = usable / max((empties + 1) // 2, 1) + self.increment
+        self.limit = max(min(base * self.max_ratio, usable), self.min_time)
+        self.target = max(min(base, self.limit), self.min_time)
+
+        return self.limit
+
+    def is_enough(self, best_move, score):
+        """
+        反復ごとの思考終了判定
+        """
+        elapsed = time.time() - self.start_time
+
+        if best_move == self.best_move and (self.score is None or abs(score - self.score) < self.swing):
+            self.stable += 1
+        else:
+            if self.best_move is not None:
+                self.target = min(self.target * (1 + self.instability), self.limit)  # 変動した場合は延長する
+            self.stable = 0
+        self.best_move, self.score = best_move, score
+
+        if self.stable >= self.stable_depth and elapsed >= self.target * self.stable_ratio:
+            return True  # 最善手が安定したため打ち切る
+
+        return elapsed >= self.target * self.next_ratio
+
+    def end(self):
+        """
+        思考終了(消費した時間を持ち時間から差し引く)
+        """
+        if self.start_time is not None:
+            self.remaining += self.increment - (time.time() - self.start_time)
+            self.start_time = None
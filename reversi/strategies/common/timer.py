@@ -3,34 +3,115 @@
 
 import time
 import os
+import weakref
+from collections.abc import MutableMapping
 
 from reversi.strategies.common import CPU_TIME
 
 
+class _ProcessId:
+    """
+    プロセスID
+    (インスタンスごとに生成し、そのインスタンスの直近の時間予算を持つ)
+    """
+    def __init__(self, name):
+        self.name = name          # 表示名
+        self.time_budget = None   # 直近の時間予算
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return self.name
+
+
+class PidDict(MutableMapping):
+    """
+    プロセスIDをキーとする辞書
+    (インスタンスごとのプロセスIDは弱参照で保持し、インスタンスの破棄とともに削除する。時間予算はそのプロセスIDのキーとして扱う)
+    """
+    def __init__(self):
+        self._weak = weakref.WeakKeyDictionary()
+        self._data = {}
+
+    def _select(self, key):
+        """
+        キーに応じた格納先を選択
+        """
+        if isinstance(key, TimeBudget):
+            key = key.pid
+
+        return (self._weak if isinstance(key, _ProcessId) else self._data), key
+
+    def __getitem__(self, key):
+        data, key = self._select(key)
+        return data[key]
+
+    def __setitem__(self, key, value):
+        data, key = self._select(key)
+        data[key] = value
+
+    def __delitem__(self, key):
+        data, key = self._select(key)
+        del data[key]
+
+    def __contains__(self, key):
+        data, key = self._select(key)
+        return key in data
+
+    def __iter__(self):
+        yield from list(self._data)
+        yield from list(self._weak)
+
+    def __len__(self):
+        return len(self._data) + len(self._weak)
+
+
 class Timer:
     """
     タイマー
+    (探索は引数で渡された時間予算(TimeBudget)を参照する。プロセスIDはそのインスタンスの直近の時間予算を持つ)
     """
-    deadline = {}
-    timeout_flag = {}
-    timeout_value = {}
     time_limit = CPU_TIME
+    _pids = weakref.WeakKeyDictionary()  # インスタンスごとのプロセスID
 
     @classmethod
     def get_pid(cls, obj):
         """
-        プロセスID取得
+        プロセスID取得(同じクラスでもインスタンスごとに異なり、インスタンスの破棄とともに解放される)
+        """
+        pid = Timer._pids.get(obj)
+        if pid is None:
+            pid = Timer._pids[obj] = _ProcessId(obj.__class__.__name__ + str(os.getpid()))
+
+        return pid
+
+    @classmethod
+    def set_deadline(cls, pid, value, time_limit=None):
+        """
+        期限を設定(time_limitの省略時はTimer.time_limitを使用)
+        """
+        cls.create_budget(pid, value, time_limit)
+
+    @classmethod
+    def create_budget(cls, pid, value, time_limit=None):
+        """
+        時間予算を生成(time_limitの省略時はTimer.time_limitを使用)
         """
-        return obj.__class__.__name__ + str(os.getpid())
+        budget = TimeBudget(pid, value, time_limit=Timer.time_limit if time_limit is None else time_limit)
+        if isinstance(pid, _ProcessId):
+            pid.time_budget = budget  # 探索後のタイムアウト発生有無の確認用
+        return budget
 
     @classmethod
-    def set_deadline(cls, pid, value):
+    def get_budget(cls, obj, budget=None):
         """
-        期限を設定
+        引数で渡された時間予算を取得(タイマーなしの場合はプロセスID)
         """
-        Timer.deadline[pid] = time.time() + Timer.time_limit  # デッドラインを設定する
-        Timer.timeout_flag[pid] = False                       # タイムアウト未発生
-        Timer.timeout_value[pid] = value                      # タイムアウト発生時の値を設定する
+        if isinstance(budget, TimeBudget):
+            return budget
+
+        return cls.get_pid(obj)
 
     @classmethod
     def start(cls, value):
@@ -39,8 +120,8 @@ class Timer:
         """
         def _start(func):
             def wrapper(*args, **kwargs):
-                pid = cls.get_pid(args[0])
-                cls.set_deadline(pid, value)
+                if not isinstance(kwargs.get('budget'), TimeBudget):
+                    kwargs['budget'] = cls.create_budget(cls.get_pid(args[0]), value)  # インスタンスごとの時間予算を引数で渡す
                 return func(*args, **kwargs)
             return wrapper
         return _start
@@ -54,18 +135,124 @@ class Timer:
             if 'pid' in kwargs:
                 pid = kwargs['pid']
                 if pid:
-                    if time.time() > Timer.deadline[pid]:
-                        Timer.timeout_flag[pid] = True  # タイムアウト発生
-                        return Timer.timeout_value[pid]
+                    if cls.is_expired(pid):
+                        return cls.get_timeout_value(pid)
             return func(*args, **kwargs)
         return wrapper
 
+    @classmethod
+    def is_expired(cls, pid):
+        """
+        期限切れの判定(時間予算のノード数の間隔ごとに時計を参照する)
+        """
+        budget = cls._get_time_budget(pid)
+        if budget is not None:
+            return budget.is_expired()
+
+        return False
+
     @classmethod
     def is_timeout(cls, pid):
         """
         タイムアウト発生有無
         """
-        if pid in Timer.timeout_flag:
-            return Timer.timeout_flag[pid]
+        budget = cls._get_time_budget(pid)
+        if budget is not None:
+            return budget.timeout_flag
 
         return False
+
+    @classmethod
+    def set_timeout(cls, pid):
+        """
+        タイムアウト発生を設定
+        """
+        budget = cls._get_time_budget(pid)
+        if budget is not None:
+            budget.timeout_flag = True
+
+    @classmethod
+    def get_deadline(cls, pid):
+        """
+        期限を取得(未設定の場合はNone)
+        """
+        budget = cls._get_time_budget(pid)
+        if budget is not None:
+            return budget.deadline
+
+        return None
+
+    @classmethod
+    def get_timeout_value(cls, pid):
+        """
+        タイムアウト発生時の値を取得(未設定の場合はNone)
+        """
+        budget = cls._get_time_budget(pid)
+        if budget is not None:
+            return budget.timeout_value
+
+        return None
+
+    @classmethod
+    def _get_time_budget(cls, pid):
+        """
+        時間予算を取得(プロセスIDの場合はそのインスタンスの直近の時間予算)
+        """
+        if isinstance(pid, TimeBudget):
+            return pid
+
+        if isinstance(pid, _ProcessId):
+            return pid.time_budget
+
+        return None
+
+
+class TimeBudget:
+    """
+    時間予算
+    (探索ごとの期限(単調増加時計の時刻)とタイムアウト状態を持つ。計測ではプロセスIDのキーとして扱う)
+    """
+    check_period = 0.001    # 時計を参照する目標の周期(秒)
+    check_max_nodes = 1024  # 時計を参照するノード数の間隔の上限
+
+    def __init__(self, pid, timeout_value=0, time_limit=None, deadline=None):
+        now = time.monotonic()
+        if deadline is None:
+            deadline = now + (Timer.time_limit if time_limit is None else time_limit)
+        self.pid = pid                      # プロセスID
+        self.deadline = deadline            # 期限
+        self.timeout_value = timeout_value  # タイムアウト発生時の値
+        self.timeout_flag = False           # タイムアウト発生有無
+        self.checked = now                  # 前回時計を参照した時刻
+        self.nodes = 1                      # 時計を参照するノード数の間隔
+        self.count = 0                      # 次に時計を参照するまでのノード数(最初のノードでは必ず時計を参照する)
+
+    def is_expired(self):
+        """
+        期限切れの判定(期限切れの場合はタイムアウト発生とする)
+        """
+        if self.count:
+            self.count -= 1
+            return False
+
+        now = time.monotonic()
+        if now > self.deadline:
+            self.timeout_flag = True  # タイムアウト発生(以降のノードでも時計を参照する)
+            return True
+
+        # 前回からの経過時間が目標の周期に近づくように間隔を調整する
+        elapsed = now - self.checked
+        if elapsed < self.check_period / 2 and self.nodes < self.check_max_nodes:
+            self.nodes <<= 1
+        elif elapsed > self.check_period * 2 and self.nodes > 1:
+            self.nodes >>= 1
+
+        self.checked = now
+        self.count = self.nodes - 1
+        return False
+
+    def remaining(self):
+        """
+        残り時間
+        """
+        return self.deadline - time.monotonic()
@@ -0,0 +1,56 @@
+cdef class CyEvaluator:
+    cdef:
+        unsigned int has_table        # テーブルによる評価値を使う場合1(探索カーネルが差分更新する)
+        signed int[64] square_values  # ビット位置ごとのテーブル値
+    cpdef double evaluate_bits(self, unsigned int int_color, unsigned long long b, unsigned long long w, unsigned int bs, unsigned int ws, unsigned int pb, unsigned int pw, unsigned long long fd)
+    cdef double _evaluate(self, unsigned int int_color, unsigned long long b, unsigned long long w, unsigned int bs, unsigned int ws, unsigned int pb, unsigned int pw, unsigned long long fd, signed int ts) noexcept nogil
+
+
+cdef class CyEvaluator_N(CyEvaluator):
+    pass
+
+
+cdef class CyEvaluator_TPW(CyEvaluator):
+    cdef:
+        signed int wp
+        signed int ww
+
+
+cdef class CyEvaluator_TPWE(CyEvaluator_TPW):
+    cdef:
+        signed int we
+
+
+cdef enum:
+    PATTERN_MAX_INSTANCES = 64  # パターンを当てはめる位置の数の上限
+    PATTERN_MAX_SQUARES = 10    # パターンの升目の数の上限
+
+
+cdef class CyEvaluator_Pattern(CyEvaluator):
+    cdef:
+        const short[::1] weights
+        unsigned int stages
+        unsigned int size
+        signed int ww
+        unsigned int count
+        unsigned int[PATTERN_MAX_INSTANCES] offsets
+        unsigned int[PATTERN_MAX_INSTANCES] lengths
+        unsigned long long[PATTERN_MAX_INSTANCES][PATTERN_MAX_SQUARES] masks
+
+
+cdef enum:
+    CORNER_LEVELS = 5      # 隅のパターンの段階数
+    CORNER_MAX_MASKS = 15  # 段階ごとのパターンの数の上限
+
+
+cdef class CyEvaluator_Compiled(CyEvaluator):
+    cdef:
+        unsigned int has_winlose
+        signed int ww
+        double wp, wo, wn, we, wc, wb1, wb2, wb3, wec1, wec2, wst
+        unsigned int[CORNER_LEVELS] corner_counts
+        unsigned long long[CORNER_LEVELS][4][CORNER_MAX_MASKS] corner_masks
+        signed int[CORNER_LEVELS][CORNER_MAX_MASKS] corner_weights
+
+    cdef signed int _get_c(self, unsigned long long b, unsigned long long w) noexcept nogil
+    cdef signed int _get_corner_level(self, unsigned long long b, unsigned long long w, unsigned int level, unsigned int index) noexcept nogil
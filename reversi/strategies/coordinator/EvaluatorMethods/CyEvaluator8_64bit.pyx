@@ -0,0 +1,413 @@
+#cython: language_level=3, profile=False, boundscheck=False, wraparound=False, initializedcheck=False, cdivision=True
+"""CyEvaluator8_64bit
+
+       探索カーネルから盤面オブジェクトを介さずに呼び出せる評価関数(Size8,64bit)
+"""
+
+from reversi.strategies.common.TableScore cimport set_square_values, get_table_score
+from reversi.BitBoardMethods.StableDiscs cimport get_stable_discs_bits_size8_64bit
+from reversi.strategies.coordinator.EvaluatorMethods.Pattern import PATTERN_SIZE, PATTERN_INSTANCES
+
+
+cdef:
+    signed int[256] edge_table8 = [
+        0, 0, 0, 1, 0, 0, 0, 2,
+        0, 0, 0, 1, 0, 0, 0, 3,
+        0, 0, 0, 1, 0, 0, 0, 2,
+        0, 0, 0, 1, 0, 0, 0, 4,
+        0, 0, 0, 1, 0, 0, 0, 2,
+        0, 0, 0, 1, 0, 0, 0, 3,
+        0, 0, 0, 1, 0, 0, 0, 2,
+        0, 0, 0, 1, 0, 0, 0, 5,
+        0, 0, 0, 1, 0, 0, 0, 2,
+        0, 0, 0, 1, 0, 0, 0, 3,
+        0, 0, 0, 1, 0, 0, 0, 2,
+        0, 0, 0, 1, 0, 0, 0, 4,
+        0, 0, 0, 1, 0, 0, 0, 2,
+        0, 0, 0, 1, 0, 0, 0, 3,
+        0, 0, 0, 1, 0, 0, 0, 2,
+        0, 0, 0, 1, 0, 0, 0, 6,
+        0, 0, 0, 1, 0, 0, 0, 2,
+        0, 0, 0, 1, 0, 0, 0, 3,
+        0, 0, 0, 1, 0, 0, 0, 2,
+        0, 0, 0, 1, 0, 0, 0, 4,
+        0, 0, 0, 1, 0, 0, 0, 2,
+        0, 0, 0, 1, 0, 0, 0, 3,
+        0, 0, 0, 1, 0, 0, 0, 2,
+        0, 0, 0, 1, 0, 0, 0, 5,
+        1, 1, 1, 2, 1, 1, 1, 3,
+        1, 1, 1, 2, 1, 1, 1, 4,
+        1, 1, 1, 2, 1, 1, 1, 3,
+        1, 1, 1, 2, 1, 1, 1, 5,
+        2, 2, 2, 3, 2, 2, 2, 4,
+        2, 2, 2, 3, 2, 2, 2, 5,
+        3, 3, 3, 4, 3, 3, 3, 5,
+        4, 4, 4, 5, 5, 5, 6, 13
+    ]
+
+
+cdef class CyEvaluator:
+    """CyEvaluator
+
+           ビットボード/石数/着手可能数/直前に返した石/テーブルによる評価値から評価値(+側黒優勢)を算出する
+           (テーブルによる評価値は探索カーネルが着手と取り消しに合わせて差分更新したものを受け取る)
+    """
+    cpdef double evaluate_bits(self, unsigned int int_color, unsigned long long b, unsigned long long w, unsigned int bs, unsigned int ws, unsigned int pb, unsigned int pw, unsigned long long fd):
+        cdef:
+            signed int ts = 0
+        if self.has_table:
+            ts = get_table_score(self.square_values, b, w)
+        return self._evaluate(int_color, b, w, bs, ws, pb, pw, fd, ts)
+
+    cdef double _evaluate(self, unsigned int int_color, unsigned long long b, unsigned long long w, unsigned int bs, unsigned int ws, unsigned int pb, unsigned int pw, unsigned long long fd, signed int ts) noexcept nogil:
+        # 探索カーネルからGILを解放したまま呼び出す(派生クラスで実装する)
+        return <double>0
+
+
+cdef class CyEvaluator_N(CyEvaluator):
+    """CyEvaluator_N
+
+           盤面の評価値を石数で算出
+    """
+    cdef double _evaluate(self, unsigned int int_color, unsigned long long b, unsigned long long w, unsigned int bs, unsigned int ws, unsigned int pb, unsigned int pw, unsigned long long fd, signed int ts) noexcept nogil:
+        return <double>(<signed int>bs - <signed int>ws)
+
+
+cdef class CyEvaluator_TPW(CyEvaluator):
+    """CyEvaluator_TPW
+
+           盤面の評価値をTable+配置可能数+勝敗で算出
+    """
+    def __init__(self, table, wp, ww):
+        self.wp = wp
+        self.ww = ww
+        self.has_table = 1
+        set_square_values(self.square_values, table)  # ビット位置ごとのテーブル値
+
+    cdef double _evaluate(self, unsigned int int_color, unsigned long long b, unsigned long long w, unsigned int bs, unsigned int ws, unsigned int pb, unsigned int pw, unsigned long long fd, signed int ts) noexcept nogil:
+        # 勝敗が決まっている場合
+        if not pb and not pw:
+            return <double>_get_w(bs, ws, self.ww)
+        return <double>(ts + (<signed int>pb - <signed int>pw) * self.wp)
+
+
+cdef class CyEvaluator_TPWE(CyEvaluator_TPW):
+    """CyEvaluator_TPWE
+
+           盤面の評価値をTable+配置可能数+勝敗+辺のパターンで算出
+    """
+    def __init__(self, table, wp, ww, we):
+        super().__init__(table, wp, ww)
+        self.we = we
+
+    cdef double _evaluate(self, unsigned int int_color, unsigned long long b, unsigned long long w, unsigned int bs, unsigned int ws, unsigned int pb, unsigned int pw, unsigned long long fd, signed int ts) noexcept nogil:
+        # 勝敗が決まっている場合
+        if not pb and not pw:
+            return <double>_get_w(bs, ws, self.ww)
+        return <double>(ts + (<signed int>pb - <signed int>pw) * self.wp + _get_e(b, w) * self.we)
+
+
+cdef class CyEvaluator_Pattern(CyEvaluator):
+    """CyEvaluator_Pattern
+
+           盤面の評価値をパターンごとの重み(局面の進行度別)+勝敗で算出
+    """
+    def __init__(self, weights, stages, ww):
+        cdef:
+            unsigned int i, j
+        self.weights = weights
+        self.stages = stages
+        self.size = PATTERN_SIZE
+        self.ww = ww
+        # パターンを当てはめる位置ごとの重みの開始位置と升目
+        self.count = len(PATTERN_INSTANCES)
+        for i, (offset, masks) in enumerate(PATTERN_INSTANCES):
+            self.offsets[i] = offset
+            self.lengths[i] = len(masks)
+            for j, mask in enumerate(masks):
+                self.masks[i][j] = mask
+
+    cdef double _evaluate(self, unsigned int int_color, unsigned long long b, unsigned long long w, unsigned int bs, unsigned int ws, unsigned int pb, unsigned int pw, unsigned long long fd, signed int ts) noexcept nogil:
+        cdef:
+            unsigned int i, j, index, discs = bs + ws
+            signed int score = 0
+            const short* weights
+        # 勝敗が決まっている場合
+        if not pb and not pw:
+            return <double>_get_w(bs, ws, self.ww)
+        # 局面の進行度に応じた重みを3進数のインデックスで参照
+        discs = discs - 4 if discs > 4 else 0
+        weights = &self.weights[(discs * self.stages // 61) * self.size]
+        for i in range(self.count):
+            index = 0
+            for j in range(self.lengths[i]):
+                index *= 3
+                if b & self.masks[i][j]:
+                    index += 1
+                elif w & self.masks[i][j]:
+                    index += 2
+            score += weights[self.offsets[i] + index]
+        return <double>score
+
+
+cdef class CyEvaluator_Compiled(CyEvaluator):
+    """CyEvaluator_Compiled
+
+           Evaluatorの組み込みScorerの組み合わせを1つの関数で算出(重みが0の項目は算出しない)
+    """
+    def __init__(self, table=None, ww=None, wp=0, wo=0, wn=0, we=0, wc=0, wb1=0, wb2=0, wb3=0, wec1=0, wec2=0, wst=0, corner=None):
+        cdef:
+            unsigned int level, index, i
+        if table is not None:
+            self.has_table = 1
+            set_square_values(self.square_values, table)  # ビット位置ごとのテーブル値
+        if ww is not None:
+            self.has_winlose = 1
+            self.ww = ww
+        self.wp, self.wo, self.wn, self.we, self.wc = wp, wo, wn, we, wc
+        self.wb1, self.wb2, self.wb3 = wb1, wb2, wb3
+        self.wec1, self.wec2 = wec1, wec2
+        self.wst = wst
+        # 隅のパターン(CornerScorerと同じ並び)
+        if corner is not None:
+            for level, (maskvalues, weights) in enumerate(corner):
+                self.corner_counts[level] = len(weights)
+                for i, weight in enumerate(weights):
+                    self.corner_weights[level][i] = weight
+                for index in range(4):
+                    for i, maskvalue in enumerate(maskvalues[index]):
+                        self.corner_masks[level][index][i] = maskvalue
+
+    cdef double _evaluate(self, unsigned int int_color, unsigned long long b, unsigned long long w, unsigned int bs, unsigned int ws, unsigned int pb, unsigned int pw, unsigned long long fd, signed int ts) noexcept nogil:
+        cdef:
+            double score = 0
+        # 勝敗が決まっている場合
+        if self.has_winlose and not pb and not pw:
+            return <double>_get_w(bs, ws, self.ww)
+        if self.has_table:
+            score += ts
+        if self.wp:
+            score += (<signed int>pb - <signed int>pw) * self.wp
+        if self.wo:
+            score += _get_o(b, w, fd) * self.wo
+        if self.wn:
+            score += (<signed int>bs - <signed int>ws) * self.wn
+        if self.we:
+            score += _get_e(b, w) * self.we
+        if self.wc:
+            score += self._get_c(b, w) * self.wc
+        if self.wb1 or self.wb2 or self.wb3:
+            score += _get_b(b, w, self.wb1, self.wb2, self.wb3)
+        if self.wec1 or self.wec2:
+            score += _get_ec(b, w, self.wec1, self.wec2)
+        if self.wst:
+            score += (<signed int>_popcount(get_stable_discs_bits_size8_64bit(b, b, w, 0)) - <signed int>_popcount(get_stable_discs_bits_size8_64bit(w, b, w, 0))) * self.wst
+        return score
+
+    cdef signed int _get_c(self, unsigned long long b, unsigned long long w) noexcept nogil:
+        """隅のパターンによる評価値(重み無し)
+        """
+        cdef:
+            unsigned int index, level
+            signed int score = 0, corner_score, tmp_score
+        for index in range(4):
+            corner_score = self._get_corner_level(b, w, 0, index)  # Level1
+            if corner_score:
+                for level in range(CORNER_LEVELS-1, 0, -1):  # Level5から順に一致するものを探す
+                    tmp_score = self._get_corner_level(b, w, level, index)
+                    if tmp_score:
+                        corner_score = tmp_score
+                        break
+            score += corner_score
+        return score
+
+    cdef signed int _get_corner_level(self, unsigned long long b, unsigned long long w, unsigned int level, unsigned int index) noexcept nogil:
+        """隅のパターンのうち最初に一致したものの重み(黒+、白-)
+        """
+        cdef:
+            unsigned int i
+            unsigned long long maskvalue
+        for i in range(self.corner_counts[level]):
+            maskvalue = self.corner_masks[level][index][i]
+            if (b & maskvalue) == maskvalue:
+                return self.corner_weights[level][i]
+            if (w & maskvalue) == maskvalue:
+                return -self.corner_weights[level][i]
+        return 0
+
+
+cdef inline signed int _get_w(unsigned int bs, unsigned int ws, signed int ww) noexcept nogil:
+    """勝敗による評価値
+    """
+    cdef:
+        signed int score = <signed int>bs - <signed int>ws
+    if score > 0:    # 黒が勝った
+        score += ww
+    elif score < 0:  # 白が勝った
+        score -= ww
+    return score
+
+
+cdef inline signed int _get_e(unsigned long long b, unsigned long long w) noexcept nogil:
+    """辺の確定石による評価値(重み無し)
+    """
+    cdef:
+        signed int score = 0
+    # 四隅のどこかに石がある場合のみ
+    if not (b | w) & <unsigned long long>0x8100000000000081:
+        return score
+    score += edge_table8[b >> 56] - edge_table8[w >> 56]                          # 上辺
+    score += edge_table8[b & 0xFF] - edge_table8[w & 0xFF]                        # 下辺
+    score += edge_table8[_get_left_edge(b)] - edge_table8[_get_left_edge(w)]      # 左辺
+    score += edge_table8[_get_right_edge(b)] - edge_table8[_get_right_edge(w)]    # 右辺
+    return score
+
+
+cdef inline unsigned long long _get_left_edge(unsigned long long bits) noexcept nogil:
+    """左辺を上から順に8bitへ詰める
+    """
+    return (((bits & <unsigned long long>0x8080808080808080) >> 7) * <unsigned long long>0x0102040810204080) >> 56
+
+
+cdef inline unsigned long long _get_right_edge(unsigned long long bits) noexcept nogil:
+    """右辺を上から順に8bitへ詰める
+    """
+    return ((bits & <unsigned long long>0x0101010101010101) * <unsigned long long>0x0102040810204080) >> 56
+
+
+cdef inline signed int _get_o(unsigned long long b, unsigned long long w, unsigned long long fd) noexcept nogil:
+    """直前に返した石の開放度(周囲8方向の空きマスの数の合計)
+    """
+    cdef:
+        unsigned long long blank = ~(b | w)
+    return <signed int>(
+        _popcount(blank & ((fd << 1) & <unsigned long long>0xFEFEFEFEFEFEFEFE)) +  # 左
+        _popcount(blank & ((fd >> 1) & <unsigned long long>0x7F7F7F7F7F7F7F7F)) +  # 右
+        _popcount(blank & (fd << 8)) +                                             # 上
+        _popcount(blank & (fd >> 8)) +                                             # 下
+        _popcount(blank & ((fd << 9) & <unsigned long long>0xFEFEFEFEFEFEFEFE)) +  # 左上
+        _popcount(blank & ((fd << 7) & <unsigned long long>0x7F7F7F7F7F7F7F7F)) +  # 右上
+        _popcount(blank & ((fd >> 7) & <unsigned long long>0xFEFEFEFEFEFEFEFE)) +  # 左下
+        _popcount(blank & ((fd >> 9) & <unsigned long long>0x7F7F7F7F7F7F7F7F))    # 右下
+    )
+
+
+cdef inline double _get_b(unsigned long long black, unsigned long long white, double w1, double w2, double w3) noexcept nogil:
+    """空きマスに接する石のパターンによる評価値(BlankScorerと同じ)
+    """
+    cdef:
+        double score = 0
+        unsigned int i
+        unsigned long long blackwhite = black | white, not_blackwhite = ~(black | white)
+        unsigned long long horizontal, vertical, diagonal
+        unsigned long long l_blank, r_blank, t_blank, b_blank, lt_blank, rt_blank, lb_blank, rb_blank
+        unsigned long long lt_x, rt_x, lb_x, rb_x
+        unsigned long long lt_r, lt_b, rt_l, rt_b, lb_t, lb_r, rb_t, rb_l
+        signed int lt_r_sign = 1, lt_b_sign = 1, rt_l_sign = 1, rt_b_sign = 1, lb_t_sign = 1, lb_r_sign = 1, rb_t_sign = 1, rb_l_sign = 1
+    horizontal = blackwhite & <unsigned long long>0x7E7E7E7E7E7E7E7E  # 左右チェック用マスク
+    vertical = blackwhite & <unsigned long long>0x00FFFFFFFFFFFF00    # 上下チェック用マスク
+    diagonal = blackwhite & <unsigned long long>0x007E7E7E7E7E7E00    # 斜めチェック用マスク
+    # 各方向に空きがある石
+    l_blank = horizontal & ((horizontal << 1) & not_blackwhite) >> 1
+    r_blank = horizontal & ((horizontal >> 1) & not_blackwhite) << 1
+    t_blank = vertical & ((vertical << 8) & not_blackwhite) >> 8
+    b_blank = vertical & ((vertical >> 8) & not_blackwhite) << 8
+    lt_blank = diagonal & ((diagonal << 9) & not_blackwhite) >> 9
+    rt_blank = diagonal & ((diagonal << 7) & not_blackwhite) >> 7
+    lb_blank = diagonal & ((diagonal >> 7) & not_blackwhite) << 7
+    rb_blank = diagonal & ((diagonal >> 9) & not_blackwhite) << 9
+    # w1の計算
+    if w1:
+        score += w1 * (<signed int>(_popcount(l_blank & black) + _popcount(r_blank & black) + _popcount(t_blank & black) + _popcount(b_blank & black) + _popcount(lt_blank & black) + _popcount(rt_blank & black) + _popcount(lb_blank & black) + _popcount(rb_blank & black)) - <signed int>(_popcount(l_blank & white) + _popcount(r_blank & white) + _popcount(t_blank & white) + _popcount(b_blank & white) + _popcount(lt_blank & white) + _popcount(rt_blank & white) + _popcount(lb_blank & white) + _popcount(rb_blank & white)))  # noqa: E501
+    # w2の計算(空いた隅に接するX打ち)
+    if w2:
+        lt_x = lt_blank & <unsigned long long>0x0040000000000000
+        rt_x = rt_blank & <unsigned long long>0x0002000000000000
+        lb_x = lb_blank & <unsigned long long>0x0000000000004000
+        rb_x = rb_blank & <unsigned long long>0x0000000000000200
+        score += w2 * (<signed int>_popcount((lt_x | rt_x | lb_x | rb_x) & black) - <signed int>_popcount((lt_x | rt_x | lb_x | rb_x) & white))
+    # w3の計算(空いた隅に接するC打ち時の辺の空きマス)
+    if w3:
+        lt_r = l_blank & <unsigned long long>0x4000000000000000
+        lt_b = t_blank & <unsigned long long>0x0080000000000000
+        rt_l = r_blank & <unsigned long long>0x0200000000000000
+        rt_b = t_blank & <unsigned long long>0x0001000000000000
+        lb_t = b_blank & <unsigned long long>0x0000000000008000
+        lb_r = l_blank & <unsigned long long>0x0000000000000040
+        rb_t = b_blank & <unsigned long long>0x0000000000000100
+        rb_l = r_blank & <unsigned long long>0x0000000000000002
+        if lt_r & white:
+            lt_r_sign = -1
+        if lt_b & white:
+            lt_b_sign = -1
+        if rt_l & white:
+            rt_l_sign = -1
+        if rt_b & white:
+            rt_b_sign = -1
+        if lb_t & white:
+            lb_t_sign = -1
+        if lb_r & white:
+            lb_r_sign = -1
+        if rb_t & white:
+            rb_t_sign = -1
+        if rb_l & white:
+            rb_l_sign = -1
+        for i in range(1, 5):
+            lt_r >>= 1
+            if lt_r & not_blackwhite:
+                score += w3 * lt_r_sign
+            lt_b >>= 8
+            if lt_b & not_blackwhite:
+                score += w3 * lt_b_sign
+            rt_l <<= 1
+            if rt_l & not_blackwhite:
+                score += w3 * rt_l_sign
+            rt_b >>= 8
+            if rt_b & not_blackwhite:
+                score += w3 * rt_b_sign
+            lb_t <<= 8
+            if lb_t & not_blackwhite:
+                score += w3 * lb_t_sign
+            lb_r >>= 1
+            if lb_r & not_blackwhite:
+                score += w3 * lb_r_sign
+            rb_t <<= 8
+            if rb_t & not_blackwhite:
+                score += w3 * rb_t_sign
+            rb_l <<= 1
+            if rb_l & not_blackwhite:
+                score += w3 * rb_l_sign
+    return score
+
+
+cdef inline double _get_ec(unsigned long long b, unsigned long long w, double w1, double w2) noexcept nogil:
+    """辺と隅のパターンによる評価値(EdgeCornerScorerと同じ)
+    """
+    cdef:
+        double score = 0
+        unsigned int i
+        unsigned long long edge_mask, corners
+        unsigned long long[4] edge_masks = [0xFF00000000000000, 0x8080808080808080, 0x0101010101010101, 0x00000000000000FF]  # 上、左、右、下
+        unsigned long long[4] corner_masks = [0x8100000000000000, 0x8000000000000080, 0x0100000000000001, 0x0000000000000081]
+    for i in range(4):
+        edge_mask = edge_masks[i]
+        if ((b | w) & edge_mask) == edge_mask:  # 辺がすべて埋まっている場合
+            score += (<signed int>_popcount(b & edge_mask) - <signed int>_popcount(w & edge_mask)) * w1
+            continue
+        corners = corner_masks[i]
+        if _popcount(b & corners) > _popcount(w & corners):    # 黒の隅が多い場合
+            score += w2
+        elif _popcount(b & corners) < _popcount(w & corners):  # 白の隅が多い場合
+            score -= w2
+    return score
+
+
+cdef inline unsigned long long _popcount(unsigned long long bits) noexcept nogil:
+    """_popcount
+    """
+    bits = bits - ((bits >> <unsigned int>1) & <unsigned long long>0x5555555555555555)
+    bits = (bits & <unsigned long long>0x3333333333333333) + ((bits >> <unsigned int>2) & <unsigned long long>0x3333333333333333)
+    bits = (bits + (bits >> <unsigned int>4)) & <unsigned long long>0x0F0F0F0F0F0F0F0F
+    bits = bits + (bits >> <unsigned int>8)
+    bits = bits + (bits >> <unsigned int>16)
+    return (bits + (bits >> <unsigned int>32)) & <unsigned long long>0x000000000000007F
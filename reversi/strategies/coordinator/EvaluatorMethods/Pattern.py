@@ -0,0 +1,165 @@
+"""Pattern
+
+       パターン評価関数の定義と重みファイル(NumPyの.npy形式)の読み書き
+"""
+
+import os
+import sys
+import ast
+import mmap
+import struct
+from array import array
+
+
+# 基準となるパターンの升目((x, y)、先頭ほど3進数の上位の桁)
+PATTERN_SQUARES = [
+    [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0), (5, 0), (6, 0), (7, 0), (1, 1), (6, 1)],  # 辺+2X
+    [(0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (2, 1), (0, 2), (1, 2), (2, 2)],           # 隅3x3
+    [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0), (0, 1), (1, 1), (2, 1), (3, 1), (4, 1)],  # 隅2x5
+    [(0, 0), (1, 1), (2, 2), (3, 3), (4, 4), (5, 5), (6, 6), (7, 7)],                   # 対角線8
+    [(0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 6), (6, 7)],                           # 対角線7
+    [(0, 2), (1, 3), (2, 4), (3, 5), (4, 6), (5, 7)],                                   # 対角線6
+    [(0, 3), (1, 4), (2, 5), (3, 6), (4, 7)],                                           # 対角線5
+    [(0, 4), (1, 5), (2, 6), (3, 7)],                                                   # 対角線4
+    [(0, 1), (1, 1), (2, 1), (3, 1), (4, 1), (5, 1), (6, 1), (7, 1)],                   # 2列目
+    [(0, 2), (1, 2), (2, 2), (3, 2), (4, 2), (5, 2), (6, 2), (7, 2)],                   # 3列目
+    [(0, 3), (1, 3), (2, 3), (3, 3), (4, 3), (5, 3), (6, 3), (7, 3)],                   # 4列目
+]
+
+# 盤面の対称変換(回転を優先)
+SYMMETRIES = [
+    lambda x, y: (x, y),
+    lambda x, y: (7 - y, x),
+    lambda x, y: (7 - x, 7 - y),
+    lambda x, y: (y, 7 - x),
+    lambda x, y: (7 - x, y),
+    lambda x, y: (x, 7 - y),
+    lambda x, y: (y, x),
+    lambda x, y: (7 - y, 7 - x),
+]
+
+NPY_MAGIC = b'\x93NUMPY'
+NPY_DESCR = '<i2'
+
+
+def _get_pattern_offsets():
+    """
+    パターンごとの重みの開始位置と、1ステージあたりの重みの数
+    """
+    offsets, size = [], 0
+    for squares in PATTERN_SQUARES:
+        offsets.append(size)
+        size += 3 ** len(squares)
+    return offsets, size
+
+
+def _get_pattern_instances():
+    """
+    対称な位置のパターンを列挙し、(重みの開始位置, 各升目のビット)のリストを返す
+    """
+    instances = []
+    for offset, squares in zip(PATTERN_OFFSETS, PATTERN_SQUARES):
+        found = set()
+        for symmetry in SYMMETRIES:
+            moved = [symmetry(x, y) for x, y in squares]
+            key = frozenset(moved)
+            if key not in found:  # 升目の集合が同じものは除く
+                found.add(key)
+                instances.append((offset, [1 << (63 - (y * 8 + x)) for x, y in moved]))
+    return instances
+
+
+PATTERN_OFFSETS, PATTERN_SIZE = _get_pattern_offsets()
+PATTERN_INSTANCES = _get_pattern_instances()
+
+
+def get_stage(discs, stages):
+    """
+    石数から局面の進行度(0～stages-1)を求める
+    """
+    return max(discs - 4, 0) * stages // 61
+
+
+def evaluate_pattern(weights, stages, b, w, bs, ws):
+    """
+    パターンの重みの合計(+側黒優勢)
+    """
+    base = get_stage(bs + ws, stages) * PATTERN_SIZE
+    score = 0
+    for offset, masks in PATTERN_INSTANCES:
+        index = 0
+        for mask in masks:
+            index *= 3
+            if b & mask:
+                index += 1
+            elif w & mask:
+                index += 2
+        score += weights[base + offset + index]
+    return score
+
+
+def load_pattern_weights(weights):
+    """
+    重みを読み込み、(int16のメモリビュー, ステージ数)を返す
+    (ファイルパスの場合は.npy形式をメモリマップで読み込む)
+    """
+    if isinstance(weights, (str, os.PathLike)):
+        weights = _load_npy(weights)
+    elif isinstance(weights, (list, tuple)):
+        weights = array('h', weights)
+
+    weights = memoryview(weights)
+    if weights.format.lstrip('<=@') != 'h':
+        raise ValueError('pattern weights must be int16')
+    if weights.ndim != 1:
+        weights = weights.cast('B').cast('h')
+    if not len(weights) or len(weights) % PATTERN_SIZE:
+        raise ValueError('pattern weights must be a multiple of ' + str(PATTERN_SIZE))
+
+    return weights, len(weights) // PATTERN_SIZE
+
+
+def save_pattern_weights(path, weights):
+    """
+    重みを.npy形式(int16, 形状は(ステージ数, 1ステージあたりの重みの数))で保存する
+    """
+    data = array('h', weights)
+    if not len(data) or len(data) % PATTERN_SIZE:
+        raise ValueError('pattern weights must be a multiple of ' + str(PATTERN_SIZE))
+    if sys.byteorder != 'little':
+        data.byteswap()
+
+    header = "{'descr': '" + NPY_DESCR + "', 'fortran_order': False, 'shape': (" + str(len(data) // PATTERN_SIZE) + ', ' + str(PATTERN_SIZE) + '), }'
+    header += ' ' * (63 - (len(NPY_MAGIC) + 4 + len(header)) % 64) + '\n'  # データの開始位置を64バイト境界に揃える
+
+    with open(path, 'wb') as f:
+        f.write(NPY_MAGIC + b'\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1'))
+        data.tofile(f)
+
+
+def _load_npy(path):
+    """
+    .npy形式のファイルをメモリマップで読み込む
+    """
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if mm[:len(NPY_MAGIC)] != NPY_MAGIC:
+        raise ValueError('not a npy file')
+
+    start = len(NPY_MAGIC) + 4
+    header_len = struct.unpack('<H', mm[len(NPY_MAGIC)+2:start])[0]
+    if mm[len(NPY_MAGIC)] >= 2:
+        start += 2
+        header_len = struct.unpack('<I', mm[len(NPY_MAGIC)+2:start])[0]
+    header = ast.literal_eval(mm[start:start+header_len].decode('latin1'))
+
+    if header['descr'] != NPY_DESCR or header['fortran_order']:
+        raise ValueError('pattern weights must be little-endian int16 in C order')
+
+    data = memoryview(mm)[start+header_len:].cast('h')
+    if sys.byteorder != 'little':  # ビッグエンディアンの環境では変換する
+        data = array('h', data)
+        data.byteswap()
+
+    return data
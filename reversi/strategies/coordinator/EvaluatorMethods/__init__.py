@@ -4,6 +4,7 @@ pyximport.install()
 
 
 SLOW_MODE = True
+CYEVALUATOR_ERROR = True
 
 try:
     if 'FORCE_EVALUATORMETHODS_IMPORT_ERROR' in os.environ:
@@ -15,8 +16,30 @@ try:
 except ImportError:
     from ....strategies.coordinator.EvaluatorMethods.Evaluate import evaluate_tpw, evaluate_tpwe
 
+from ....strategies.coordinator.EvaluatorMethods.Pattern import evaluate_pattern, load_pattern_weights, save_pattern_weights, PATTERN_SIZE  # noqa: E402
+
+try:
+    if 'FORCE_EVALUATORMETHODS_IMPORT_ERROR' in os.environ:
+        if os.environ['FORCE_EVALUATORMETHODS_IMPORT_ERROR'] == 'RAISE':
+            raise ImportError
+
+    from ....strategies.coordinator.EvaluatorMethods.CyEvaluator8_64bit import CyEvaluator, CyEvaluator_N, CyEvaluator_TPW, CyEvaluator_TPWE, CyEvaluator_Pattern, CyEvaluator_Compiled  # noqa: E501
+    CYEVALUATOR_ERROR = False
+except ImportError:
+    pass
+
 
 __all__ = [
     'evaluate_tpw',
     'evaluate_tpwe',
+    'evaluate_pattern',
+    'load_pattern_weights',
+    'save_pattern_weights',
+    'PATTERN_SIZE',
+    'CyEvaluator',
+    'CyEvaluator_N',
+    'CyEvaluator_TPW',
+    'CyEvaluator_TPWE',
+    'CyEvaluator_Pattern',
+    'CyEvaluator_Compiled',
 ]
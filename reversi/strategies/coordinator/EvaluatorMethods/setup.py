@@ -11,3 +11,12 @@ setup(
     cmdclass={'build_ext': build_ext},
     ext_modules=ext_modules
 )
+
+# CyEvaluator8_64bit
+ext_modules = [Extension("CyEvaluator8_64bit", ["CyEvaluator8_64bit.pyx"], include_dirs=[".", "../../../.."])]
+
+setup(
+    name='CyEvaluator8_64bit',
+    cmdclass={'build_ext': build_ext},
+    ext_modules=ext_modules
+)
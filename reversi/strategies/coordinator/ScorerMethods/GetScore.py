@@ -31,3 +31,29 @@ def get_blank_score(board, w1, w2, w3):
                                         value += w3  # 隅の反対の縦横方向に空きマスがある場合
             score += value * board_info[x][y]
     return score
+
+
+def get_opening_score(size, black, white, flippable_discs):
+    # 盤面の範囲と、左端/右端の列のマスク
+    mask = (1 << size * size) - 1
+    left = 0
+    for y in range(size):
+        left |= 1 << (size * size - 1 - y * size)
+    right = left >> (size - 1)
+    not_left, not_right = mask & ~left, mask & ~right
+
+    # ひっくり返した石の周囲8方向にある空きマス(石が置かれていない場所)をカウント
+    blank = mask & ~(black | white)
+    opening = 0
+    for neighbours in (
+        (flippable_discs << 1) & not_right,            # 左
+        (flippable_discs >> 1) & not_left,             # 右
+        (flippable_discs << size),                     # 上
+        (flippable_discs >> size),                     # 下
+        (flippable_discs << (size + 1)) & not_right,   # 左上
+        (flippable_discs << (size - 1)) & not_left,    # 右上
+        (flippable_discs >> (size - 1)) & not_right,   # 左下
+        (flippable_discs >> (size + 1)) & not_left,    # 右下
+    ):
+        opening += bin(neighbours & blank).count('1')
+    return opening
@@ -13,6 +13,12 @@ def get_blank_score(board, w1, w2, w3):
     return _get_blank_score(board, w1, w2, w3)
 
 
+def get_opening_score(size, black, white, flippable_discs):
+    if size == 8 and sys.maxsize == MAXSIZE64:
+        return _get_opening_score_size8_64bit(black, white, flippable_discs)
+    return _get_opening_score(size, black, white, flippable_discs)
+
+
 cdef:
     signed int[8] directions_x = [-1, 0, 1, -1, 1, -1, 0, 1]
     signed int[8] directions_y = [-1, -1, -1, 0, 0, 1, 1, 1]
@@ -200,3 +206,46 @@ cdef inline signed int _get_blank_score(board, signed int w1, signed int w2, sig
                                             value += w3  # 隅の反対の縦横方向に空きマスがある場合
                 score += value * board_info[x][y]
     return score
+
+
+cdef inline signed int _get_opening_score_size8_64bit(unsigned long long black, unsigned long long white, unsigned long long fd):
+    cdef:
+        unsigned long long blank = ~(black | white)
+
+    # ひっくり返した石の周囲8方向にある空きマスをカウント
+    return (
+        _popcount(blank & ((fd << 1) & <unsigned long long>0xFEFEFEFEFEFEFEFE)) +  # 左
+        _popcount(blank & ((fd >> 1) & <unsigned long long>0x7F7F7F7F7F7F7F7F)) +  # 右
+        _popcount(blank & (fd << 8)) +                                             # 上
+        _popcount(blank & (fd >> 8)) +                                             # 下
+        _popcount(blank & ((fd << 9) & <unsigned long long>0xFEFEFEFEFEFEFEFE)) +  # 左上
+        _popcount(blank & ((fd << 7) & <unsigned long long>0x7F7F7F7F7F7F7F7F)) +  # 右上
+        _popcount(blank & ((fd >> 7) & <unsigned long long>0xFEFEFEFEFEFEFEFE)) +  # 左下
+        _popcount(blank & ((fd >> 9) & <unsigned long long>0x7F7F7F7F7F7F7F7F))    # 右下
+    )
+
+
+def _get_opening_score(size, black, white, flippable_discs):
+    # 盤面の範囲と、左端/右端の列のマスク
+    mask = (1 << size * size) - 1
+    left = 0
+    for y in range(size):
+        left |= 1 << (size * size - 1 - y * size)
+    right = left >> (size - 1)
+    not_left, not_right = mask & ~left, mask & ~right
+
+    # ひっくり返した石の周囲8方向にある空きマス(石が置かれていない場所)をカウント
+    blank = mask & ~(black | white)
+    opening = 0
+    for neighbours in (
+        (flippable_discs << 1) & not_right,            # 左
+        (flippable_discs >> 1) & not_left,             # 右
+        (flippable_discs << size),                     # 上
+        (flippable_discs >> size),                     # 下
+        (flippable_discs << (size + 1)) & not_right,   # 左上
+        (flippable_discs << (size - 1)) & not_left,    # 右上
+        (flippable_discs >> (size - 1)) & not_right,   # 左下
+        (flippable_discs >> (size + 1)) & not_left,    # 右下
+    ):
+        opening += bin(neighbours & blank).count('1')
+    return opening
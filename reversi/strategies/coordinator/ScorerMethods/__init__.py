@@ -10,12 +10,13 @@ try:
         if os.environ['FORCE_SCORERMETHODS_IMPORT_ERROR'] == 'RAISE':
             raise ImportError
 
-    from ....strategies.coordinator.ScorerMethods.GetScoreFast import get_blank_score
+    from ....strategies.coordinator.ScorerMethods.GetScoreFast import get_blank_score, get_opening_score
     SLOW_MODE = False
 except ImportError:
-    from ....strategies.coordinator.ScorerMethods.GetScore import get_blank_score
+    from ....strategies.coordinator.ScorerMethods.GetScore import get_blank_score, get_opening_score
 
 
 __all__ = [
     'get_blank_score',
+    'get_opening_score',
 ]
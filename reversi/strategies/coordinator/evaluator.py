@@ -1,8 +1,11 @@
 """Evaluator
 """
 
+import copy
+from collections import OrderedDict
+
 from reversi.strategies.common import AbstractEvaluator
-from reversi.strategies.coordinator import TableScorer, PossibilityScorer, OpeningScorer, WinLoseScorer, NumberScorer, EdgeScorer, CornerScorer, BlankScorer, EdgeCornerScorer  # noqa: E501
+from reversi.strategies.coordinator import TableScorer, PossibilityScorer, OpeningScorer, WinLoseScorer, NumberScorer, EdgeScorer, CornerScorer, BlankScorer, EdgeCornerScorer, StableScorer  # noqa: E501
 import reversi.strategies.coordinator.EvaluatorMethods as EvaluatorMethods
 
 
@@ -12,10 +15,75 @@ class Evaluator(AbstractEvaluator):
     def __init__(self, separated=[], combined=[]):
         self.separated = separated
         self.combined = combined
+        self.cy_evaluator = None  # 探索カーネル用(compile()で設定)
+
+    def compile(self):
+        """compile
+
+               組み込みのScorerの組み合わせと重みを、盤面サイズ8のビットボード用の1つのCython関数にまとめる
+               (Cythonが使えない場合は何もしない)
+        """
+        if EvaluatorMethods.CYEVALUATOR_ERROR:
+            return self
+
+        ww = None
+        for scorer in self.separated:
+            if type(scorer) is not WinLoseScorer:
+                raise ValueError('only WinLoseScorer can be compiled in separated: ' + type(scorer).__name__)
+            if ww is None:
+                ww = scorer._W  # 最初に判定されるもののみ有効
+
+        table, params = None, {'wp': 0, 'wo': 0, 'wn': 0, 'we': 0, 'wc': 0, 'wb1': 0, 'wb2': 0, 'wb3': 0, 'wec1': 0, 'wec2': 0, 'wst': 0}
+        corner = None
+        for scorer in self.combined:
+            scorer_type = type(scorer)
+            if scorer_type is TableScorer:
+                scorer_table = copy.copy(scorer.table)  # 元のテーブルサイズは変えない
+                scorer_table.set_table(8)
+                if table is None:
+                    table = [[0] * 8 for _ in range(8)]
+                for y in range(8):
+                    for x in range(8):
+                        table[y][x] += scorer_table.table[y][x]
+            elif scorer_type is PossibilityScorer:
+                params['wp'] += scorer._W
+            elif scorer_type is OpeningScorer:
+                params['wo'] += scorer._W
+            elif scorer_type is NumberScorer:
+                params['wn'] += 1
+            elif scorer_type is EdgeScorer:
+                params['we'] += scorer._W
+            elif scorer_type is CornerScorer:
+                if corner is None:  # パターンはどのCornerScorerも共通
+                    corner = [(getattr(scorer, 'level' + str(level) + '_maskvalue'), getattr(scorer, 'level' + str(level) + '_weight')) for level in range(1, 6)]  # noqa: E501
+                params['wc'] += scorer._W
+            elif scorer_type is BlankScorer:
+                params['wb1'] += scorer._W1
+                params['wb2'] += scorer._W2
+                params['wb3'] += scorer._W3
+            elif scorer_type is EdgeCornerScorer:
+                params['wec1'] += scorer._W1
+                params['wec2'] += scorer._W2
+            elif scorer_type is StableScorer:
+                params['wst'] += scorer._W
+            else:
+                raise ValueError('scorer can not be compiled: ' + scorer_type.__name__)
+
+        self.cy_evaluator = EvaluatorMethods.CyEvaluator_Compiled(table, ww, corner=corner, **params)
+
+        return self
 
     def evaluate(self, color, board, possibility_b, possibility_w):
         """evaluate
         """
+        # compile()済みの場合は盤面サイズ8のビットボードのみCython実装で算出
+        if self.cy_evaluator is not None and board.size == 8 and hasattr(board, '_black_bitboard') and possibility_b is not None and possibility_w is not None:
+            b, w, h = board.get_bitboard_info()
+            if not h:
+                fd = getattr(board, '_flippable_discs_num', 0) or 0
+                score = self.cy_evaluator.evaluate_bits(1, b, w, board._black_score, board._white_score, possibility_b, possibility_w, fd)
+                return int(score) if score == int(score) else score
+
         for scorer in self.separated:
             score = scorer.get_score(color, board, possibility_b, possibility_w)
             if score is not None:
@@ -103,6 +171,9 @@ class Evaluator_N_Fast(AbstractEvaluator):
 
            盤面の評価値を石数で算出
     """
+    def __init__(self):
+        self.cy_evaluator = None if EvaluatorMethods.CYEVALUATOR_ERROR else EvaluatorMethods.CyEvaluator_N()  # 探索カーネル用
+
     def evaluate(self, color, board, possibility_b, possibility_w):
         return board._black_score - board._white_score
 
@@ -282,6 +353,10 @@ class Evaluator_TPW_Fast(AbstractEvaluator):
         self.p = PossibilityScorer(wp)
         self.w = WinLoseScorer(ww)
         self.params = [wp, ww]
+        self.cy_evaluator = None  # 探索カーネル用
+        if not EvaluatorMethods.CYEVALUATOR_ERROR:
+            table = TableScorer(8, corner, c, a1, a2, b1, b2, b3, x, o1, o2).table.table
+            self.cy_evaluator = EvaluatorMethods.CyEvaluator_TPW(table, wp, ww)
 
     def evaluate(self, color, board, possibility_b, possibility_w):
         return EvaluatorMethods.evaluate_tpw(self.t, self.params, color, board, possibility_b, possibility_w)
@@ -352,6 +427,10 @@ class Evaluator_TPWE_Fast(AbstractEvaluator):
         self.w = WinLoseScorer(ww)
         self.e = EdgeScorer(we)
         self.params = [wp, ww, we]
+        self.cy_evaluator = None  # 探索カーネル用
+        if not EvaluatorMethods.CYEVALUATOR_ERROR:
+            table = TableScorer(8, corner, c, a1, a2, b1, b2, b3, x, o1, o2).table.table
+            self.cy_evaluator = EvaluatorMethods.CyEvaluator_TPWE(table, wp, ww, we)
 
     def evaluate(self, color, board, possibility_b, possibility_w):
         return EvaluatorMethods.evaluate_tpwe(self.t, self.t.table.table, self.params, color, board, possibility_b, possibility_w)
@@ -537,3 +616,117 @@ class Evaluator_TPWEB(AbstractEvaluator):
         score_b = self.b.get_score(color, board, possibility_b, possibility_w)
 
         return score_t + score_p + score_e + score_b
+
+
+class PatternEvaluator(AbstractEvaluator):
+    """Pattern Evaluator
+
+           盤面の評価値を辺+2X/隅/対角線/列のパターンごとの重み(局面の進行度別)+勝敗で算出
+           (重みは局面の進行度ごとにint16で並べた配列、またはそれを保存した.npyファイルで与える)
+    """
+    def __init__(self, weights, ww=10000):
+        self.weights, self.stages = EvaluatorMethods.load_pattern_weights(weights)
+        self.w = WinLoseScorer(ww)
+        self.n = NumberScorer()
+        self.cy_evaluator = None  # 探索カーネル用
+        if not EvaluatorMethods.CYEVALUATOR_ERROR:
+            self.cy_evaluator = EvaluatorMethods.CyEvaluator_Pattern(self.weights, self.stages, ww)
+
+    def evaluate(self, color, board, possibility_b, possibility_w):
+        """evaluate
+        """
+        score_w = self.w.get_score(color, board, possibility_b, possibility_w)
+
+        # 勝敗が決まっている場合
+        if score_w is not None:
+            return score_w
+
+        # パターンは盤面サイズ8のみ
+        if board.size != 8:
+            return self.n.get_score(color, board, possibility_b, possibility_w)
+
+        b, w, _ = board.get_bitboard_info()
+
+        if self.cy_evaluator is not None:
+            return int(self.cy_evaluator.evaluate_bits(1, b, w, board._black_score, board._white_score, possibility_b, possibility_w, 0))
+
+        return EvaluatorMethods.evaluate_pattern(self.weights, self.stages, b, w, board._black_score, board._white_score)
+
+
+class CachedEvaluator(AbstractEvaluator):
+    """Cached Evaluator
+
+           評価関数の結果を盤面のハッシュ値と手番をキーに保持する(上限を超えた場合は最も長く参照していないものから削除)
+           (同じインスタンスを使い続けることで、対局中の複数回の探索で結果を共有できる)
+           (開放度(OpeningScorer)のように直前の手でひっくり返した石を使う評価関数は、その石もキーに含める)
+    """
+    def __init__(self, evaluator, max_entries=1000000, path_dependent=None):
+        self.evaluator = evaluator
+        self.max_entries = max_entries
+        self.path_dependent = _has_opening_scorer(evaluator) if path_dependent is None else path_dependent  # 盤面以外に直前の手に依存するかどうか
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.cy_evaluator = getattr(evaluator, 'cy_evaluator', None)  # 探索カーネルではCython実装の評価関数を直接使う
+
+    def __len__(self):
+        return len(self.cache)
+
+    @property
+    def hit_rate(self):
+        """hit_rate
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+    def clear(self):
+        """clear
+        """
+        self.cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def evaluate(self, color, board, possibility_b, possibility_w):
+        """evaluate
+        """
+        key = (board.hash, color, _get_flippable_discs(board)) if self.path_dependent else (board.hash, color)
+        cache = self.cache
+        score = cache.get(key)
+
+        # 保持している場合
+        if score is not None:
+            self.hits += 1
+            cache.move_to_end(key)
+            return score
+
+        self.misses += 1
+        score = self.evaluator.evaluate(color, board, possibility_b, possibility_w)
+        cache[key] = score
+
+        # 上限を超えた場合は最も長く参照していないものを削除
+        if len(cache) > self.max_entries:
+            cache.popitem(last=False)
+
+        return score
+
+
+def _has_opening_scorer(evaluator):
+    """
+    開放度(OpeningScorer)を使う評価関数かどうか
+    """
+    for value in vars(evaluator).values():
+        scorers = value if isinstance(value, (list, tuple)) else [value]
+        if any(isinstance(scorer, OpeningScorer) for scorer in scorers):
+            return True
+
+    return False
+
+
+def _get_flippable_discs(board):
+    """
+    直前の手でひっくり返した石(OpeningScorerと同じものを使う)
+    """
+    if hasattr(board, '_flippable_discs_num'):
+        return board._flippable_discs_num
+
+    return board._get_bit_pos(board.prev[-1]['flippable_discs']) if board.prev else 0
@@ -32,6 +32,30 @@ class Orderer_B(Orderer):
         return moves
 
 
+class Orderer_S(Orderer):
+    """Orderer_S
+
+           前回の最善手を先頭に、残りを前回の評価値の高い順に
+           (最善手以外の評価値は窓の外の上限値(fail-hard)のことが多く、正確な順位ではないため、同値の手の並びは元の順を保つ)
+    """
+    def move_ordering(self, *args, **kwargs):
+        """move_ordering
+        """
+        moves = super().move_ordering(*args, **kwargs)
+
+        best_move = kwargs['best_move']
+        scores = kwargs.get('scores')
+
+        if scores:
+            moves = sorted(moves, key=lambda move: -scores[move] if move in scores else float('inf'))
+
+        if best_move in moves:  # 選択で除かれた場合は先頭にしない
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+
+        return moves
+
+
 class Orderer_C(Orderer):
     """Orderer_C
 
@@ -51,35 +51,17 @@ class OpeningScorer(AbstractScorer):
         """
         評価値の算出
         """
-        size, board_info, opening = board.size, board.get_board_info(), 0
-
-        directions = [
-            (-1,  1), (0,  1), (1,  1),
-            (-1,  0),          (1,  0),
-            (-1, -1), (0, -1), (1, -1),
-        ]
+        size = board.size
 
         # 最後にひっくり返された石の場所を取得する
         if isinstance(board, PyBitBoard) or isinstance(board, CythonBitBoard):
-            flippable_discs = board._flippable_discs_num
-            discs = []
-            mask = 1 << ((size * size) - 1)
-            for y in range(size):
-                for x in range(size):
-                    if mask & flippable_discs:
-                        discs.append([x, y])
-                    mask >>= 1
+            black, white, flippable_discs = board._black_bitboard, board._white_bitboard, board._flippable_discs_num
         else:
-            discs = board.prev[-1]['flippable_discs']
-
-        # ひっくり返した石の周りをチェックする
-        for disc_x, disc_y in discs:
-            for dx, dy in directions:
-                x, y = disc_x + dx, disc_y + dy
+            black, white, _ = board.get_bitboard_info()
+            flippable_discs = board._get_bit_pos(board.prev[-1]['flippable_discs'])
 
-                if 0 <= x < size and 0 <= y < size:
-                    if board_info[y][x] == 0:
-                        opening += 1  # 石が置かれていない場所をカウント
+        # ひっくり返した石の周りの石が置かれていない場所をカウントする
+        opening = ScorerMethods.get_opening_score(size, black, white, flippable_discs)
 
         return opening * self._W
 
@@ -828,3 +810,20 @@ class EdgeCornerScorer(AbstractScorer):
                 elif corner < 0:
                     score -= self._W2  # 白の隅が多い場合
         return score
+
+
+class StableScorer(AbstractScorer):
+    """
+    確定石の数に基づいて算出
+    """
+    def __init__(self, w=10):
+        self._W = w
+
+    def get_score(self, color, board, possibility_b, possibility_w):
+        """
+        評価値の算出
+        """
+        stable_b = board.get_bit_count(board.get_stable_discs_bits('black'))
+        stable_w = board.get_bit_count(board.get_stable_discs_bits('white'))
+
+        return (stable_b - stable_w) * self._W
@@ -3,7 +3,7 @@
 
 import sys
 
-from reversi.strategies.common import Timer, Measure, AbstractStrategy
+from reversi.strategies.common import Timer, Measure, SearchStats, AbstractStrategy
 from reversi.strategies.coordinator import Evaluator_N_Fast
 from reversi.strategies.alphabeta import _AlphaBeta_, _AlphaBeta, AlphaBeta_, AlphaBeta
 import reversi.strategies.EndGameMethods as EndGameMethods
@@ -25,15 +25,22 @@ class _EndGame_(AbstractStrategy):
         self.timer = False
         self.measure = False
         self.role = role.lower()
+        self.context = EndGameMethods.SearchContext() if not EndGameMethods.ENDGAME_SIZE8_64BIT_ERROR else None  # 探索ごとの状態(盤面サイズ8の探索でのみ使用)
+        self.stats = SearchStats()  # 直近の探索の統計情報
 
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """
         次の一手
         """
-        pid = Timer.get_pid(self)  # タイムアウト監視用のプロセスID
+        pid = Timer.get_budget(self, budget)  # タイムアウト監視用の時間予算
+        self.stats = SearchStats()
+        self.stats.start()
         if board.size == 8 and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not EndGameMethods.ENDGAME_SIZE8_64BIT_ERROR:
-            return EndGameMethods.next_move(color, board, self.depth, pid, self.timer, self.measure, self.role)
-        return self.alphabeta_n.next_move(color, board)
+            best_move = EndGameMethods.next_move(color, board, self.depth, pid, self.timer, self.measure, self.role, context=self.context, stats=self.stats)
+        else:
+            best_move = self.alphabeta_n.next_move(color, board)
+        self.stats.end(self.depth, Timer.is_timeout(pid))
+        return best_move
 
     def get_best_move(self, color, board, moves, depth=60, pid=None):
         """
@@ -41,7 +48,7 @@ class _EndGame_(AbstractStrategy):
         """
         alpha, beta = self._MIN, self._MAX
         if board.size == 8 and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not EndGameMethods.ENDGAME_SIZE8_64BIT_ERROR:
-            return EndGameMethods.get_best_move(color, board, moves, alpha, beta, depth, pid, self.timer, self.measure, self.role, False)
+            return EndGameMethods.get_best_move(color, board, moves, alpha, beta, depth, pid, self.timer, self.measure, self.role, False, context=self.context, stats=self.stats)  # noqa: E501
         return self.alphabeta_n.get_best_move(color, board, moves, depth, pid)
 
     def get_best_record(self, color, board, moves, depth=60, pid=None):
@@ -50,7 +57,7 @@ class _EndGame_(AbstractStrategy):
         """
         alpha, beta = self._MIN, self._MAX
         if board.size == 8 and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not EndGameMethods.ENDGAME_SIZE8_64BIT_ERROR:
-            return EndGameMethods.get_best_move(color, board, moves, alpha, beta, depth, pid, self.timer, self.measure, self.role, True)
+            return EndGameMethods.get_best_move(color, board, moves, alpha, beta, depth, pid, self.timer, self.measure, self.role, True, context=self.context, stats=self.stats)  # noqa: E501
         return None, None, None  # unsupported
 
 
@@ -64,10 +71,10 @@ class _EndGame(_EndGame_):
         self.measure = True
 
     @Measure.time
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """next_move
         """
-        return super().next_move(color, board)
+        return super().next_move(color, board, budget)
 
 
 class EndGame_(_EndGame_):
@@ -80,10 +87,10 @@ class EndGame_(_EndGame_):
         self.measure = False
 
     @Timer.start(-10000000)
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """next_move
         """
-        return super().next_move(color, board)
+        return super().next_move(color, board, budget)
 
 
 class EndGame(_EndGame_):
@@ -97,7 +104,7 @@ class EndGame(_EndGame_):
 
     @Timer.start(-10000000)
     @Measure.time
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """next_move
         """
-        return super().next_move(color, board)
+        return super().next_move(color, board, budget)
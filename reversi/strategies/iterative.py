@@ -1,52 +1,162 @@
 """IterativeDeepning strategy
 """
 
-from reversi.strategies.common import Timer, Measure, AbstractStrategy
+import time
+
+from reversi.strategies.common import Timer, TimeBudget, Measure, SearchStats, AbstractStrategy
+import reversi.strategies.TranspositionTableMethods as TranspositionTableMethods
 
 
 class IterativeDeepning_(AbstractStrategy):
     """IterativeDeepning + Timer
     """
-    def __init__(self, depth=None, selector=None, orderer=None, search=None, limit=None):
+    def __init__(self, depth=None, selector=None, orderer=None, search=None, limit=None, ordering_size=None, aspiration=None, time_manager=None):
         self.depth = depth
         self.selector = selector
         self.orderer = orderer
         self.search = search
         self.max_depth = depth
         self.limit = limit
+        self.aspiration = aspiration      # 前回の評価値を中心とした探索窓の幅(片側、Noneの場合は全幅で探索)
+        self.aspiration_width = None      # 直近の探索で用いた窓の幅
+        self.aspiration_researches = 0    # 窓を広げて再探索した回数
+        self.time_manager = time_manager  # 持ち時間の管理(Noneの場合は一手ごとにTimer.time_limitの時間で読む)
+        self.iteration_times = []         # 直近の探索で完了した反復ごとの経過時間
+        self.ebf = None                   # 直近の探索の実効分岐係数(反復ごとの経過時間の比)
+        self.skipped = False              # 次の反復を読み切れないと予測して打ち切ったかどうか
+        self.stats = SearchStats()        # 直近の探索の統計情報(各反復の合計)
+        self.pv = []                      # 直近の探索で採用した反復の最善応手手順
+
+        # 置換表を持たない探索クラスには、途中局面の手の並び替え用テーブル(ordering_size:MB)を持たせる
+        if ordering_size and getattr(search, 'transposition_table', False) is None and not TranspositionTableMethods.TRANSPOSITIONTABLE_ERROR:
+            search.transposition_table = TranspositionTableMethods.TranspositionTable(ordering_size, cutoff=False)
 
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """next_move
+
+               budgetの指定時はその時間予算で読む(持ち時間の管理は呼び出し元で行う)
         """
         depth, moves, best_move, scores, = self.depth, None, None, {}
 
-        pid = Timer.get_pid(self.search)           # タイムアウト監視用のプロセスID
-        Timer.set_deadline(pid, self.search._MIN)  # 探索クラスのタイムアウトを設定
+        moves, time_limit = board.get_legal_moves(color), None
+        manage_time = self.time_manager is not None and not isinstance(budget, TimeBudget)
+        if manage_time:
+            time_limit = self.time_manager.start(board, moves)  # 持ち時間から思考時間を配分
+            if len(moves) == 1:
+                self.time_manager.end()
+                return moves[0]  # 手の選択肢がない場合は読まない
+
+        pid = budget if isinstance(budget, TimeBudget) else Timer.create_budget(Timer.get_pid(self.search), self.search._MIN, time_limit)  # 探索クラスの時間予算を設定
+        timed = isinstance(budget, TimeBudget) or getattr(self.search, 'timer', True)  # タイマーなしの探索は期限で打ち切らない
+
+        transposition_table = getattr(self.search, 'transposition_table', None)
+        if transposition_table is not None:
+            if transposition_table.cutoff:
+                transposition_table.new_search()  # 置換表は各深さの探索で共有する
+            else:
+                transposition_table.clear()       # 並び替え用テーブルは探索ごとに初期化
+
+        self.aspiration_width, self.aspiration_researches = None, 0
+        self.iteration_times, self.ebf, self.skipped = [], None, False
+        self.stats, self.pv, completed_depth = SearchStats(), [], None
+        self.stats.start()
+        self.search.stats = self.stats  # 各反復の探索の統計情報を集計する
 
-        moves = board.get_legal_moves(color)
         while True:
-            moves = self.selector.select_moves(color, board, moves, scores, depth)                          # 次の手の候補を選択
-            moves = self.orderer.move_ordering(color=color, board=board, moves=moves, best_move=best_move)  # 次の手の候補を並び替え
-            best_move, scores = self.search.get_best_move(color, board, moves, depth, pid)                  # 最善手を取得
+            moves = self.selector.select_moves(color, board, moves, scores, depth)                                         # 次の手の候補を選択
+            moves = self.orderer.move_ordering(color=color, board=board, moves=moves, best_move=best_move, scores=scores)  # 次の手の候補を並び替え
+            completed_move = best_move                                                                                     # 直前に完了した反復の最善手
+            start = time.perf_counter()
+            if self.aspiration and best_move in scores:
+                best_move, scores, window = self._get_best_move_aspiration(color, board, moves, depth, pid, scores[best_move])  # 前回の評価値を中心とした窓で最善手を取得
+            else:
+                best_move, scores = self.search.get_best_move(color, board, moves, depth, pid)                                     # 最善手を取得
+                window = None                                                                                                      # 全幅で探索
 
             if Timer.is_timeout(pid):  # タイムアウト発生時、処理を抜ける
+                # 途中で打ち切った反復は、最初の手を読み終えていて最善手の評価値が窓の内側の確定値の場合のみ結果を使う
+                # (最後の手は読み終えておらず、窓の外の評価値やタイムアウト時の値は最善手の根拠にならない)
+                if completed_move is not None and (len(scores) < 2 or not self._is_exact_score(scores.get(best_move), window, pid)):
+                    best_move = completed_move
+                else:
+                    self.pv = getattr(self.search, 'pv', [best_move])
                 break
 
+            completed_depth = depth
+            self.pv = getattr(self.search, 'pv', [best_move])
+            self.iteration_times.append(time.perf_counter() - start)
+            self.ebf = self._get_ebf()
+
             if self.limit and depth >= self.limit:  # 限界深さに到達時
                 break
 
+            if manage_time and self.time_manager.is_enough(best_move, scores[best_move]):  # 配分した思考時間に到達時
+                break
+
+            if timed and self.ebf is not None and self.iteration_times[-1] * self.ebf > pid.remaining():  # 次の反復を読み切れない場合
+                self.skipped = True
+                break
+
             depth += 1  # 読みの深さを増やす
 
         self.max_depth = depth  # 読んだ深さを記録
+        self.stats.end(completed_depth, Timer.is_timeout(pid))
+        if manage_time:
+            self.time_manager.end()
 
         return best_move
 
+    def _get_ebf(self):
+        """_get_ebf
+
+               直近の反復の経過時間の比から実効分岐係数を求める
+               (手番の偶奇で比が揺れるため、2反復前との比の平方根を用いる)
+        """
+        times = [elapsed for elapsed in self.iteration_times[-3:] if elapsed > 0]
+        if len(times) < 2:
+            return None
+        return (times[-1] / times[0]) ** (1 / (len(times) - 1))
+
+    def _get_best_move_aspiration(self, color, board, moves, depth, pid, score):
+        """_get_best_move_aspiration
+
+               窓の範囲外の評価値となった場合は、外れた側の幅を倍にして再探索(最後に用いた窓も返す)
+        """
+        lower, upper = self.aspiration, self.aspiration
+
+        while True:
+            alpha, beta = max(score - lower, self.search._MIN), min(score + upper, self.search._MAX)
+            self.aspiration_width = beta - alpha
+            best_move, scores = self.search.get_best_move(color, board, moves, depth, pid, alpha=alpha, beta=beta)
+
+            if Timer.is_timeout(pid):
+                break
+
+            if scores[best_move] <= alpha and alpha > self.search._MIN:   # fail-low
+                lower *= 2
+            elif scores[best_move] >= beta and beta < self.search._MAX:   # fail-high
+                upper *= 2
+            else:
+                break
+
+            self.aspiration_researches += 1
+
+        return best_move, scores, (alpha, beta)
+
+    def _is_exact_score(self, score, window, pid):
+        """_is_exact_score
+
+               評価値が窓(Noneの場合は全幅)の内側の確定値かどうか(タイムアウト時の値は除く)
+        """
+        alpha, beta = window if window is not None else (self.search._MIN, self.search._MAX)
+        return score is not None and alpha < score < beta and score != Timer.get_timeout_value(pid)
+
 
 class IterativeDeepning(IterativeDeepning_):
     """IterativeDeepning + Measure + Timer
     """
     @Measure.time
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """next_move
         """
-        return super().next_move(color, board)
+        return super().next_move(color, board, budget)
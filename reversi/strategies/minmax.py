@@ -16,10 +16,10 @@ class _MinMax_(AbstractStrategy):
         self.depth = depth
         self.evaluator = evaluator
 
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """next_move
         """
-        pid = Timer.get_pid(self)  # タイムアウト監視用のプロセスID
+        pid = Timer.get_budget(self, budget)  # タイムアウト監視用の時間予算
 
         # select best move
         next_color = 'white' if color == 'black' else 'black'
@@ -75,10 +75,10 @@ class MinMax(_MinMax_):
     """MinMax + Measure
     """
     @Measure.time
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """next_move
         """
-        return super().next_move(color, board)
+        return super().next_move(color, board, budget)
 
     @Measure.countup
     def get_score(self, color, board, depth, pid=None):
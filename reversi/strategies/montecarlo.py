@@ -24,11 +24,11 @@ class MonteCarlo(AbstractStrategy):
 
     @Measure.time
     @Timer.start(-10000000)
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """
         次の一手
         """
-        pid = Timer.get_pid(self)                # タイムアウト監視用のプロセスID
+        pid = Timer.get_budget(self, budget)     # タイムアウト監視用の時間予算
         moves = board.get_legal_moves(color)     # 手の候補を取得
         scores = [0 for _ in range(len(moves))]  # スコアの初期化
 
@@ -0,0 +1,134 @@
+"""MTD(f)
+"""
+
+import sys
+
+from reversi.strategies.common import Timer, Measure, SearchStats, AbstractStrategy
+from reversi.strategies.common.analyze import analyze
+from reversi.strategies.alphabeta import _AlphaBeta_, _AlphaBeta, AlphaBeta_, AlphaBeta
+import reversi.strategies.MTDfMethods as MTDfMethods
+import reversi.strategies.TranspositionTableMethods as TranspositionTableMethods
+
+
+MAXSIZE64 = 2**63 - 1
+
+
+class _MTDf_(AbstractStrategy):
+    """
+    MTD(f)法で次の手を決める
+    """
+    def __init__(self, depth=3, evaluator=None, tt_size=16, killer_history=False):
+        self._MIN = -10000000
+        self._MAX = 10000000
+
+        self.depth = depth
+        self.evaluator = evaluator
+        self.alphabeta = _AlphaBeta_(depth=depth, evaluator=evaluator)  # 盤面サイズ8以外の場合に使用
+        self.timer = False
+        self.measure = False
+        self.transposition_table = None
+        self.killer_history = killer_history
+        self.context = MTDfMethods.SearchContext() if not MTDfMethods.MTDF_SIZE8_64BIT_ERROR else None  # 探索ごとの状態(盤面サイズ8の探索でのみ使用)
+        self.first_guess = 0  # 評価値の初期推定値(前回の探索結果)
+        self.stats = SearchStats()  # 直近の探索の統計情報
+
+        # 置換表(tt_size:MB)
+        if not TranspositionTableMethods.TRANSPOSITIONTABLE_ERROR:
+            self.transposition_table = TranspositionTableMethods.TranspositionTable(tt_size)
+
+    def next_move(self, color, board, budget=None):
+        """
+        次の一手
+        """
+        pid = Timer.get_budget(self, budget)  # タイムアウト監視用の時間予算
+        self.stats = SearchStats()
+        self.stats.start()
+
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
+
+        if board.size == 8 and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not MTDfMethods.MTDF_SIZE8_64BIT_ERROR:
+            best_move, scores = MTDfMethods.next_move(color, board, self._MIN, self._MAX, self.first_guess, self.depth, self.evaluator, pid, self.timer, self.measure, self.transposition_table, self.killer_history, context=self.context, stats=self.stats)  # noqa: E501
+            self._update_first_guess(best_move, scores, pid)
+        else:
+            best_move = self.alphabeta.next_move(color, board)
+
+        self.stats.end(self.depth, Timer.is_timeout(pid))
+
+        return best_move
+
+    def get_best_move(self, color, board, moves, depth, pid=None, alpha=None, beta=None):
+        """
+        最善手を選ぶ(alpha, betaを省略した場合は全幅で探索)
+        """
+        alpha = self._MIN if alpha is None else alpha
+        beta = self._MAX if beta is None else beta
+
+        if board.size == 8 and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not MTDfMethods.MTDF_SIZE8_64BIT_ERROR:
+            best_move, scores = MTDfMethods.get_best_move(color, board, moves, alpha, beta, self.first_guess, depth, self.evaluator, pid, self.timer, self.measure, self.transposition_table, self.killer_history, context=self.context, stats=self.stats)  # noqa: E501
+            self._update_first_guess(best_move, scores, pid)
+            return best_move, scores
+
+        return self.alphabeta.get_best_move(color, board, moves, depth, pid, alpha, beta)
+
+    def analyze(self, color, board, k=1, depth=None, time_limit=None):
+        """
+        上位k個の手の評価値と最善応手手順を求める(depthの省略時は探索の深さ、time_limitの指定時は時間内で深さを増やす)
+        """
+        return analyze(self, color, board, k, depth, time_limit)
+
+    def _update_first_guess(self, best_move, scores, pid):
+        """
+        次の探索の初期推定値を更新
+        """
+        if best_move in scores and not Timer.is_timeout(pid):
+            self.first_guess = scores[best_move]
+
+
+class _MTDf(_MTDf_):
+    """MTDf + Measure
+    """
+    def __init__(self, depth=3, evaluator=None, tt_size=16, killer_history=False):
+        super().__init__(depth, evaluator, tt_size, killer_history)
+        self.alphabeta = _AlphaBeta(depth=depth, evaluator=evaluator)
+        self.timer = False
+        self.measure = True
+
+    @Measure.time
+    def next_move(self, color, board, budget=None):
+        """next_move
+        """
+        return super().next_move(color, board, budget)
+
+
+class MTDf_(_MTDf_):
+    """MTDf + Timer
+    """
+    def __init__(self, depth=3, evaluator=None, tt_size=16, killer_history=False):
+        super().__init__(depth, evaluator, tt_size, killer_history)
+        self.alphabeta = AlphaBeta_(depth=depth, evaluator=evaluator)
+        self.timer = True
+        self.measure = False
+
+    @Timer.start(-10000000)
+    def next_move(self, color, board, budget=None):
+        """next_move
+        """
+        return super().next_move(color, board, budget)
+
+
+class MTDf(_MTDf_):
+    """MTDf + Measure + Timer
+    """
+    def __init__(self, depth=3, evaluator=None, tt_size=16, killer_history=False):
+        super().__init__(depth, evaluator, tt_size, killer_history)
+        self.alphabeta = AlphaBeta(depth=depth, evaluator=evaluator)
+        self.timer = True
+        self.measure = True
+
+    @Timer.start(-10000000)
+    @Measure.time
+    def next_move(self, color, board, budget=None):
+        """next_move
+        """
+        return super().next_move(color, board, budget)
@@ -16,11 +16,11 @@ class _NegaMax_(AbstractStrategy):
         self.depth = depth
         self.evaluator = evaluator
 
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """
         次の一手
         """
-        pid = Timer.get_pid(self)  # タイムアウト監視用のプロセスID
+        pid = Timer.get_budget(self, budget)  # タイムアウト監視用の時間予算
         next_color = 'white' if color == 'black' else 'black'
         moves, max_score = {}, self._MIN
 
@@ -92,10 +92,10 @@ class _NegaMax(_NegaMax_):
     """NegaMax + Measure
     """
     @Measure.time
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """next_move
         """
-        return super().next_move(color, board)
+        return super().next_move(color, board, budget)
 
     @Measure.countup
     def get_score(self, color, board, depth, pid=None):
@@ -108,10 +108,10 @@ class NegaMax_(_NegaMax_):
     """NegaMax + Timer
     """
     @Timer.start(-10000000)
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """next_move
         """
-        return super().next_move(color, board)
+        return super().next_move(color, board, budget)
 
     @Timer.timeout
     def get_score(self, color, board, depth, pid=None):
@@ -125,10 +125,10 @@ class NegaMax(_NegaMax_):
     """
     @Timer.start(-10000000)
     @Measure.time
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """next_move
         """
-        return super().next_move(color, board)
+        return super().next_move(color, board, budget)
 
     @Timer.timeout
     @Measure.countup
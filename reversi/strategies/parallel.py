@@ -0,0 +1,500 @@
+"""ParallelSearch
+"""
+
+import os
+import time
+import copy
+import queue
+import threading
+from multiprocessing import Pool, Value
+from concurrent.futures import ThreadPoolExecutor
+
+from reversi.board import BitBoard
+from reversi.strategies.common import Timer, TimeBudget, Measure, AbstractStrategy
+import reversi.strategies.TranspositionTableMethods as TranspositionTableMethods
+
+
+# ワーカープロセス側の状態(プールの初期化時に設定)
+_worker_search = None
+_worker_alpha = None
+_worker_generation = None
+
+
+class _ParallelSearch_(AbstractStrategy):
+    """
+    ルートの手を複数プロセスに分配して探索する
+    (最初の手を単独で探索して窓の下限を確定させた後、残りの手を並列に探索する)
+    """
+    def __init__(self, search=None, processes=None):
+        self.search = search
+        self.depth = search.depth
+        self.processes = processes if processes else os.cpu_count()
+        self._pool = None
+        self._alpha = None     # プロセス間で共有する窓の下限
+        self._generation = 0   # 探索の世代(ワーカー側の置換表の世代更新用)
+
+    @property
+    def _MIN(self):
+        return self.search._MIN
+
+    @property
+    def _MAX(self):
+        return self.search._MAX
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_pool'], state['_alpha'] = None, None  # プールと共有メモリは複製しない
+        return state
+
+    def next_move(self, color, board, budget=None):
+        """
+        次の一手
+        """
+        pid = Timer.get_budget(self, budget)  # タイムアウト監視用の時間予算
+        moves = board.get_legal_moves(color)
+        best_move, _ = self.get_best_move(color, board, moves, self.depth, pid)
+
+        return best_move
+
+    def get_best_move(self, color, board, moves, depth, pid=None, alpha=None, beta=None):
+        """
+        最善手を選ぶ(alpha, betaを省略した場合は全幅で探索)
+        """
+        alpha = self._MIN if alpha is None else alpha
+        beta = self._MAX if beta is None else beta
+
+        if self.processes < 2 or len(moves) < 2:
+            return self.search.get_best_move(color, board, moves, depth, pid, alpha=alpha, beta=beta)
+
+        pool = self._get_pool()
+        deadline, timeout_value = None, None
+        if pid and Timer.get_deadline(pid) is not None:
+            deadline, timeout_value = Timer.get_deadline(pid), Timer.get_timeout_value(pid)
+
+        self._generation += 1
+        self._alpha.value = alpha
+        state = _get_board_state(board)
+        args = [(self._generation, color, state, index, move, depth, beta, deadline, timeout_value) for index, move in enumerate(moves)]
+
+        # 最初の手の評価値で窓の下限を確定させてから、残りの手を並列に探索する
+        results = [pool.apply(_search_move, (args[0],))]
+        if not results[0][3]:
+            results += pool.imap_unordered(_search_move, args[1:])
+
+        best_move, scores, timeout, count = _get_best_result(moves, results, alpha)
+
+        if pid:
+            if timeout:
+                Timer.set_timeout(pid)  # タイムアウト発生
+            if self.search.measure:
+                Measure.count[pid] = Measure.count.get(pid, 0) + count
+
+        return best_move, scores
+
+    def _get_pool(self):
+        """
+        ワーカープロセスのプールを取得(初回のみ生成し、以降は再利用)
+        """
+        if self._pool is None:
+            self._alpha = Value('d', self._MIN)
+            self._pool = Pool(processes=self.processes, initializer=_init_worker, initargs=(self.search, self._alpha))
+
+        return self._pool
+
+    def close(self):
+        """
+        ワーカープロセスのプールを終了
+        """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool, self._alpha = None, None
+
+
+class _ParallelSearch(_ParallelSearch_):
+    """ParallelSearch + Measure
+    """
+    @Measure.time
+    def next_move(self, color, board, budget=None):
+        """next_move
+        """
+        return super().next_move(color, board, budget)
+
+
+class ParallelSearch_(_ParallelSearch_):
+    """ParallelSearch + Timer
+    """
+    @Timer.start(-10000000)
+    def next_move(self, color, board, budget=None):
+        """next_move
+        """
+        return super().next_move(color, board, budget)
+
+
+class ParallelSearch(_ParallelSearch_):
+    """ParallelSearch + Measure + Timer
+    """
+    @Timer.start(-10000000)
+    @Measure.time
+    def next_move(self, color, board, budget=None):
+        """next_move
+        """
+        return super().next_move(color, board, budget)
+
+
+class _ThreadedSearch_(AbstractStrategy):
+    """
+    ルートの手を複数スレッドに分配して探索する
+    (盤面サイズ8の探索はGILを解放するため、プロセスの起動や探索クラスの転送なしに並列に探索できる)
+    """
+    def __init__(self, search=None, threads=None):
+        self.search = search
+        self.depth = search.depth
+        self.threads = threads if threads else os.cpu_count()
+        self._executor = None
+        self._searches = None  # スレッドで使用する探索(探索ごとの状態を共有しないよう複製する)
+        self._idle = None      # 空いている探索の番号
+        self._lock = threading.Lock()
+        self._alpha = None     # スレッド間で共有する窓の下限
+
+    @property
+    def _MIN(self):
+        return self.search._MIN
+
+    @property
+    def _MAX(self):
+        return self.search._MAX
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_executor'], state['_searches'], state['_idle'], state['_lock'] = None, None, None, None  # スレッドは複製しない
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def next_move(self, color, board, budget=None):
+        """
+        次の一手
+        """
+        pid = Timer.get_budget(self, budget)  # タイムアウト監視用の時間予算
+        moves = board.get_legal_moves(color)
+        best_move, _ = self.get_best_move(color, board, moves, self.depth, pid)
+
+        return best_move
+
+    def get_best_move(self, color, board, moves, depth, pid=None, alpha=None, beta=None):
+        """
+        最善手を選ぶ(alpha, betaを省略した場合は全幅で探索)
+        """
+        alpha = self._MIN if alpha is None else alpha
+        beta = self._MAX if beta is None else beta
+
+        if self.threads < 2 or len(moves) < 2:
+            return self.search.get_best_move(color, board, moves, depth, pid, alpha=alpha, beta=beta)
+
+        executor = self._get_executor()
+        deadline, timeout_value = None, None
+        if pid and Timer.get_deadline(pid) is not None:
+            deadline, timeout_value = Timer.get_deadline(pid), Timer.get_timeout_value(pid)
+
+        # 置換表の世代を探索ごとに更新する
+        for search in self._searches:
+            transposition_table = getattr(search, 'transposition_table', None)
+            if transposition_table is not None:
+                transposition_table.new_search()
+
+        self._alpha = alpha
+        args = [(color, board, index, move, depth, pid, beta, deadline, timeout_value) for index, move in enumerate(moves)]
+
+        # 最初の手の評価値で窓の下限を確定させてから、残りの手を並列に探索する
+        results = [self._search_move(args[0])]
+        if not results[0][3]:
+            results += executor.map(self._search_move, args[1:])
+
+        best_move, scores, timeout, count = _get_best_result(moves, results, alpha)
+
+        if pid:
+            if timeout:
+                Timer.set_timeout(pid)  # タイムアウト発生
+            if self.search.measure:
+                Measure.count[pid] = Measure.count.get(pid, 0) + count
+
+        return best_move, scores
+
+    def _search_move(self, args):
+        """
+        スレッドでルートの一手を探索
+        """
+        color, board, index, move, depth, pid, beta, deadline, timeout_value = args
+        number = self._idle.get()  # 空いている探索を使用する
+        search = self._searches[number]
+        try:
+            # 呼び出し元の期限をスレッドごとの時間予算に設定する
+            thread_pid = None
+            if pid:
+                thread_pid = TimeBudget(Timer.get_pid(search), timeout_value if timeout_value is not None else search._MIN, deadline=deadline if deadline is not None else float('inf'))  # noqa: E501
+                Measure.count[thread_pid] = 0
+            if deadline is not None and time.monotonic() > deadline:
+                return index, thread_pid.timeout_value, self._alpha, True, 0
+
+            alpha = self._alpha  # 他のスレッドが更新した窓の下限を使用する
+            _, scores = search.get_best_move(color, copy.deepcopy(board), [move], depth, thread_pid, alpha=alpha, beta=beta)
+            score, timeout = scores[move], Timer.is_timeout(thread_pid)
+
+            if not timeout and score > alpha:
+                with self._lock:
+                    if score > self._alpha:
+                        self._alpha = score
+
+            return index, score, alpha, timeout, Measure.count.get(thread_pid, 0)
+        finally:
+            self._idle.put(number)
+
+    def _get_executor(self):
+        """
+        スレッドプールを取得(初回のみ生成し、以降は再利用)
+        """
+        if self._executor is None:
+            self._searches = [copy.deepcopy(self.search) for _ in range(self.threads)]
+            self._idle = queue.Queue()
+            for number in range(self.threads):
+                self._idle.put(number)
+            self._executor = ThreadPoolExecutor(max_workers=self.threads)
+
+        return self._executor
+
+    def close(self):
+        """
+        スレッドプールを終了
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor, self._searches, self._idle = None, None, None
+
+
+class _ThreadedSearch(_ThreadedSearch_):
+    """ThreadedSearch + Measure
+    """
+    @Measure.time
+    def next_move(self, color, board, budget=None):
+        """next_move
+        """
+        return super().next_move(color, board, budget)
+
+
+class ThreadedSearch_(_ThreadedSearch_):
+    """ThreadedSearch + Timer
+    """
+    @Timer.start(-10000000)
+    def next_move(self, color, board, budget=None):
+        """next_move
+        """
+        return super().next_move(color, board, budget)
+
+
+class ThreadedSearch(_ThreadedSearch_):
+    """ThreadedSearch + Measure + Timer
+    """
+    @Timer.start(-10000000)
+    @Measure.time
+    def next_move(self, color, board, budget=None):
+        """next_move
+        """
+        return super().next_move(color, board, budget)
+
+
+class _LazySMP_(AbstractStrategy):
+    """
+    同じ反復深化の探索を複数プロセスで実行し、共有置換表を介して探索結果を共有する
+    (補助プロセスは開始深さをずらして探索し、手の決定には自プロセスの探索結果を用いる)
+    """
+    def __init__(self, base=None, processes=None, tt_size=16):
+        self.base = copy.deepcopy(base)  # 共有置換表を持たせるため、既定引数で共有される探索クラスを複製する
+        self.processes = processes if processes else os.cpu_count()
+        self.transposition_table = None
+        self._pool = None
+
+        # 共有置換表(tt_size:MB, 盤面サイズ8の探索でのみ使用)
+        if self.processes > 1 and not TranspositionTableMethods.SHARED_TRANSPOSITIONTABLE_ERROR:
+            self.transposition_table = TranspositionTableMethods.SharedTranspositionTable(tt_size)
+            self.base.search.transposition_table = self.transposition_table
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_pool'] = None  # プールは複製しない
+        return state
+
+    def next_move(self, color, board, budget=None):
+        """
+        次の一手
+        (補助プロセスも自プロセスと同じ期限で読み、補助プロセスを待つ時間も含めて持ち時間から差し引く)
+        (budgetの指定時はその時間予算の期限で読み、持ち時間の管理は呼び出し元で行う)
+        """
+        if self.transposition_table is None:
+            return self.base.next_move(color, board, budget)
+
+        moves, time_manager, time_limit = board.get_legal_moves(color), None, None
+        if not isinstance(budget, TimeBudget):
+            time_manager = self.base.time_manager
+            if time_manager is not None:
+                time_limit = time_manager.start(board, moves)  # 持ち時間から思考時間を配分
+                if len(moves) == 1:
+                    time_manager.end()
+                    return moves[0]  # 手の選択肢がない場合は読まない
+
+            budget = Timer.create_budget(Timer.get_pid(self.base.search), self.base.search._MIN, time_limit)  # 自プロセスと補助プロセスで共有する期限
+        pool = self._get_pool()
+        state = _get_board_state(board)
+        helpers = [pool.apply_async(_search_helper, ((self._get_helper_depth(i), color, state, budget.deadline),)) for i in range(self.processes - 1)]
+
+        try:
+            best_move = self.base.next_move(color, board, budget)
+        finally:
+            for helper in helpers:
+                helper.wait(max(budget.deadline - time.monotonic(), 0))  # 補助プロセスは期限を過ぎたら待たない
+            if time_manager is not None:
+                time_manager.end()
+
+        return best_move
+
+    def _get_helper_depth(self, index):
+        """
+        補助プロセスの開始深さ(1つおきに1手、2手深くする)
+        """
+        depth = self.base.depth + 1 + index % 2
+        if self.base.limit:
+            depth = min(depth, self.base.limit)
+
+        return depth
+
+    def _get_pool(self):
+        """
+        補助プロセスのプールを取得(初回のみ生成し、以降は再利用)
+        """
+        if self._pool is None:
+            self._pool = Pool(processes=self.processes - 1, initializer=_init_worker, initargs=(self.base, None))
+
+        return self._pool
+
+    def close(self):
+        """
+        補助プロセスのプールを終了
+        """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+
+class LazySMP(_LazySMP_):
+    """LazySMP + Measure
+    """
+    @Measure.time
+    def next_move(self, color, board, budget=None):
+        """next_move
+        """
+        return super().next_move(color, board, budget)
+
+
+def _get_best_result(moves, results, alpha):
+    """
+    各手の探索結果から最善手を選ぶ
+    """
+    best_move, scores, timeout, count = None, {}, False, 0
+    for index, score, window_alpha, is_timeout, node in sorted(results):
+        move = moves[index]
+        scores[move] = score
+        timeout |= is_timeout
+        count += node
+        if not is_timeout and score > window_alpha and score > alpha:  # 窓の下限を超えた手の評価値のみ確定値として扱う
+            alpha = score
+            best_move = move
+
+    if best_move is None:
+        best_move = moves[0]  # 窓の下限を超える手がない場合
+
+    return best_move, scores, timeout, count
+
+
+def _get_board_state(board):
+    """
+    ワーカープロセスへ渡す盤面の情報を取得
+    """
+    if hasattr(board, '_black_bitboard'):
+        return (board.size, board._hole_bitboard, board._black_bitboard, board._white_bitboard, board._black_score, board._white_score, list(board.prev), board._hash)  # noqa: E501
+
+    return board
+
+
+def _get_board(state):
+    """
+    盤面の情報から盤面を復元
+    """
+    if isinstance(state, tuple):
+        size, hole, black_bitboard, white_bitboard, black_score, white_score, prev, hash_value = state
+        board = BitBoard(size, hole=hole)
+        board._black_bitboard, board._white_bitboard = black_bitboard, white_bitboard
+        board._black_score, board._white_score = black_score, white_score
+        board.prev = prev
+        board._hash = hash_value
+        return board
+
+    return state
+
+
+def _init_worker(search, alpha):
+    """
+    ワーカープロセスの初期化
+    """
+    global _worker_search, _worker_alpha
+    _worker_search = search
+    _worker_alpha = alpha
+
+
+def _search_move(args):
+    """
+    ワーカープロセスでルートの一手を探索
+    """
+    global _worker_generation
+    generation, color, state, index, move, depth, beta, deadline, timeout_value = args
+    search = _worker_search
+
+    # 置換表は同じ探索の間はワーカー内で共有し、探索ごとに世代を更新する
+    transposition_table = getattr(search, 'transposition_table', None)
+    if generation != _worker_generation:
+        _worker_generation = generation
+        if transposition_table is not None:
+            transposition_table.new_search()
+
+    # 呼び出し元の期限をワーカーの時間予算に設定する
+    pid = TimeBudget(Timer.get_pid(search), timeout_value if timeout_value is not None else search._MIN, deadline=deadline if deadline is not None else float('inf'))  # noqa: E501
+    if deadline is not None and time.monotonic() > deadline:
+        return index, pid.timeout_value, _worker_alpha.value, True, 0
+
+    alpha = _worker_alpha.value  # 他のワーカーが更新した窓の下限を使用する
+    Measure.count[pid] = 0
+    _, scores = search.get_best_move(color, _get_board(state), [move], depth, pid, alpha=alpha, beta=beta)
+    score, timeout = scores[move], Timer.is_timeout(pid)
+
+    if not timeout and score > alpha:
+        with _worker_alpha.get_lock():
+            if score > _worker_alpha.value:
+                _worker_alpha.value = score
+
+    return index, score, alpha, timeout, Measure.count[pid]
+
+
+def _search_helper(args):
+    """
+    補助プロセスで反復深化の探索を実行(結果は共有置換表にのみ残す)
+    """
+    depth, color, state, deadline = args
+    base = _worker_search
+    base.depth, base.time_manager = depth, None  # 持ち時間は呼び出し元で管理する
+
+    # 呼び出し元の期限を補助プロセスの時間予算に設定する
+    budget = TimeBudget(Timer.get_pid(base.search), base.search._MIN, deadline=deadline if deadline is not None else float('inf'))
+    if time.monotonic() < budget.deadline:
+        base.next_move(color, _get_board(state), budget)
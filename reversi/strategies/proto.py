@@ -119,7 +119,7 @@ class NegaMax_(MinMax_):
     """
     @Measure.time
     @Timer.start(-10000000)
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """
         次の一手
         """
@@ -132,8 +132,8 @@ class NegaMax_(MinMax_):
             score = -self.get_score(next_color, board, self.depth-1)  # 評価値を取得
             board.undo()                                              # 打った手を戻す
 
-            if Timer.is_timeout(self):      # タイムアウト発生時
-                if max_score not in moves:  # 候補がない場合は現在の手を返す
+            if Timer.is_timeout(Timer.get_pid(self)):  # タイムアウト発生時
+                if max_score not in moves:             # 候補がない場合は現在の手を返す
                     moves[max_score] = [move]
                 break
             else:
@@ -173,7 +173,7 @@ class NegaMax_(MinMax_):
             score = -self.get_score(next_color, board, depth-1)
             board.undo()
 
-            if Timer.is_timeout(self):
+            if Timer.is_timeout(Timer.get_pid(self)):
                 break
             else:
                 max_score = max(max_score, score)  # 最大値を選択
@@ -195,11 +195,11 @@ class AlphaBeta_(NegaMax_):
     """
     @Measure.time
     @Timer.start(-10000000)
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """
         次の一手
         """
-        pid = Timer.get_pid(self)             # タイムアウト監視用のプロセスID
+        pid = Timer.get_budget(self, budget)  # タイムアウト監視用の時間予算
         moves = board.get_legal_moves(color)  # 手の候補
         best_move = self.get_best_move(color, board, moves, self.depth, pid)
 
@@ -284,7 +284,7 @@ class AB_T(AlphaBeta_):
 
     @Measure.time
     @Timer.start(-10000000)
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """
         次の一手
         """
@@ -344,11 +344,11 @@ class AB_TI(AB_T):
 
     @Measure.time
     @Timer.start(-10000000)
-    def next_move(self, color, board):
+    def next_move(self, color, board, budget=None):
         """
         次の一手
         """
-        pid = Timer.get_pid(self)  # タイムアウト監視用のプロセスID
+        pid = Timer.get_budget(self, budget)  # タイムアウト監視用の時間予算
 
         if self.table.size != board.size:  # テーブルサイズの調整
             self.table.set_table(board.size)
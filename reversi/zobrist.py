@@ -0,0 +1,52 @@
+"""Zobrist
+
+       盤面のハッシュ値(64bit)
+"""
+
+import random
+
+
+ZOBRIST_SEED = 0x5A0B
+ZOBRIST_SQUARES = 26 * 26  # 最大ボードサイズのマス数
+
+_random = random.Random(ZOBRIST_SEED)
+ZOBRIST_BLACK = [_random.getrandbits(64) for _ in range(ZOBRIST_SQUARES)]  # 黒石(ビット位置ごと)
+ZOBRIST_WHITE = [_random.getrandbits(64) for _ in range(ZOBRIST_SQUARES)]  # 白石(ビット位置ごと)
+ZOBRIST_TURN = _random.getrandbits(64)                                      # 白番
+
+
+def get_hash(black_bitboard, white_bitboard, turn):
+    """get_hash
+
+           盤面と手番(turn)からハッシュ値を算出
+    """
+    ret = get_discs_hash(black_bitboard, white_bitboard)
+    if turn == 'white':
+        ret ^= ZOBRIST_TURN
+    return ret
+
+
+def get_discs_hash(black_bits, white_bits):
+    """get_discs_hash
+
+           指定ビット位置の石のハッシュ値を算出
+           (差分のビットを与えると、変化前後のハッシュ値の差分となる)
+    """
+    ret = 0
+    for keys, bits in ((ZOBRIST_BLACK, black_bits), (ZOBRIST_WHITE, white_bits)):
+        while bits:
+            lsb = bits & -bits
+            ret ^= keys[lsb.bit_length() - 1]
+            bits ^= lsb
+    return ret
+
+
+def get_turn_hash(prev, black_score):
+    """get_turn_hash
+
+           直前の手から手番のハッシュ値を求める(ビットボード用)
+           (直前に黒が打っていれば白番、それ以外は黒番とし、パスは考慮しない)
+    """
+    if prev and black_score > prev[-1][2]:
+        return ZOBRIST_TURN
+    return 0
@@ -24,6 +24,8 @@ setup(
         'reversi.strategies.NegaScoutMethods',
         'reversi.strategies.EndGameMethods',
         'reversi.strategies.BlankMethods',
+        'reversi.strategies.TranspositionTableMethods',
+        'reversi.strategies.MTDfMethods',
         'reversi.genetic_algorithm',
         'reversi.examples',
         'reversi.examples.extra',
@@ -33,7 +35,7 @@ setup(
         'reversi.examples.extra.sample_input',
     ],
     package_data={
-        "": ["*.json", "*.pl", "*.py", "*.vbs", "*.txt", "*.pyx", "*.pyd", "*.bat"]
+        "": ["*.json", "*.pl", "*.py", "*.vbs", "*.txt", "*.pyx", "*.pxd", "*.pyd", "*.bat"]
     },
     entry_points={
         "console_scripts": [
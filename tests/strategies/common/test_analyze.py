@@ -0,0 +1,67 @@
+"""Tests of analyze.py
+"""
+
+import unittest
+import time
+
+from reversi.board import BitBoard
+from reversi.strategies import _NegaScout_, NegaScout, _AlphaBeta_, MTDf, _Blank_
+import reversi.strategies.coordinator as coord
+
+
+class TestAnalyze(unittest.TestCase):
+    """analyze
+    """
+    def test_analyze_depth(self):
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 4)
+        moves = board.get_legal_moves('black')
+
+        for strategy in [_NegaScout_(depth=4, evaluator=coord.Evaluator_TPW_Fast()), _AlphaBeta_(depth=4, evaluator=coord.Evaluator_TPW_Fast(), tt_size=1), MTDf(depth=4, evaluator=coord.Evaluator_TPW_Fast()), _Blank_(depth=4)]:  # noqa: E501
+            # 各手を全幅の窓で読んだ評価値と一致する
+            expected = {}
+            for move in moves:
+                _, scores = strategy.get_best_move('black', board, [move], 4)
+                expected[move] = scores[move]
+
+            result = strategy.analyze('black', board, k=3)
+            self.assertEqual(len(result), 3)
+            self.assertEqual([score for _, score, _ in result], sorted(expected.values(), reverse=True)[:3])
+            for move, score, pv in result:
+                self.assertEqual(score, expected[move])
+                self.assertEqual(pv[0], move)
+
+        # 深さの指定
+        strategy = _NegaScout_(depth=4, evaluator=coord.Evaluator_TPW_Fast())
+        result = strategy.analyze('black', board, k=1, depth=2)
+        self.assertEqual(len(result[0][2]), 2)
+
+        # 手の数より多い場合
+        result = strategy.analyze('black', board, k=100)
+        self.assertEqual(len(result), len(moves))
+
+    def test_analyze_time_limit(self):
+        board = BitBoard()
+        strategy = NegaScout(evaluator=coord.Evaluator_TPW_Fast(), tt_size=1)
+
+        # 制限時間内で深さを増やして読む
+        start = time.time()
+        result = strategy.analyze('black', board, k=2, time_limit=0.2)
+        self.assertLessEqual(time.time() - start, 0.3)
+        self.assertEqual(len(result), 2)
+        self.assertGreaterEqual(result[0][1], result[1][1])
+        self.assertGreater(len(result[0][2]), 2)
+
+        # 制限時間内に読み切れない場合も深さ1の結果を返す(タイムアウト時の値を含まない)
+        result = strategy.analyze('black', board, k=2, time_limit=0)
+        self.assertEqual(result, strategy.analyze('black', board, k=2, depth=1))
+        self.assertNotIn(strategy._MIN, [score for _, score, _ in result])
+
+        # 最後まで読んだ場合は打ち切る
+        board = BitBoard()
+        board._black_bitboard = 0xFFFFFFFFFFFFFFFC
+        board._white_bitboard = 0x0000000000000002
+        board.update_score()
+        result = strategy.analyze('black', board, k=1, time_limit=10)
+        self.assertEqual(result, [((7, 7), 10064, [(7, 7)])])  # 勝ちの評価値
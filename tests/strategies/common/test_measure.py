@@ -4,11 +4,12 @@
 import unittest
 import os
 import time
+import gc
 
 from reversi import BitBoard
 from reversi import C as c
 from reversi.strategies import AbstractStrategy
-from reversi.strategies.common import Measure
+from reversi.strategies.common import Measure, Timer
 
 
 class TestMeasure(unittest.TestCase):
@@ -24,10 +25,10 @@ class TestMeasure(unittest.TestCase):
                 time.sleep(wait)
                 return (0, 0)
 
-        pid = "TestTime" + str(os.getpid())
+        strategy = TestTime()
+        pid = Timer.get_pid(strategy)
         self.assertTrue(pid not in Measure.elp_time)
 
-        strategy = TestTime()
         for _ in range(repeat):
             board = BitBoard()
             strategy.next_move(c.black, board)
@@ -37,6 +38,12 @@ class TestMeasure(unittest.TestCase):
         self.assertGreaterEqual(Measure.elp_time[pid]['max'], Measure.elp_time[pid]['ave'])
         self.assertGreaterEqual(Measure.elp_time[pid]['ave'], Measure.elp_time[pid]['min'])
 
+        # 同じクラスの別インスタンスは計測結果を共有しない
+        strategy2 = TestTime()
+        strategy2.next_move(c.black, BitBoard())
+        self.assertEqual(Measure.elp_time[Timer.get_pid(strategy2)]['cnt'], 1)
+        self.assertEqual(Measure.elp_time[pid]['cnt'], repeat)
+
     def test_measure_countup(self):
         repeat = 10
 
@@ -54,3 +61,29 @@ class TestMeasure(unittest.TestCase):
 
         self.assertTrue(pid in Measure.count)
         self.assertEqual(Measure.count[pid], repeat)
+
+    def test_measure_release(self):
+        class TestRelease(AbstractStrategy):
+            @Measure.time
+            @Timer.start(-100)
+            def next_move(self, color, board, budget=None):
+                Measure.count[budget] = 90230
+                Timer.set_timeout(budget)
+                return (0, 0)
+
+        gc.collect()
+        size = len(Measure.elp_time), len(Measure.count)
+        for _ in range(500):
+            TestRelease().next_move(c.black, BitBoard())
+        gc.collect()
+
+        # 破棄したインスタンスの計測値は残らない
+        self.assertLessEqual(len(Measure.elp_time), size[0])
+        self.assertLessEqual(len(Measure.count), size[1])
+
+        # 新しいインスタンスは破棄したインスタンスの計測値やタイムアウトを引き継がない
+        strategy = TestRelease()
+        pid = Timer.get_pid(strategy)
+        self.assertNotIn(pid, Measure.count)
+        self.assertNotIn(pid, Measure.elp_time)
+        self.assertFalse(Timer.is_timeout(pid))
@@ -0,0 +1,59 @@
+"""Tests of stats.py
+"""
+
+import unittest
+
+from reversi.strategies.common import SearchStats
+
+
+class TestSearchStats(unittest.TestCase):
+    """stats
+    """
+    def test_stats_init(self):
+        stats = SearchStats()
+        self.assertEqual(stats.nodes_by_depth, {})
+        self.assertEqual(stats.nodes, 0)
+        self.assertEqual(stats.nps, 0)
+        self.assertEqual(stats.first_move_cutoff_rate, 0)
+        self.assertEqual(stats.tt_hit_rate, 0)
+        self.assertEqual(stats.timeouts, 0)
+        self.assertIsNone(stats.depth)
+
+    def test_stats_add(self):
+        stats = SearchStats()
+        counter = {'nodes': [0, 4, 20, 0], 'leaves': 20, 'cutoffs': 8, 'first_cutoffs': 6, 'tt_probes': 5, 'tt_hits': 1}
+
+        # 探索カーネルの計数値を加算する
+        stats.add(counter)
+        stats.add(counter)
+        self.assertEqual(stats.nodes_by_depth, {1: 8, 2: 40})
+        self.assertEqual(stats.nodes, 48)
+        self.assertEqual(stats.leaf_evaluations, 40)
+        self.assertEqual(stats.cutoffs, 16)
+        self.assertEqual(stats.first_move_cutoffs, 12)
+        self.assertEqual(stats.first_move_cutoff_rate, 0.75)
+        self.assertEqual(stats.tt_probes, 10)
+        self.assertEqual(stats.tt_hit_rate, 0.2)
+
+    def test_stats_start_end(self):
+        stats = SearchStats()
+        stats.add({'nodes': [0, 100], 'leaves': 100, 'cutoffs': 0, 'first_cutoffs': 0, 'tt_probes': 0, 'tt_hits': 0})
+        stats.start()
+        stats.start_time -= 0.5
+        stats.end(3)
+        self.assertEqual(stats.depth, 3)
+        self.assertEqual(stats.timeouts, 0)
+        self.assertAlmostEqual(stats.elapsed, 0.5, places=1)
+        self.assertAlmostEqual(stats.nps, 200, delta=20)
+        self.assertIsNone(stats.start_time)
+
+        # タイムアウトした探索の回数を数える
+        stats.end(4, True)
+        self.assertEqual(stats.depth, 4)
+        self.assertEqual(stats.timeouts, 1)
+
+        result = stats.to_dict()
+        self.assertEqual(result['nodes'], 100)
+        self.assertEqual(result['nodes_by_depth'], {1: 100})
+        self.assertEqual(result['timeouts'], 1)
+        self.assertTrue(repr(stats).startswith('SearchStats(nodes=100, leaf_evaluations=100'))
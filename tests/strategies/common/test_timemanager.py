@@ -0,0 +1,90 @@
+"""Tests of timemanager.py
+"""
+
+import unittest
+import time
+
+from reversi import BitBoard
+from reversi.strategies.common import TimeManager
+
+
+class TestTimeManager(unittest.TestCase):
+    """timemanager
+    """
+    def test_timemanager_init(self):
+        time_manager = TimeManager()
+        self.assertEqual(time_manager.total, 60)
+        self.assertEqual(time_manager.increment, 0)
+        self.assertEqual(time_manager.remaining, 60)
+        self.assertIsNone(time_manager.empties)
+        self.assertIsNone(time_manager.start_time)
+
+        time_manager = TimeManager(total=10, increment=1)
+        self.assertEqual(time_manager.total, 10)
+        self.assertEqual(time_manager.increment, 1)
+        self.assertEqual(time_manager.remaining, 10)
+
+    def test_timemanager_start(self):
+        time_manager = TimeManager(total=60, increment=1, margin=0.05, max_ratio=3)
+        board = BitBoard()
+
+        # 残りの自分の手数(空きマス60 -> 30手)で均等に配分する
+        limit = time_manager.start(board, board.get_legal_moves('black'))
+        self.assertEqual(time_manager.empties, 60)
+        self.assertAlmostEqual(time_manager.target, 57 / 30 + 1)
+        self.assertAlmostEqual(limit, (57 / 30 + 1) * 3)
+
+        # 上限は残りの持ち時間を超えない
+        time_manager.remaining = 2
+        limit = time_manager.start(board, board.get_legal_moves('black'))
+        self.assertAlmostEqual(limit, 1.9)
+
+        # 手の選択肢がない場合
+        limit = time_manager.start(board, [(2, 3)])
+        self.assertEqual(limit, time_manager.min_time)
+
+        # 空きマスが増えた場合は新しい対局とみなす
+        board.put_disc('black', 3, 2)
+        time_manager.start(board, board.get_legal_moves('white'))
+        self.assertEqual(time_manager.remaining, 2)
+        time_manager.start(BitBoard(), BitBoard().get_legal_moves('black'))
+        self.assertEqual(time_manager.remaining, 60)
+
+    def test_timemanager_is_enough(self):
+        time_manager = TimeManager(total=60, stable_depth=2, stable_ratio=0.3, instability=0.5, swing=10, next_ratio=0.5)
+        board = BitBoard()
+        time_manager.start(board, board.get_legal_moves('black'))
+        target = time_manager.target
+
+        # 最善手が変わった場合は配分時間を延長する
+        self.assertFalse(time_manager.is_enough((2, 3), 0))
+        self.assertFalse(time_manager.is_enough((3, 2), 1))
+        self.assertAlmostEqual(time_manager.target, target * 1.5)
+        self.assertEqual(time_manager.stable, 0)
+
+        # 評価値が大きく変動した場合も延長する
+        self.assertFalse(time_manager.is_enough((3, 2), 20))
+        self.assertAlmostEqual(time_manager.target, target * 2.25)
+
+        # 最善手が安定した場合は早めに打ち切る
+        time_manager.start_time = time.time() - target * 2.25 * 0.3
+        self.assertFalse(time_manager.is_enough((3, 2), 21))
+        self.assertTrue(time_manager.is_enough((3, 2), 22))
+
+        # 次の反復を始められない場合は打ち切る
+        time_manager.start(board, board.get_legal_moves('black'))
+        time_manager.start_time = time.time() - time_manager.target * 0.5
+        self.assertTrue(time_manager.is_enough((2, 3), 0))
+
+    def test_timemanager_end(self):
+        time_manager = TimeManager(total=10, increment=2)
+        board = BitBoard()
+        time_manager.start(board, board.get_legal_moves('black'))
+        time_manager.start_time -= 1
+        time_manager.end()
+        self.assertAlmostEqual(time_manager.remaining, 11, places=1)
+        self.assertIsNone(time_manager.start_time)
+
+        # 思考開始前は持ち時間を変えない
+        time_manager.end()
+        self.assertAlmostEqual(time_manager.remaining, 11, places=1)
@@ -4,8 +4,9 @@
 import unittest
 import os
 import time
+import pickle
 
-from reversi.strategies.common import Timer, CPU_TIME
+from reversi.strategies.common import Timer, TimeBudget, CPU_TIME
 
 
 class TestTimer(unittest.TestCase):
@@ -17,15 +18,20 @@ class TestTimer(unittest.TestCase):
     def test_get_pid(self):
         pid1 = self.__class__.__name__ + str(os.getpid())
         pid2 = Timer.get_pid(self)
-        self.assertEqual(pid1, pid2)
+        self.assertEqual(pid1, str(pid2))
+        self.assertIs(Timer.get_pid(self), pid2)
+
+        # 同じクラスでもインスタンスごとに異なる
+        other = self.__class__()
+        self.assertNotEqual(Timer.get_pid(other), pid2)
 
     def test_deadline(self):
         pid = Timer.get_pid(self)
-        deadline = time.time() + Timer.time_limit
+        deadline = time.monotonic() + Timer.time_limit
         Timer.set_deadline(pid, -10000)
-        self.assertGreaterEqual(Timer.deadline[pid], deadline)
-        self.assertFalse(Timer.timeout_flag[pid])
-        self.assertEqual(Timer.timeout_value[pid], -10000)
+        self.assertGreaterEqual(Timer.get_deadline(pid), deadline)
+        self.assertFalse(Timer.is_timeout(pid))
+        self.assertEqual(Timer.get_timeout_value(pid), -10000)
 
     def test_start(self):
         value = -100
@@ -35,17 +41,18 @@ class TestTimer(unittest.TestCase):
                 self.dummy = False
 
             @Timer.start(value)
-            def timer_start(self):
+            def timer_start(self, budget=None):
                 self.dummy = True
 
-        deadline = time.time() + Timer.time_limit
+        deadline = time.monotonic() + Timer.time_limit
         dummy = Dummy()
         dummy.timer_start()
-        pid = dummy.__class__.__name__ + str(os.getpid())
+        pid = Timer.get_pid(dummy)
         self.assertTrue(dummy.dummy)
-        self.assertGreaterEqual(Timer.deadline[pid], deadline)
-        self.assertFalse(Timer.timeout_flag[pid])
-        self.assertEqual(Timer.timeout_value[pid], value)
+        self.assertGreaterEqual(Timer.get_deadline(pid), deadline)
+        self.assertFalse(Timer.is_timeout(pid))
+        self.assertEqual(Timer.get_timeout_value(pid), value)
+        self.assertIsInstance(pid.time_budget, TimeBudget)  # 直近の時間予算はプロセスIDが持つ
 
     def test_timeout(self):
         pre_limit = Timer.time_limit
@@ -56,7 +63,7 @@ class TestTimer(unittest.TestCase):
                 self.dummy = False
 
             @Timer.start(value)
-            def timer_start(self):
+            def timer_start(self, budget=None):
                 self.dummy = True
 
             @Timer.timeout
@@ -65,15 +72,16 @@ class TestTimer(unittest.TestCase):
 
         dummy = Dummy()
         dummy.timer_start()
-        pid = dummy.__class__.__name__ + str(os.getpid())
-        self.assertFalse(Timer.timeout_flag[pid])
+        pid = Timer.get_pid(dummy)
+        self.assertFalse(Timer.is_timeout(pid))
 
         dummy.timeout_monitor(pid=pid)
-        self.assertFalse(Timer.timeout_flag[pid])
+        self.assertFalse(Timer.is_timeout(pid))
 
         time.sleep(Timer.time_limit * 1.1)
-        dummy.timeout_monitor(pid=pid)
-        self.assertTrue(Timer.timeout_flag[pid])
+        for _ in range(2):  # 直前の確認から間もないため2ノード目で時計を参照する
+            dummy.timeout_monitor(pid=pid)
+        self.assertTrue(Timer.is_timeout(pid))
 
         Timer.time_limit = pre_limit
 
@@ -86,7 +94,7 @@ class TestTimer(unittest.TestCase):
                 self.dummy = False
 
             @Timer.start(value)
-            def timer_start(self):
+            def timer_start(self, budget=None):
                 self.dummy = True
 
             @Timer.timeout
@@ -95,13 +103,14 @@ class TestTimer(unittest.TestCase):
 
         dummy = Dummy()
         dummy.timer_start()
-        pid = dummy.__class__.__name__ + str(os.getpid())
+        pid = Timer.get_pid(dummy)
         dummy.timeout_monitor(pid=pid)
 
         self.assertFalse(Timer.is_timeout(pid))
 
         time.sleep(Timer.time_limit * 1.1)
-        dummy.timeout_monitor(pid=pid)
+        for _ in range(2):  # 直前の確認から間もないため2ノード目で時計を参照する
+            dummy.timeout_monitor(pid=pid)
 
         self.assertTrue(Timer.is_timeout(pid))
 
@@ -116,7 +125,7 @@ class TestTimer(unittest.TestCase):
                 self.dummy = False
 
             @Timer.start(value)
-            def timer_start(self):
+            def timer_start(self, budget=None):
                 self.dummy = True
 
             @Timer.timeout
@@ -128,7 +137,7 @@ class TestTimer(unittest.TestCase):
                 self.dummy = False
 
             @Timer.start(value)
-            def timer_start(self):
+            def timer_start(self, budget=None):
                 self.dummy = True
 
             @Timer.timeout
@@ -137,8 +146,8 @@ class TestTimer(unittest.TestCase):
 
         dummy1 = Dummy1()
         dummy2 = Dummy2()
-        pid1 = dummy1.__class__.__name__ + str(os.getpid())
-        pid2 = dummy2.__class__.__name__ + str(os.getpid())
+        pid1 = Timer.get_pid(dummy1)
+        pid2 = Timer.get_pid(dummy2)
         self.assertFalse(Timer.is_timeout(pid1))
         self.assertFalse(Timer.is_timeout(pid2))
 
@@ -197,3 +206,82 @@ class TestTimer(unittest.TestCase):
         self.assertTrue(Timer.is_timeout(pid2))
 
         Timer.time_limit = pre_limit
+
+    def test_time_budget(self):
+        budget = TimeBudget('BUDGET', -100, time_limit=10)
+        self.assertEqual(budget.pid, 'BUDGET')
+        self.assertEqual(budget.timeout_value, -100)
+        self.assertFalse(budget.timeout_flag)
+        self.assertGreater(budget.remaining(), 9)
+        self.assertEqual(Timer.get_deadline(budget), budget.deadline)
+        self.assertEqual(Timer.get_timeout_value(budget), -100)
+        self.assertFalse(Timer.is_expired(budget))
+        self.assertFalse(Timer.is_timeout(budget))
+
+        # 期限切れ
+        budget = TimeBudget('BUDGET', -100, deadline=0)
+        self.assertTrue(Timer.is_expired(budget))
+        self.assertTrue(Timer.is_timeout(budget))
+        self.assertFalse(Timer.is_timeout('BUDGET'))
+
+        # 複製
+        budget_copy = pickle.loads(pickle.dumps(budget))
+        self.assertIsInstance(budget_copy, TimeBudget)
+        self.assertEqual(budget_copy.pid, 'BUDGET')
+        self.assertEqual(budget_copy.deadline, 0)
+        self.assertTrue(budget_copy.timeout_flag)
+
+    def test_time_budget_check_interval(self):
+        budget = TimeBudget('BUDGET', -100, time_limit=10)
+
+        # 短い周期で確認する場合は時計を参照するノード数の間隔を広げる
+        for _ in range(100):
+            self.assertFalse(budget.is_expired())
+        self.assertGreater(budget.nodes, 1)
+        self.assertLessEqual(budget.nodes, TimeBudget.check_max_nodes)
+
+        # 時計を参照するノードまでは期限切れを判定しない
+        budget.deadline = 0
+        for _ in range(budget.count):
+            self.assertFalse(budget.is_expired())
+        self.assertTrue(budget.is_expired())
+        self.assertTrue(budget.timeout_flag)
+
+    def test_budget_per_instance(self):
+        pre_limit = Timer.time_limit
+        Timer.time_limit = 0.2
+        value = -100
+
+        class Dummy:
+            @Timer.start(value)
+            def timer_start(self, budget=None):
+                return Timer.get_budget(self, budget)
+
+            @Timer.timeout
+            def timeout_monitor(self, pid=None):
+                return 0
+
+        # 同じクラスの別インスタンスは時間予算を共有しない
+        dummy1, dummy2 = Dummy(), Dummy()
+        budget1 = dummy1.timer_start()
+        time.sleep(Timer.time_limit * 0.6)
+        budget2 = dummy2.timer_start()
+        self.assertIsInstance(budget1, TimeBudget)
+        self.assertNotEqual(budget1, budget2)
+        time.sleep(Timer.time_limit * 0.6)
+
+        self.assertEqual(dummy1.timeout_monitor(pid=budget1), value)
+        self.assertEqual(dummy2.timeout_monitor(pid=budget2), 0)
+        self.assertTrue(Timer.is_timeout(budget1))
+        self.assertFalse(Timer.is_timeout(budget2))
+        self.assertTrue(Timer.is_timeout(Timer.get_pid(dummy1)))
+        self.assertFalse(Timer.is_timeout(Timer.get_pid(dummy2)))
+
+        # 引数で渡された時間予算はそのまま使用する
+        self.assertIs(dummy1.timer_start(budget=budget2), budget2)
+
+        # タイマーなしの場合はプロセスID
+        self.assertEqual(Timer.get_budget(self), Timer.get_pid(self))
+        self.assertNotIsInstance(Timer.get_budget(self), TimeBudget)
+
+        Timer.time_limit = pre_limit
@@ -3,7 +3,7 @@
 
 import unittest
 
-from reversi.board import BitBoard
+from reversi.board import Board, BitBoard
 import reversi.strategies.coordinator as coord
 
 
@@ -71,6 +71,62 @@ class TestEvaluator(unittest.TestCase):
         score = evaluator.evaluate('black', board8, possibility_b, possibility_w)
         self.assertEqual(score, -61)
 
+    def test_general_evaluator_compile(self):
+        from reversi.strategies import _NegaScout_
+
+        def create():
+            return coord.Evaluator(
+                separated=[coord.WinLoseScorer()],
+                combined=[
+                    coord.TableScorer(), coord.PossibilityScorer(), coord.OpeningScorer(), coord.NumberScorer(), coord.EdgeScorer(),
+                    coord.CornerScorer(), coord.BlankScorer(), coord.EdgeCornerScorer(), coord.TableScorer(6, corner=10), coord.StableScorer(),
+                ],
+            )
+
+        evaluator, compiled = create(), create().compile()
+        self.assertIsNone(evaluator.cy_evaluator)
+        self.assertIsNotNone(compiled.cy_evaluator)
+
+        # 組み込みのScorer以外はまとめられない
+        with self.assertRaises(ValueError):
+            coord.Evaluator(separated=[coord.NumberScorer()]).compile()
+        with self.assertRaises(ValueError):
+            coord.Evaluator(combined=[coord.Evaluator_T()]).compile()
+
+        # 各Scorerで算出した場合と同じ評価値になる
+        board8 = BitBoard(8)
+        color = 'black'
+        while True:
+            moves = board8.get_legal_moves(color)
+            if not moves:
+                color = 'white' if color == 'black' else 'black'
+                moves = board8.get_legal_moves(color)
+                if not moves:
+                    break
+            board8.put_disc(color, *moves[len(moves) // 2])
+            color = 'white' if color == 'black' else 'black'
+            possibility_b = board8.get_bit_count(board8.get_legal_moves_bits('black'))
+            possibility_w = board8.get_bit_count(board8.get_legal_moves_bits('white'))
+            expected = evaluator.evaluate(color, board8, possibility_b, possibility_w)
+            self.assertAlmostEqual(compiled.evaluate(color, board8, possibility_b, possibility_w), expected)
+        self.assertEqual(compiled.evaluate(color, board8, 0, 0), evaluator.evaluate(color, board8, 0, 0))  # 対局終了時
+
+        # 盤面サイズ8以外は各Scorerで算出
+        board6 = BitBoard(6)
+        board6.put_disc('black', 1, 2)
+        self.assertEqual(compiled.evaluate('white', board6, 3, 3), evaluator.evaluate('white', board6, 3, 3))
+
+        # 探索結果も変わらない
+        board8 = BitBoard(8)
+        for color, move in [('black', (3, 2)), ('white', (2, 4)), ('black', (5, 5)), ('white', (4, 2)), ('black', (3, 5))]:
+            board8.put_disc(color, *move)
+        moves = board8.get_legal_moves('white')
+        for depth in range(1, 5):
+            _, expected = _NegaScout_(depth=depth, evaluator=create()).get_best_move('white', board8, moves, depth)
+            _, scores = _NegaScout_(depth=depth, evaluator=create().compile()).get_best_move('white', board8, moves, depth)
+            for move in moves:
+                self.assertAlmostEqual(scores[move], expected[move])
+
     def test_specific_evaluator(self):
         board8 = BitBoard(8)
         board8.put_disc('black', 3, 2)
@@ -350,6 +406,194 @@ class TestEvaluator(unittest.TestCase):
         score = evaluator.evaluate('black', board8, None, None)
         self.assertEqual(score, -10006)
 
+    def test_cy_evaluator(self):
+        import random
+        import reversi
+
+        if reversi.strategies.coordinator.EvaluatorMethods.CYEVALUATOR_ERROR:
+            return
+
+        evaluators = [coord.Evaluator_N_Fast(), coord.Evaluator_TPW_Fast(), coord.Evaluator_TPWE_Fast()]
+        random.seed(0)
+        for _ in range(30):
+            board8 = BitBoard(8)
+            while True:
+                color = 'black' if len(board8.prev) % 2 == 0 else 'white'
+                legal_moves = board8.get_legal_moves(color)
+                if not legal_moves:
+                    color = 'white' if color == 'black' else 'black'
+                    legal_moves = board8.get_legal_moves(color)
+                    if not legal_moves:
+                        break
+                board8.put_disc(color, *random.choice(legal_moves))
+                b, w, _ = board8.get_bitboard_info()
+                possibility_b = board8.get_bit_count(board8.get_legal_moves_bits('black'))
+                possibility_w = board8.get_bit_count(board8.get_legal_moves_bits('white'))
+                for evaluator in evaluators:
+                    expected = evaluator.evaluate('black', board8, possibility_b, possibility_w)
+                    score = evaluator.cy_evaluator.evaluate_bits(1, b, w, board8._black_score, board8._white_score, possibility_b, possibility_w, 0)
+                    self.assertEqual(score, expected)
+
+    def test_pattern_evaluator(self):
+        import os
+        import random
+        import tempfile
+        from array import array
+        import reversi
+        from reversi.strategies.coordinator.EvaluatorMethods import PATTERN_SIZE, evaluate_pattern, save_pattern_weights
+        from reversi.strategies.coordinator.EvaluatorMethods.Pattern import PATTERN_OFFSETS
+
+        # 各パターンの全て空きの重みのみ設定(局面の進行度は2段階)
+        weights = array('h', [0] * PATTERN_SIZE * 2)
+        for offset in PATTERN_OFFSETS:
+            weights[offset] = 1
+            weights[PATTERN_SIZE + offset] = 10
+        evaluator = coord.PatternEvaluator(weights)
+        self.assertEqual(evaluator.stages, 2)
+
+        board8 = BitBoard(8)
+        self.assertEqual(evaluator.evaluate('black', board8, 4, 4), 36)  # 中央の4マスに掛からないパターンの数
+        board8.put_disc('black', 3, 2)
+        self.assertEqual(evaluator.evaluate('black', board8, 3, 3), 34)
+        board8._black_score, board8._white_score = 30, 30
+        self.assertEqual(evaluator.evaluate('black', board8, 3, 3), 340)
+
+        # 勝敗が決まっている場合
+        self.assertEqual(evaluator.evaluate('black', board8, 0, 0), 0)
+        board8._black_score = 31
+        self.assertEqual(evaluator.evaluate('black', board8, 0, 0), 10001)
+
+        # 盤面サイズ8以外は石数
+        self.assertEqual(evaluator.evaluate('black', BitBoard(6), 4, 4), 0)
+
+        # 重みの数が合わない場合
+        with self.assertRaises(ValueError):
+            coord.PatternEvaluator([0] * (PATTERN_SIZE + 1))
+        with self.assertRaises(ValueError):
+            coord.PatternEvaluator(array('i', [0] * PATTERN_SIZE))
+
+        # .npyファイルからの読み込み
+        random.seed(0)
+        weights = array('h', [random.randint(-100, 100) for _ in range(PATTERN_SIZE * 3)])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'pattern.npy')
+            save_pattern_weights(path, weights)
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(10)[:6], b'\x93NUMPY')
+            self.assertEqual(os.path.getsize(path), 128 + PATTERN_SIZE * 3 * 2)
+
+            evaluator = coord.PatternEvaluator(path)
+            self.assertEqual(evaluator.stages, 3)
+            self.assertEqual(list(evaluator.weights[:100]), list(weights[:100]))
+
+            # 探索カーネル用の評価関数と一致する
+            board8 = BitBoard(8)
+            color = 'black'
+            while True:
+                legal_moves = board8.get_legal_moves(color)
+                if not legal_moves:
+                    color = 'white' if color == 'black' else 'black'
+                    legal_moves = board8.get_legal_moves(color)
+                    if not legal_moves:
+                        break
+                board8.put_disc(color, *random.choice(legal_moves))
+                color = 'white' if color == 'black' else 'black'
+                b, w, _ = board8.get_bitboard_info()
+                possibility_b = board8.get_bit_count(board8.get_legal_moves_bits('black'))
+                possibility_w = board8.get_bit_count(board8.get_legal_moves_bits('white'))
+                if possibility_b or possibility_w:
+                    expected = evaluate_pattern(evaluator.weights, evaluator.stages, b, w, board8._black_score, board8._white_score)
+                    self.assertEqual(evaluator.evaluate('black', board8, possibility_b, possibility_w), expected)
+                    if not reversi.strategies.coordinator.EvaluatorMethods.CYEVALUATOR_ERROR:
+                        score = evaluator.cy_evaluator.evaluate_bits(1, b, w, board8._black_score, board8._white_score, possibility_b, possibility_w, 0)
+                        self.assertEqual(score, expected)
+            del evaluator  # メモリマップを解放
+
+    def test_cached_evaluator(self):
+        from reversi.strategies import _NegaScout_
+
+        class CountEvaluator:
+            def __init__(self):
+                self.count = 0
+
+            def evaluate(self, color, board, possibility_b, possibility_w):
+                self.count += 1
+                return board._black_score - board._white_score
+
+        # 同じ盤面と手番は保持した結果を返す
+        evaluator = coord.CachedEvaluator(CountEvaluator(), max_entries=2)
+        self.assertIsNone(evaluator.cy_evaluator)
+        self.assertEqual(evaluator.hit_rate, 0)
+        board8 = BitBoard(8)
+        self.assertEqual(evaluator.evaluate('black', board8, 4, 4), 0)
+        self.assertEqual(evaluator.evaluate('black', board8, 4, 4), 0)
+        self.assertEqual(evaluator.evaluate('white', board8, 4, 4), 0)
+        self.assertEqual((evaluator.hits, evaluator.misses, evaluator.evaluator.count), (1, 2, 2))
+        self.assertAlmostEqual(evaluator.hit_rate, 1 / 3)
+
+        # 上限を超えた場合は最も長く参照していないものから削除
+        self.assertEqual(evaluator.evaluate('black', board8, 4, 4), 0)
+        board8.put_disc('black', 3, 2)
+        self.assertEqual(evaluator.evaluate('white', board8, 3, 3), 3)
+        self.assertEqual(len(evaluator), 2)
+        self.assertIn((BitBoard(8).hash, 'black'), evaluator.cache)
+        self.assertNotIn((BitBoard(8).hash, 'white'), evaluator.cache)
+
+        evaluator.clear()
+        self.assertEqual((len(evaluator), evaluator.hits, evaluator.misses), (0, 0, 0))
+
+        # 探索結果は変わらず、続けて探索した場合は保持した結果を使う
+        board8 = BitBoard(8)
+        for color, move in [('black', (3, 2)), ('white', (2, 4)), ('black', (5, 5)), ('white', (4, 2)), ('black', (3, 5))]:
+            board8.put_disc(color, *move)
+        moves = board8.get_legal_moves('white')
+        evaluator = coord.CachedEvaluator(coord.Evaluator_TPWEC())
+        for depth in range(1, 5):
+            _, expected = _NegaScout_(depth=depth, evaluator=coord.Evaluator_TPWEC()).get_best_move('white', board8, moves, depth)
+            _, scores = _NegaScout_(depth=depth, evaluator=evaluator).get_best_move('white', board8, moves, depth)
+            self.assertEqual(scores, expected)
+        self.assertGreater(evaluator.hits, 0)
+
+        # Cython実装の評価関数は探索カーネルで直接使う
+        inner = coord.Evaluator_TPW_Fast()
+        self.assertIs(coord.CachedEvaluator(inner).cy_evaluator, inner.cy_evaluator)
+
+    def test_cached_evaluator_path_dependent(self):
+        from reversi.strategies import _NegaScout_
+
+        # 開放度を使う評価関数は直前の手でひっくり返した石もキーに含める
+        for evaluator in [coord.Evaluator_O(), coord.Evaluator_TPO(), coord.Evaluator_TPOW(), coord.Evaluator(combined=[coord.OpeningScorer()])]:
+            self.assertTrue(coord.CachedEvaluator(evaluator).path_dependent)
+        for evaluator in [coord.Evaluator_TPW(), coord.Evaluator_TPWEC()]:
+            self.assertFalse(coord.CachedEvaluator(evaluator).path_dependent)
+        self.assertTrue(coord.CachedEvaluator(coord.Evaluator_TPW(), path_dependent=True).path_dependent)
+
+        # 同じ盤面でも、直前の手でひっくり返した石が異なる場合は保持した結果を使わない
+        for board_class in [BitBoard, Board]:
+            board1, board2 = board_class(8), board_class(8)
+            for color, move in [('black', (3, 2)), ('white', (2, 2)), ('black', (1, 2)), ('white', (3, 5)), ('black', (4, 5))]:
+                board1.put_disc(color, *move)
+            for color, move in [('black', (3, 2)), ('white', (2, 2)), ('black', (4, 5)), ('white', (3, 5)), ('black', (1, 2))]:
+                board2.put_disc(color, *move)
+            self.assertEqual(board1.hash, board2.hash)
+            evaluator = coord.CachedEvaluator(coord.Evaluator_O())
+            for board in [board1, board2]:
+                self.assertEqual(evaluator.evaluate('white', board, 0, 0), coord.Evaluator_O().evaluate('white', board, 0, 0))
+            self.assertEqual(evaluator.hits, 0)
+            self.assertNotEqual(evaluator.evaluate('white', board1, 0, 0), evaluator.evaluate('white', board2, 0, 0))
+
+        # 探索結果は変わらない
+        board8 = BitBoard(8)
+        for color, move in [('black', (3, 2)), ('white', (2, 4)), ('black', (5, 5)), ('white', (4, 2)), ('black', (3, 5))]:
+            board8.put_disc(color, *move)
+        moves = board8.get_legal_moves('white')
+        evaluator = coord.CachedEvaluator(coord.Evaluator_TPOW())
+        for depth in range(1, 5):
+            _, expected = _NegaScout_(depth=depth, evaluator=coord.Evaluator_TPOW()).get_best_move('white', board8, moves, depth)
+            _, scores = _NegaScout_(depth=depth, evaluator=evaluator).get_best_move('white', board8, moves, depth)
+            self.assertEqual(scores, expected)
+        self.assertGreater(evaluator.hits, 0)
+
     def test_evaluator_force_import_error(self):
         import os
         import importlib
@@ -360,8 +604,14 @@ class TestEvaluator(unittest.TestCase):
         os.environ['FORCE_EVALUATORMETHODS_IMPORT_ERROR'] = 'RAISE'
         importlib.reload(reversi.strategies.coordinator.EvaluatorMethods)
         self.assertTrue(reversi.strategies.coordinator.EvaluatorMethods.SLOW_MODE)
+        self.assertTrue(reversi.strategies.coordinator.EvaluatorMethods.CYEVALUATOR_ERROR)
         # -------------------------------
 
+        # 探索カーネル用の評価関数なし
+        self.assertIsNone(coord.Evaluator_TPW_Fast().cy_evaluator)
+        self.assertIsNone(coord.Evaluator(separated=[coord.WinLoseScorer()], combined=[coord.TableScorer()]).compile().cy_evaluator)
+        self.assertIsNone(coord.PatternEvaluator([0] * reversi.strategies.coordinator.EvaluatorMethods.PATTERN_SIZE).cy_evaluator)
+
         # Evaluator_TPW_Fast
         board8 = BitBoard(8)
         board8.put_disc('black', 3, 2)
@@ -428,4 +678,5 @@ class TestEvaluator(unittest.TestCase):
         del os.environ['FORCE_EVALUATORMETHODS_IMPORT_ERROR']
         importlib.reload(reversi.strategies.coordinator.EvaluatorMethods)
         self.assertFalse(reversi.strategies.coordinator.EvaluatorMethods.SLOW_MODE)
+        self.assertFalse(reversi.strategies.coordinator.EvaluatorMethods.CYEVALUATOR_ERROR)
         # -------------------------------
@@ -4,7 +4,7 @@
 import unittest
 
 from reversi.board import BitBoard
-from reversi.strategies.coordinator import Orderer, Orderer_B, Orderer_C, Orderer_P, Orderer_BC, Orderer_CB, Orderer_PCB
+from reversi.strategies.coordinator import Orderer, Orderer_B, Orderer_S, Orderer_C, Orderer_P, Orderer_BC, Orderer_CB, Orderer_PCB
 
 
 class TestOrderer(unittest.TestCase):
@@ -27,6 +27,25 @@ class TestOrderer(unittest.TestCase):
 
         self.assertEqual(moves, [(4, 2), (2, 2), (2, 4)])
 
+    def test_orderer_s(self):
+        board = BitBoard(8)
+        board.put_disc('black', 3, 2)
+        orderer = Orderer_S()
+        moves = orderer.move_ordering(color='white', board=board, moves=board.get_legal_moves('white'), best_move=None)
+        self.assertEqual(moves, [(2, 2), (4, 2), (2, 4)])
+
+        scores = {(2, 2): 1, (4, 2): 3, (2, 4): 2}
+        moves = orderer.move_ordering(color='white', board=board, moves=board.get_legal_moves('white'), best_move=None, scores=scores)
+        self.assertEqual(moves, [(4, 2), (2, 4), (2, 2)])
+
+        scores = {(2, 2): 3, (4, 2): 3}
+        moves = orderer.move_ordering(color='white', board=board, moves=board.get_legal_moves('white'), best_move=(4, 2), scores=scores)
+        self.assertEqual(moves, [(4, 2), (2, 2), (2, 4)])
+
+        # 前回の最善手が候補にない場合
+        moves = orderer.move_ordering(color='white', board=board, moves=[(2, 2), (2, 4)], best_move=(4, 2), scores=scores)
+        self.assertEqual(moves, [(2, 2), (2, 4)])
+
     def test_orderer_c(self):
         board = BitBoard(8)
         board.put_disc('black', 3, 2)
@@ -104,6 +104,28 @@ class TestScorer(unittest.TestCase):
         scorer = coord.OpeningScorer()
         self.assertEqual(scorer.get_score(None, board, None, None), -8.25)
 
+        # ビットボード
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 2)
+        board.put_disc('black', 2, 3)
+        board.put_disc('white', 4, 2)
+        board.put_disc('black', 1, 1)
+        board.put_disc('white', 0, 0)
+        self.assertEqual(scorer.get_score(None, board, None, None), -8.25)
+
+        # 盤面サイズ8以外
+        for board, expected in [(Board(10), [-3.0, -2.25, -3.75]), (BitBoard(10), [-3.0, -2.25, -3.75])]:
+            for (color, x, y), score in zip([('black', 4, 3), ('white', 3, 3), ('black', 2, 3)], expected):
+                board.put_disc(color, x, y)
+                self.assertEqual(scorer.get_score(None, board, None, None), score)
+
+        # 盤面の端(左右の列をまたいでカウントしない)
+        board = BitBoard(4)
+        for (color, x, y), score in zip([('black', 1, 0), ('white', 0, 0), ('black', 0, 1)], [-3.0, -2.25, -1.5]):
+            board.put_disc(color, x, y)
+            self.assertEqual(scorer.get_score(None, board, None, None), score)
+
     def test_winlose_scorer(self):
         board = Board()
         board.put_disc('black', 3, 2)
@@ -132,6 +154,18 @@ class TestScorer(unittest.TestCase):
         scorer = coord.NumberScorer()
         self.assertEqual(scorer.get_score(None, board, None, None), -6)
 
+    def test_stable_scorer(self):
+        board = BitBoard()
+        scorer = coord.StableScorer()
+        self.assertEqual(scorer.get_score(None, board, None, None), 0)
+
+        board._black_bitboard = 0xE0C0800000000000
+        board._white_bitboard = 0x0000000000000103
+        self.assertEqual(scorer.get_score(None, board, None, None), 30)
+
+        scorer = coord.StableScorer(w=-2)
+        self.assertEqual(scorer.get_score(None, board, None, None), -6)
+
     def test_edge_scorer(self):
         board = BitBoard()
         scorer = coord.EdgeScorer()
@@ -389,6 +423,20 @@ class TestScorer(unittest.TestCase):
         score = scorer.get_score(None, board, None, None)
         self.assertEqual(score, 8)
 
+        # OpeningScorer
+        scorer = coord.OpeningScorer()
+        board = BitBoard(8)
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 2)
+        board.put_disc('black', 2, 3)
+        self.assertEqual(scorer.get_score(None, board, None, None), -1.5)
+
+        board = BitBoard(10)
+        board.put_disc('black', 4, 3)
+        board.put_disc('white', 3, 3)
+        board.put_disc('black', 2, 3)
+        self.assertEqual(scorer.get_score(None, board, None, None), -3.75)
+
         # -------------------------------
         # recover environment and reload module
         del os.environ['FORCE_SCORERMETHODS_IMPORT_ERROR']
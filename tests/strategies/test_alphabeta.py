@@ -2,13 +2,14 @@
 """
 
 import unittest
-import os
 import time
+import copy
 
 from reversi.board import BitBoard
-from reversi.strategies.common import Timer, Measure, CPU_TIME
+from reversi.strategies.common import Timer, TimeBudget, Measure, CPU_TIME
 from reversi.strategies import _AlphaBeta_, _AlphaBeta, AlphaBeta_, AlphaBeta
 import reversi.strategies.coordinator as coord
+from reversi.strategies.TranspositionTableMethods import TranspositionTable
 
 
 class TestAlphaBeta(unittest.TestCase):
@@ -72,25 +73,106 @@ class TestAlphaBeta(unittest.TestCase):
             moves = board.get_legal_moves('black')
             self.assertEqual(alphabeta.get_best_move('black', board, moves, 5), ((2, 2), {(2, 2): 8, (2, 3): 8, (5, 3): 8, (1, 5): 8, (2, 5): 8, (3, 5): 8, (4, 5): 8, (6, 5): 8}))  # noqa: E501
 
+    def test_alphabeta_transposition_table(self):
+        for instance in [_AlphaBeta_, _AlphaBeta, AlphaBeta_, AlphaBeta]:
+            self.assertIsNone(instance().transposition_table)
+
+            board = BitBoard()
+            alphabeta = instance(evaluator=coord.Evaluator_TPW())
+            alphabeta_tt = instance(evaluator=coord.Evaluator_TPW(), tt_size=1)
+            self.assertTrue(isinstance(alphabeta_tt.transposition_table, TranspositionTable))
+
+            board.put_disc('black', 3, 2)
+            board.put_disc('white', 2, 4)
+            board.put_disc('black', 5, 5)
+            board.put_disc('white', 4, 2)
+            board.put_disc('black', 5, 2)
+            board.put_disc('white', 5, 4)
+            moves = board.get_legal_moves('black')
+            best_move, scores = alphabeta.get_best_move('black', board, moves, 5)
+            best_move_tt, scores_tt = alphabeta_tt.get_best_move('black', board, moves, 5)
+            self.assertEqual(best_move_tt, best_move)
+            self.assertEqual(scores_tt[best_move_tt], scores[best_move])
+            self.assertGreater(alphabeta_tt.transposition_table.probes, 0)
+            self.assertGreater(alphabeta_tt.transposition_table.hits, 0)
+
+            self.assertEqual(alphabeta_tt.next_move('black', board), alphabeta.next_move('black', board))
+
+    def test_alphabeta_killer_history(self):
+        for instance in [_AlphaBeta_, _AlphaBeta, AlphaBeta_, AlphaBeta]:
+            self.assertFalse(instance().killer_history)
+            self.assertTrue(instance(killer_history=True).killer_history)
+
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 4)
+        board.put_disc('black', 5, 5)
+        board.put_disc('white', 4, 2)
+        board.put_disc('black', 5, 2)
+        board.put_disc('white', 5, 4)
+        moves = board.get_legal_moves('black')
+        pid = 'ALPHABETA_KILLER_HISTORY'
+
+        alphabeta = _AlphaBeta(evaluator=coord.Evaluator_TPW())
+        Measure.count[pid] = 0
+        best_move, scores = alphabeta.get_best_move('black', board, moves, 6, pid)
+        count = Measure.count[pid]
+
+        alphabeta_kh = _AlphaBeta(evaluator=coord.Evaluator_TPW(), killer_history=True)
+        Measure.count[pid] = 0
+        best_move_kh, scores_kh = alphabeta_kh.get_best_move('black', board, moves, 6, pid)
+        count_kh = Measure.count[pid]
+
+        self.assertEqual(scores_kh[best_move_kh], scores[best_move])
+        self.assertLess(count_kh, count)
+
+    def test_alphabeta_search_context(self):
+        class NestedEvaluator:
+            """評価中に別の探索を実行する評価関数"""
+            def __init__(self):
+                self.evaluator = coord.Evaluator_TPW()
+                self.search = _AlphaBeta(evaluator=coord.Evaluator_TPW())
+                self.board = BitBoard()
+
+            def evaluate(self, color, board, possibility_b, possibility_w):
+                self.search.next_move('black', self.board)
+                return self.evaluator.evaluate(color, board, possibility_b, possibility_w)
+
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 4)
+        moves = board.get_legal_moves('black')
+
+        # 探索の途中で別の探索を実行しても結果が変わらない
+        alphabeta = _AlphaBeta(evaluator=coord.Evaluator_TPW())
+        alphabeta_nested = _AlphaBeta(evaluator=NestedEvaluator())
+        self.assertIsNotNone(alphabeta.context)
+        self.assertIsNot(alphabeta.context, alphabeta_nested.context)
+        self.assertEqual(alphabeta_nested.get_best_move('black', board, moves, 3), alphabeta.get_best_move('black', board, moves, 3))
+        self.assertEqual(board.get_legal_moves('black'), moves)
+
+        # 複製した場合は探索ごとの状態を共有しない
+        alphabeta_copy = copy.deepcopy(alphabeta)
+        self.assertIsNot(alphabeta_copy.context, alphabeta.context)
+        self.assertEqual(alphabeta_copy.next_move('black', board), alphabeta.next_move('black', board))
+
     def test_alphabeta_performance_of_get_score(self):
         board = BitBoard()
         board.put_disc('black', 3, 2)
 
         # AlphaBeta
         alphabeta = AlphaBeta(evaluator=coord.Evaluator_TPOW())
-        pid = alphabeta.__class__.__name__ + str(os.getpid())
+        pid = Timer.get_pid(alphabeta)
 
         Measure.count[pid] = 0
-        Timer.timeout_flag[pid] = False
-        Timer.timeout_value[pid] = 0
-        Timer.deadline[pid] = time.time() + CPU_TIME
+        Timer.set_deadline(pid, 0, CPU_TIME)
         score = alphabeta._get_score('white', board, alphabeta._MIN, alphabeta._MAX, 5, pid=pid)  # depth 5
         self.assertEqual(score, 4)
         self.assertEqual(Measure.count[pid], 703)
 
         # _AlphaBeta
         alphabeta = _AlphaBeta(evaluator=coord.Evaluator_TPOW())
-        pid = alphabeta.__class__.__name__ + str(os.getpid())
+        pid = Timer.get_pid(alphabeta)
 
         Measure.count[pid] = 0
         score = alphabeta._get_score('white', board, alphabeta._MIN, alphabeta._MAX, 2, pid=pid)  # depth 2
@@ -139,7 +221,7 @@ class TestAlphaBeta(unittest.TestCase):
                 return super().get_best_move(color, board, moves, depth)
 
         alphabeta = _AlphaBetaTest(evaluator=coord.Evaluator_TPOW())
-        pid = alphabeta.__class__.__name__ + str(os.getpid())
+        pid = Timer.get_pid(alphabeta)
 
         moves = board.get_legal_moves('black')
         Measure.elp_time[pid] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
@@ -168,15 +250,87 @@ class TestAlphaBeta(unittest.TestCase):
         board = BitBoard()
         board.put_disc('black', 3, 2)
         alphabeta = AlphaBeta(depth=10, evaluator=coord.Evaluator_TPOW())
-        pid = alphabeta.__class__.__name__ + str(os.getpid())
+        pid = Timer.get_pid(alphabeta)
         Measure.elp_time[pid] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
         Measure.count[pid] = 0
 
         alphabeta.next_move('white', board)
-        self.assertTrue(Timer.timeout_flag[pid])
+        self.assertTrue(Timer.is_timeout(pid))
         self.assertLessEqual(Measure.elp_time[pid]['max'], CPU_TIME * 1.1)
         print('(9000)', Measure.count[pid])
 
+    def test_alphabeta_search_stats(self):
+        board = BitBoard()
+        alphabeta = _AlphaBeta_(depth=3, evaluator=coord.Evaluator_TPW_Fast())
+        alphabeta.next_move('black', board)
+        stats = alphabeta.stats
+        self.assertEqual(stats.depth, 3)
+        self.assertEqual(stats.nodes_by_depth[1], 4)
+        self.assertEqual(stats.leaf_evaluations, stats.nodes_by_depth[3])
+        self.assertGreater(stats.cutoffs, 0)
+        self.assertEqual(stats.tt_probes, 0)
+
+    def test_alphabeta_pv(self):
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 4)
+        alphabeta = _AlphaBeta_(depth=4, evaluator=coord.Evaluator_TPW_Fast())
+        self.assertEqual(alphabeta.pv, [])
+
+        # 最善応手手順をたどった末端の評価値が最善手の評価値と一致する
+        moves = board.get_legal_moves('black')
+        best_move, scores = alphabeta.get_best_move('black', board, moves, 4)
+        self.assertEqual(alphabeta.pv, [(5, 5), (4, 2), (3, 5), (4, 5)])
+        color = 'black'
+        for move in alphabeta.pv:
+            board.put_disc(color, *move)
+            color = 'white' if color == 'black' else 'black'
+        score = coord.Evaluator_TPW().evaluate(color, board, len(board.get_legal_moves('black')), len(board.get_legal_moves('white')))
+        self.assertEqual(score, scores[best_move])
+
+    def test_alphabeta_incremental_table_score(self):
+        board = BitBoard()
+        for color, move in [('black', (3, 2)), ('white', (2, 4)), ('black', (5, 5)), ('white', (4, 2)), ('black', (3, 5))]:
+            board.put_disc(color, *move)
+        moves = board.get_legal_moves('white')
+
+        # 着手ごとに差分更新したテーブルの評価値で、盤面全体から求めた場合と同じ評価値になる
+        for fast, slow in [(coord.Evaluator_TPW_Fast(), coord.Evaluator_TPW()), (coord.Evaluator_TPWE_Fast(), coord.Evaluator_TPWE())]:
+            for depth in range(1, 5):
+                _, expected = _AlphaBeta_(depth=depth, evaluator=slow).get_best_move('white', board, moves, depth)
+                _, scores = _AlphaBeta_(depth=depth, evaluator=fast).get_best_move('white', board, moves, depth)
+                self.assertEqual(scores, expected)
+
+    def test_alphabeta_shallow_search_ordering(self):
+        board = BitBoard()
+        for color, move in [('black', (3, 2)), ('white', (2, 4)), ('black', (5, 5)), ('white', (4, 2)), ('black', (3, 5))]:
+            board.put_disc(color, *move)
+        moves = board.get_legal_moves('white')
+
+        # 初期値は並び替えなし、引数で指定でき、複製しても設定を引き継ぐ
+        search = _AlphaBeta_(evaluator=coord.Evaluator_TPW_Fast())
+        self.assertEqual(search.context.ordering_depth, 0)
+        self.assertEqual(search.context.ordering_search_depth, 2)
+        search = _AlphaBeta_(evaluator=coord.Evaluator_TPW_Fast(), ordering_depth=3, ordering_search_depth=1)
+        search_copy = copy.deepcopy(search)
+        self.assertEqual((search_copy.context.ordering_depth, search_copy.context.ordering_search_depth), (3, 1))
+
+        # 浅い探索で手を並び替えても評価値は変わらず、浅い探索のノード数も数える
+        # (Cython実装の評価関数の場合は並び替えにより本探索の枝刈りが減る、Python実装の評価関数の場合はテーブルで代用する)
+        for evaluator in [coord.Evaluator_TPW_Fast(), coord.Evaluator_TPWE_Fast(), coord.Evaluator_TPW()]:
+            for depth in range(1, 6):
+                search = _AlphaBeta_(depth=depth, evaluator=evaluator)
+                expected, expected_scores = search.get_best_move('white', board, moves, depth)
+                ordered = _AlphaBeta_(depth=depth, evaluator=evaluator, ordering_depth=2)
+                best_move, scores = ordered.get_best_move('white', board, moves, depth)
+                self.assertEqual(best_move, expected)
+                self.assertEqual(scores[best_move], expected_scores[expected])
+                if depth >= 3:
+                    self.assertGreater(ordered.stats.nodes, search.stats.nodes)
+                    self.assertGreater(ordered.stats.leaf_evaluations, search.stats.leaf_evaluations)
+                if depth >= 4 and getattr(evaluator, 'cy_evaluator', None) is not None:
+                    self.assertLess(ordered.stats.cutoffs, search.stats.cutoffs)
+
     def test_alphabeta_force_import_error(self):
         import os
         import importlib
@@ -197,12 +351,10 @@ class TestAlphaBeta(unittest.TestCase):
         self.assertEqual(Measure.count[pid], 3)
 
         # timer
-        pid = 'ALPHABETA_IMPORT_ERROR_TIMER'
-        Timer.deadline[pid] = 0
-        Timer.timeout_value[pid] = 100
+        pid = TimeBudget('ALPHABETA_IMPORT_ERROR_TIMER', 100, deadline=0)
         self.assertIsNone(reversi.strategies.AlphaBetaMethods.GetScore.timer(None))
         self.assertEqual(reversi.strategies.AlphaBetaMethods.GetScore.timer(pid), 100)
-        self.assertTrue(Timer.timeout_flag[pid])
+        self.assertTrue(Timer.is_timeout(pid))
 
         # get_score
         alphabeta = AlphaBeta(depth=2, evaluator=coord.Evaluator_N())
@@ -230,19 +382,18 @@ class TestAlphaBeta(unittest.TestCase):
         self.assertEqual(Measure.count[pid], 3)
 
         # get_score_timer
-        Timer.deadline[pid] = 0
-        Timer.timeout_value[pid] = 100
+        pid = TimeBudget(pid, 100, deadline=0)
         score = reversi.strategies.AlphaBetaMethods.GetScore.get_score_timer(alphabeta, color, board, alpha, beta, depth, pid)
         self.assertEqual(score, 100)
-        self.assertTrue(Timer.timeout_flag[pid])
+        self.assertTrue(Timer.is_timeout(pid))
 
-        Timer.deadline[pid] = time.time() + 1
+        pid.deadline = time.monotonic() + 1
         score = reversi.strategies.AlphaBetaMethods.GetScore.get_score_timer(alphabeta, color, board, alpha, beta, depth, pid)
         self.assertEqual(score, 1)
 
         # get_score_measure_timer
         Measure.count[pid] = 0
-        Timer.deadline[pid] = time.time() + 1
+        pid.deadline = time.monotonic() + 1
         score = reversi.strategies.AlphaBetaMethods.GetScore.get_score_measure_timer(alphabeta, color, board, alpha, beta, depth, pid)
         self.assertEqual(score, 1)
         self.assertEqual(Measure.count[pid], 3)
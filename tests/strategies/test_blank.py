@@ -2,7 +2,7 @@
 """
 
 import unittest
-import os
+import copy
 
 from reversi.board import BitBoard
 from reversi.strategies.common import Measure, Timer
@@ -60,6 +60,23 @@ class TestBlank(unittest.TestCase):
             board.put_disc('black', 4, 5)
             self.assertEqual(blank.next_move('white', board), expected.next_move('white', board))
 
+    def test_blank_pv(self):
+        blank = _Blank_(depth=4)
+        self.assertEqual(blank.pv, [])
+        board = BitBoard()
+        best_move = blank.next_move('black', board)
+        self.assertEqual(len(blank.pv), 4)
+        self.assertEqual(blank.pv[0], best_move)
+        color = 'black'
+        for move in blank.pv:
+            self.assertIn(move, board.get_legal_moves(color))
+            board.put_disc(color, *move)
+            color = 'white' if color == 'black' else 'black'
+
+        # 盤面サイズ8以外の場合
+        blank.next_move('black', BitBoard(6))
+        self.assertEqual(blank.pv, blank.negascout_tpweb.pv)
+
     def test_blank_performance(self):
         board = BitBoard()
         board.put_disc('black', 3, 2)
@@ -77,9 +94,9 @@ class TestBlank(unittest.TestCase):
         )
 
         #Timer.time_limit = 1.2
-        key = iterative.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(iterative)
         Measure.elp_time[key] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
-        key2 = iterative.search.__class__.__name__ + str(os.getpid())
+        key2 = Timer.get_pid(iterative.search)
         Measure.count[key2] = 0
         iterative.next_move('black', board)
 
@@ -89,6 +106,34 @@ class TestBlank(unittest.TestCase):
         print('(max_depth=9)', iterative.max_depth)
         print(' max :', Measure.elp_time[key]['max'], '(s)')
 
+    def test_blank_shallow_search_ordering(self):
+        board = BitBoard()
+        for color, move in [('black', (3, 2)), ('white', (2, 4)), ('black', (5, 5)), ('white', (4, 2)), ('black', (3, 5))]:
+            board.put_disc(color, *move)
+        moves = board.get_legal_moves('white')
+
+        # 初期値は並び替えなし、引数で指定でき、複製しても設定を引き継ぐ
+        blank = _Blank_()
+        self.assertEqual(blank.context.ordering_depth, 0)
+        self.assertEqual(blank.context.ordering_search_depth, 2)
+        blank = _Blank_(ordering_depth=3, ordering_search_depth=1)
+        blank_copy = copy.deepcopy(blank)
+        self.assertEqual((blank_copy.context.ordering_depth, blank_copy.context.ordering_search_depth), (3, 1))
+
+        # 浅い探索で手を並び替えても評価値は変わらず、浅い探索のノード数も数える(並び替えにより本探索の枝刈りが減る)
+        for depth in range(1, 7):
+            blank = _Blank_(depth=depth)
+            expected, expected_scores = blank.get_best_move('white', board, moves, depth)
+            ordered = _Blank_(depth=depth, ordering_depth=2)
+            best_move, scores = ordered.get_best_move('white', board, moves, depth)
+            self.assertEqual(best_move, expected)
+            self.assertEqual(scores[best_move], expected_scores[expected])
+            if depth >= 3:
+                self.assertGreater(ordered.stats.nodes, blank.stats.nodes)
+                self.assertGreater(ordered.stats.leaf_evaluations, blank.stats.leaf_evaluations)
+            if depth >= 4:
+                self.assertLess(ordered.stats.cutoffs, blank.stats.cutoffs)
+
     def test_blank_force_import_error(self):
         import os
         import importlib
@@ -2,7 +2,6 @@
 """
 
 import unittest
-import os
 
 from reversi.board import BitBoard
 from reversi.strategies.common import Timer, Measure, CPU_TIME
@@ -153,11 +152,11 @@ class TestEndGame(unittest.TestCase):
         board = BitBoard()
         board.put_disc('black', 3, 2)
         endgame = EndGame(depth=20)
-        pid = endgame.__class__.__name__ + str(os.getpid())
+        pid = Timer.get_pid(endgame)
         Measure.elp_time[pid] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
         Measure.count[pid] = 0
         endgame.next_move('white', board)
-        self.assertTrue(Timer.timeout_flag[pid])
+        self.assertTrue(Timer.is_timeout(pid))
         self.assertLessEqual(Measure.elp_time[pid]['max'], CPU_TIME * 1.1)
         print('(1000000)', Measure.count[pid])
 
@@ -165,7 +164,7 @@ class TestEndGame(unittest.TestCase):
         # Windows10 Celeron 1.6GHz 4.00GB
         board = BitBoard()
         endgame = _EndGame(depth=12)
-        key = endgame.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(endgame)
         Measure.elp_time[key] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
         Measure.count[key] = 0
         color = 'black'
@@ -183,7 +182,7 @@ class TestEndGame(unittest.TestCase):
     def test_endgame_remain_14(self):
         board = BitBoard()
         endgame = _EndGame(depth=14)
-        key = endgame.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(endgame)
         Measure.elp_time[key] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
         Measure.count[key] = 0
         color = 'black'
@@ -201,7 +200,7 @@ class TestEndGame(unittest.TestCase):
     def test_endgame_remain_16(self):
         board = BitBoard()
         endgame = _EndGame(depth=16)
-        key = endgame.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(endgame)
         Measure.elp_time[key] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
         Measure.count[key] = 0
         color = 'black'
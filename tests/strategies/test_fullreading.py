@@ -2,10 +2,9 @@
 """
 
 import unittest
-import os
 
 from reversi.board import BitBoard
-from reversi.strategies.common import Measure
+from reversi.strategies.common import Measure, Timer
 from reversi.strategies import _AlphaBetaN_, _AlphaBetaN, AlphaBetaN_, AlphaBetaN, _FullReading_, _FullReading, FullReading_, FullReading
 
 
@@ -72,7 +71,7 @@ class TestFullReading(unittest.TestCase):
 
         board = BitBoard()
         fullreading = _FullReading(remain=9, base=Test())
-        key = fullreading.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(fullreading)
         Measure.elp_time[key] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
         color = 'white'
 
@@ -118,7 +117,7 @@ class TestFullReading(unittest.TestCase):
 
         board = BitBoard()
         fullreading = _FullReading(remain=10, base=Test())
-        key = fullreading.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(fullreading)
         Measure.elp_time[key] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
         color = 'black'
 
@@ -139,7 +138,7 @@ class TestFullReading(unittest.TestCase):
 
         board = BitBoard()
         fullreading = _FullReading(remain=11, base=Test())
-        key = fullreading.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(fullreading)
         Measure.elp_time[key] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
         color = 'white'
 
@@ -160,7 +159,7 @@ class TestFullReading(unittest.TestCase):
 
         board = BitBoard()
         fullreading = _FullReading(remain=12, base=Test())
-        key = fullreading.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(fullreading)
         Measure.elp_time[key] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
         color = 'black'
 
@@ -2,11 +2,11 @@
 """
 
 import unittest
-import os
+import time
 
 from reversi.board import BitBoard
-from reversi.strategies.common import Measure
-from reversi.strategies import IterativeDeepning
+from reversi.strategies.common import Timer, Measure
+from reversi.strategies import IterativeDeepning, TimeManager
 from reversi.strategies.alphabeta import _AlphaBeta, AlphaBeta
 from reversi.strategies.negascout import NegaScout
 import reversi.strategies.coordinator as coord
@@ -45,9 +45,9 @@ class TestIterativeDeepning(unittest.TestCase):
             limit=4,
         )
 
-        key = iterative.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(iterative)
         Measure.elp_time[key] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
-        key2 = iterative.search.__class__.__name__ + str(os.getpid())
+        key2 = Timer.get_pid(iterative.search)
         Measure.count[key2] = 0
 
         board.put_disc('black', 3, 2)
@@ -69,9 +69,9 @@ class TestIterativeDeepning(unittest.TestCase):
             ),
         )
 
-        key = iterative.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(iterative)
         Measure.elp_time[key] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
-        key2 = iterative.search.__class__.__name__ + str(os.getpid())
+        key2 = Timer.get_pid(iterative.search)
         Measure.count[key2] = 0
         iterative.next_move('black', board)
 
@@ -90,9 +90,9 @@ class TestIterativeDeepning(unittest.TestCase):
             ),
         )
 
-        key = iterative.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(iterative)
         Measure.elp_time[key] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
-        key2 = iterative.search.__class__.__name__ + str(os.getpid())
+        key2 = Timer.get_pid(iterative.search)
         Measure.count[key2] = 0
         iterative.next_move('black', board)
 
@@ -114,9 +114,9 @@ class TestIterativeDeepning(unittest.TestCase):
             ),
         )
 
-        key = iterative.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(iterative)
         Measure.elp_time[key] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
-        key2 = iterative.search.__class__.__name__ + str(os.getpid())
+        key2 = Timer.get_pid(iterative.search)
         Measure.count[key2] = 0
         iterative.next_move('black', board)
 
@@ -135,9 +135,9 @@ class TestIterativeDeepning(unittest.TestCase):
             ),
         )
 
-        key = iterative.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(iterative)
         Measure.elp_time[key] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
-        key2 = iterative.search.__class__.__name__ + str(os.getpid())
+        key2 = Timer.get_pid(iterative.search)
         Measure.count[key2] = 0
         iterative.next_move('black', board)
 
@@ -156,9 +156,9 @@ class TestIterativeDeepning(unittest.TestCase):
             ),
         )
 
-        key = iterative.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(iterative)
         Measure.elp_time[key] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
-        key2 = iterative.search.__class__.__name__ + str(os.getpid())
+        key2 = Timer.get_pid(iterative.search)
         Measure.count[key2] = 0
         iterative.next_move('black', board)
 
@@ -177,9 +177,9 @@ class TestIterativeDeepning(unittest.TestCase):
             ),
         )
 
-        key = iterative.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(iterative)
         Measure.elp_time[key] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
-        key2 = iterative.search.__class__.__name__ + str(os.getpid())
+        key2 = Timer.get_pid(iterative.search)
         Measure.count[key2] = 0
         iterative.next_move('black', board)
 
@@ -188,3 +188,286 @@ class TestIterativeDeepning(unittest.TestCase):
         print('NegaScout-Evaluator_TPWEB : (26000)', Measure.count[key2])
         print('(max_depth=7)', iterative.max_depth)
         print(' max :', Measure.elp_time[key]['max'], '(s)')
+
+    def test_iterative_transposition_table(self):
+        board = BitBoard()
+        iterative = IterativeDeepning(
+            depth=2,
+            selector=coord.Selector(),
+            orderer=coord.Orderer_B(),
+            search=_AlphaBeta(
+                evaluator=coord.Evaluator_TPOW(),
+                tt_size=1,
+            ),
+            limit=4,
+        )
+
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 4)
+        board.put_disc('black', 5, 5)
+        board.put_disc('white', 4, 2)
+        board.put_disc('black', 5, 2)
+        board.put_disc('white', 5, 4)
+        self.assertEqual(iterative.next_move('black', board), (5, 3))
+        self.assertGreaterEqual(iterative.max_depth, 4)
+        self.assertGreater(iterative.search.transposition_table.hits, 0)
+
+    def test_iterative_ordering(self):
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 4)
+        board.put_disc('black', 5, 5)
+        board.put_disc('white', 4, 2)
+        board.put_disc('black', 5, 2)
+        board.put_disc('white', 5, 4)
+
+        iterative = IterativeDeepning(
+            depth=2,
+            selector=coord.Selector(),
+            orderer=coord.Orderer_S(),
+            search=_AlphaBeta(
+                evaluator=coord.Evaluator_TPOW(),
+            ),
+            limit=4,
+            ordering_size=1,
+        )
+        self.assertFalse(iterative.search.transposition_table.cutoff)
+        self.assertEqual(iterative.next_move('black', board), (5, 3))
+        self.assertGreaterEqual(iterative.max_depth, 4)
+        self.assertGreater(iterative.search.transposition_table.hits, 0)
+
+        # 置換表を持つ場合はそのまま使用
+        iterative = IterativeDeepning(
+            depth=2,
+            selector=coord.Selector(),
+            orderer=coord.Orderer_S(),
+            search=_AlphaBeta(
+                evaluator=coord.Evaluator_TPOW(),
+                tt_size=1,
+            ),
+            ordering_size=1,
+        )
+        self.assertTrue(iterative.search.transposition_table.cutoff)
+
+    def test_iterative_aspiration(self):
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 4)
+        board.put_disc('black', 5, 5)
+        board.put_disc('white', 4, 2)
+        board.put_disc('black', 5, 2)
+        board.put_disc('white', 5, 4)
+
+        for search in [_AlphaBeta, NegaScout]:
+            iterative = IterativeDeepning(
+                depth=2,
+                selector=coord.Selector(),
+                orderer=coord.Orderer_S(),
+                search=search(
+                    evaluator=coord.Evaluator_TPOW(),
+                ),
+                limit=4,
+                aspiration=1,
+            )
+            self.assertEqual(iterative.aspiration, 1)
+            self.assertIsNone(iterative.aspiration_width)
+            self.assertEqual(iterative.aspiration_researches, 0)
+
+            self.assertEqual(iterative.next_move('black', board), (5, 3))
+            self.assertGreaterEqual(iterative.max_depth, 4)
+            self.assertGreaterEqual(iterative.aspiration_width, 2)
+            self.assertGreater(iterative.aspiration_researches, 0)
+
+            # 窓を指定した探索
+            moves = board.get_legal_moves('black')
+            best_move, scores = iterative.search.get_best_move('black', board, moves, 2, alpha=10000, beta=10001)  # fail-low
+            self.assertEqual(best_move, moves[0])
+            self.assertTrue(all([score <= 10000 for score in scores.values()]))
+            best_move, scores = iterative.search.get_best_move('black', board, moves, 2, alpha=-10001, beta=-10000)  # fail-high
+            self.assertEqual(scores[best_move], -10000)
+
+    def test_iterative_time_manager(self):
+        time_manager = TimeManager(total=2)
+        iterative = IterativeDeepning(
+            depth=2,
+            selector=coord.Selector(),
+            orderer=coord.Orderer_B(),
+            search=NegaScout(
+                evaluator=coord.Evaluator_TPW_Fast(),
+            ),
+            time_manager=time_manager,
+        )
+        self.assertIs(iterative.time_manager, time_manager)
+
+        # 配分した上限の時間内で読む
+        board = BitBoard()
+        start = time.time()
+        self.assertIn(iterative.next_move('black', board), board.get_legal_moves('black'))
+        elapsed = time.time() - start
+        self.assertLessEqual(elapsed, time_manager.limit * 1.1)
+        self.assertAlmostEqual(time_manager.remaining, 2 - elapsed, places=1)
+        self.assertIsNone(time_manager.start_time)
+
+        # 手の選択肢がない場合は読まない(空きマスが増えたため新しい対局とみなす)
+        board = BitBoard()
+        board._black_bitboard = 0x0000000000000080
+        board._white_bitboard = 0x0000000000004000
+        board.update_score()
+        self.assertEqual(board.get_legal_moves('black'), [(2, 5)])
+        self.assertEqual(iterative.next_move('black', board), (2, 5))
+        self.assertEqual(time_manager.empties, 62)
+        self.assertGreater(time_manager.remaining, 2 - 0.01)
+
+    def test_iterative_predictor(self):
+        board = BitBoard()
+        iterative = IterativeDeepning(
+            depth=2,
+            selector=coord.Selector(),
+            orderer=coord.Orderer_B(),
+            search=NegaScout(
+                evaluator=coord.Evaluator_TPOW(),
+            ),
+            limit=4,
+        )
+        self.assertEqual(iterative.iteration_times, [])
+        self.assertIsNone(iterative.ebf)
+        self.assertFalse(iterative.skipped)
+
+        # 完了した反復ごとの経過時間と実効分岐係数を記録する
+        iterative.next_move('black', board)
+        self.assertEqual(len(iterative.iteration_times), 3)
+        self.assertTrue(all([elapsed > 0 for elapsed in iterative.iteration_times]))
+        self.assertAlmostEqual(iterative.ebf, (iterative.iteration_times[2] / iterative.iteration_times[0]) ** 0.5)
+
+        iterative.iteration_times = [1]
+        self.assertIsNone(iterative._get_ebf())
+        iterative.iteration_times = [1, 3]
+        self.assertEqual(iterative._get_ebf(), 3)
+        iterative.iteration_times = [1, 2, 8, 32]
+        self.assertEqual(iterative._get_ebf(), 4)
+
+    def test_iterative_predictor_skip(self):
+        class SlowSearch:
+            """反復ごとに経過時間が4倍になる探索"""
+            _MIN = -10000000
+
+            def __init__(self):
+                self.depths = []
+
+            def get_best_move(self, color, board, moves, depth, pid=None):
+                self.depths.append(depth)
+                time.sleep(0.01 * 4 ** (depth - 1))
+                return moves[0], {move: depth for move in moves}
+
+        # 次の反復を読み切れないと予測した場合は打ち切る(0.01s, 0.04s, 0.16s, 次は0.64sかかる)
+        iterative = IterativeDeepning(depth=1, selector=coord.Selector(), orderer=coord.Orderer(), search=SlowSearch())
+        time_limit, Timer.time_limit = Timer.time_limit, 0.5
+        try:
+            iterative.next_move('black', BitBoard())
+        finally:
+            Timer.time_limit = time_limit
+        self.assertTrue(iterative.skipped)
+        self.assertEqual(iterative.search.depths, [1, 2, 3])
+        self.assertEqual(iterative.max_depth, 3)
+        self.assertGreater(iterative.ebf, 3)
+
+        # タイマーなしの探索は打ち切らない
+        iterative = IterativeDeepning(depth=1, selector=coord.Selector(), orderer=coord.Orderer(), search=SlowSearch(), limit=4)
+        iterative.search.timer = False
+        time_limit, Timer.time_limit = Timer.time_limit, 0.5
+        try:
+            iterative.next_move('black', BitBoard())
+        finally:
+            Timer.time_limit = time_limit
+        self.assertFalse(iterative.skipped)
+        self.assertEqual(iterative.search.depths, [1, 2, 3, 4])
+
+    def test_iterative_partial_iteration(self):
+        class TimeoutSearch:
+            """指定した深さで、指定した数の手を読んだところでタイムアウトする探索"""
+            _MIN = -10000000
+            _MAX = 10000000
+
+            def __init__(self, completed):
+                self.completed = completed
+
+            def get_best_move(self, color, board, moves, depth, pid=None):
+                scores = {move: depth * 10 + i for i, move in enumerate(moves)}
+                if depth == 2:
+                    Timer.set_timeout(pid)
+                    scores = {move: scores[move] for move in moves[:self.completed + 1]}
+                return max(scores, key=scores.get), scores
+
+        board = BitBoard()
+        moves = board.get_legal_moves('black')
+
+        # 最初の手を読み終えていない場合は、前回の反復の最善手を返す
+        iterative = IterativeDeepning(depth=1, selector=coord.Selector(), orderer=coord.Orderer(), search=TimeoutSearch(0))
+        self.assertEqual(iterative.next_move('black', board), moves[-1])
+
+        # 最初の手を読み終えている場合は、途中までの反復の結果を使う
+        iterative = IterativeDeepning(depth=1, selector=coord.Selector(), orderer=coord.Orderer(), search=TimeoutSearch(1))
+        self.assertEqual(iterative.next_move('black', board), moves[1])
+
+    def test_iterative_partial_iteration_aspiration(self):
+        class FailLowTimeoutSearch:
+            """窓を指定した探索で、最初の手がfail-lowし、次の手を読んでいる途中でタイムアウトする探索"""
+            _MIN = -10000000
+            _MAX = 10000000
+
+            def get_best_move(self, color, board, moves, depth, pid=None, alpha=None, beta=None):
+                if alpha is None:
+                    scores = {move: i for i, move in enumerate(moves)}
+                    return max(scores, key=scores.get), scores
+                Timer.set_timeout(pid)
+                scores = {moves[0]: alpha - 5, moves[1]: Timer.get_timeout_value(pid)}
+                return moves[1], scores  # 窓の下限を超える手がないまま、読み終えていない手が最善手となる
+
+        board = BitBoard()
+        moves = board.get_legal_moves('black')
+
+        # 最善手の評価値が窓の内側の確定値でない場合は、前回の反復の最善手を返す
+        iterative = IterativeDeepning(depth=1, selector=coord.Selector(), orderer=coord.Orderer(), search=FailLowTimeoutSearch(), aspiration=10)
+        self.assertEqual(iterative.next_move('black', board), moves[-1])
+        self.assertEqual(iterative.max_depth, 2)
+
+    def test_iterative_search_stats(self):
+        board = BitBoard()
+        iterative = IterativeDeepning(
+            depth=2,
+            selector=coord.Selector(),
+            orderer=coord.Orderer_B(),
+            search=NegaScout(
+                evaluator=coord.Evaluator_TPW_Fast(),
+                tt_size=1,
+            ),
+            limit=4,
+        )
+        iterative.next_move('black', board)
+
+        # 各反復の探索の統計情報を合計する
+        stats = iterative.stats
+        self.assertIs(iterative.search.stats, stats)
+        self.assertEqual(stats.depth, 4)
+        self.assertEqual(stats.nodes_by_depth[1], 4 * 3)
+        self.assertGreater(stats.tt_hits, 0)
+        self.assertEqual(stats.timeouts, 0)
+
+    def test_iterative_pv(self):
+        board = BitBoard()
+        iterative = IterativeDeepning(
+            depth=2,
+            selector=coord.Selector(),
+            orderer=coord.Orderer_B(),
+            search=NegaScout(
+                evaluator=coord.Evaluator_TPW_Fast(),
+            ),
+            limit=4,
+        )
+        self.assertEqual(iterative.pv, [])
+
+        # 最後に完了した反復の最善応手手順
+        best_move = iterative.next_move('black', board)
+        self.assertEqual(len(iterative.pv), 4)
+        self.assertEqual(iterative.pv[0], best_move)
+        self.assertEqual(iterative.pv, iterative.search.pv)
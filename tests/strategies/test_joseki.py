@@ -2,12 +2,11 @@
 """
 
 import unittest
-import os
 
 from reversi import C as c
 from reversi.board import BitBoard
 from reversi.strategies import AbstractStrategy, Random, _Joseki_, _Usagi_, Usagi, _Tora_, Tora, _Ushi_, Ushi, _Nezumi_, Nezumi, _Neko_, Neko, _Hitsuji_, Hitsuji  # noqa: E501
-from reversi.strategies.common import Measure
+from reversi.strategies.common import Measure, Timer
 from reversi.strategies.joseki import MOUSE, BULL, TIGER, SROSE, ROSEVILLE, FASTBOAT, CAT, RABBIT, SHEEP
 
 
@@ -97,7 +96,7 @@ class TestJoseki(unittest.TestCase):
 
         # no Measure
         _usagi_ = _Usagi_(Random())
-        key = _usagi_.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(_usagi_)
         board = BitBoard()
         _usagi_.next_move(c.black, board)
 
@@ -107,7 +106,7 @@ class TestJoseki(unittest.TestCase):
 
         # with Measure
         usagi = Usagi(Random())
-        key = usagi.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(usagi)
         board = BitBoard()
         usagi.next_move(c.black, board)
 
@@ -153,7 +152,7 @@ class TestJoseki(unittest.TestCase):
 
         # no Measure
         _tora_ = _Tora_(Random())
-        key = _tora_.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(_tora_)
         board = BitBoard()
         _tora_.next_move(c.black, board)
 
@@ -163,7 +162,7 @@ class TestJoseki(unittest.TestCase):
 
         # with Measure
         tora = Tora(Random())
-        key = tora.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(tora)
         board = BitBoard()
         tora.next_move(c.black, board)
 
@@ -206,7 +205,7 @@ class TestJoseki(unittest.TestCase):
 
         # no Measure
         _ushi_ = _Ushi_(Random())
-        key = _ushi_.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(_ushi_)
         board = BitBoard()
         _ushi_.next_move(c.black, board)
 
@@ -216,7 +215,7 @@ class TestJoseki(unittest.TestCase):
 
         # with Measure
         ushi = Ushi(Random())
-        key = ushi.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(ushi)
         board = BitBoard()
         ushi.next_move(c.black, board)
 
@@ -262,7 +261,7 @@ class TestJoseki(unittest.TestCase):
 
         # no Measure
         _nezumi_ = _Nezumi_(Random())
-        key = _nezumi_.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(_nezumi_)
         board = BitBoard()
         _nezumi_.next_move(c.black, board)
 
@@ -272,7 +271,7 @@ class TestJoseki(unittest.TestCase):
 
         # with Measure
         nezumi = Nezumi(Random())
-        key = nezumi.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(nezumi)
         board = BitBoard()
         nezumi.next_move(c.black, board)
 
@@ -324,7 +323,7 @@ class TestJoseki(unittest.TestCase):
 
         # no Measure
         _neko_ = _Neko_(Random())
-        key = _neko_.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(_neko_)
         board = BitBoard()
         _neko_.next_move(c.black, board)
 
@@ -334,7 +333,7 @@ class TestJoseki(unittest.TestCase):
 
         # with Measure
         neko = Neko(Random())
-        key = neko.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(neko)
         board = BitBoard()
         neko.next_move(c.black, board)
 
@@ -382,7 +381,7 @@ class TestJoseki(unittest.TestCase):
 
         # no Measure
         _hitsuji_ = _Hitsuji_(Random())
-        key = _hitsuji_.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(_hitsuji_)
         board = BitBoard()
         _hitsuji_.next_move(c.black, board)
 
@@ -392,7 +391,7 @@ class TestJoseki(unittest.TestCase):
 
         # with Measure
         hitsuji = Hitsuji(Random())
-        key = hitsuji.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(hitsuji)
         board = BitBoard()
         hitsuji.next_move(c.black, board)
 
@@ -2,10 +2,9 @@
 """
 
 import unittest
-import os
 
 from reversi.board import BitBoard
-from reversi.strategies.common import Measure
+from reversi.strategies.common import Measure, Timer
 from reversi.strategies import MinMax
 import reversi.strategies.coordinator as coord
 
@@ -72,7 +71,7 @@ class TestMinMax(unittest.TestCase):
         board.put_disc('black', 3, 2)
 
         minmax = MinMax(evaluator=coord.Evaluator_TPOW())
-        pid = minmax.__class__.__name__ + str(os.getpid())
+        pid = Timer.get_pid(minmax)
 
         Measure.count[pid] = 0
         score = minmax.get_score('white', board, 2, pid=pid)  # depth 2
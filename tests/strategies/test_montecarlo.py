@@ -2,10 +2,9 @@
 """
 
 import unittest
-import os
 
 from reversi.board import BitBoard
-from reversi.strategies.common import Measure
+from reversi.strategies.common import Measure, Timer
 from reversi.strategies import Random, MonteCarlo
 
 
@@ -56,7 +55,7 @@ class TestMonteCarlo(unittest.TestCase):
         montecarlo = MonteCarlo()
         montecarlo.next_move('white', board)
 
-        key = montecarlo.__class__.__name__ + str(os.getpid())
+        key = Timer.get_pid(montecarlo)
         print()
         print(key)
         print(' count(120) :', Measure.count[key])
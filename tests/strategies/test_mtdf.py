@@ -0,0 +1,168 @@
+"""Tests of mtdf.py
+"""
+
+import unittest
+import os
+
+from reversi.board import BitBoard
+from reversi.strategies.common import Timer, Measure, CPU_TIME
+from reversi.strategies import _MTDf_, _MTDf, MTDf_, MTDf, _NegaScout, IterativeDeepning
+import reversi.strategies.coordinator as coord
+from reversi.strategies.TranspositionTableMethods import TranspositionTable
+
+
+MTDF_CLASSES = [_MTDf_, _MTDf, MTDf_, MTDf]
+
+
+class TestMTDf(unittest.TestCase):
+    """mtdf
+    """
+    def test_mtdf_init(self):
+        for class_name in MTDF_CLASSES:
+            mtdf = class_name()
+            self.assertEqual(mtdf._MIN, -10000000)
+            self.assertEqual(mtdf._MAX, 10000000)
+            self.assertEqual(mtdf.depth, 3)
+            self.assertEqual(mtdf.evaluator, None)
+            self.assertTrue(isinstance(mtdf.transposition_table, TranspositionTable))
+            self.assertEqual(mtdf.transposition_table.size, 16)
+            self.assertFalse(mtdf.killer_history)
+            self.assertEqual(mtdf.first_guess, 0)
+
+            mtdf = class_name(depth=4, evaluator=coord.Evaluator_T(), tt_size=1, killer_history=True)
+            self.assertEqual(mtdf.depth, 4)
+            self.assertTrue(isinstance(mtdf.evaluator, coord.Evaluator_T))
+            self.assertEqual(mtdf.transposition_table.size, 1)
+            self.assertTrue(mtdf.killer_history)
+
+    def test_mtdf_next_move(self):
+        for class_name in MTDF_CLASSES:
+            board = BitBoard()
+            mtdf = class_name(evaluator=coord.Evaluator_TPOW(), tt_size=1)
+
+            board.put_disc('black', 3, 2)
+            self.assertEqual(mtdf.next_move('white', board), (2, 4))
+
+            board.put_disc('white', 2, 4)
+            board.put_disc('black', 5, 5)
+            board.put_disc('white', 4, 2)
+            board.put_disc('black', 5, 2)
+            board.put_disc('white', 5, 4)
+            self.assertEqual(mtdf.next_move('black', board), (2, 2))
+
+    def test_mtdf_get_best_move(self):
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 4)
+        board.put_disc('black', 5, 5)
+        board.put_disc('white', 4, 2)
+        board.put_disc('black', 5, 2)
+        board.put_disc('white', 5, 4)
+        moves = board.get_legal_moves('black')
+        negascout = _NegaScout(evaluator=coord.Evaluator_TPW())
+        best_move, scores = negascout.get_best_move('black', board, moves, 5)
+
+        for class_name in MTDF_CLASSES:
+            for killer_history in [False, True]:
+                mtdf = class_name(evaluator=coord.Evaluator_TPW(), tt_size=1, killer_history=killer_history)
+                best_move_mtdf, scores_mtdf = mtdf.get_best_move('black', board, moves, 5)
+                self.assertEqual(best_move_mtdf, best_move)
+                self.assertEqual(scores_mtdf[best_move_mtdf], scores[best_move])
+                self.assertEqual(mtdf.first_guess, scores[best_move])
+
+        # 窓を指定した探索
+        mtdf = _MTDf_(evaluator=coord.Evaluator_TPW(), tt_size=1)
+        best_move, scores = mtdf.get_best_move('black', board, moves, 5, alpha=100, beta=200)
+        self.assertEqual(best_move, moves[0])
+        self.assertLessEqual(scores[best_move], 100)
+
+    def test_mtdf_size6(self):
+        expected = _NegaScout(evaluator=coord.Evaluator_TPW())
+        for class_name in MTDF_CLASSES:
+            board = BitBoard(6)
+            mtdf = class_name(evaluator=coord.Evaluator_TPW(), tt_size=1)
+            board.put_disc('black', 2, 1)
+            self.assertEqual(mtdf.next_move('white', board), expected.next_move('white', board))
+            moves = board.get_legal_moves('white')
+            self.assertEqual(mtdf.get_best_move('white', board, moves, 3)[0], expected.get_best_move('white', board, moves, 3)[0])
+
+    def test_mtdf_performance(self):
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 4)
+        board.put_disc('black', 5, 5)
+        board.put_disc('white', 4, 2)
+        board.put_disc('black', 5, 2)
+        board.put_disc('white', 5, 4)
+        moves = board.get_legal_moves('black')
+
+        pid = 'MTDF_PERFORMANCE'
+        print()
+        searches = [
+            ('NegaScout', _NegaScout(evaluator=coord.Evaluator_TPWE_Fast())),
+            ('MTDf', _MTDf(evaluator=coord.Evaluator_TPWE_Fast(), killer_history=True)),
+        ]
+        for name, search in searches:
+            Measure.count[pid] = 0
+            search.get_best_move('black', board, moves, 6, pid)
+            print(name, Measure.count[pid])
+
+    def test_mtdf_iterative(self):
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 4)
+        board.put_disc('black', 5, 5)
+        board.put_disc('white', 4, 2)
+        board.put_disc('black', 5, 2)
+        board.put_disc('white', 5, 4)
+        iterative = IterativeDeepning(
+            depth=2,
+            selector=coord.Selector(),
+            orderer=coord.Orderer_S(),
+            search=_MTDf(
+                evaluator=coord.Evaluator_TPOW(),
+                tt_size=1,
+            ),
+            limit=4,
+        )
+        self.assertEqual(iterative.next_move('black', board), (5, 3))
+        self.assertGreaterEqual(iterative.max_depth, 4)
+        self.assertGreater(iterative.search.transposition_table.hits, 0)
+
+    def test_mtdf_timer_timeout(self):
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        mtdf = MTDf(depth=12, evaluator=coord.Evaluator_TPOW(), tt_size=1)
+        pid = Timer.get_pid(mtdf)
+        Measure.elp_time[pid] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
+        Measure.count[pid] = 0
+
+        mtdf.next_move('white', board)
+        self.assertTrue(Timer.is_timeout(pid))
+        self.assertLessEqual(Measure.elp_time[pid]['max'], CPU_TIME * 1.1)
+        self.assertEqual(mtdf.first_guess, 0)
+
+    def test_mtdf_force_import_error(self):
+        import importlib
+        import reversi
+
+        # -------------------------------
+        # switch environ and reload module
+        os.environ['FORCE_MTDFMETHODS_IMPORT_ERROR'] = 'RAISE'
+        importlib.reload(reversi.strategies.MTDfMethods)
+        self.assertTrue(reversi.strategies.MTDfMethods.MTDF_SIZE8_64BIT_ERROR)
+        # -------------------------------
+
+        expected = _NegaScout(evaluator=coord.Evaluator_TPW())
+        for class_name in MTDF_CLASSES:
+            board = BitBoard()
+            mtdf = class_name(evaluator=coord.Evaluator_TPW(), tt_size=1)
+            board.put_disc('black', 3, 2)
+            self.assertEqual(mtdf.next_move('white', board), expected.next_move('white', board))
+
+        # -------------------------------
+        # recover environment and reload module
+        del os.environ['FORCE_MTDFMETHODS_IMPORT_ERROR']
+        importlib.reload(reversi.strategies.MTDfMethods)
+        self.assertFalse(reversi.strategies.MTDfMethods.MTDF_SIZE8_64BIT_ERROR)
+        # -------------------------------
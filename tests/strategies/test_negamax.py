@@ -2,8 +2,6 @@
 """
 
 import unittest
-import os
-import time
 
 from reversi.board import BitBoard
 from reversi.strategies.common import Timer, Measure, CPU_TIME
@@ -65,7 +63,7 @@ class TestNegaMax(unittest.TestCase):
                 nonlocal score
                 score -= 1
                 if score == 8:
-                    Timer.timeout_flag[pid] = True
+                    Timer.set_timeout(pid)
 
                 return score
 
@@ -74,11 +72,9 @@ class TestNegaMax(unittest.TestCase):
         board = BitBoard()
         board.put_disc('black', 3, 2)
         negamax = NegaMax(evaluator=coord.Evaluator_TPOW())
-        pid = negamax.__class__.__name__ + str(os.getpid())
+        pid = Timer.get_pid(negamax)
         Measure.count[pid] = 0
-        Timer.timeout_flag[pid] = False
-        Timer.timeout_value[pid] = 0
-        Timer.deadline[pid] = time.time() + CPU_TIME
+        Timer.set_deadline(pid, 0, CPU_TIME)
         negamax.get_score = func()  # override get_score
 
         self.assertEqual(negamax.next_move('white', board), (2, 2))
@@ -101,19 +97,17 @@ class TestNegaMax(unittest.TestCase):
 
         # NegaMax
         negamax = NegaMax(evaluator=coord.Evaluator_TPOW())
-        pid = negamax.__class__.__name__ + str(os.getpid())
+        pid = Timer.get_pid(negamax)
 
         Measure.count[pid] = 0
-        Timer.timeout_flag[pid] = False
-        Timer.timeout_value[pid] = 0
-        Timer.deadline[pid] = time.time() + CPU_TIME
+        Timer.set_deadline(pid, 0, CPU_TIME)
         score = negamax.get_score('white', board, 4, pid=pid)  # depth 4
         self.assertEqual(score, -8.25)
         self.assertEqual(Measure.count[pid], 428)
 
         # _NegaMax
         negamax = _NegaMax(evaluator=coord.Evaluator_TPOW())
-        pid = negamax.__class__.__name__ + str(os.getpid())
+        pid = Timer.get_pid(negamax)
 
         Measure.count[pid] = 0
         score = negamax.get_score('white', board, 2, pid=pid)  # depth 2
@@ -154,9 +148,9 @@ class TestNegaMax(unittest.TestCase):
         board = BitBoard()
         board.put_disc('black', 3, 2)
         negamax = NegaMax(depth=10, evaluator=coord.Evaluator_TPOW())
-        pid = negamax.__class__.__name__ + str(os.getpid())
+        pid = Timer.get_pid(negamax)
         Measure.elp_time[pid] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
 
         negamax.next_move('white', board)
-        self.assertTrue(Timer.timeout_flag[pid])
+        self.assertTrue(Timer.is_timeout(pid))
         self.assertLessEqual(Measure.elp_time[pid]['max'], CPU_TIME * 1.1)
@@ -2,13 +2,14 @@
 """
 
 import unittest
-import os
 import time
+import copy
 
 from reversi.board import BitBoard
-from reversi.strategies.common import Timer, Measure, CPU_TIME
+from reversi.strategies.common import Timer, TimeBudget, Measure, CPU_TIME
 from reversi.strategies import _NegaScout_, _NegaScout, NegaScout_, NegaScout
 import reversi.strategies.coordinator as coord
+from reversi.strategies.TranspositionTableMethods import TranspositionTable
 
 
 NEGASCOUT_CLASSES = [_NegaScout_, _NegaScout, NegaScout_, NegaScout]
@@ -75,25 +76,107 @@ class TestNegaScout(unittest.TestCase):
             moves = board.get_legal_moves('black')
             self.assertEqual(negascout.get_best_move('black', board, moves, 5), ((2, 2), {(2, 2): 8, (2, 3): 8, (5, 3): 8, (1, 5): 8, (2, 5): 8, (3, 5): 8, (4, 5): 8, (6, 5): 8}))  # noqa: E501
 
+    def test_negascout_transposition_table(self):
+        for class_name in NEGASCOUT_CLASSES:
+            self.assertIsNone(class_name().transposition_table)
+
+            board = BitBoard()
+            negascout = class_name(evaluator=coord.Evaluator_TPW())
+            negascout_tt = class_name(evaluator=coord.Evaluator_TPW(), tt_size=1)
+            self.assertTrue(isinstance(negascout_tt.transposition_table, TranspositionTable))
+
+            board.put_disc('black', 3, 2)
+            board.put_disc('white', 2, 4)
+            board.put_disc('black', 5, 5)
+            board.put_disc('white', 4, 2)
+            board.put_disc('black', 5, 2)
+            board.put_disc('white', 5, 4)
+            moves = board.get_legal_moves('black')
+            best_move, scores = negascout.get_best_move('black', board, moves, 5)
+            best_move_tt, scores_tt = negascout_tt.get_best_move('black', board, moves, 5)
+            self.assertEqual(best_move_tt, best_move)
+            self.assertEqual(scores_tt[best_move_tt], scores[best_move])
+            self.assertGreater(negascout_tt.transposition_table.probes, 0)
+            self.assertGreater(negascout_tt.transposition_table.hits, 0)
+
+            self.assertEqual(negascout_tt.next_move('black', board), negascout.next_move('black', board))
+
+    def test_negascout_killer_history(self):
+        for instance in NEGASCOUT_CLASSES:
+            self.assertFalse(instance().killer_history)
+            self.assertTrue(instance(killer_history=True).killer_history)
+
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 4)
+        board.put_disc('black', 5, 5)
+        board.put_disc('white', 4, 2)
+        board.put_disc('black', 5, 2)
+        board.put_disc('white', 5, 4)
+        moves = board.get_legal_moves('black')
+        pid = 'NEGASCOUT_KILLER_HISTORY'
+
+        negascout = _NegaScout(evaluator=coord.Evaluator_TPW())
+        Measure.count[pid] = 0
+        best_move, scores = negascout.get_best_move('black', board, moves, 6, pid)
+        count = Measure.count[pid]
+
+        negascout_kh = _NegaScout(evaluator=coord.Evaluator_TPW(), killer_history=True)
+        Measure.count[pid] = 0
+        best_move_kh, scores_kh = negascout_kh.get_best_move('black', board, moves, 6, pid)
+        count_kh = Measure.count[pid]
+
+        self.assertEqual(scores_kh[best_move_kh], scores[best_move])
+        self.assertGreater(count, 0)
+        self.assertGreater(count_kh, 0)
+
+    def test_negascout_search_context(self):
+        class NestedEvaluator:
+            """評価中に別の探索を実行する評価関数"""
+            def __init__(self):
+                self.evaluator = coord.Evaluator_TPW()
+                self.search = _NegaScout(evaluator=coord.Evaluator_TPW())
+                self.board = BitBoard()
+
+            def evaluate(self, color, board, possibility_b, possibility_w):
+                self.search.next_move('black', self.board)
+                return self.evaluator.evaluate(color, board, possibility_b, possibility_w)
+
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 4)
+        moves = board.get_legal_moves('black')
+
+        # 探索の途中で別の探索を実行しても結果が変わらない
+        negascout = _NegaScout(evaluator=coord.Evaluator_TPW())
+        negascout_nested = _NegaScout(evaluator=NestedEvaluator())
+        self.assertIsNotNone(negascout.context)
+        self.assertIsNot(negascout.context, negascout_nested.context)
+        self.assertEqual(negascout_nested.get_best_move('black', board, moves, 3), negascout.get_best_move('black', board, moves, 3))
+        self.assertEqual(board.get_legal_moves('black'), moves)
+
+        # 複製した場合は探索ごとの状態を共有しない
+        negascout_copy = copy.deepcopy(negascout)
+        self.assertIsNot(negascout_copy.context, negascout.context)
+        self.assertEqual(negascout_copy.next_move('black', board), negascout.next_move('black', board))
+
     def test_negascout_performance_of_get_score(self):
         board = BitBoard()
         board.put_disc('black', 3, 2)
 
         # NegaScout
         negascout = NegaScout(evaluator=coord.Evaluator_TPOW())
-        pid = negascout.__class__.__name__ + str(os.getpid())
+        pid = Timer.get_pid(negascout)
 
         Measure.count[pid] = 0
-        Timer.timeout_flag[pid] = False
-        Timer.timeout_value[pid] = 0
-        Timer.deadline[pid] = time.time() + CPU_TIME
+        Timer.set_deadline(pid, 0, CPU_TIME)
         score = negascout._get_score('white', board, negascout._MIN, negascout._MAX, 5, pid=pid)  # depth 5
         self.assertEqual(score, 4)
         self.assertEqual(Measure.count[pid], 293)
 
         # _NegaScout
         negascout = _NegaScout(evaluator=coord.Evaluator_TPOW())
-        pid = negascout.__class__.__name__ + str(os.getpid())
+        pid = Timer.get_pid(negascout)
 
         Measure.count[pid] = 0
         score = negascout._get_score('white', board, negascout._MIN, negascout._MAX, 2, pid=pid)  # depth 2
@@ -147,7 +230,7 @@ class TestNegaScout(unittest.TestCase):
                 return super().get_best_move(color, board, moves, depth)
 
         negascout = _NegaScoutTest(evaluator=coord.Evaluator_TPOW())
-        pid = negascout.__class__.__name__ + str(os.getpid())
+        pid = Timer.get_pid(negascout)
 
         moves = board.get_legal_moves('black')
         Measure.elp_time[pid] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
@@ -175,16 +258,170 @@ class TestNegaScout(unittest.TestCase):
     def test_negascout_timer_timeout(self):
         board = BitBoard()
         board.put_disc('black', 3, 2)
-        negascout = NegaScout(depth=10, evaluator=coord.Evaluator_TPOW())
-        pid = negascout.__class__.__name__ + str(os.getpid())
+        negascout = NegaScout(depth=14, evaluator=coord.Evaluator_TPOW())
+        pid = Timer.get_pid(negascout)
         Measure.elp_time[pid] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
         Measure.count[pid] = 0
 
         negascout.next_move('white', board)
-        self.assertTrue(Timer.timeout_flag[pid])
+        self.assertTrue(Timer.is_timeout(pid))
         self.assertLessEqual(Measure.elp_time[pid]['max'], CPU_TIME * 1.1)
         print('(10000)', Measure.count[pid])
 
+    def test_negascout_timer_per_instance(self):
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        negascout1 = NegaScout(depth=14, evaluator=coord.Evaluator_TPOW())
+        negascout2 = NegaScout(depth=2, evaluator=coord.Evaluator_TPOW())
+        pid1, pid2 = Timer.get_pid(negascout1), Timer.get_pid(negascout2)
+        self.assertNotEqual(pid1, pid2)
+
+        # 同じクラスの別インスタンスはノード数とタイムアウトを共有しない
+        negascout1.next_move('white', board)
+        count1 = Measure.count[pid1]
+        self.assertTrue(Timer.is_timeout(pid1))
+        self.assertNotIn(pid2, Measure.count)
+        self.assertFalse(Timer.is_timeout(pid2))
+
+        negascout2.next_move('white', board)
+        self.assertFalse(Timer.is_timeout(pid2))
+        self.assertTrue(Timer.is_timeout(pid1))
+        self.assertEqual(Measure.count[pid1], count1)
+        self.assertLess(Measure.count[pid2], count1)
+
+    def test_negascout_timer_interval(self):
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        negascout = NegaScout_(depth=20, evaluator=coord.Evaluator_TPW_Fast())
+        self.assertEqual(negascout.context.timer_interval, 0)
+
+        # 確認間隔を固定した場合
+        negascout.context.timer_interval = 4096
+        self.assertEqual(copy.deepcopy(negascout).context.timer_interval, 4096)
+        start = time.time()
+        negascout.next_move('white', board)
+        pid = Timer.get_pid(negascout)
+        self.assertTrue(Timer.is_timeout(pid))
+        self.assertLessEqual(time.time() - start, CPU_TIME * 1.1)
+
+        # 期限切れの場合は最初のノードでタイムアウトする
+        Timer.set_deadline(pid, 100, -1)
+        moves = board.get_legal_moves('white')
+        best_move, scores = negascout.get_best_move('white', board, moves, 20, pid=pid)
+        self.assertEqual(best_move, moves[0])
+        self.assertEqual(scores, {moves[0]: -100})
+        self.assertTrue(Timer.is_timeout(pid))
+
+    def test_negascout_search_stats(self):
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        negascout = _NegaScout_(depth=4, evaluator=coord.Evaluator_TPW_Fast(), tt_size=1)
+        self.assertEqual(negascout.stats.nodes, 0)
+
+        # 盤面サイズ8の探索では深さごとのノード数などを計測する
+        negascout.next_move('white', board)
+        stats = negascout.stats
+        self.assertEqual(stats.depth, 4)
+        self.assertEqual(sorted(stats.nodes_by_depth), [1, 2, 3, 4])
+        self.assertEqual(stats.nodes_by_depth[1], len(board.get_legal_moves('white')))
+        self.assertEqual(stats.leaf_evaluations, stats.nodes_by_depth[4])
+        self.assertGreater(stats.cutoffs, 0)
+        self.assertGreater(stats.first_move_cutoff_rate, 0)
+        self.assertLessEqual(stats.first_move_cutoff_rate, 1)
+        self.assertGreater(stats.tt_probes, 0)
+        self.assertEqual(stats.timeouts, 0)
+        self.assertGreater(stats.nps, 0)
+
+        # 探索ごとに初期化する(置換表は引き継ぐため読むノード数は減る)
+        negascout.next_move('white', board)
+        self.assertIsNot(negascout.stats, stats)
+        self.assertGreater(negascout.stats.tt_hits, 0)
+        self.assertLess(negascout.stats.nodes, stats.nodes)
+
+        # タイムアウトした場合
+        negascout = NegaScout_(depth=20, evaluator=coord.Evaluator_TPW_Fast())
+        negascout.next_move('white', board)
+        self.assertEqual(negascout.stats.timeouts, 1)
+
+        # 盤面サイズ8以外の場合は深さと時間のみ
+        negascout = _NegaScout_(depth=2, evaluator=coord.Evaluator_TPW())
+        negascout.next_move('black', BitBoard(6))
+        self.assertEqual(negascout.stats.depth, 2)
+        self.assertEqual(negascout.stats.nodes, 0)
+
+    def test_negascout_pv(self):
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 4)
+        negascout = _NegaScout_(depth=5, evaluator=coord.Evaluator_TPW_Fast())
+        self.assertEqual(negascout.pv, [])
+
+        # 最善応手手順をたどった末端の評価値が最善手の評価値と一致する
+        moves = board.get_legal_moves('black')
+        best_move, scores = negascout.get_best_move('black', board, moves, 5)
+        self.assertEqual(len(negascout.pv), 5)
+        self.assertEqual(negascout.pv[0], best_move)
+        color = 'black'
+        for move in negascout.pv:
+            self.assertIn(move, board.get_legal_moves(color))
+            board.put_disc(color, *move)
+            color = 'white' if color == 'black' else 'black'
+        score = coord.Evaluator_TPW().evaluate(color, board, len(board.get_legal_moves('black')), len(board.get_legal_moves('white')))
+        self.assertEqual(score, scores[best_move])
+
+        # next_moveでも保持する
+        negascout = _NegaScout_(depth=3, evaluator=coord.Evaluator_TPW_Fast())
+        best_move = negascout.next_move('black', BitBoard())
+        self.assertEqual(len(negascout.pv), 3)
+        self.assertEqual(negascout.pv[0], best_move)
+
+        # 盤面サイズ8以外の場合は最善手のみ
+        negascout.next_move('black', BitBoard(4))
+        self.assertEqual(len(negascout.pv), 1)
+
+    def test_negascout_incremental_table_score(self):
+        board = BitBoard()
+        for color, move in [('black', (3, 2)), ('white', (2, 4)), ('black', (5, 5)), ('white', (4, 2)), ('black', (3, 5))]:
+            board.put_disc(color, *move)
+        moves = board.get_legal_moves('white')
+
+        # 着手ごとに差分更新したテーブルの評価値で、盤面全体から求めた場合と同じ評価値になる
+        for fast, slow in [(coord.Evaluator_TPW_Fast(), coord.Evaluator_TPW()), (coord.Evaluator_TPWE_Fast(), coord.Evaluator_TPWE())]:
+            for depth in range(1, 6):
+                _, expected = _NegaScout_(depth=depth, evaluator=slow).get_best_move('white', board, moves, depth)
+                _, scores = _NegaScout_(depth=depth, evaluator=fast).get_best_move('white', board, moves, depth)
+                self.assertEqual(scores, expected)
+
+    def test_negascout_shallow_search_ordering(self):
+        board = BitBoard()
+        for color, move in [('black', (3, 2)), ('white', (2, 4)), ('black', (5, 5)), ('white', (4, 2)), ('black', (3, 5))]:
+            board.put_disc(color, *move)
+        moves = board.get_legal_moves('white')
+
+        # 初期値は並び替えなし、引数で指定でき、複製しても設定を引き継ぐ
+        search = _NegaScout_(evaluator=coord.Evaluator_TPW_Fast())
+        self.assertEqual(search.context.ordering_depth, 0)
+        self.assertEqual(search.context.ordering_search_depth, 2)
+        search = _NegaScout_(evaluator=coord.Evaluator_TPW_Fast(), ordering_depth=3, ordering_search_depth=1)
+        search_copy = copy.deepcopy(search)
+        self.assertEqual((search_copy.context.ordering_depth, search_copy.context.ordering_search_depth), (3, 1))
+
+        # 浅い探索で手を並び替えても評価値は変わらず、浅い探索のノード数も数える
+        # (Cython実装の評価関数の場合は並び替えにより本探索の枝刈りが減る、Python実装の評価関数の場合はテーブルで代用する)
+        for evaluator in [coord.Evaluator_TPW_Fast(), coord.Evaluator_TPWE_Fast(), coord.Evaluator_TPW()]:
+            for depth in range(1, 7):
+                search = _NegaScout_(depth=depth, evaluator=evaluator)
+                expected, expected_scores = search.get_best_move('white', board, moves, depth)
+                ordered = _NegaScout_(depth=depth, evaluator=evaluator, ordering_depth=2)
+                best_move, scores = ordered.get_best_move('white', board, moves, depth)
+                self.assertEqual(best_move, expected)
+                self.assertEqual(scores[best_move], expected_scores[expected])
+                if depth >= 3:
+                    self.assertGreater(ordered.stats.nodes, search.stats.nodes)
+                    self.assertGreater(ordered.stats.leaf_evaluations, search.stats.leaf_evaluations)
+                if depth >= 4 and getattr(evaluator, 'cy_evaluator', None) is not None:
+                    self.assertLess(ordered.stats.cutoffs, search.stats.cutoffs)
+
     def test_negascout_force_import_error(self):
         import os
         import importlib
@@ -205,12 +442,10 @@ class TestNegaScout(unittest.TestCase):
         self.assertEqual(Measure.count[pid], 3)
 
         # timer
-        pid = 'NEGASCOUT_IMPORT_ERROR_TIMER'
-        Timer.deadline[pid] = 0
-        Timer.timeout_value[pid] = 100
+        pid = TimeBudget('NEGASCOUT_IMPORT_ERROR_TIMER', 100, deadline=0)
         self.assertIsNone(reversi.strategies.NegaScoutMethods.GetScore.timer(None))
         self.assertEqual(reversi.strategies.NegaScoutMethods.GetScore.timer(pid), 100)
-        self.assertTrue(Timer.timeout_flag[pid])
+        self.assertTrue(Timer.is_timeout(pid))
 
         # get_score
         negascout = NegaScout(depth=2, evaluator=coord.Evaluator_N())
@@ -245,7 +480,8 @@ class TestNegaScout(unittest.TestCase):
         depth = 3
         alpha = -100
         beta = 100
-        Timer.timeout_flag[pid] = True
+        pid = TimeBudget(pid)
+        Timer.set_timeout(pid)
         score = reversi.strategies.NegaScoutMethods.GetScore.get_score(negascout, color, board, alpha, beta, depth, pid)
         self.assertEqual(score, 6)
 
@@ -260,19 +496,19 @@ class TestNegaScout(unittest.TestCase):
         self.assertEqual(Measure.count[pid], 3)
 
         # get_score_timer
-        Timer.deadline[pid] = 0
-        Timer.timeout_value[pid] = 100
+        pid.deadline = 0
+        pid.timeout_value = 100
         score = reversi.strategies.NegaScoutMethods.GetScore.get_score_timer(negascout, color, board, alpha, beta, depth, pid)
         self.assertEqual(score, 100)
-        self.assertTrue(Timer.timeout_flag[pid])
+        self.assertTrue(Timer.is_timeout(pid))
 
-        Timer.deadline[pid] = time.time() + 1
+        pid.deadline = time.monotonic() + 1
         score = reversi.strategies.NegaScoutMethods.GetScore.get_score_timer(negascout, color, board, alpha, beta, depth, pid)
         self.assertEqual(score, -3)
 
         # get_score_measure_timer
         Measure.count[pid] = 0
-        Timer.deadline[pid] = time.time() + 1
+        pid.deadline = time.monotonic() + 1
         score = reversi.strategies.NegaScoutMethods.GetScore.get_score_measure_timer(negascout, color, board, alpha, beta, depth, pid)
         self.assertEqual(score, -3)
         self.assertEqual(Measure.count[pid], 3)
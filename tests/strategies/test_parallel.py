@@ -0,0 +1,379 @@
+"""Tests of parallel.py
+"""
+
+import unittest
+import os
+import pickle
+import time
+
+from reversi.board import BitBoard, Board
+from reversi.strategies.common import Timer, Measure, CPU_TIME
+from reversi.strategies import _ParallelSearch_, _ParallelSearch, ParallelSearch_, ParallelSearch, _ThreadedSearch_, _ThreadedSearch, ThreadedSearch_, ThreadedSearch, _LazySMP_, LazySMP, _NegaScout, NegaScout_, _AlphaBeta, IterativeDeepning, NsI_B_TPW, TimeManager  # noqa: E501
+from reversi.strategies.TranspositionTableMethods import SharedTranspositionTable
+from reversi.strategies.parallel import _get_board_state, _search_helper
+import reversi.strategies.coordinator as coord
+
+
+PARALLELSEARCH_CLASSES = [_ParallelSearch_, _ParallelSearch, ParallelSearch_, ParallelSearch]
+THREADEDSEARCH_CLASSES = [_ThreadedSearch_, _ThreadedSearch, ThreadedSearch_, ThreadedSearch]
+LAZYSMP_CLASSES = [_LazySMP_, LazySMP]
+
+
+def get_board(board):
+    board.put_disc('black', 3, 2)
+    board.put_disc('white', 2, 4)
+    board.put_disc('black', 5, 5)
+    board.put_disc('white', 4, 2)
+    board.put_disc('black', 5, 2)
+    board.put_disc('white', 5, 4)
+    return board
+
+
+class TestParallelSearch(unittest.TestCase):
+    """parallel
+    """
+    def test_parallelsearch_init(self):
+        for class_name in PARALLELSEARCH_CLASSES:
+            search = _NegaScout(depth=4, evaluator=coord.Evaluator_TPW())
+            parallel = class_name(search)
+            self.assertIs(parallel.search, search)
+            self.assertEqual(parallel.depth, 4)
+            self.assertEqual(parallel.processes, os.cpu_count())
+            self.assertEqual(parallel._MIN, -10000000)
+            self.assertEqual(parallel._MAX, 10000000)
+
+            parallel = class_name(search, processes=3)
+            self.assertEqual(parallel.processes, 3)
+
+    def test_parallelsearch_get_best_move(self):
+        for board in [get_board(BitBoard()), get_board(BitBoard(6)), get_board(Board())]:
+            moves = board.get_legal_moves('black')
+            for search in [_NegaScout(evaluator=coord.Evaluator_TPW()), _AlphaBeta(evaluator=coord.Evaluator_TPW(), tt_size=1)]:
+                best_move, scores = search.get_best_move('black', board, moves, 3)
+
+                parallel = _ParallelSearch_(search, processes=2)
+                best_move_parallel, scores_parallel = parallel.get_best_move('black', board, moves, 3)
+                self.assertEqual(scores_parallel[best_move_parallel], scores[best_move])
+                self.assertEqual(board.get_legal_moves('black'), moves)
+
+                # 窓を指定した探索
+                best_move_parallel, scores_parallel = parallel.get_best_move('black', board, moves, 3, alpha=100, beta=200)
+                self.assertEqual(best_move_parallel, moves[0])
+                self.assertLessEqual(scores_parallel[best_move_parallel], 100)
+                parallel.close()
+
+    def test_parallelsearch_next_move(self):
+        expected = _NegaScout(evaluator=coord.Evaluator_TPOW())
+        for class_name in PARALLELSEARCH_CLASSES:
+            board = BitBoard()
+            parallel = class_name(NegaScout_(evaluator=coord.Evaluator_TPOW()), processes=2)
+
+            board.put_disc('black', 3, 2)
+            self.assertEqual(parallel.next_move('white', board), expected.next_move('white', board))
+
+            board = get_board(BitBoard())
+            self.assertEqual(parallel.next_move('black', board), expected.next_move('black', board))
+            parallel.close()
+
+    def test_parallelsearch_single_process(self):
+        board = get_board(BitBoard())
+        moves = board.get_legal_moves('black')
+        search = _NegaScout(evaluator=coord.Evaluator_TPW())
+        parallel = _ParallelSearch_(search, processes=1)
+        self.assertEqual(parallel.get_best_move('black', board, moves, 3), search.get_best_move('black', board, moves, 3))
+        self.assertIsNone(parallel._pool)
+
+    def test_parallelsearch_measure(self):
+        board = get_board(BitBoard())
+        moves = board.get_legal_moves('black')
+        pid = 'PARALLELSEARCH_MEASURE'
+        Measure.count[pid] = 0
+        _NegaScout(evaluator=coord.Evaluator_TPW()).get_best_move('black', board, moves, 4, pid)
+        serial_count = Measure.count[pid]
+
+        parallel = _ParallelSearch_(_NegaScout(evaluator=coord.Evaluator_TPW()), processes=2)
+        Measure.count[pid] = 0
+        parallel.get_best_move('black', board, moves, 4, pid)
+        self.assertGreater(Measure.count[pid], 0)
+        print()
+        print('serial', serial_count, 'parallel', Measure.count[pid])
+        parallel.close()
+
+    def test_parallelsearch_timer_timeout(self):
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        parallel = ParallelSearch(NegaScout_(depth=12, evaluator=coord.Evaluator_TPOW()), processes=2)
+        pid = Timer.get_pid(parallel)
+        Measure.elp_time[pid] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
+
+        parallel.next_move('white', board)
+        self.assertTrue(Timer.is_timeout(pid))
+        self.assertLessEqual(Measure.elp_time[pid]['max'], CPU_TIME * 1.1)
+
+        # 期限切れの場合はワーカーで探索しない
+        Timer.set_deadline(pid, -10000000, -1)
+        moves = board.get_legal_moves('white')
+        best_move, scores = parallel.get_best_move('white', board, moves, 12, pid)
+        self.assertEqual(best_move, moves[0])
+        self.assertEqual(scores, {moves[0]: -10000000})
+        self.assertTrue(Timer.is_timeout(pid))
+        parallel.close()
+
+    def test_parallelsearch_iterative(self):
+        board = get_board(BitBoard())
+        expected = IterativeDeepning(
+            depth=2,
+            selector=coord.Selector(),
+            orderer=coord.Orderer_S(),
+            search=NegaScout_(evaluator=coord.Evaluator_TPOW()),
+            limit=4,
+        )
+        iterative = IterativeDeepning(
+            depth=2,
+            selector=coord.Selector(),
+            orderer=coord.Orderer_S(),
+            search=ParallelSearch_(NegaScout_(evaluator=coord.Evaluator_TPOW(), tt_size=1), processes=2),
+            limit=4,
+        )
+        self.assertEqual(iterative.next_move('black', board), expected.next_move('black', board))
+        self.assertEqual(iterative.max_depth, 4)
+        iterative.search.close()
+
+    def test_parallelsearch_pickle(self):
+        board = get_board(BitBoard())
+        parallel = _ParallelSearch_(_NegaScout(evaluator=coord.Evaluator_TPW()), processes=2)
+        parallel.next_move('black', board)
+        self.assertIsNotNone(parallel._pool)
+
+        parallel_copy = pickle.loads(pickle.dumps(parallel))
+        self.assertIsNone(parallel_copy._pool)
+        self.assertEqual(parallel_copy.next_move('black', board), parallel.next_move('black', board))
+        parallel.close()
+        parallel_copy.close()
+        self.assertIsNone(parallel._pool)
+
+
+class TestThreadedSearch(unittest.TestCase):
+    """threadedsearch
+    """
+    def test_threadedsearch_init(self):
+        for class_name in THREADEDSEARCH_CLASSES:
+            search = _NegaScout(depth=4, evaluator=coord.Evaluator_TPW())
+            threaded = class_name(search)
+            self.assertIs(threaded.search, search)
+            self.assertEqual(threaded.depth, 4)
+            self.assertEqual(threaded.threads, os.cpu_count())
+            self.assertEqual(threaded._MIN, -10000000)
+            self.assertEqual(threaded._MAX, 10000000)
+
+            threaded = class_name(search, threads=3)
+            self.assertEqual(threaded.threads, 3)
+
+    def test_threadedsearch_get_best_move(self):
+        for board in [get_board(BitBoard()), get_board(BitBoard(6)), get_board(Board())]:
+            moves = board.get_legal_moves('black')
+            for search in [_NegaScout(evaluator=coord.Evaluator_TPW_Fast()), _NegaScout(evaluator=coord.Evaluator_TPW()), _AlphaBeta(evaluator=coord.Evaluator_TPW_Fast(), tt_size=1)]:  # noqa: E501
+                best_move, scores = search.get_best_move('black', board, moves, 3)
+
+                threaded = _ThreadedSearch_(search, threads=2)
+                best_move_threaded, scores_threaded = threaded.get_best_move('black', board, moves, 3)
+                self.assertEqual(scores_threaded[best_move_threaded], scores[best_move])
+                self.assertEqual(board.get_legal_moves('black'), moves)
+
+                # 窓を指定した探索
+                best_move_threaded, scores_threaded = threaded.get_best_move('black', board, moves, 3, alpha=100, beta=200)
+                self.assertEqual(best_move_threaded, moves[0])
+                self.assertLessEqual(scores_threaded[best_move_threaded], 100)
+
+                # スレッドごとに探索を複製する
+                self.assertEqual(len(threaded._searches), 2)
+                self.assertNotIn(search, threaded._searches)
+                threaded.close()
+                self.assertIsNone(threaded._executor)
+
+    def test_threadedsearch_next_move(self):
+        expected = _NegaScout(evaluator=coord.Evaluator_TPOW())
+        for class_name in THREADEDSEARCH_CLASSES:
+            board = BitBoard()
+            threaded = class_name(NegaScout_(evaluator=coord.Evaluator_TPOW()), threads=2)
+
+            board.put_disc('black', 3, 2)
+            self.assertEqual(threaded.next_move('white', board), expected.next_move('white', board))
+
+            board = get_board(BitBoard())
+            self.assertEqual(threaded.next_move('black', board), expected.next_move('black', board))
+            threaded.close()
+
+    def test_threadedsearch_single_thread(self):
+        board = get_board(BitBoard())
+        moves = board.get_legal_moves('black')
+        search = _NegaScout(evaluator=coord.Evaluator_TPW())
+        threaded = _ThreadedSearch_(search, threads=1)
+        self.assertEqual(threaded.get_best_move('black', board, moves, 3), search.get_best_move('black', board, moves, 3))
+        self.assertIsNone(threaded._executor)
+
+    def test_threadedsearch_measure(self):
+        board = get_board(BitBoard())
+        moves = board.get_legal_moves('black')
+        pid = 'THREADEDSEARCH_MEASURE'
+        threaded = _ThreadedSearch_(_NegaScout(evaluator=coord.Evaluator_TPW_Fast()), threads=2)
+        Measure.count[pid] = 0
+        threaded.get_best_move('black', board, moves, 4, pid)
+        self.assertGreater(Measure.count[pid], 0)
+        threaded.close()
+
+    def test_threadedsearch_timer_timeout(self):
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        threaded = ThreadedSearch(NegaScout_(depth=12, evaluator=coord.Evaluator_TPOW()), threads=2)
+        pid = Timer.get_pid(threaded)
+        Measure.elp_time[pid] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
+
+        threaded.next_move('white', board)
+        self.assertTrue(Timer.is_timeout(pid))
+        self.assertLessEqual(Measure.elp_time[pid]['max'], CPU_TIME * 1.1)
+
+        # 期限切れの場合はスレッドで探索しない
+        Timer.set_deadline(pid, -10000000, -1)
+        moves = board.get_legal_moves('white')
+        best_move, scores = threaded.get_best_move('white', board, moves, 12, pid)
+        self.assertEqual(best_move, moves[0])
+        self.assertEqual(scores, {moves[0]: -10000000})
+        self.assertTrue(Timer.is_timeout(pid))
+        threaded.close()
+
+    def test_threadedsearch_pickle(self):
+        board = get_board(BitBoard())
+        threaded = _ThreadedSearch_(_NegaScout(evaluator=coord.Evaluator_TPW()), threads=2)
+        threaded.next_move('black', board)
+        self.assertIsNotNone(threaded._executor)
+
+        threaded_copy = pickle.loads(pickle.dumps(threaded))
+        self.assertIsNone(threaded_copy._executor)
+        self.assertEqual(threaded_copy.next_move('black', board), threaded.next_move('black', board))
+        threaded.close()
+        threaded_copy.close()
+
+
+class TestLazySMP(unittest.TestCase):
+    """lazysmp
+    """
+    def get_base(self, limit=4):
+        return IterativeDeepning(
+            depth=2,
+            selector=coord.Selector(),
+            orderer=coord.Orderer_B(),
+            search=NegaScout_(evaluator=coord.Evaluator_TPW()),
+            limit=limit,
+        )
+
+    def test_lazysmp_init(self):
+        for class_name in LAZYSMP_CLASSES:
+            base = NsI_B_TPW()
+            lazysmp = class_name(base, processes=3, tt_size=1)
+            self.assertTrue(isinstance(lazysmp.base, NsI_B_TPW))
+            self.assertEqual(lazysmp.processes, 3)
+            self.assertTrue(isinstance(lazysmp.transposition_table, SharedTranspositionTable))
+            self.assertEqual(lazysmp.transposition_table.size, 1)
+            self.assertIs(lazysmp.base.search.transposition_table, lazysmp.transposition_table)
+            self.assertIsNone(base.search.transposition_table)
+            self.assertIsNone(NsI_B_TPW().search.transposition_table)
+
+            lazysmp = class_name(NsI_B_TPW())
+            self.assertEqual(lazysmp.processes, os.cpu_count())
+
+            # 1プロセスの場合は共有置換表を使わない
+            lazysmp = class_name(NsI_B_TPW(), processes=1)
+            self.assertIsNone(lazysmp.transposition_table)
+            self.assertIsNone(lazysmp.base.search.transposition_table)
+
+    def test_lazysmp_helper_depth(self):
+        lazysmp = _LazySMP_(self.get_base(limit=None), processes=4, tt_size=1)
+        self.assertEqual([lazysmp._get_helper_depth(i) for i in range(3)], [3, 4, 3])
+
+        lazysmp = _LazySMP_(self.get_base(limit=3), processes=4, tt_size=1)
+        self.assertEqual([lazysmp._get_helper_depth(i) for i in range(3)], [3, 3, 3])
+
+    def test_lazysmp_next_move(self):
+        board = get_board(BitBoard())
+        expected = self.get_base().next_move('black', board)
+        for class_name in LAZYSMP_CLASSES:
+            lazysmp = class_name(self.get_base(), processes=3, tt_size=1)
+            self.assertEqual(lazysmp.next_move('black', board), expected)
+            self.assertEqual(lazysmp.base.max_depth, 4)
+            self.assertGreater(lazysmp.transposition_table.hits, 0)
+            self.assertEqual(board.get_legal_moves('black'), get_board(BitBoard()).get_legal_moves('black'))
+
+            lazysmp.close()
+            self.assertIsNone(lazysmp._pool)
+
+    def test_lazysmp_search_helper(self):
+        board = get_board(BitBoard())
+        lazysmp = _LazySMP_(self.get_base(), processes=2, tt_size=1)
+        board.put_disc('black', *board.get_legal_moves('black')[0])
+        key = board._hash
+        board.undo()
+        self.assertIsNone(lazysmp.transposition_table.get(key))
+
+        # 補助プロセスの探索結果が共有置換表に残る
+        lazysmp._get_pool().apply(_search_helper, ((4, 'black', _get_board_state(board), None),))
+        self.assertIsNotNone(lazysmp.transposition_table.get(key))
+
+        # 期限を過ぎている場合は読まない
+        start = time.time()
+        lazysmp._get_pool().apply(_search_helper, ((20, 'white', _get_board_state(board), time.monotonic()),))
+        self.assertLess(time.time() - start, CPU_TIME)
+        lazysmp.close()
+
+    def test_lazysmp_time_manager(self):
+        board = get_board(BitBoard())
+        base = self.get_base(limit=None)
+        base.time_manager = TimeManager(total=20)
+        lazysmp = _LazySMP_(base, processes=3, tt_size=1)
+        lazysmp._get_pool()  # プロセスの生成時間は含めない
+        time_manager = lazysmp.base.time_manager
+
+        # 補助プロセスも同じ期限で読み、待ち時間も含めて持ち時間から差し引く
+        start = time.time()
+        lazysmp.next_move('black', board)
+        elapsed = time.time() - start
+        self.assertLessEqual(elapsed, time_manager.limit * 1.1)
+        self.assertAlmostEqual(time_manager.remaining, 20 - elapsed, delta=0.01)
+        self.assertIsNone(time_manager.start_time)
+        lazysmp.close()
+
+    def test_lazysmp_budget(self):
+        board = get_board(BitBoard())
+        base = self.get_base(limit=None)
+        base.time_manager = TimeManager(total=20)
+        for class_name in LAZYSMP_CLASSES:
+            lazysmp = class_name(base, processes=3, tt_size=1)
+            lazysmp._get_pool()  # プロセスの生成時間は含めない
+            time_manager = lazysmp.base.time_manager
+
+            # 時間予算の指定時はその期限で読み、持ち時間は呼び出し元で管理する
+            budget = Timer.create_budget(Timer.get_pid(lazysmp.base.search), lazysmp.base.search._MIN, 0.2)
+            start = time.time()
+            self.assertIn(lazysmp.next_move('black', board, budget), board.get_legal_moves('black'))
+            self.assertLessEqual(time.time() - start, 0.2 * 1.5)
+            self.assertTrue(Timer.is_timeout(budget) or lazysmp.base.skipped)  # 期限で打ち切る
+            self.assertEqual(time_manager.remaining, 20)
+            lazysmp.close()
+
+    def test_lazysmp_single_process(self):
+        board = get_board(BitBoard())
+        lazysmp = _LazySMP_(self.get_base(), processes=1)
+        self.assertEqual(lazysmp.next_move('black', board), self.get_base().next_move('black', board))
+        self.assertIsNone(lazysmp._pool)
+
+    def test_lazysmp_pickle(self):
+        board = get_board(BitBoard())
+        lazysmp = _LazySMP_(self.get_base(), processes=2, tt_size=1)
+        lazysmp.next_move('black', board)
+        self.assertIsNotNone(lazysmp._pool)
+
+        lazysmp_copy = pickle.loads(pickle.dumps(lazysmp))
+        self.assertIsNone(lazysmp_copy._pool)
+        self.assertEqual(lazysmp_copy.transposition_table.name, lazysmp.transposition_table.name)
+        self.assertIs(lazysmp_copy.base.search.transposition_table, lazysmp_copy.transposition_table)
+        lazysmp.close()
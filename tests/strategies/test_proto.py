@@ -5,7 +5,7 @@ import unittest
 import time
 
 from reversi.board import BitBoard
-from reversi.strategies.common import Timer
+from reversi.strategies.common import Timer, TimeBudget
 from reversi.strategies import MinMax2, NegaMax3, AlphaBeta4, AB_T4, AB_TI
 
 
@@ -101,8 +101,8 @@ class TestAlphaBeta(unittest.TestCase):
         board = BitBoard()
         board._black_bitboard = 0xC001
         board._white_bitboard = 0x2002
-        Timer.timeout_flag[negamax3] = True
         self.assertEqual(negamax3.next_move('black', board), (3, 6))
+        Timer.set_timeout(Timer.get_pid(negamax3))
         self.assertEqual(negamax3.get_score('black', board, 2), -10000000)
 
     def test_proto_alphabeta4_init(self):
@@ -133,14 +133,12 @@ class TestAlphaBeta(unittest.TestCase):
 
     def test_proto_alphabeta4_timeout(self):
         alphabeta4 = AlphaBeta4()
-        pid = 'ALPHABETA4_TIMEOUT'
+        pid = TimeBudget('ALPHABETA4_TIMEOUT', -999, deadline=0)
         board = BitBoard()
         board._black_bitboard = 0xC001
         board._white_bitboard = 0x2002
-        Timer.deadline[pid] = 0
-        Timer.timeout_value[pid] = -999
         self.assertEqual(alphabeta4.get_best_move('black', board, [(3, 6)], 0, pid=pid), (3, 6))
-        Timer.deadline[pid] = time.time() + 0.01
+        pid.deadline = time.monotonic() + 0.01
         self.assertEqual(alphabeta4._get_score('black', board, 1000, -1000, 2, pid=pid), 1000)
 
     def test_proto_alphabeta4_get_score(self):
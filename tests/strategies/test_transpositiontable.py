@@ -0,0 +1,210 @@
+"""Tests of TranspositionTableMethods
+"""
+
+import unittest
+import pickle
+import multiprocessing
+from multiprocessing import shared_memory
+
+import reversi.strategies.TranspositionTableMethods as TranspositionTableMethods
+from reversi.strategies.TranspositionTableMethods import TranspositionTable, SharedTranspositionTable, EXACT, LOWER, UPPER
+
+
+class TestTranspositionTable(unittest.TestCase):
+    """TranspositionTable
+    """
+    def test_transpositiontable_init(self):
+        self.assertFalse(TranspositionTableMethods.TRANSPOSITIONTABLE_ERROR)
+
+        tt = TranspositionTable(1)
+        self.assertEqual(tt.size, 1)
+        self.assertTrue(tt.cutoff)
+        self.assertEqual(tt.buckets, 16384)
+        self.assertEqual(len(tt), 32768)
+        self.assertEqual(tt.probes, 0)
+        self.assertEqual(tt.hits, 0)
+
+        tt = TranspositionTable(0.1, cutoff=False)
+        self.assertEqual(tt.buckets, 1024)
+        self.assertFalse(tt.cutoff)
+
+        with self.assertRaises(ValueError):
+            TranspositionTable(0)
+
+    def test_transpositiontable_get_put(self):
+        tt = TranspositionTable(1)
+        self.assertIsNone(tt.get(0x1234))
+
+        tt.put(0x1234, 3, EXACT, 10, 0x8000000000000000)
+        self.assertEqual(tt.get(0x1234), (3, EXACT, 10, 0x8000000000000000))
+        self.assertEqual(tt.probes, 2)
+        self.assertEqual(tt.hits, 1)
+
+        # 最善手が不明な場合は以前の手を残す
+        tt.put(0x1234, 4, UPPER, -5, 0)
+        self.assertEqual(tt.get(0x1234), (4, UPPER, -5, 0x8000000000000000))
+
+        tt.clear()
+        self.assertIsNone(tt.get(0x1234))
+        self.assertEqual(tt.probes, 1)
+        self.assertEqual(tt.hits, 0)
+
+    def test_transpositiontable_replacement(self):
+        tt = TranspositionTable(1)
+        key1, key2, key3, key4, key5 = [tt.buckets * i + 7 for i in range(5)]  # 同一バケット
+
+        tt.put(key1, 5, EXACT, 1, 1)
+        tt.put(key2, 3, LOWER, 2, 2)  # 深さ優先スロットより浅い -> 常時置換スロット
+        self.assertEqual(tt.get(key1), (5, EXACT, 1, 1))
+        self.assertEqual(tt.get(key2), (3, LOWER, 2, 2))
+
+        tt.put(key3, 1, UPPER, 3, 4)  # 常時置換スロットを上書き
+        self.assertEqual(tt.get(key1), (5, EXACT, 1, 1))
+        self.assertIsNone(tt.get(key2))
+        self.assertEqual(tt.get(key3), (1, UPPER, 3, 4))
+
+        tt.put(key4, 6, EXACT, 4, 8)  # より深い -> 深さ優先スロット(追い出したエントリは常時置換スロットへ)
+        self.assertEqual(tt.get(key4), (6, EXACT, 4, 8))
+        self.assertEqual(tt.get(key1), (5, EXACT, 1, 1))
+        self.assertIsNone(tt.get(key3))
+
+        tt.new_search()  # 世代が変わると浅い探索結果でも置換
+        self.assertEqual(tt.probes, 0)
+        tt.put(key5, 1, EXACT, 5, 16)
+        self.assertEqual(tt.get(key5), (1, EXACT, 5, 16))
+        self.assertEqual(tt.get(key4), (6, EXACT, 4, 8))
+        self.assertIsNone(tt.get(key1))
+
+    def test_transpositiontable_pickle(self):
+        tt = TranspositionTable(1)
+        tt.put(0x1234, 3, EXACT, 10, 1)
+
+        copied = pickle.loads(pickle.dumps(tt))
+        self.assertEqual(copied.size, 1)
+        self.assertTrue(copied.cutoff)
+        self.assertEqual(copied.buckets, tt.buckets)
+        self.assertIsNone(copied.get(0x1234))
+
+    def test_transpositiontable_force_import_error(self):
+        import os
+        import importlib
+
+        # -------------------------------
+        # switch environ and reload module
+        os.environ['FORCE_TRANSPOSITIONTABLEMETHODS_IMPORT_ERROR'] = 'RAISE'
+        importlib.reload(TranspositionTableMethods)
+        self.assertTrue(TranspositionTableMethods.TRANSPOSITIONTABLE_ERROR)
+        self.assertTrue(TranspositionTableMethods.SHARED_TRANSPOSITIONTABLE_ERROR)
+        # -------------------------------
+
+        from reversi.strategies import AlphaBeta, LazySMP, NsI_B_TPW
+        self.assertIsNone(AlphaBeta(tt_size=1).transposition_table)
+        self.assertIsNone(LazySMP(NsI_B_TPW(), processes=2).transposition_table)
+
+        # -------------------------------
+        # recover environment and reload module
+        del os.environ['FORCE_TRANSPOSITIONTABLEMETHODS_IMPORT_ERROR']
+        importlib.reload(TranspositionTableMethods)
+        self.assertFalse(TranspositionTableMethods.TRANSPOSITIONTABLE_ERROR)
+        self.assertFalse(TranspositionTableMethods.SHARED_TRANSPOSITIONTABLE_ERROR)
+        # -------------------------------
+
+
+def put_shared(tt):
+    tt.put(0x5678, 7, LOWER, 2.5, 0x10)
+
+
+class TestSharedTranspositionTable(unittest.TestCase):
+    """SharedTranspositionTable
+    """
+    def test_sharedtranspositiontable_init(self):
+        tt = SharedTranspositionTable(1)
+        self.assertTrue(isinstance(tt, TranspositionTable))
+        self.assertEqual(tt.size, 1)
+        self.assertTrue(tt.cutoff)
+        self.assertEqual(tt.buckets, 16384)
+        self.assertEqual(len(tt), 32768)
+        self.assertTrue(tt.owner)
+        self.assertTrue(tt.name)
+
+        attached = SharedTranspositionTable(1, name=tt.name)
+        self.assertFalse(attached.owner)
+        self.assertEqual(attached.name, tt.name)
+
+        with self.assertRaises(ValueError):
+            SharedTranspositionTable(0)
+
+    def test_sharedtranspositiontable_get_put(self):
+        tt = SharedTranspositionTable(1)
+        attached = SharedTranspositionTable(1, name=tt.name)
+        self.assertIsNone(tt.get(0x1234))
+
+        tt.put(0x1234, 3, EXACT, 10, 0x8000000000000000)
+        self.assertEqual(attached.get(0x1234), (3, EXACT, 10, 0x8000000000000000))
+        self.assertEqual(attached.probes, 1)
+        self.assertEqual(attached.hits, 1)
+
+        # 最善手が不明な場合は以前の手を残す
+        attached.put(0x1234, 4, UPPER, -5, 0)
+        self.assertEqual(tt.get(0x1234), (4, UPPER, -5, 0x8000000000000000))
+
+        tt.clear()
+        self.assertIsNone(attached.get(0x1234))
+
+    def test_sharedtranspositiontable_replacement(self):
+        tt = SharedTranspositionTable(1)
+        key1, key2, key3, key4 = [tt.buckets * i + 7 for i in range(4)]  # 同一バケット
+
+        tt.put(key1, 5, EXACT, 1, 1)
+        tt.put(key2, 3, LOWER, 2, 2)  # 深さ優先スロットより浅い -> 常時置換スロット
+        self.assertEqual(tt.get(key1), (5, EXACT, 1, 1))
+        self.assertEqual(tt.get(key2), (3, LOWER, 2, 2))
+
+        tt.put(key3, 1, UPPER, 3, 4)  # 常時置換スロットを上書き
+        self.assertEqual(tt.get(key1), (5, EXACT, 1, 1))
+        self.assertIsNone(tt.get(key2))
+
+        tt.put(key4, 6, EXACT, 4, 8)  # より深い -> 深さ優先スロット(追い出したエントリは常時置換スロットへ)
+        self.assertEqual(tt.get(key4), (6, EXACT, 4, 8))
+        self.assertEqual(tt.get(key1), (5, EXACT, 1, 1))
+        self.assertIsNone(tt.get(key3))
+
+    def test_sharedtranspositiontable_broken_entry(self):
+        tt = SharedTranspositionTable(1)
+        key = 0x1234
+        tt.put(key, 3, EXACT, 10, 1)
+
+        # 書き込みの競合を模擬して評価値の一部を書き換えると読み捨てる
+        shm = shared_memory.SharedMemory(name=tt.name)
+        offset = (key & (tt.buckets - 1)) * 2 * 32 + 16
+        shm.buf[offset] ^= 0xFF
+        self.assertIsNone(tt.get(key))
+        shm.close()
+
+    def test_sharedtranspositiontable_pickle(self):
+        tt = SharedTranspositionTable(1)
+        tt.put(0x1234, 3, EXACT, 10, 1)
+
+        copied = pickle.loads(pickle.dumps(tt))
+        self.assertFalse(copied.owner)
+        self.assertEqual(copied.name, tt.name)
+        self.assertEqual(copied.get(0x1234), (3, EXACT, 10, 1))
+
+    def test_sharedtranspositiontable_process(self):
+        tt = SharedTranspositionTable(1)
+        for method in multiprocessing.get_all_start_methods():
+            tt.clear()
+            process = multiprocessing.get_context(method).Process(target=put_shared, args=(tt,))
+            process.start()
+            process.join()
+            self.assertEqual(tt.get(0x5678), (7, LOWER, 2.5, 0x10))
+
+    def test_sharedtranspositiontable_unlink(self):
+        tt = SharedTranspositionTable(1)
+        name = tt.name
+        tt.unlink()
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+        tt.put(0x1234, 3, EXACT, 10, 1)
+        self.assertIsNone(tt.get(0x1234))
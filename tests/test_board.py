@@ -1036,6 +1036,53 @@ class TestBoard(unittest.TestCase):
             legal_moves_bits = board.get_legal_moves_bits(c.black)
             self.assertEqual(board.get_bit_count(legal_moves_bits), 4)
 
+    def test_board_get_stable_discs(self):
+        for board in [PyBitBoard(8), BitBoard(8)]:
+            # 初期配置は確定石なし
+            self.assertEqual(board.get_stable_discs(c.black), [])
+            self.assertEqual(board.get_stable_discs_bits(c.white), 0)
+
+            # 隅から連続する石
+            board._black_bitboard = 0xE0C0800000000000
+            board._white_bitboard = 0x0000000000000000
+            self.assertEqual(board.get_stable_discs(c.black), [(0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (0, 2)])
+            self.assertEqual(board.get_stable_discs_bits(c.black), 0xE0C0800000000000)
+
+            # 埋まった辺
+            board._black_bitboard = 0xAA40000000000000
+            board._white_bitboard = 0x5500000000000000
+            self.assertEqual(board.get_stable_discs_bits(c.black), 0xAA00000000000000)
+            self.assertEqual(board.get_stable_discs_bits(c.white), 0x5500000000000000)
+
+        # すべて埋まった盤面
+        for size in [4, 6, 8, 10]:
+            board = PyBitBoard(size)
+            board._black_bitboard = (1 << (size * size)) - 1 - 1
+            board._white_bitboard = 1
+            self.assertEqual(board.get_bit_count(board.get_stable_discs_bits(c.black)), size * size - 1)
+            self.assertEqual(board.get_stable_discs(c.white), [(size - 1, size - 1)])
+
+        # Boardも同じ結果になる
+        board, bitboard, color = Board(6), BitBoard(6), c.black
+        while True:
+            legal_moves = board.get_legal_moves(color)
+            if not legal_moves:
+                color = c.white if color == c.black else c.black
+                legal_moves = board.get_legal_moves(color)
+                if not legal_moves:
+                    break
+            board.put_disc(color, *legal_moves[0])
+            bitboard.put_disc(color, *legal_moves[0])
+            color = c.white if color == c.black else c.black
+            self.assertEqual(board.get_stable_discs(c.black), bitboard.get_stable_discs(c.black))
+            self.assertEqual(board.get_stable_discs_bits(c.white), bitboard.get_stable_discs_bits(c.white))
+        self.assertEqual(board.get_bit_count(board.get_stable_discs_bits(c.black) | board.get_stable_discs_bits(c.white)), 36)
+
+        # 穴は盤面の端と同じ
+        board = BitBoard(8, hole=0x0000000000000001)
+        board._black_bitboard = 0x0000000000000102
+        self.assertEqual(board.get_stable_discs_bits(c.black), 0x0000000000000102)
+
     def test_board_get_bitboard_info(self):
         size = 4
         for board_class in self.board_classes:
@@ -1083,6 +1130,42 @@ class TestBoard(unittest.TestCase):
             board.undo()
             self.assertEqual(str(board), board_str)
 
+    def test_board_hash(self):
+        from reversi.zobrist import ZOBRIST_TURN, get_hash
+
+        for board_class in self.board_classes + [lambda: Board(4), lambda: PyBitBoard(4), lambda: PyBitBoard(10)]:
+            board = board_class()
+            black_bitboard, white_bitboard, _ = board.get_bitboard_info()
+            hash_values = [board.hash]
+            self.assertEqual(board.hash, get_hash(black_bitboard, white_bitboard, c.black))
+
+            # 合法手を打ち続けて差分更新したハッシュ値が再計算と一致すること
+            color = c.black
+            while True:
+                legal_moves = board.get_legal_moves(color)
+                if not legal_moves:
+                    color = c.next_color(color)
+                    legal_moves = board.get_legal_moves(color)
+                    if not legal_moves:
+                        break
+                board.put_disc(color, *legal_moves[len(hash_values) % len(legal_moves)])
+                color = c.next_color(color)
+                black_bitboard, white_bitboard, _ = board.get_bitboard_info()
+                self.assertEqual(board.hash, get_hash(black_bitboard, white_bitboard, color))
+                hash_values.append(board.hash)
+
+            # 全て戻すと元のハッシュ値に戻ること
+            while board.prev:
+                hash_values.pop()
+                board.undo()
+                self.assertEqual(board.hash, hash_values[-1])
+
+        # 手番が異なる場合は別のハッシュ値となること
+        board = BitBoard()
+        board.put_disc(c.black, 3, 2)
+        board_pass = BitBoard(ini_black=board._black_bitboard, ini_white=board._white_bitboard)
+        self.assertEqual(board.hash ^ board_pass.hash, ZOBRIST_TURN)
+
     def test_board_play_result(self):
         for board_class in self.board_classes:
             board = board_class()
@@ -1587,6 +1670,7 @@ class TestBoard(unittest.TestCase):
         self.assertTrue(reversi.BitBoardMethods.SLOW_MODE3)
         self.assertTrue(reversi.BitBoardMethods.SLOW_MODE4)
         self.assertTrue(reversi.BitBoardMethods.SLOW_MODE5)
+        self.assertTrue(reversi.BitBoardMethods.SLOW_MODE6)
         # -------------------------------
 
         # get_board_info
@@ -1639,6 +1723,13 @@ class TestBoard(unittest.TestCase):
         self.assertEqual(board._white_bitboard, 0x0000001008000000)
         self.assertEqual(board._black_score, 2)
         self.assertEqual(board._white_score, 2)
+        self.assertEqual(board.hash, BitBoard(8).hash)
+
+        # get_stable_discs
+        board = BitBoard(8)
+        board._black_bitboard = 0xE0C0800000000000
+        self.assertEqual(board.get_stable_discs(c.black), [(0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (0, 2)])
+        self.assertEqual(board.get_stable_discs_bits(c.white), 0)
 
         # -------------------------------
         # recover environment and reload module
@@ -1649,6 +1740,7 @@ class TestBoard(unittest.TestCase):
         self.assertFalse(reversi.BitBoardMethods.SLOW_MODE3)
         self.assertFalse(reversi.BitBoardMethods.SLOW_MODE4)
         self.assertFalse(reversi.BitBoardMethods.SLOW_MODE5)
+        self.assertFalse(reversi.BitBoardMethods.SLOW_MODE6)
         # -------------------------------
 
     def test_cyboard_force_import_error(self):